@@ -32,3 +32,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário inválido")
 
     return user
+
+
+def user_email(user) -> str | None:
+    """E-mail do usuário autenticado (modelo do banco ou dict, como nos overrides de teste)."""
+    if isinstance(user, dict):
+        return user.get("email")
+    return getattr(user, "email", None)
@@ -1,18 +1,40 @@
 import os
+import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from api.auth.routes import router as auth_router
 from api.routes import edital_routes
 from api.routes import match_routes
 from api.routes import produto_routes
+from api.routes import job_routes
+from core.utils.metrics import CONTENT_TYPE, REGISTRY
+from core.utils.models import REGISTRY as MODELS, warm_up, warmup_kinds
 from db.session import init_db
 
+
+HTTP_SECONDS = REGISTRY.histogram("matchllm_http_request_duration_seconds", "Duração das requisições HTTP por método, rota e status.")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema do banco no startup (não no import): importar a app continua barato
+    await run_in_threadpool(init_db)
+    # MODEL_WARMUP=embedder,ocr,llm (ou all): carrega e aquece os modelos antes da 1ª requisição
+    kinds = warmup_kinds()
+    if kinds:
+        app.state.warmup = await run_in_threadpool(warm_up, kinds)
+    yield
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Licitação IA API",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     cors_origins = os.getenv(
@@ -28,19 +50,40 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.middleware("http")
+    async def http_metrics(request: Request, call_next):
+        t0 = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Rota "template" (/jobs/{job_id}) para não explodir a cardinalidade dos labels
+            route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - t0, method=request.method, route=route, status=status)
+
     app.include_router(auth_router)
 
     app.include_router(edital_routes.router)
     app.include_router(match_routes.router)
     app.include_router(produto_routes.router)
-
-    # initialize DB (development only)
-    init_db()
+    app.include_router(job_routes.router)
 
     @app.get("/health")
     def health():
         return {"status": "ok"}
 
+    @app.get("/health/models")
+    def health_models(request: Request):
+        """Modelos já carregados neste processo (tempo de carga/warm-up) e o resultado do warm-up."""
+        return {"loaded": MODELS.loaded(), "warmup": getattr(request.app.state, "warmup", None)}
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Contadores/histogramas por etapa (OCR, embeddings, LLM, ...) no formato texto do Prometheus."""
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
     @app.get("/")
     def root():
         return {"message": "MatchLLM API", "docs": "/docs"}
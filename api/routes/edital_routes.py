@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Form
+from fastapi.concurrency import run_in_threadpool
 import traceback
 import json
+import time
 from typing import List, Optional
 from pathlib import Path
 from api.models.edital import Produto
@@ -27,7 +29,9 @@ from db.repositories.match_repo import create_match
 
 
 from pydantic import BaseModel
+from core.utils.concurrency import env_concurrency, map_ordered
 from core.utils.emailer import is_valid_email, send_email
+from core.vectorstore.chunk_store import list_edital_ids
 
 
 class MatchMultipleRequest(BaseModel):
@@ -330,16 +334,7 @@ async def match_edital(
 @router.get("/ids")
 async def listar_editais_indexados() -> List[int]:
     """Lista os edital_id disponíveis no vectorstore para facilitar testes."""
-    ids: List[int] = []
-    vector_dir = Path("data/processed/vectorstore")
-    if vector_dir.exists():
-        for fp in vector_dir.glob("edital_*_index.pkl"):
-            try:
-                id_str = fp.name.replace("edital_", "").replace("_index.pkl", "")
-                ids.append(int(id_str))
-            except Exception:
-                continue
-    return sorted(ids)
+    return list_edital_ids(Path("data/processed/vectorstore"))
 
 @router.post("/requisitos/{edital_id}")
 async def gerar_requisitos(edital_id: int, model: str | None = None, max_chunks: int = 20):
@@ -356,6 +351,70 @@ async def gerar_requisitos(edital_id: int, model: str | None = None, max_chunks:
 
 
 
+def _match_multiple_one(request: "MatchMultipleRequest", eid: int, *, produto_id: int | None) -> dict:
+    """Match de um edital do /match_multiple (roda em paralelo, com sessão própria para persistir)."""
+    t0 = time.perf_counter()
+    try:
+        if request.use_requisitos:
+            try:
+                itens = rodar_match_com_requisitos(request.produto, eid, model=request.model)
+            except FileNotFoundError:
+                _ = extrair_requisitos(eid, model=request.model)
+                itens = rodar_match_com_requisitos(request.produto, eid, model=request.model)
+            result_parsed = itens
+            raw = None
+        else:
+            raw = rodar_match(request.produto, eid, request.consulta, model=request.model)
+            # tenta parsear
+            try:
+                parsed = json.loads(raw) if isinstance(raw, str) else raw
+            except Exception:
+                parsed = None
+            result_parsed = parsed
+    except FileNotFoundError:
+        return {"edital_id": eid, "error": "Índice não encontrado", "elapsed_ms": _elapsed_ms(t0)}
+
+    # Build a technical summary from parsed result if available
+    # Normaliza: se o parsed for dict, transforma em lista para consistência
+    if isinstance(result_parsed, dict):
+        result_parsed = [result_parsed]
+    # Aplicar normalização por item
+    if isinstance(result_parsed, list):
+        result_parsed = [_normalize_match_item(it) for it in result_parsed]
+
+    # Persistir match no banco (sessão própria: a do request não é compartilhada entre threads)
+    db = SessionLocal()
+    try:
+        if request.use_requisitos:
+            resultado_llm = {"resultado": result_parsed, "modo": "requisitos"}
+        else:
+            resultado_llm = {"raw": raw, "resultado": result_parsed}
+        create_match(
+            db,
+            edital_id=eid,
+            produto_id=produto_id,
+            consulta=request.consulta,
+            resultado_llm=resultado_llm,
+        )
+    except Exception:
+        pass
+    finally:
+        db.close()
+    summary = _summarize_technical(result_parsed if isinstance(result_parsed, list) else (result_parsed or []))
+
+    return {
+        "edital_id": eid,
+        "resultado": result_parsed,
+        "resultado_llm": raw,
+        "resumo_tecnico": summary,
+        "elapsed_ms": _elapsed_ms(t0),
+    }
+
+
+def _elapsed_ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000.0, 1)
+
+
 @router.post("/match_multiple")
 async def match_multiple(request: "MatchMultipleRequest", db: Session = Depends(get_db)):
     """
@@ -367,8 +426,10 @@ async def match_multiple(request: "MatchMultipleRequest", db: Session = Depends(
     - consulta: texto usado para RAG/retrieval
     - model: override de modelo
     - use_requisitos: se True, usa requisitos já extraídos (ou extrai se ausente)
+
+    Os editais rodam em paralelo (até MATCH_EDITAL_CONCURRENCY); `results` segue a ordem
+    de `edital_ids` e traz `elapsed_ms` por edital.
     """
-    results = []
     try:
         init_db()
 
@@ -378,63 +439,14 @@ async def match_multiple(request: "MatchMultipleRequest", db: Session = Depends(
         except Exception:
             prod_rec = None
 
-        for eid in request.edital_ids:
-            try:
-                if request.use_requisitos:
-                    try:
-                        itens = rodar_match_com_requisitos(request.produto, eid, model=request.model)
-                    except FileNotFoundError:
-                        _ = extrair_requisitos(eid, model=request.model)
-                        itens = rodar_match_com_requisitos(request.produto, eid, model=request.model)
-                    result_parsed = itens
-                    raw = None
-                else:
-                    raw = rodar_match(request.produto, eid, request.consulta, model=request.model)
-                    # tenta parsear
-                    try:
-                        parsed = json.loads(raw) if isinstance(raw, str) else raw
-                    except Exception:
-                        parsed = None
-                    result_parsed = parsed
-
-                # Build a technical summary from parsed result if available
-                # Normaliza: se o parsed for dict, transforma em lista para consistência
-                if isinstance(result_parsed, dict):
-                    result_parsed = [result_parsed]
-                # Aplicar normalização por item
-                if isinstance(result_parsed, list):
-                    result_parsed = [_normalize_match_item(it) for it in result_parsed]
-
-                # Persistir match no banco
-                try:
-                    if request.use_requisitos:
-                        create_match(
-                            db,
-                            edital_id=eid,
-                            produto_id=int(prod_rec.id) if prod_rec else None,
-                            consulta=request.consulta,
-                            resultado_llm={"resultado": result_parsed, "modo": "requisitos"},
-                        )
-                    else:
-                        create_match(
-                            db,
-                            edital_id=eid,
-                            produto_id=int(prod_rec.id) if prod_rec else None,
-                            consulta=request.consulta,
-                            resultado_llm={"raw": raw, "resultado": result_parsed},
-                        )
-                except Exception:
-                    pass
-                summary = _summarize_technical(result_parsed if isinstance(result_parsed, list) else (result_parsed or []))
-
-                results.append({
-                    "edital_id": eid,
-                    "resultado": result_parsed,
-                    "resultado_llm": raw,
-                    "resumo_tecnico": summary,
-                })
-            except FileNotFoundError:
-                results.append({"edital_id": eid, "error": "Índice não encontrado"})
+        produto_id = int(prod_rec.id) if prod_rec else None
+        workers = env_concurrency("MATCH_EDITAL_CONCURRENCY", 2)
+        results = await run_in_threadpool(
+            map_ordered,
+            lambda eid: _match_multiple_one(request, eid, produto_id=produto_id),
+            list(request.edital_ids),
+            workers,
+        )
         response = {"consulta": request.consulta, "produto": request.produto, "results": results}
         email_sent = False
         email_error = None
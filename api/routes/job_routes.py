@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.auth.deps import get_current_user, user_email
+from core.utils.jobs import get_job_manager
+
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@router.get("/")
+async def listar_jobs(limit: int = 50, user=Depends(get_current_user)):
+    """Jobs mais recentes do usuário autenticado (sem o resultado) e contadores da fila."""
+    email = user_email(user)
+    manager = get_job_manager()
+    jobs = manager.list(limit=limit, owner=email) if email else []
+    return {
+        "stats": manager.stats(),
+        "jobs": [j.to_dict(include_result=False) for j in jobs],
+    }
+
+
+@router.get("/{job_id}")
+async def status_job(job_id: str, include_result: bool = True, user=Depends(get_current_user)):
+    """Estado do job: status (queued/running/done/error), etapa, percentual e, ao terminar, o resultado."""
+    job = get_job_manager().get(job_id)
+    email = user_email(user)
+    # Job de outro usuário responde igual a inexistente (não revela que o id existe)
+    if job is None or not email or job.owner != email:
+        raise HTTPException(status_code=404, detail="Job não encontrado (ou já expirado)")
+    return job.to_dict(include_result=include_result)
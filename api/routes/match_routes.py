@@ -1,22 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import os
 import shutil
+import threading
+import time
 import uuid
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from api.auth.deps import get_current_user
-from core.llm.client import LLMClient
+from api.auth.deps import get_current_user, user_email
+from core.utils.models import get_llm_client
 from core.llm.prompt import MATCH_ITEMS_PROMPT, REQUIREMENTS_PROMPT
 from core.pipeline import _chunk_text
 from core.ocr.extractor import PDFExtractor
 from core.pipeline import processar_datasheet
+from core.utils.concurrency import env_concurrency, map_ordered
+from core.utils.jobs import get_job_manager
+from core.utils.profiling import profile
+from core.utils.singleflight import document_flight, match_flight
+from core.utils.tracing import span
 from db.session import SessionLocal, init_db
 from db.repositories.cache_repo import get_document_cache, upsert_document_cache, get_match_cache, upsert_match_cache
 from db.repositories.match_repo import create_match
@@ -107,7 +117,7 @@ def _extract_edital_requirements_from_pdf(pdf_path: str, *, model: str | None) -
     if not preview:
         return {"items": [], "_meta": {"extraction_log": extraction_log, "total_chunks": 0}}
 
-    llm = LLMClient(model=model)
+    llm = get_llm_client(model)
     prompt = REQUIREMENTS_PROMPT.format(edital=preview)
     raw = llm.generate(prompt)
     try:
@@ -135,7 +145,7 @@ def _extract_edital_requirements_from_pdf(pdf_path: str, *, model: str | None) -
 def _match_from_requirements(*, produto_json: dict, requisitos_json: dict, model: str | None) -> object:
     produto_str = json.dumps(produto_json, ensure_ascii=False)
     requisitos_str = json.dumps(requisitos_json, ensure_ascii=False)
-    llm = LLMClient(model=model)
+    llm = get_llm_client(model)
     prompt = MATCH_ITEMS_PROMPT.format(produto=produto_str, requisitos=requisitos_str)
     raw = llm.generate(prompt)
     try:
@@ -144,64 +154,177 @@ def _match_from_requirements(*, produto_json: dict, requisitos_json: dict, model
         return {"error": "LLM retornou resultado não-JSON", "raw": raw}
 
 
-@router.post("/run")
-async def run_match(
-    datasheet: UploadFile = File(...),
-    editais: List[UploadFile] = File(...),
-    consulta: str = Form(""),
-    model: Optional[str] = Form(None),
-    email: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
-):
-    """1-clique: recebe PDFs (datasheet + editais), faz OCR/extração com cache e roda match.
+def _match_edital_upload(
+    db: Session,
+    *,
+    edital: dict,
+    datasheet_name: str | None,
+    produto_sha: str,
+    produto_payload: dict,
+    produto_meta: dict,
+    consulta: str,
+    model: str | None,
+    settings_sig: str,
+    req_hint_key: str,
+    on_requisitos=None,
+) -> dict:
+    """Requisitos (com cache) + match (com cache) de um edital já gravado, na sessão `db` recebida.
+
+    Chamado em paralelo pelo /match/run: cada edital usa sua própria sessão.
+    """
+    filename = edital["name"]
+    edital_sha, edital_path = edital["sha256"], edital["path"]
 
-    - Cache de OCR/extração em `document_cache`
-    - Cache de resultado em `match_cache`
+    def _requisitos() -> tuple[object, bool]:
+        # Reconsulta dentro do single-flight: quem chegou depois do líder acha o cache gravado
+        cache = get_document_cache(db, doc_type="edital", sha256=edital_sha, hint_key=req_hint_key)
+        if cache is not None:
+            return cache.extracted_json, True
+        requisitos = _extract_edital_requirements_from_pdf(str(edital_path), model=model)
+        req_meta = requisitos.get("_meta") if isinstance(requisitos, dict) else {}
+        upsert_document_cache(
+            db,
+            doc_type="edital",
+            sha256=edital_sha,
+            hint_key=req_hint_key,
+            original_name=filename,
+            extracted_json=requisitos,
+            meta_json=req_meta if isinstance(req_meta, dict) else None,
+        )
+        return requisitos, False
+
+    # Uploads simultâneos do mesmo edital esperam uma única extração (OCR + REQUIREMENTS_PROMPT)
+    with span("requisitos") as s:
+        (requisitos, cache_hit), shared = document_flight.do(("edital", edital_sha, req_hint_key), _requisitos)
+        cache_hit = cache_hit or shared
+        s.set(cached=cache_hit, shared=shared)
+    if on_requisitos is not None:
+        on_requisitos()
+
+    # ---- Match cache ----
+    def _match() -> tuple[object, bool]:
+        cached_match = get_match_cache(db, edital_sha256=edital_sha, produto_sha256=produto_sha, settings_sig=settings_sig)
+        if cached_match is not None:
+            return cached_match.result_json, True
+        match_result = _match_from_requirements(
+            produto_json={"nome": produto_payload.get("nome"), **(produto_payload.get("atributos") or {})},
+            requisitos_json=requisitos,
+            model=model,
+        )
+        upsert_match_cache(
+            db,
+            edital_sha256=edital_sha,
+            produto_sha256=produto_sha,
+            settings_sig=settings_sig,
+            result_json=match_result,
+            meta_json={"edital_name": filename, "datasheet_name": datasheet_name},
+        )
+        return match_result, False
+
+    with span("match") as s:
+        (match_result, match_cache_hit), shared = match_flight.do((edital_sha, produto_sha, settings_sig), _match)
+        match_cache_hit = match_cache_hit or shared
+        s.set(cached=match_cache_hit, shared=shared)
+
+    # Persiste também no histórico de matches (best-effort)
+    try:
+        create_match(
+            db,
+            edital_id=None,
+            produto_id=(produto_meta or {}).get("produto_id"),
+            consulta=consulta,
+            resultado_llm={
+                "edital_name": filename,
+                "edital_sha256": edital_sha,
+                "produto_sha256": produto_sha,
+                "requisitos": requisitos,
+                "resultado": match_result,
+            },
+        )
+    except Exception:
+        pass
+
+    return {
+        "edital_name": filename,
+        "edital_sha256": edital_sha,
+        "requisitos_cache_hit": cache_hit,
+        "match_cache_hit": match_cache_hit,
+        "resultado": match_result,
+    }
+
+
+def _run_match_job(
+    ctx,
+    *,
+    datasheet: dict,
+    editais: list[dict],
+    consulta: str,
+    model: str | None,
+    email: str | None,
+) -> dict:
+    """Corpo do /match/run (bloqueante: OCR, extração, LLM). Roda no pool de jobs com sessão própria.
+
+    datasheet/editais: {"name", "sha256", "path"} já gravados pelo request ({"name", "error"} se rejeitado).
+    O resultado traz `trace` (spans por etapa/edital); com PROFILE ligado grava o perfil em PROFILE_DIR.
     """
-    init_db()
+    db = SessionLocal()
+    try:
+        with span("match.run", editais=len(editais)) as root, profile("match.run"):
+            out = _run_match(ctx, db, datasheet=datasheet, editais=editais, consulta=consulta, model=model, email=email)
+        out["trace"] = root.to_dict()
+        return out
+    finally:
+        db.close()
 
-    # ---- Datasheet: OCR/specs + cache ----
-    if not (datasheet.filename or "").lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Datasheet precisa ser PDF")
 
-    produto_sha, datasheet_path = _hash_and_store_upload(datasheet, subdir="datasheet")
+def _datasheet_produto(db: Session, datasheet: dict) -> tuple[dict, dict, bool]:
+    """(produto_payload, produto_meta, cache_hit) do datasheet, via `document_cache` ou OCR/specs."""
+    produto_sha, datasheet_path = datasheet["sha256"], datasheet["path"]
     datasheet_cache = get_document_cache(db, doc_type="datasheet", sha256=produto_sha, hint_key=None)
-    datasheet_cache_hit = datasheet_cache is not None
-
-    if datasheet_cache_hit:
-        produto_payload = datasheet_cache.extracted_json
-        produto_meta = datasheet_cache.meta_json or {}
-    else:
-        fabricante = (Path(datasheet.filename or "").stem or "desconhecido")
-        modelo = fabricante
-        out = processar_datasheet(str(datasheet_path), fabricante, modelo, None, db)
-        # Normaliza o formato esperado pelo front: {nome, atributos}
-        produto_payload = {
-            "nome": f"{out.get('fabricante', '')} {out.get('modelo', '')}".strip() or (datasheet.filename or "Produto"),
-            "atributos": out.get("specs") or {},
-        }
-
-        # também garante persistência em `produtos` (para histórico/consultas)
-        try:
-            prod_rec = get_or_create(db, nome=produto_payload["nome"], atributos_json=produto_payload["atributos"])
-            produto_meta = {"produto_id": int(prod_rec.id)}
-        except Exception:
-            produto_meta = {}
+    if datasheet_cache is not None:
+        return datasheet_cache.extracted_json, datasheet_cache.meta_json or {}, True
+
+    fabricante = (Path(datasheet["name"] or "").stem or "desconhecido")
+    modelo = fabricante
+    out = processar_datasheet(str(datasheet_path), fabricante, modelo, None, db)
+    # Normaliza o formato esperado pelo front: {nome, atributos}
+    produto_payload = {
+        "nome": f"{out.get('fabricante', '')} {out.get('modelo', '')}".strip() or (datasheet["name"] or "Produto"),
+        "atributos": out.get("specs") or {},
+    }
 
-        upsert_document_cache(
-            db,
-            doc_type="datasheet",
-            sha256=produto_sha,
-            hint_key=None,
-            original_name=datasheet.filename,
-            extracted_json=produto_payload,
-            meta_json=produto_meta,
+    # também garante persistência em `produtos` (para histórico/consultas)
+    try:
+        prod_rec = get_or_create(db, nome=produto_payload["nome"], atributos_json=produto_payload["atributos"])
+        produto_meta = {"produto_id": int(prod_rec.id)}
+    except Exception:
+        produto_meta = {}
+
+    upsert_document_cache(
+        db,
+        doc_type="datasheet",
+        sha256=produto_sha,
+        hint_key=None,
+        original_name=datasheet["name"],
+        extracted_json=produto_payload,
+        meta_json=produto_meta,
+    )
+    return produto_payload, produto_meta, False
+
+
+def _run_match(ctx, db: Session, *, datasheet: dict, editais: list[dict], consulta: str, model: str | None, email: str | None) -> dict:
+    produto_sha = datasheet["sha256"]
+
+    # ---- Datasheet: OCR/specs + cache ----
+    ctx.progress("datasheet", 0)
+    with span("datasheet") as s:
+        (produto_payload, produto_meta, datasheet_cache_hit), shared = document_flight.do(
+            ("datasheet", produto_sha, None), _datasheet_produto, db, datasheet
         )
+        datasheet_cache_hit = datasheet_cache_hit or shared
+        s.set(cached=datasheet_cache_hit, shared=shared)
 
     # ---- Editais: OCR/requisitos + cache ----
-    results = []
-    edital_summaries = []
-
     settings_sig = json.dumps(
         {
             "consulta": consulta or "",
@@ -217,87 +340,61 @@ async def run_match(
         sort_keys=True,
     )
 
-    for edital in editais:
-        filename = edital.filename or "edital.pdf"
-        if not filename.lower().endswith(".pdf"):
-            results.append({"edital_name": filename, "error": "Edital precisa ser PDF"})
-            continue
-
-        edital_sha, edital_path = _hash_and_store_upload(edital, subdir="edital")
-
-        cache = get_document_cache(db, doc_type="edital", sha256=edital_sha, hint_key=req_hint_key)
-        cache_hit = cache is not None
-        if cache_hit:
-            requisitos = cache.extracted_json
-            req_meta = cache.meta_json or {}
-        else:
-            requisitos = _extract_edital_requirements_from_pdf(str(edital_path), model=model)
-            req_meta = requisitos.get("_meta") if isinstance(requisitos, dict) else {}
-            upsert_document_cache(
-                db,
-                doc_type="edital",
-                sha256=edital_sha,
-                hint_key=req_hint_key,
-                original_name=filename,
-                extracted_json=requisitos,
-                meta_json=req_meta if isinstance(req_meta, dict) else None,
-            )
-
-        # ---- Match cache ----
-        cached_match = get_match_cache(db, edital_sha256=edital_sha, produto_sha256=produto_sha, settings_sig=settings_sig)
-        match_cache_hit = cached_match is not None
-        if match_cache_hit:
-            match_result = cached_match.result_json
-        else:
-            match_result = _match_from_requirements(
-                produto_json={"nome": produto_payload.get("nome"), **(produto_payload.get("atributos") or {})},
-                requisitos_json=requisitos,
-                model=model,
-            )
-            upsert_match_cache(
-                db,
-                edital_sha256=edital_sha,
-                produto_sha256=produto_sha,
-                settings_sig=settings_sig,
-                result_json=match_result,
-                meta_json={"edital_name": filename, "datasheet_name": datasheet.filename},
-            )
-
-        # Persiste também no histórico de matches (best-effort)
+    # 10% para o datasheet; o resto dividido entre os editais (metade requisitos, metade match).
+    # Com editais em paralelo o percentual conta as etapas já concluídas, em qualquer ordem.
+    total = len(editais)
+    step = 90.0 / max(1, total)
+    done_steps = 0
+    progress_lock = threading.Lock()
+
+    def _step_done(stage: str, steps: int = 1, **meta) -> None:
+        nonlocal done_steps
+        with progress_lock:
+            done_steps += steps
+            ctx.progress(stage, 10.0 + done_steps * step / 2, **meta)
+
+    def _one(item: tuple[int, dict]) -> dict:
+        i, edital = item
+        filename = edital["name"]
+        if edital.get("error"):
+            _step_done(f"edital {i + 1}/{total}: ignorado", steps=2)
+            return {"edital_name": filename, "error": edital["error"]}
+        t0 = time.perf_counter()
+        edital_db = SessionLocal()
         try:
-            create_match(
-                db,
-                edital_id=None,
-                produto_id=(produto_meta or {}).get("produto_id"),
-                consulta=consulta,
-                resultado_llm={
-                    "edital_name": filename,
-                    "edital_sha256": edital_sha,
-                    "produto_sha256": produto_sha,
-                    "requisitos": requisitos,
-                    "resultado": match_result,
-                },
-            )
-        except Exception:
-            pass
-
-        results.append(
-            {
-                "edital_name": filename,
-                "edital_sha256": edital_sha,
-                "requisitos_cache_hit": cache_hit,
-                "match_cache_hit": match_cache_hit,
-                "resultado": match_result,
-            }
-        )
-        edital_summaries.append({"name": filename, "sha256": edital_sha})
+            with span("edital", edital=filename):
+                out = _match_edital_upload(
+                    edital_db,
+                    edital=edital,
+                    datasheet_name=datasheet["name"],
+                    produto_sha=produto_sha,
+                    produto_payload=produto_payload,
+                    produto_meta=produto_meta,
+                    consulta=consulta,
+                    model=model,
+                    settings_sig=settings_sig,
+                    req_hint_key=req_hint_key,
+                    on_requisitos=lambda: _step_done(f"edital {i + 1}/{total}: requisitos", edital=filename),
+                )
+        finally:
+            edital_db.close()
+        out["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        _step_done(f"edital {i + 1}/{total}: match", edital=filename)
+        return out
+
+    ctx.progress("editais", 10.0)
+    workers = env_concurrency("MATCH_EDITAL_CONCURRENCY", 2)
+    results = map_ordered(_one, list(enumerate(editais)), max_workers=workers)
+    edital_summaries = [
+        {"name": r["edital_name"], "sha256": r["edital_sha256"]} for r in results if not r.get("error")
+    ]
 
     return {
         "consulta": consulta,
         "model": model,
         "email": email,
         "datasheet": {
-            "name": datasheet.filename,
+            "name": datasheet["name"],
             "sha256": produto_sha,
             "cache_hit": datasheet_cache_hit,
         },
@@ -305,3 +402,136 @@ async def run_match(
         "editais": edital_summaries,
         "results": results,
     }
+
+
+@router.post("/run")
+async def run_match(
+    datasheet: UploadFile = File(...),
+    editais: List[UploadFile] = File(...),
+    consulta: str = Form(""),
+    model: Optional[str] = Form(None),
+    email: Optional[str] = Form(None),
+    background: bool = Form(False),
+    user=Depends(get_current_user),
+):
+    """1-clique: recebe PDFs (datasheet + editais), faz OCR/extração com cache e roda match.
+
+    - Cache de OCR/extração em `document_cache`
+    - Cache de resultado em `match_cache`
+    - O trabalho pesado roda no pool de jobs (JOB_WORKERS), fora do event loop.
+      Os editais rodam em paralelo (MATCH_EDITAL_CONCURRENCY), cada um com sua sessão;
+      `results` segue a ordem do upload e traz `elapsed_ms` por edital.
+      Com `background=true` responde na hora com o `job_id`; acompanhe em `/jobs/{job_id}`.
+      Sem ele, espera o job terminar e devolve o resultado (mesmo formato de antes).
+    """
+    init_db()
+
+    if not (datasheet.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Datasheet precisa ser PDF")
+
+    # Só grava os uploads aqui (os arquivos temporários do request não sobrevivem a ele)
+    produto_sha, datasheet_path = await run_in_threadpool(_hash_and_store_upload, datasheet, subdir="datasheet")
+    datasheet_info = {"name": datasheet.filename, "sha256": produto_sha, "path": str(datasheet_path)}
+    editais_info = []
+    for edital in editais:
+        filename = edital.filename or "edital.pdf"
+        if not filename.lower().endswith(".pdf"):
+            editais_info.append({"name": filename, "error": "Edital precisa ser PDF"})
+            continue
+        edital_sha, edital_path = await run_in_threadpool(_hash_and_store_upload, edital, subdir="edital")
+        editais_info.append({"name": filename, "sha256": edital_sha, "path": str(edital_path)})
+
+    job = get_job_manager().submit(
+        _run_match_job,
+        kind="match_run",
+        meta={"datasheet": datasheet.filename, "editais": len(editais_info)},
+        owner=user_email(user),
+        datasheet=datasheet_info,
+        editais=editais_info,
+        consulta=consulta,
+        model=model,
+        email=email,
+    )
+    if background:
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"},
+        )
+    return await asyncio.wrap_future(job.future)
+
+
+# Um MatchPipeline por modelo de LLM (os modelos em si vêm do registro do processo); uso serializado por lock
+# porque o pipeline guarda estado por execução (ex.: PDFExtractor.last_meta).
+_stream_pipelines: dict[str | None, tuple[threading.Lock, object]] = {}
+_stream_pipelines_lock = threading.Lock()
+
+
+def _get_stream_pipeline(model: str | None):
+    with _stream_pipelines_lock:
+        entry = _stream_pipelines.get(model)
+        if entry is None:
+            from core.Pipeline.pipeline import MatchPipeline
+
+            entry = (threading.Lock(), MatchPipeline(llm_model=model))
+            _stream_pipelines[model] = entry
+        return entry
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def stream_match(
+    request: Request,
+    datasheet: UploadFile = File(...),
+    edital: UploadFile = File(...),
+    model: Optional[str] = Form(None),
+):
+    """Roda o MatchPipeline (datasheet x edital) emitindo Server-Sent Events.
+
+    Eventos: `stage` (ocr, chunk, embed, retrieve, extract, match, justify; start/done/error),
+    `token` (texto do LLM em streaming) e, no fim, `result` | `error` | `cancelled`.
+    Se o cliente desconectar, a execução é cancelada e a geração no Ollama é interrompida.
+    """
+    for up, label in ((datasheet, "Datasheet"), (edital, "Edital")):
+        if not (up.filename or "").lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail=f"{label} precisa ser PDF")
+
+    _, datasheet_path = await run_in_threadpool(_hash_and_store_upload, datasheet, subdir="datasheet")
+    _, edital_path = await run_in_threadpool(_hash_and_store_upload, edital, subdir="edital")
+
+    async def _events():
+        lock, pipeline = await run_in_threadpool(_get_stream_pipeline, (model or "").strip() or None)
+        # acquire sem bloquear e no próprio event loop: um cancelamento da tarefa
+        # nunca deixa para trás um acquire feito numa thread sem o release correspondente
+        if not lock.acquire(blocking=False):
+            yield _sse({"type": "stage", "stage": "queue", "status": "start"})
+            while not lock.acquire(blocking=False):
+                if await request.is_disconnected():
+                    return
+                await asyncio.sleep(0.25)
+        try:
+            stream = pipeline.run_events(str(edital_path), str(datasheet_path))
+        except BaseException:
+            lock.release()
+            raise
+        # O lock é liberado pela thread da execução quando ela termina: vale também quando o
+        # cliente desconecta e o Starlette cancela esta tarefa (o finally não precisa de await)
+        stream.add_done_callback(lock.release)
+        try:
+            while not stream.finished:
+                ev = await run_in_threadpool(stream.next_event, 1.0)
+                if await request.is_disconnected():
+                    break
+                if ev is not None:
+                    yield _sse(ev)
+        finally:
+            if not stream.finished:
+                stream.cancel()
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
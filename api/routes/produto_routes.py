@@ -8,6 +8,7 @@ from core.pipeline import processar_datasheet
 from typing import Optional
 from db.repositories.produto_repo import get_or_create
 from db.models.produtos import Produto
+from api.services.produto_catalog import match_catalogo
 
 from api.auth.deps import get_current_user
 
@@ -90,3 +91,28 @@ async def listar_produtos(db: Session = Depends(get_db)):
         return out
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/match_edital")
+def match_catalogo_edital(
+    edital: dict = Body(...),
+    top_k: int = 50,
+    include_reprovados: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Ranqueia os produtos do catálogo para um edital já extraído.
+
+    Espera {"requisitos": {"tensao_v": {"valor_min": 12, "unidade": "V", "obrigatorio": true}, ...}}
+    (ou o dict de requisitos direto). Por padrão omite os produtos REPROVADOS, que são
+    descartados pelo índice por atributo antes do MatchingEngine.
+
+    Rota síncrona de propósito: consulta ao banco + MatchingEngine rodam no threadpool
+    do FastAPI, sem bloquear o event loop. O schema é criado no lifespan da API.
+    """
+    requisitos = edital.get("requisitos") if isinstance(edital.get("requisitos"), dict) else edital
+    if not requisitos or not all(isinstance(r, dict) for r in requisitos.values()):
+        raise HTTPException(status_code=400, detail="Envie {'requisitos': {chave: {valor_min, valor_max, unidade, obrigatorio}}}")
+    try:
+        return match_catalogo(db, {"requisitos": requisitos}, top_k=top_k, include_reprovados=include_reprovados)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Falha no match do catálogo: {e}")
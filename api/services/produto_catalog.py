@@ -0,0 +1,89 @@
+import threading
+from typing import Any, Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.match.attribute_index import AttributeIndex, produto_atributos
+from core.match.config import get_match_config
+from core.match.matching_engine import MatchingEngine
+from core.match.scoring import compute_score
+from db.models.produtos import Produto
+from db.repositories.produto_repo import catalog_version
+
+_GERAL_ORDER = {"APROVADO": 0, "DUVIDOSO": 1, "REPROVADO": 2}
+
+_lock = threading.Lock()
+_cached: tuple[tuple, AttributeIndex] | None = None
+
+
+def catalog_index(db: Session) -> AttributeIndex:
+    """
+    AttributeIndex de todos os produtos do banco, reaproveitado entre requisições.
+
+    Reconstruído quando o catálogo muda: escrita via produto_repo neste processo ou
+    mudança de (count, max id) feita por outro processo.
+    """
+    global _cached
+    count, max_id = db.query(func.count(Produto.id), func.max(Produto.id)).one()
+    key = (catalog_version(), int(count or 0), int(max_id or 0))
+    cached = _cached
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _lock:
+        if _cached is not None and _cached[0] == key:
+            return _cached[1]
+        rows = db.query(Produto.id, Produto.nome, Produto.atributos_json).order_by(Produto.id).all()
+        produtos = [{"nome": nome, "atributos": produto_atributos(attrs)} for _, nome, attrs in rows]
+        index = AttributeIndex(produtos, ids=[int(pid) for pid, _, _ in rows])
+        _cached = (key, index)
+        return index
+
+
+def match_catalogo(
+    db: Session,
+    edital: Dict[str, Any],
+    *,
+    top_k: int = 50,
+    include_reprovados: bool = False,
+) -> Dict[str, Any]:
+    """
+    Produtos do catálogo que atendem um edital (requisitos já extraídos), ranqueados.
+
+    O índice por atributo descarta, por faixa, quem com certeza seria REPROVADO;
+    MatchingEngine + compute_score avaliam só os candidatos restantes.
+    """
+    cfg = get_match_config()
+    index = catalog_index(db)
+    if include_reprovados:
+        positions = range(len(index))
+    else:
+        positions = index.candidates(edital, cfg).tolist()
+
+    engine = MatchingEngine(cfg)
+    itens = []
+    for pos in positions:
+        produto = index.produtos[pos]
+        matching = engine.compare(produto, edital)
+        score = compute_score(matching, edital, config=cfg)
+        if not include_reprovados and score["status_geral"] == "REPROVADO":
+            continue
+        itens.append(
+            {
+                "produto_id": index.ids[pos],
+                "nome": produto.get("nome"),
+                "status_geral": score["status_geral"],
+                "score_percent": score["score_percent"],
+                "matching": matching,
+                "score": score,
+            }
+        )
+
+    # APROVADO, DUVIDOSO, REPROVADO; dentro de cada um, score decrescente (sort estável por id)
+    itens.sort(key=lambda it: (_GERAL_ORDER[it["status_geral"]], -it["score_percent"]))
+    return {
+        "catalogo_total": len(index),
+        "candidatos": len(positions),
+        "total": len(itens),
+        "resultados": itens[: max(0, int(top_k))] if top_k else itens,
+    }
@@ -0,0 +1,6 @@
+"""Benchmarks reproduzíveis do pipeline (editais/datasheets sintéticos + LLM simulado).
+
+Uso:
+  python -m benchmarks.run --pages 50 --items 20 --out bench.json
+  python -m benchmarks.compare base.json bench.json
+"""
@@ -0,0 +1,82 @@
+"""Compara dois resultados de `benchmarks.run` (mediana por etapa) e aponta regressões.
+
+Uso:
+  python -m benchmarks.compare base.json novo.json --threshold 0.15
+Sai com código 1 se alguma etapa ficou mais lenta que o limite.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def load(path: str | Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_results(
+    base: Dict[str, Any],
+    new: Dict[str, Any],
+    *,
+    threshold: float = 0.15,
+    min_delta_ms: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """
+    Uma linha por etapa presente nos dois resultados: medianas, variação relativa e se é
+    regressão (mais lenta que `threshold` E por mais de `min_delta_ms`, para ignorar ruído
+    em etapas de microssegundos). Etapas puladas/com erro em algum lado vêm com status.
+    """
+    rows: List[Dict[str, Any]] = []
+    base_stages = base.get("stages") or {}
+    new_stages = new.get("stages") or {}
+    for name in [s for s in base_stages if s in new_stages] + [s for s in new_stages if s not in base_stages]:
+        b, n = base_stages.get(name) or {}, new_stages.get(name) or {}
+        row: Dict[str, Any] = {"stage": name}
+        b_ms, n_ms = (b.get("ms") or {}).get("median"), (n.get("ms") or {}).get("median")
+        if b_ms is None or n_ms is None:
+            row["status"] = "novo" if not b else (n.get("skipped") or n.get("error") or b.get("skipped") or b.get("error") or "sem dados")
+            rows.append(row)
+            continue
+        delta = (n_ms - b_ms) / b_ms if b_ms > 0 else 0.0
+        row.update(base_ms=b_ms, new_ms=n_ms, delta_pct=round(delta * 100.0, 1))
+        if delta > threshold and (n_ms - b_ms) > min_delta_ms:
+            row["status"] = "REGRESSÃO"
+        elif delta < -threshold and (b_ms - n_ms) > min_delta_ms:
+            row["status"] = "melhora"
+        else:
+            row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def has_regression(rows: List[Dict[str, Any]]) -> bool:
+    return any(r.get("status") == "REGRESSÃO" for r in rows)
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'etapa':<20} {'base (ms)':>12} {'novo (ms)':>12} {'Δ%':>8}  status"]
+    for r in rows:
+        if "base_ms" in r:
+            lines.append(f"{r['stage']:<20} {r['base_ms']:>12.2f} {r['new_ms']:>12.2f} {r['delta_pct']:>+8.1f}  {r['status']}")
+        else:
+            lines.append(f"{r['stage']:<20} {'-':>12} {'-':>12} {'-':>8}  {r['status']}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark")
+    parser.add_argument("base")
+    parser.add_argument("novo")
+    parser.add_argument("--threshold", type=float, default=0.15, help="variação relativa tolerada (default: 0.15)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    rows = compare_results(load(args.base), load(args.novo), threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+    print(format_table(rows))
+    return 1 if has_regression(rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
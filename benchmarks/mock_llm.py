@@ -0,0 +1,99 @@
+"""LLM simulado em processo: respostas determinísticas por tipo de prompt, com latência configurável."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+
+class MockLLM:
+    """
+    Responde como o Ollama responderia aos prompts do projeto, sem rede:
+    - extração de edital/datasheet: JSON das heurísticas (mesmo texto -> mesma resposta)
+    - REQUIREMENTS_PROMPT / MATCH_ITEMS_PROMPT (API): listas JSON fixas
+    - justificativas e o resto: texto curto
+
+    Latência = `latency_ms` fixo + `ms_per_1k_chars` do prompt (simula prefill).
+    """
+
+    def __init__(self, latency_ms: float = 0.0, ms_per_1k_chars: float = 0.0):
+        self.latency_ms = float(latency_ms)
+        self.ms_per_1k_chars = float(ms_per_1k_chars)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._edital = None
+        self._produto = None
+
+    def delay_s(self, prompt: str) -> float:
+        return (self.latency_ms + self.ms_per_1k_chars * len(prompt) / 1000.0) / 1000.0
+
+    def respond(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            if self._edital is None:
+                from core.preprocess.editalExtractor import EditalExtractor
+                from core.preprocess.product_extractor import ProductExtractor
+
+                self._edital, self._produto = EditalExtractor(), ProductExtractor()
+
+        if "Texto do datasheet:" in prompt:
+            text = prompt.split("Texto do datasheet:", 1)[1].split("Estrutura EXEMPLO", 1)[0]
+            return json.dumps(self._produto._heuristic_extract(text), ensure_ascii=False)
+        if "Texto do edital:" in prompt:
+            text = prompt.split("Texto do edital:", 1)[1].split("Regras IMPORTANTES", 1)[0]
+            return json.dumps(self._edital._heuristic_extract(text), ensure_ascii=False)
+        if "veredito" in prompt:
+            return json.dumps([{"item_id": 1, "titulo": "Requisito", "veredito": "atende", "score": 0.9}], ensure_ascii=False)
+        if "requisitos solicitados" in prompt:
+            return json.dumps([{"item_id": 1, "titulo": "Item", "descricao": "", "criterios": []}], ensure_ascii=False)
+        return "Atende ao requisito conforme especificação do datasheet."
+
+
+@contextmanager
+def mock_llm(latency_ms: float = 0.0, ms_per_1k_chars: float = 0.0) -> Iterator[MockLLM]:
+    """
+    Troca o transporte HTTP do LLMClient/AsyncLLMClient (`_generate`) pelo MockLLM.
+    Payload, cache de respostas e tracing continuam passando pelo caminho real.
+    """
+    from core.llm.client import AsyncLLMClient, LLMClient
+
+    mock = MockLLM(latency_ms, ms_per_1k_chars)
+
+    def _generate(self, payload: dict, prompt: str) -> tuple[str, str]:
+        time.sleep(mock.delay_s(prompt))
+        return mock.respond(prompt), payload.get("model")
+
+    async def _agenerate(self, payload: dict, prompt: str) -> tuple[str, str]:
+        await asyncio.sleep(mock.delay_s(prompt))
+        return mock.respond(prompt), payload.get("model")
+
+    saved = (LLMClient._generate, AsyncLLMClient._generate)
+    LLMClient._generate, AsyncLLMClient._generate = _generate, _agenerate
+    try:
+        yield mock
+    finally:
+        LLMClient._generate, AsyncLLMClient._generate = saved
+
+
+class HashEmbedder:
+    """
+    Embedder determinístico (bag of words com crc32), para medir chunk/retrieval sem o
+    fastembed ou isolar o custo do modelo. Mesma interface mínima do Embedder.
+    """
+
+    def __init__(self, model_name: str = "hash-e5-256", dim: int = 256):
+        self.model_name = model_name
+        self.dim = dim
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for r, t in enumerate(texts):
+            for w in t.lower().split():
+                out[r, zlib.crc32(w.encode("utf-8")) % self.dim] += 1.0
+        return out
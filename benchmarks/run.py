@@ -0,0 +1,264 @@
+"""Benchmark por etapa do pipeline com editais/datasheets sintéticos e LLM simulado.
+
+Etapas: chunk, embed, retrieve, extract_heuristic, extract_llm (LLM simulado com latência),
+match, score e api (POST /match/run ponta a ponta). Cada etapa roda `--repeat` vezes
+(após `--warmup`) e reporta min/mediana/p95 em ms e throughput na unidade da etapa.
+
+Uso:
+  python -m benchmarks.run --pages 50 --items 20 --density 0.4 --out bench.json
+  python -m benchmarks.run --stages chunk,retrieve --baseline bench.json   # compara e sai 1 se regrediu
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.compare import compare_results, format_table, has_regression, load
+from benchmarks.mock_llm import HashEmbedder, mock_llm
+from benchmarks.synthetic import make_datasheet, make_edital, make_edital_pages, make_match_pairs, write_pdf
+
+
+STAGES = ("chunk", "embed", "retrieve", "extract_heuristic", "extract_llm", "match", "score", "api")
+
+# Consultas por atributo no mesmo formato do MatchPipeline._attribute_queries
+ATTR_QUERIES = [
+    "tensão nominal V",
+    "corrente máxima A",
+    "capacidade Ah",
+    "potência W",
+    "memória RAM GB",
+    "armazenamento SSD GB",
+    "peso kg",
+    "garantia meses",
+]
+
+
+def _summary(times_s: List[float], units: float, unit: str) -> Dict[str, Any]:
+    ms = sorted(t * 1000.0 for t in times_s)
+    median = statistics.median(ms)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return {
+        "unit": unit,
+        "units": units,
+        "runs": len(ms),
+        "ms": {
+            "min": round(ms[0], 3),
+            "median": round(median, 3),
+            "p95": round(p95, 3),
+            "mean": round(statistics.fmean(ms), 3),
+        },
+        "throughput_per_s": round(units / (median / 1000.0), 2) if median > 0 else None,
+    }
+
+
+def _measure(fn: Callable[[int], Any], *, repeat: int, warmup: int) -> List[float]:
+    """fn(i) é chamado warmup + repeat vezes; só as `repeat` últimas entram na conta."""
+    times = []
+    for i in range(warmup + repeat):
+        t0 = time.perf_counter()
+        fn(i)
+        if i >= warmup:
+            times.append(time.perf_counter() - t0)
+    return times
+
+
+def _make_embedder(kind: str):
+    """(embedder, backend). auto: fastembed se instalado, senão o HashEmbedder determinístico."""
+    if kind in ("auto", "fastembed"):
+        try:
+            from core.preprocess.embeddings import Embedder, default_embed_model
+
+            model = os.getenv("BENCH_EMBED_MODEL") or default_embed_model()
+            return Embedder(model_name=model), f"fastembed:{model}"
+        except ImportError:
+            if kind == "fastembed":
+                raise
+    return HashEmbedder(), "hash"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _bench_api(args, repeat: int, warmup: int) -> Dict[str, Any]:
+    """POST /match/run (datasheet + 1 edital) com PDFs novos a cada chamada: OCR, extração e match a frio."""
+    tmp = Path(tempfile.mkdtemp(prefix="bench_api_"))
+    cwd = os.getcwd()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp / 'bench.sqlite'}")
+    os.chdir(tmp)  # uploads/artefatos relativos (data/...) ficam no diretório temporário
+    try:
+        try:
+            from fastapi.testclient import TestClient
+
+            from api.auth.deps import get_current_user
+            from api.main import create_app
+        except ImportError as e:
+            return {"skipped": f"API indisponível neste ambiente: {e}"}
+
+        app = create_app()
+        app.dependency_overrides[get_current_user] = lambda: {"email": "bench@local"}
+        client = TestClient(app)
+
+        def _one(i: int) -> None:
+            seed = args.seed + 1000 + i
+            edital = write_pdf(make_edital_pages(args.pages, args.items, args.density, seed=seed), tmp / f"edital_{i}.pdf")
+            datasheet = write_pdf([make_datasheet(seed=seed)], tmp / f"datasheet_{i}.pdf")
+            with open(datasheet, "rb") as fd, open(edital, "rb") as fe:
+                r = client.post(
+                    "/match/run",
+                    files=[("datasheet", (datasheet.name, fd, "application/pdf")), ("editais", (edital.name, fe, "application/pdf"))],
+                    data={"consulta": "bench"},
+                )
+            r.raise_for_status()
+
+        try:
+            return _summary(_measure(_one, repeat=repeat, warmup=warmup), 1, "requests")
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        os.chdir(cwd)
+
+
+def run(args) -> Dict[str, Any]:
+    from core.match.config import get_match_config
+    from core.match.matching_engine import MatchingEngine
+    from core.match.scoring import compute_score
+    from core.preprocess.chunker import chunk_text
+    from core.preprocess.editalExtractor import EditalExtractor
+    from core.preprocess.product_extractor import ProductExtractor
+    from core.rag.dense_retriever import DenseRetriever
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()] if args.stages else list(STAGES)
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"Etapas desconhecidas: {', '.join(unknown)} (disponíveis: {', '.join(STAGES)})")
+
+    edital = make_edital(args.pages, args.items, args.density, seed=args.seed)
+    datasheet = make_datasheet(seed=args.seed)
+    embedder, backend = _make_embedder(args.embedder)
+    retriever = DenseRetriever(embedder)
+    queries = ["requisitos técnicos especificações obrigatórias mínimo máximo"] + ATTR_QUERIES
+    pairs = make_match_pairs(args.pairs, seed=args.seed)
+    cfg = get_match_config()
+    engine = MatchingEngine(cfg)
+
+    # Entradas das etapas seguintes são preparadas uma vez (cada etapa mede só o próprio trabalho)
+    chunks = chunk_text(edital, max_tokens=args.chunk_tokens)
+    vecs = retriever.encode_passages(chunks)
+    context = "\n\n".join(chunks[i] for i, _ in retriever.search_vectors(queries, vecs, args.top_k))
+    matchings = [engine.compare(p, e, config=cfg) for p, e in pairs]
+
+    results: Dict[str, Any] = {}
+    rw = {"repeat": args.repeat, "warmup": args.warmup}
+    for stage in stages:
+        if stage == "chunk":
+            results[stage] = _summary(_measure(lambda _: chunk_text(edital, max_tokens=args.chunk_tokens), **rw), len(edital), "chars")
+        elif stage == "embed":
+            results[stage] = _summary(_measure(lambda _: retriever.encode_passages(chunks), **rw), len(chunks), "chunks")
+        elif stage == "retrieve":
+            results[stage] = _summary(
+                _measure(lambda _: retriever.search_vectors(queries, vecs, args.top_k), **rw), len(queries), "queries"
+            )
+        elif stage == "extract_heuristic":
+            ed_ex, prod_ex = EditalExtractor(), ProductExtractor()
+
+            def _heur(_: int) -> None:
+                ed_ex._heuristic_extract(edital, cfg)
+                prod_ex._heuristic_extract(datasheet)
+
+            results[stage] = _summary(_measure(_heur, **rw), len(edital) + len(datasheet), "chars")
+        elif stage == "extract_llm":
+            with mock_llm(args.llm_latency_ms, args.llm_ms_per_1k_chars) as mock:
+                ed_ex = EditalExtractor()
+                results[stage] = _summary(_measure(lambda _: ed_ex.extract(context, produto_hint="bateria 12V 7Ah"), **rw), 1, "calls")
+                results[stage]["llm_calls"] = mock.calls
+        elif stage == "match":
+            results[stage] = _summary(
+                _measure(lambda _: [engine.compare(p, e, config=cfg) for p, e in pairs], **rw), len(pairs), "pairs"
+            )
+        elif stage == "score":
+            results[stage] = _summary(
+                _measure(lambda _: [compute_score(m, e, config=cfg) for m, (_p, e) in zip(matchings, pairs)], **rw),
+                len(pairs),
+                "pairs",
+            )
+        elif stage == "api":
+            with mock_llm(args.llm_latency_ms, args.llm_ms_per_1k_chars):
+                results[stage] = _bench_api(args, repeat=args.api_repeat, warmup=0)
+        print(f"  {stage:<18} {_fmt_stage(results[stage])}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embedder": backend,
+            "params": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+            "sizes": {"edital_chars": len(edital), "chunks": len(chunks), "pairs": len(pairs)},
+        },
+        "stages": results,
+    }
+
+
+def _fmt_stage(r: Dict[str, Any]) -> str:
+    if "ms" not in r:
+        return r.get("skipped") or r.get("error") or "-"
+    return f"mediana {r['ms']['median']:10.3f} ms  p95 {r['ms']['p95']:10.3f} ms  {r['throughput_per_s'] or 0:12.1f} {r['unit']}/s"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark por etapa com dados sintéticos e LLM simulado")
+    parser.add_argument("--pages", type=int, default=30, help="páginas do edital sintético")
+    parser.add_argument("--items", type=int, default=15, help="itens no termo de referência")
+    parser.add_argument("--density", type=float, default=0.5, help="fração de linhas dos itens com requisito mensurável")
+    parser.add_argument("--pairs", type=int, default=500, help="pares produto x edital em match/score")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--api-repeat", type=int, default=3)
+    parser.add_argument("--stages", default=None, help=f"subconjunto separado por vírgula (default: {','.join(STAGES)})")
+    parser.add_argument("--embedder", choices=("auto", "fastembed", "hash"), default="auto")
+    parser.add_argument("--chunk-tokens", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="latência fixa por chamada do LLM simulado")
+    parser.add_argument("--llm-ms-per-1k-chars", type=float, default=2.0, help="latência extra por 1000 chars de prompt")
+    parser.add_argument("--out", default=None, help="grava o resultado JSON aqui (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="resultado anterior para comparar (sai 1 se regrediu)")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    payload = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(payload, encoding="utf-8")
+    else:
+        print(payload)
+
+    if args.baseline:
+        rows = compare_results(load(args.baseline), result, threshold=args.threshold)
+        print(format_table(rows), file=sys.stderr)
+        return 1 if has_regression(rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+"""Editais e datasheets sintéticos de tamanho controlado (páginas, itens, densidade de requisitos)."""
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+# (chave canônica, frase no edital, unidade, faixa de valores)
+REQUISITOS: List[Tuple[str, str, str, Tuple[float, float]]] = [
+    ("tensao_v", "Tensão nominal", "V", (5, 240)),
+    ("corrente_a", "Corrente máxima", "A", (1, 40)),
+    ("capacidade_ah", "Capacidade", "Ah", (5, 200)),
+    ("potencia_w", "Potência", "W", (10, 3000)),
+    ("memoria_ram_gb", "Memória RAM", "GB", (4, 128)),
+    ("armazenamento_gb", "Armazenamento SSD", "GB", (128, 4096)),
+    ("peso_kg", "Peso", "kg", (0.5, 40)),
+    ("garantia_meses", "Garantia", "meses", (12, 60)),
+]
+
+PRODUTOS = ("Bateria selada para no-break", "Microcomputador desktop", "Switch gerenciável", "Monitor LED", "Nobreak senoidal")
+
+# Texto jurídico/administrativo: volume sem requisitos técnicos (o que o RAG precisa descartar)
+BOILERPLATE = (
+    "A licitante deverá apresentar a documentação de habilitação jurídica e regularidade fiscal no prazo estabelecido.",
+    "As propostas serão julgadas pelo critério de menor preço por item, observadas as condições deste edital.",
+    "O pagamento será efetuado em até 30 (trinta) dias após o atesto da nota fiscal pelo fiscal do contrato.",
+    "A contratada ficará sujeita às sanções previstas na Lei nº 14.133/2021, garantida a prévia defesa.",
+    "Os recursos orçamentários correrão à conta da dotação consignada no exercício vigente.",
+    "Eventuais pedidos de esclarecimento deverão ser encaminhados em até 3 (três) dias úteis da abertura.",
+    "A ata de registro de preços terá validade de 12 (doze) meses, improrrogável.",
+    "O fornecedor deverá manter as condições de habilitação durante toda a execução contratual.",
+)
+DESCRITIVOS = (
+    "Produto novo, de primeiro uso, em embalagem original do fabricante.",
+    "Deverá acompanhar manual em português e cabos necessários ao funcionamento.",
+    "Entrega no almoxarifado central, em horário comercial, com agendamento prévio.",
+    "Compatível com as normas técnicas brasileiras aplicáveis ao equipamento.",
+)
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else f"{v:.1f}".replace(".", ",")
+
+
+def make_edital_pages(
+    pages: int = 20,
+    items: int = 10,
+    density: float = 0.5,
+    *,
+    lines_per_page: int = 40,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Páginas de um edital sintético: preâmbulo jurídico + "ANEXO I - TERMO DE REFERÊNCIA"
+    com `items` itens numerados. `density` (0..1) é a fração das linhas de cada item que
+    trazem requisito mensurável ("mínimo de 12 V"); o resto é descritivo. Páginas que
+    sobram são completadas com texto jurídico.
+    """
+    rnd = random.Random(seed)
+    density = min(1.0, max(0.0, density))
+    lines: List[str] = [f"EDITAL DE PREGÃO ELETRÔNICO Nº {rnd.randint(1, 999)}/2026", ""]
+    for i in range(1, 4):
+        lines.append(f"{i}. DISPOSIÇÕES GERAIS" if i == 1 else f"{i}. DAS CONDIÇÕES DE PARTICIPAÇÃO")
+        lines.extend(rnd.choice(BOILERPLATE) for _ in range(rnd.randint(3, 6)))
+        lines.append("")
+
+    tr: List[str] = ["ANEXO I - TERMO DE REFERÊNCIA", ""]
+    for it in range(1, items + 1):
+        tr.append(f"{it}. ITEM {it} - {rnd.choice(PRODUTOS).upper()}")
+        for j in range(1, 9):
+            if rnd.random() < density:
+                _, frase, unidade, (lo, hi) = rnd.choice(REQUISITOS)
+                v = round(rnd.uniform(lo, hi), 0 if hi > 20 else 1)
+                tr.append(f"{it}.{j} {frase}: {rnd.choice(('mínimo de', 'no mínimo', 'máximo de'))} {_fmt(v)} {unidade};")
+            else:
+                tr.append(f"{it}.{j} {rnd.choice(DESCRITIVOS)}")
+        if it % 3 == 0:
+            tr.append("Item | Descrição | Unidade | Quantidade")
+            tr.append(f"{it} | {rnd.choice(PRODUTOS)} | un | {rnd.randint(1, 200)}")
+        tr.append("")
+
+    total = max(pages * lines_per_page, len(lines) + len(tr))
+    while len(lines) + len(tr) < total:
+        lines.append(rnd.choice(BOILERPLATE))
+    lines.extend(tr)
+    return ["\n".join(lines[p : p + lines_per_page]) for p in range(0, len(lines), lines_per_page)]
+
+
+def make_edital(pages: int = 20, items: int = 10, density: float = 0.5, *, seed: int = 0) -> str:
+    return "\n".join(make_edital_pages(pages, items, density, seed=seed))
+
+
+def make_datasheet(n_attrs: int = 8, *, seed: int = 0) -> str:
+    """
+    Datasheet sintético: nome do produto + uma linha "Atributo: valor unidade" por especificação.
+
+    Sempre traz o bloco elétrico (tensão/corrente/potência) e interfaces/grau de proteção,
+    como um datasheet real: o parser de specs do /match/run acha a maioria dos campos e
+    não cai no fallback do Gemini.
+    """
+    rnd = random.Random(seed)
+    lines = [f"DATASHEET - {rnd.choice(PRODUTOS)} modelo X{rnd.randint(100, 999)}", "Especificações técnicas"]
+    eletricos = [r for r in REQUISITOS if r[0] in ("tensao_v", "corrente_a", "potencia_w")]
+    outros = [r for r in REQUISITOS if r not in eletricos]
+    escolhidos = eletricos + rnd.sample(outros, max(0, min(n_attrs, len(REQUISITOS)) - len(eletricos)))
+    for _, frase, unidade, (lo, hi) in escolhidos:
+        lines.append(f"{frase}: {_fmt(round(rnd.uniform(lo, hi), 0 if hi > 20 else 1))} {unidade}")
+    lines.append(f"Interfaces: {rnd.choice((2, 4, 8, 24))} portas; grau de proteção IP{rnd.choice((20, 54, 65))}")
+    return "\n".join(lines)
+
+
+def make_match_pairs(n: int, *, seed: int = 0) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Pares (produto_json, edital_json) já extraídos, para medir matching/score isolados."""
+    rnd = random.Random(seed)
+    pairs = []
+    for _ in range(n):
+        produto = {
+            "atributos": {
+                k: {"valor": round(rnd.uniform(lo, hi), 1), "unidade": u} for k, _, u, (lo, hi) in REQUISITOS if rnd.random() < 0.8
+            }
+        }
+        edital = {
+            "requisitos": {
+                k: {"valor_min": round(rnd.uniform(lo, hi), 1), "valor_max": None, "unidade": u, "obrigatorio": rnd.random() < 0.8}
+                for k, _, u, (lo, hi) in REQUISITOS
+                if rnd.random() < 0.7
+            }
+        }
+        pairs.append((produto, edital))
+    return pairs
+
+
+def _pdf_escape(line: str) -> bytes:
+    raw = line.encode("cp1252", "replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_pdf(pages: List[str], path: str | Path) -> Path:
+    """
+    PDF mínimo com texto nativo (Helvetica/WinAnsi), uma página por item de `pages`.
+    Suficiente para pdfplumber/pypdf extraírem o texto sem depender de reportlab.
+    """
+    objs: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in pages:
+        body = b"BT /F1 9 Tf 11 TL 40 800 Td " + b" ".join(b"(" + _pdf_escape(ln) + b") '" for ln in page.splitlines()) + b" ET"
+        objs.append(b"<< /Length %d >>\nstream\n" % len(body) + body + b"\nendstream")
+        content_id = len(objs)
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+
+    path = Path(path)
+    path.write_bytes(bytes(out))
+    return path
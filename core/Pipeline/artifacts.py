@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+import numpy as np
+
+from core.utils.singleflight import SingleFlight
+
+
+DEFAULT_ARTIFACT_DIR = Path("data/processed/artifacts")
+
+# Sobe quando prompts/pós-processamento mudam a saída de uma etapa (invalida tudo)
+ARTIFACT_VERSION = 1
+# Sobe quando o chunker muda de comportamento: invalida chunks e tudo que deriva deles
+CHUNKER_VERSION = 2
+
+# Prefixos de env que mudam a saída de cada etapa (entram na chave dos artefatos).
+# Única fonte para o MatchPipeline e para o checkpoint do lote (core/Pipeline/batch.py).
+OCR_ENV = ("OCR_", "GEMINI_OCR_MODEL")
+CHUNK_ENV = ("CHUNK_",)
+EXTRACT_ENV = ("LLM_MODEL", "LLM_DISABLE", "LLM_OPTIONS", "LLM_NUM_CTX", "LLM_FORCE_JSON", "PRODUCT_", "EDITAL_", "EDT_", "RAG_")
+# Lidos no pós-processamento do edital_json (ex.: BATTERY_ALLOWED_REQUIREMENTS)
+POSTPROCESS_ENV = ("BATTERY_",)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def env_signature(prefixes: Iterable[str]) -> Dict[str, str]:
+    """Variáveis de ambiente que começam com algum dos prefixos (entram na chave da etapa)."""
+    prefixes = tuple(prefixes)
+    return {k: v for k, v in sorted(os.environ.items()) if k.startswith(prefixes)}
+
+
+class ArtifactStore:
+    """
+    Artefatos do pipeline endereçados por conteúdo.
+
+    Chave = sha256(etapa + chaves/hashes das entradas + configuração da etapa). O mesmo
+    PDF com a mesma configuração cai sempre na mesma chave, então etapas seguintes
+    (outro produto contra o mesmo edital, reexecução do lote) pulam o trabalho.
+
+    Layout: <dir>/<etapa>/<chave[:2]>/<chave>.json (ou .npy para matrizes numpy).
+    Escrita atômica (tmp + replace); leituras corrompidas contam como miss.
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root) if root else Path(os.getenv("ARTIFACT_STORE_DIR") or DEFAULT_ARTIFACT_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._flight = SingleFlight("artifacts")
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "ArtifactStore | None":
+        """Cria o store se ARTIFACT_STORE estiver habilitado (default: 1)."""
+        if str(os.getenv("ARTIFACT_STORE", "1")).lower() not in ("1", "true", "yes"):
+            return None
+        try:
+            return cls()
+        except Exception:
+            # Cache nunca deve derrubar o pipeline (ex.: diretório sem permissão)
+            return None
+
+    @staticmethod
+    def key(stage: str, *inputs: Any, config: Any = None) -> str:
+        raw = json.dumps(
+            {"v": ARTIFACT_VERSION, "stage": stage, "inputs": list(inputs), "config": config},
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, stage: str, key: str, suffix: str) -> Path:
+        return self.root / stage / key[:2] / f"{key}{suffix}"
+
+    def _count(self, counter: Dict[str, int], stage: str) -> None:
+        with self._lock:
+            counter[stage] = counter.get(stage, 0) + 1
+
+    def _load(self, stage: str, key: str) -> Any | None:
+        npy = self._path(stage, key, ".npy")
+        try:
+            if npy.exists():
+                return np.load(npy, allow_pickle=False)
+            return json.loads(self._path(stage, key, ".json").read_text(encoding="utf-8"))
+        except Exception:
+            return None
+
+    def get(self, stage: str, key: str) -> Any | None:
+        value = self._load(stage, key)
+        self._count(self.misses if value is None else self.hits, stage)
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        is_array = isinstance(value, np.ndarray)
+        path = self._path(stage, key, ".npy" if is_array else ".json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if is_array:
+                with open(tmp, "wb") as f:
+                    np.save(f, value, allow_pickle=False)
+            else:
+                tmp.write_text(json.dumps(value, ensure_ascii=False, default=str), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception:
+            # Falha ao gravar não invalida o valor já calculado
+            try:
+                tmp.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+    def get_or_compute(
+        self,
+        stage: str,
+        key: str,
+        compute: Callable[[], Any],
+        *,
+        keep: Callable[[Any], bool] | None = None,
+    ) -> Tuple[Any, bool]:
+        """
+        (valor, hit). Em miss calcula uma vez por chave (chamadas simultâneas esperam) e grava.
+        `keep(valor)` False não persiste (ex.: extração vazia por falha do LLM).
+        """
+        value = self.get(stage, key)
+        if value is not None:
+            return value, True
+
+        def _compute() -> Any:
+            again = self._load(stage, key)
+            if again is not None:
+                return again
+            fresh = compute()
+            if keep is None or keep(fresh):
+                self.put(stage, key, fresh)
+            return fresh
+
+        value, _ = self._flight.do((stage, key), _compute)
+        return value, False
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {"hits": dict(self.hits), "misses": dict(self.misses)}
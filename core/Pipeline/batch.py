@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from core.match.config import get_match_config
+from core.ocr.page_cache import file_sha256
+from core.Pipeline.artifacts import CHUNKER_VERSION, CHUNK_ENV, EXTRACT_ENV, OCR_ENV, POSTPROCESS_ENV, env_signature
+from core.utils.concurrency import env_concurrency
+
+
+PAIR_DONE = "done"
+PAIR_ERROR = "error"
+PAIR_SKIPPED = "skipped"
+
+# Variáveis que mudam o que a extração produz: entram na assinatura dos artefatos.
+# Mesmos prefixos das chaves do MatchPipeline (OCR, chunker, extração, pós-processamento)
+# mais o modelo de embeddings default.
+_BATCH_ENV = OCR_ENV + CHUNK_ENV + EXTRACT_ENV + POSTPROCESS_ENV + ("EMBED_MODEL",)
+
+
+def default_pipeline_factory(**kwargs: Any):
+    from core.Pipeline.pipeline import MatchPipeline
+
+    return MatchPipeline(**kwargs)
+
+
+# Um MatchPipeline por processo do pool (embedder/modelos carregados uma vez só)
+_pipeline = None
+
+
+def _init_worker(factory: Callable[..., Any], kwargs: Dict[str, Any]) -> None:
+    global _pipeline
+    _pipeline = factory(**kwargs)
+
+
+def _task_produto(path: str) -> Dict[str, Any]:
+    out = _pipeline.extract_produto(path)
+    out["edital_key"] = _pipeline.edital_extraction_key(out["produto_json"], out["produto_hint"])
+    return out
+
+
+def _task_edital(path: str, produtos: List[Tuple[str, Dict[str, Any], str | None]]) -> Dict[str, Dict[str, Any]]:
+    """OCR do edital uma vez e uma extração de requisitos por chave de produto."""
+    text, ocr_meta = _pipeline.extract_edital_text(path)
+    out: Dict[str, Dict[str, Any]] = {}
+    for edital_key, produto_json, produto_hint in produtos:
+        try:
+            edital_json, debug = _pipeline.extract_edital_requisitos(text, produto_json, produto_hint)
+            out[edital_key] = {"edital_json": edital_json, "debug": {"ocr_edital": ocr_meta, **debug}}
+        except Exception as e:
+            out[edital_key] = {"error": f"{type(e).__name__}: {e}"}
+    return out
+
+
+def _task_pair(edital_path: str, produto_path: str, produto_art: Dict[str, Any], edital_art: Dict[str, Any], out_path: str) -> Tuple[Dict[str, Any], float]:
+    t0 = time.perf_counter()
+    result = _pipeline.run_with_extracted(
+        edital_json=edital_art["edital_json"],
+        produto_json=produto_art["produto_json"],
+        edital_pdf_path=edital_path,
+        produto_pdf_path=produto_path,
+        debug={"ocr_produto": produto_art.get("ocr"), **(edital_art.get("debug") or {})},
+    )
+    tmp = f"{out_path}.tmp"
+    _pipeline.save_result(result, tmp)
+    os.replace(tmp, out_path)
+    return result, round((time.perf_counter() - t0) * 1000.0, 1)
+
+
+def _run_tasks(pool: ProcessPoolExecutor | None, tasks: List[Tuple[Any, Callable[..., Any], tuple]]) -> Iterator[Tuple[Any, Any, BaseException | None]]:
+    """(chave, resultado, exceção) na ordem de conclusão; sem pool executa em série no processo atual."""
+    if pool is None:
+        for key, fn, args in tasks:
+            try:
+                yield key, fn(*args), None
+            except Exception as e:
+                yield key, None, e
+        return
+    futures = {pool.submit(fn, *args): key for key, fn, args in tasks}
+    for fut in as_completed(futures):
+        exc = fut.exception()
+        yield futures[fut], (None if exc is not None else fut.result()), exc
+
+
+def _sig(payload: Any) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchCheckpoint:
+    """
+    Diretório de checkpoint do lote.
+
+    - artifacts/<assinatura>/produtos/<sha>.json: produto extraído (compartilhado entre editais)
+    - artifacts/<assinatura>/editais/<sha>__<chave>.json: requisitos do edital por chave de produto
+    - manifest.jsonl: um registro por par concluído/falho (append + fsync; a última linha
+      truncada por um crash é ignorada)
+    """
+
+    def __init__(self, root: str | Path, extract_sig: str):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.jsonl"
+        self.artifacts = self.root / "artifacts" / extract_sig
+        for kind in ("produtos", "editais"):
+            (self.artifacts / kind).mkdir(parents=True, exist_ok=True)
+
+    def _artifact_path(self, kind: str, name: str) -> Path:
+        return self.artifacts / kind / f"{name}.json"
+
+    def load_artifact(self, kind: str, name: str) -> Dict[str, Any] | None:
+        try:
+            return json.loads(self._artifact_path(kind, name).read_text(encoding="utf-8"))
+        except Exception:
+            return None
+
+    def save_artifact(self, kind: str, name: str, data: Dict[str, Any]) -> None:
+        path = self._artifact_path(kind, name)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except Exception:
+                    continue
+
+    def completed(self, settings_sig: str) -> Dict[str, Dict[str, Any]]:
+        """Pares já concluídos com as mesmas configurações e cujo arquivo de saída ainda existe."""
+        last: Dict[str, Dict[str, Any]] = {}
+        for rec in self.records():
+            if rec.get("settings") == settings_sig and rec.get("key"):
+                last[rec["key"]] = rec
+        return {
+            k: r for k, r in last.items()
+            if r.get("status") == PAIR_DONE and r.get("out") and Path(r["out"]).exists()
+        }
+
+    def record(self, rec: Dict[str, Any]) -> None:
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def run_batch(
+    editais: Iterable[str | Path],
+    produtos: Iterable[str | Path],
+    *,
+    out_dir: str | Path,
+    checkpoint_dir: str | Path | None = None,
+    workers: int | None = None,
+    pipeline_kwargs: Dict[str, Any] | None = None,
+    pipeline_factory: Callable[..., Any] | None = None,
+    resume: bool = True,
+    on_pair: Callable[[Dict[str, Any], Dict[str, Any] | None], None] | None = None,
+) -> Dict[str, Any]:
+    """
+    Roda o produto cartesiano editais × produtos com um pool de processos.
+
+    Cada processo mantém seu MatchPipeline carregado. A extração é feita uma vez por
+    produto e uma vez por (edital, chave do produto), e os pares só rodam matching +
+    justificativa sobre os JSONs já extraídos. Com `resume`, pares presentes no
+    manifest (mesmas configurações) são pulados; artefatos extraídos também são
+    reaproveitados, então um crash no par 150 não refaz os 149 anteriores.
+
+    - workers: processos (default BATCH_WORKERS, 1 = tudo no processo atual)
+    - on_pair(registro, resultado): chamado no processo principal a cada par (resultado None se pulado/falhou)
+    """
+    editais = [Path(p) for p in editais]
+    produtos = [Path(p) for p in produtos]
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or env_concurrency("BATCH_WORKERS", 1)
+    factory = pipeline_factory or default_pipeline_factory
+    kwargs = dict(pipeline_kwargs or {})
+
+    extract_sig = _sig(
+        {
+            "pipeline": {k: v for k, v in kwargs.items() if k != "enable_justification"},
+            "env": env_signature(_BATCH_ENV),
+            "chunker": CHUNKER_VERSION,
+        }
+    )
+    settings_sig = _sig({"extract": extract_sig, "pipeline": kwargs, "match": repr(get_match_config())})
+    ckpt = BatchCheckpoint(checkpoint_dir or out_dir / ".checkpoint", extract_sig)
+
+    sha = {p: file_sha256(p) for p in {*editais, *produtos}}
+    multi_produto = len(produtos) > 1
+
+    def _out_path(edital: Path, produto: Path) -> Path:
+        name = f"resultado__{edital.stem}__{produto.stem}.json" if multi_produto else f"resultado__{edital.stem}.json"
+        return out_dir / name
+
+    pairs = [(e, p, f"{sha[e]}:{sha[p]}") for e in editais for p in produtos]
+    done = ckpt.completed(settings_sig) if resume else {}
+    summary = {"total": len(pairs), PAIR_SKIPPED: 0, PAIR_DONE: 0, PAIR_ERROR: 0, "checkpoint": str(ckpt.root)}
+
+    def _finish(edital: Path, produto: Path, key: str, status: str, result: Dict[str, Any] | None = None, **extra: Any) -> None:
+        rec = {
+            "key": key,
+            "edital": str(edital),
+            "produto": str(produto),
+            "status": status,
+            "out": str(_out_path(edital, produto)),
+            "settings": settings_sig,
+            "finished_at": time.time(),
+            **extra,
+        }
+        if status != PAIR_SKIPPED:
+            ckpt.record(rec)
+        summary[status] += 1
+        if on_pair is not None:
+            on_pair(rec, result)
+
+    pending = []
+    for e, p, key in pairs:
+        if key in done:
+            _finish(e, p, key, PAIR_SKIPPED)
+        else:
+            pending.append((e, p, key))
+    if not pending:
+        return summary
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker, initargs=(factory, kwargs))
+    else:
+        _init_worker(factory, kwargs)
+
+    try:
+        # ---- Fase 1: produtos (uma extração por PDF) ----
+        produto_art: Dict[str, Dict[str, Any]] = {}
+        failed: Dict[str, str] = {}
+        tasks = []
+        for p in dict.fromkeys(p for _, p, _ in pending):
+            art = ckpt.load_artifact("produtos", sha[p])
+            if art is not None:
+                produto_art[sha[p]] = art
+            else:
+                tasks.append((sha[p], _task_produto, (str(p),)))
+        for key, res, exc in _run_tasks(pool, tasks):
+            if exc is not None:
+                failed[key] = f"produto: {type(exc).__name__}: {exc}"
+                continue
+            ckpt.save_artifact("produtos", key, res)
+            produto_art[key] = res
+
+        # ---- Fase 2: editais (um OCR por PDF, uma extração por chave de produto) ----
+        edital_art: Dict[str, Dict[str, Any]] = {}
+        groups: Dict[Path, Dict[str, Tuple[str, Dict[str, Any], str | None]]] = {}
+        for e, p, _ in pending:
+            art_p = produto_art.get(sha[p])
+            if art_p is None:
+                continue
+            name = f"{sha[e]}__{art_p['edital_key']}"
+            if name in edital_art or name in (groups.get(e) or {}):
+                continue
+            art = ckpt.load_artifact("editais", name)
+            if art is not None:
+                edital_art[name] = art
+            else:
+                groups.setdefault(e, {})[name] = (art_p["edital_key"], art_p["produto_json"], art_p.get("produto_hint"))
+        tasks = [(e, _task_edital, (str(e), list(g.values()))) for e, g in groups.items()]
+        for e, res, exc in _run_tasks(pool, tasks):
+            for name, (edital_key, _, _) in groups[e].items():
+                item = (res or {}).get(edital_key) if exc is None else None
+                if item is None or "error" in item:
+                    err = f"{type(exc).__name__}: {exc}" if exc is not None else (item or {}).get("error", "sem resultado")
+                    failed[name] = f"edital: {err}"
+                    continue
+                ckpt.save_artifact("editais", name, item)
+                edital_art[name] = item
+
+        # ---- Fase 3: pares (matching + justificativa sobre os JSONs extraídos) ----
+        tasks = []
+        meta: Dict[str, Tuple[Path, Path]] = {}
+        for e, p, key in pending:
+            art_p = produto_art.get(sha[p])
+            name = f"{sha[e]}__{art_p['edital_key']}" if art_p else None
+            if art_p is None or name not in edital_art:
+                _finish(e, p, key, PAIR_ERROR, error=failed.get(sha[p]) or failed.get(name or "", "extração indisponível"))
+                continue
+            meta[key] = (e, p)
+            tasks.append((key, _task_pair, (str(e), str(p), art_p, edital_art[name], str(_out_path(e, p)))))
+        for key, res, exc in _run_tasks(pool, tasks):
+            e, p = meta[key]
+            if exc is not None:
+                _finish(e, p, key, PAIR_ERROR, error=f"match: {type(exc).__name__}: {exc}")
+            else:
+                res, elapsed_ms = res
+                score = res.get("score") or {}
+                _finish(
+                    e, p, key, PAIR_DONE, res,
+                    status_geral=score.get("status_geral"),
+                    score_percent=score.get("score_percent"),
+                    elapsed_ms=elapsed_ms,
+                )
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return summary
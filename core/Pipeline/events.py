@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator
+
+from core.llm.client import token_sink
+from core.utils.tracing import span
+
+
+# Etapas emitidas por MatchPipeline.run, na ordem
+STAGES = ("ocr", "chunk", "embed", "retrieve", "extract", "match", "justify")
+
+
+class PipelineCancelled(Exception):
+    """Execução interrompida pelo cliente (ex.: desconectou do SSE)."""
+
+
+class PipelineEvents:
+    """
+    Eventos de progresso do pipeline para um callback:
+    - {"type": "stage", "stage": "ocr", "status": "start" | "done" | "error", ...}
+    - {"type": "token", "stage": "extract", "text": "..."} (tokens do LLM em streaming)
+
+    `cancel` (threading.Event) é verificado a cada etapa e a cada token; quando setado,
+    a execução para com PipelineCancelled e a geração em andamento no Ollama é fechada.
+    Sem callback, tudo vira no-op (custo desprezível no caminho normal).
+    """
+
+    def __init__(self, callback: Callable[[Dict[str, Any]], None] | None = None, cancel: threading.Event | None = None):
+        self.callback = callback
+        self.cancel = cancel
+        self.current_stage: str | None = None
+
+    def emit(self, type_: str, **data: Any) -> None:
+        if self.callback is not None:
+            self.callback({"type": type_, **data})
+
+    def check(self) -> None:
+        if self.cancel is not None and self.cancel.is_set():
+            raise PipelineCancelled()
+
+    @contextmanager
+    def stage(self, name: str, **data: Any):
+        """
+        Emite start/done (com elapsed_ms); o dict devolvido vai junto no evento "done".
+        Cada etapa também é um span de tracing (`core.utils.tracing`) com `data` + `info`.
+        """
+        self.check()
+        prev, self.current_stage = self.current_stage, name
+        self.emit("stage", stage=name, status="start", **data)
+        info: Dict[str, Any] = {}
+        t0 = time.perf_counter()
+        try:
+            with span(name, **data) as s:
+                try:
+                    yield info
+                finally:
+                    s.set(**info)
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            self.emit("stage", stage=name, status="error", error=str(e), **data)
+            raise
+        finally:
+            self.current_stage = prev
+        self.emit("stage", stage=name, status="done", elapsed_ms=round((time.perf_counter() - t0) * 1000, 1), **data, **info)
+
+    def token(self, text: str) -> None:
+        self.check()
+        self.emit("token", stage=self.current_stage, text=text)
+
+    def llm_tokens(self):
+        """Contexto em que as chamadas LLMClient.generate (inclusive em threads com o contexto copiado) fazem streaming para os eventos."""
+        if self.callback is None:
+            return nullcontext()
+        return token_sink(self.token)
+
+
+_DONE = object()
+
+
+class PipelineEventStream:
+    """
+    Executa run(events) numa thread e entrega os eventos à medida que saem, terminando com
+    {"type": "result", "data": ...}, {"type": "error", "error": ...} ou {"type": "cancelled"}.
+
+    Iterável (uso síncrono) ou via next_event() (ex.: um evento por vez numa rota async).
+    cancel() pode ser chamado de qualquer thread (cliente desconectou).
+    """
+
+    def __init__(self, run: Callable[[PipelineEvents], Any]):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancel = threading.Event()
+        self._finished = False
+        self._done_lock = threading.Lock()
+        self._done = False
+        self._callbacks: list = []
+        events = PipelineEvents(self._queue.put, self._cancel)
+
+        def _worker() -> None:
+            try:
+                self._queue.put({"type": "result", "data": run(events)})
+            except PipelineCancelled:
+                self._queue.put({"type": "cancelled"})
+            except Exception as e:
+                self._queue.put({"type": "error", "error": f"{type(e).__name__}: {e}"})
+            finally:
+                self._queue.put(_DONE)
+                with self._done_lock:
+                    self._done = True
+                    callbacks, self._callbacks = self._callbacks, []
+                for fn in callbacks:
+                    fn()
+
+        self._thread = threading.Thread(target=_worker, name="pipeline-events", daemon=True)
+        self._thread.start()
+
+    def next_event(self, timeout: float | None = None) -> Dict[str, Any] | None:
+        """Próximo evento; None quando a execução terminou (ou no timeout)."""
+        if self._finished:
+            return None
+        try:
+            ev = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if ev is _DONE:
+            self._finished = True
+            return None
+        return ev
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def add_done_callback(self, fn: Callable[[], Any]) -> None:
+        """Chama fn() na thread de execução quando ela termina (na hora, se já terminou)."""
+        with self._done_lock:
+            if not self._done:
+                self._callbacks.append(fn)
+                return
+        fn()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Espera a thread de execução terminar (após cancel(), termina na próxima etapa/token)."""
+        self._thread.join(timeout)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        try:
+            while True:
+                ev = self.next_event()
+                if ev is None:
+                    return
+                yield ev
+        finally:
+            if not self._finished:
+                self.cancel()
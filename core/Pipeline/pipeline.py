@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 from typing import Any, Dict, List, Tuple
@@ -7,23 +8,32 @@ from core.ocr.extractor import PDFExtractor
 from core.ocr.normalizador import normalize_text, normalize_text_preserve_newlines
 
 from core.preprocess.chunker import chunk_text
-from core.preprocess.embeddings import Embedder
+from core.preprocess.embeddings import embed_source
+from core.rag.dense_retriever import DenseRetriever
 
 from core.preprocess.product_extractor import ProductExtractor
 from core.preprocess.editalExtractor import EditalExtractor
 
+from core.match.config import get_match_config
 from core.match.matching_engine import MatchingEngine
 from core.match.scoring import compute_score
 from core.llm.justificador import JustificationGenerator
-
-
-def _cosine_sim_matrix(q_vec, mat):
-    # q_vec: (d,), mat: (n, d)
-    import numpy as np
-
-    q = q_vec / (np.linalg.norm(q_vec) + 1e-9)
-    m = mat / (np.linalg.norm(mat, axis=1, keepdims=True) + 1e-9)
-    return (m @ q).astype(float)
+from core.ocr.page_cache import file_sha256
+from core.utils.concurrency import env_concurrency, iter_ordered
+from core.Pipeline.artifacts import (
+    CHUNKER_VERSION,
+    CHUNK_ENV,
+    EXTRACT_ENV,
+    OCR_ENV,
+    POSTPROCESS_ENV,
+    ArtifactStore,
+    content_hash,
+    env_signature,
+)
+from core.Pipeline.events import PipelineEvents, PipelineEventStream
+from core.utils.models import get_embedder
+from core.utils.profiling import profile
+from core.utils.tracing import span
 
 
 class MatchPipeline:
@@ -40,14 +50,19 @@ class MatchPipeline:
 
     def __init__(
         self,
-        embed_model: str = "intfloat/e5-base-v2",
+        embed_model: str | None = None,
         top_k_edital_chunks: int = 10,
         enable_justification: bool = True,
         llm_model: str | None = None,
+        artifacts: ArtifactStore | None = None,
     ):
         self.pdf = PDFExtractor()
-        self.embedder = Embedder(model_name=embed_model)
+        # Embedder compartilhado no processo (sessão ONNX carregada uma vez), com cache de
+        # embeddings por (modelo, hash do chunk): reexecuções do mesmo edital só calculam
+        # embeddings de chunks novos. Desabilite com EMBED_CACHE=0.
+        self.embedder = get_embedder(embed_model)
         self.top_k = int(top_k_edital_chunks)
+        self.retriever = DenseRetriever(self.embedder)
 
         self.product_extractor = ProductExtractor()
         self.edital_extractor = EditalExtractor()
@@ -56,20 +71,98 @@ class MatchPipeline:
         self.enable_justification = bool(enable_justification)
         self.justifier = JustificationGenerator(model=llm_model) if self.enable_justification else None
 
-    def _build_edital_context(self, edital_text: str, produto_hint: str | None) -> Tuple[str, List[str]]:
+        # Artefatos por etapa (texto, chunks, embeddings, produto_json, edital_json por produto):
+        # N produtos contra o mesmo edital fazem OCR/extração dele uma vez só. ARTIFACT_STORE=0 desliga.
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore.from_env()
+
+    def _cached(self, stage: str, key_fn, compute, keep=None) -> Tuple[Any, bool]:
+        """get_or_compute no ArtifactStore (sem store, só calcula). key_fn é chamado só com store ativo."""
+        if self.artifacts is None:
+            return compute(), False
+        return self.artifacts.get_or_compute(stage, key_fn(), compute, keep=keep)
+
+    def _attribute_queries(self, produto_json: Dict[str, Any] | None, produto_hint: str | None) -> List[str]:
+        """Consultas curtas por atributo do produto (ex.: "bateria tensao v 12 V"), limitadas por RAG_MAX_ATTR_QUERIES."""
+        try:
+            limit = int(os.getenv("RAG_MAX_ATTR_QUERIES", "5"))
+        except Exception:
+            limit = 5
+        attrs = (produto_json or {}).get("atributos")
+        if limit <= 0 or not isinstance(attrs, dict):
+            return []
+        out: List[str] = []
+        for key, spec in attrs.items():
+            if len(out) >= limit:
+                break
+            if not isinstance(spec, dict) or spec.get("valor") in (None, ""):
+                continue
+            label = str(key).replace("_", " ")
+            unit = spec.get("unidade") or ""
+            out.append(" ".join(p for p in (produto_hint or "", label, str(spec.get("valor")), str(unit)) if p).strip())
+        return out
+
+    @staticmethod
+    def _chunks_key(edital_text: str, max_tokens: int) -> str:
+        return ArtifactStore.key(
+            "chunks",
+            content_hash(edital_text),
+            config={"max_tokens": max_tokens, "env": env_signature(CHUNK_ENV), "chunker": CHUNKER_VERSION},
+        )
+
+    def _edital_json_key(self, edital_text: str, produto_json: Dict[str, Any] | None, produto_hint: str | None) -> str:
+        return ArtifactStore.key(
+            "edital_json",
+            # Encadeado na chave dos chunks: chunker/CHUNK_* novos invalidam os requisitos
+            self._chunks_key(edital_text, int(os.getenv("EDT_CHUNK_MAX_TOKENS", "200"))),
+            self.edital_extraction_key(produto_json, produto_hint),
+            config={
+                "env": env_signature(EXTRACT_ENV + POSTPROCESS_ENV),
+                "top_k": self.top_k,
+                "embed_model": self.embedder.model_name,
+                "embed_source": embed_source(self.embedder.model_name),
+            },
+        )
+
+    def _build_edital_context(
+        self,
+        edital_text: str,
+        produto_hint: str | None,
+        produto_json: Dict[str, Any] | None = None,
+        events: PipelineEvents | None = None,
+    ) -> Tuple[str, List[str]]:
         """
         Faz RAG simples: seleciona chunks do edital mais relevantes.
         Retorna (contexto_texto, chunks_selecionados)
         """
+        ev = events or PipelineEvents()
         max_tokens = int(os.getenv("EDT_CHUNK_MAX_TOKENS", "200"))
-        chunks = chunk_text(edital_text, max_tokens=max_tokens)
+        chunks_key = lambda: self._chunks_key(edital_text, max_tokens)
+        with ev.stage("chunk") as info:
+            chunks, hit = self._cached("chunks", chunks_key, lambda: chunk_text(edital_text, max_tokens=max_tokens), keep=bool)
+            info.update(chunks=len(chunks), chars_in=len(edital_text))
+            if hit:
+                info["cached"] = True
 
         # Evita explodir custo/tempo em editais gigantes
         if len(chunks) == 0:
             return "", []
 
-        # Embeddings dos chunks
-        chunk_vecs = self.embedder.encode(chunks)
+        # Embeddings dos chunks (com cache persistente quando habilitado; prefixo "passage:" no E5)
+        with ev.stage("embed") as info:
+            chunk_vecs, hit = self._cached(
+                "embeddings",
+                lambda: ArtifactStore.key(
+                    "embeddings", chunks_key(), config={
+                        "model": self.embedder.model_name,
+                        "source": embed_source(self.embedder.model_name),
+                        "e5": self.retriever.e5,
+                    }
+                ),
+                lambda: self.retriever.encode_passages(chunks),
+            )
+            info["items_in"] = len(chunks)
+            if hit:
+                info["cached"] = True
 
         # Query embedding
         # Query mais "esperta": puxa chunks onde normalmente aparecem os requisitos mensuráveis.
@@ -84,12 +177,14 @@ class MatchPipeline:
             "garantia meses"
         )
         query = f"{base_terms} {produto_hint}".strip() if produto_hint else base_terms
-        q_vec = self.embedder.encode([query])[0]
+        # Uma consulta extra por atributo-chave do produto; todas num único batch de embeddings
+        queries = [query] + self._attribute_queries(produto_json, produto_hint)
 
-        sims = _cosine_sim_matrix(q_vec, chunk_vecs)
-        # pega top_k índices
-        idxs = sorted(range(len(sims)), key=lambda i: sims[i], reverse=True)[: self.top_k]
-        selected = [chunks[i] for i in idxs]
+        # top_k via argpartition sobre o score fundido das consultas
+        with ev.stage("retrieve") as info:
+            hits = self.retriever.search_vectors(queries, chunk_vecs, self.top_k)
+            selected = [chunks[i] for i, _ in hits]
+            info["selected"] = len(selected)
 
         # junta contexto
         context = "\n\n".join(selected)
@@ -209,31 +304,40 @@ class MatchPipeline:
 
         # Varredura por janelas para dar contexto suficiente ao LLM e reduzir número de chamadas.
         # Ex.: window=3, stride=3 => percorre 0-2, 3-5, 6-8, ...
-        i = 0
-        while i < len(chunks):
+        windows: List[Tuple[int, str]] = []
+        for i in range(0, len(chunks), stride):
             window_chunks = chunks[i : i + window]
             text = "\n\n".join([c for c in window_chunks if c and c.strip()]).strip()
             if text:
-                extracted = self.edital_extractor.extract(text, produto_hint=produto_hint)
-                llm_calls += 1
-                reqs = extracted.get("requisitos") if isinstance(extracted, dict) else None
-                if isinstance(reqs, dict) and reqs:
-                    merged_reqs = self._merge_requisitos(merged_reqs, reqs)
-
-                if log_file:
-                    try:
-                        rec = {
-                            "window_start": i,
-                            "window_end": min(i + window - 1, len(chunks) - 1),
-                            "llm_call": llm_calls,
-                            "req_keys": sorted(list(reqs.keys())) if isinstance(reqs, dict) else [],
-                            "reqs": reqs if isinstance(reqs, dict) else {},
-                        }
-                        log_file.write(json.dumps(rec, ensure_ascii=False) + "\n")
-                        log_file.flush()
-                    except Exception:
-                        pass
-            i += stride
+                windows.append((i, text))
+
+        # Janelas são independentes: com EDITAL_FULLSCAN_CONCURRENCY > 1 elas são enviadas
+        # em paralelo ao LLM (aproveita OLLAMA_NUM_PARALLEL). O merge e o log continuam
+        # na ordem das janelas, então o resultado é o mesmo da execução serial.
+        concurrency = env_concurrency("EDITAL_FULLSCAN_CONCURRENCY", 1)
+
+        def _extract_window(win: Tuple[int, str]) -> Dict[str, Any]:
+            return self.edital_extractor.extract(win[1], produto_hint=produto_hint)
+
+        for (i, _text), extracted in zip(windows, iter_ordered(_extract_window, windows, max_workers=concurrency)):
+            llm_calls += 1
+            reqs = extracted.get("requisitos") if isinstance(extracted, dict) else None
+            if isinstance(reqs, dict) and reqs:
+                merged_reqs = self._merge_requisitos(merged_reqs, reqs)
+
+            if log_file:
+                try:
+                    rec = {
+                        "window_start": i,
+                        "window_end": min(i + window - 1, len(chunks) - 1),
+                        "llm_call": llm_calls,
+                        "req_keys": sorted(list(reqs.keys())) if isinstance(reqs, dict) else [],
+                        "reqs": reqs if isinstance(reqs, dict) else {},
+                    }
+                    log_file.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    log_file.flush()
+                except Exception:
+                    pass
 
         try:
             if log_file:
@@ -253,6 +357,7 @@ class MatchPipeline:
             "fullscan_chunk_max_tokens": max_tokens,
             "fullscan_window_chunks": window,
             "fullscan_stride_chunks": stride,
+            "fullscan_concurrency": concurrency,
         }
         return out, debug
 
@@ -526,18 +631,33 @@ class MatchPipeline:
         }
         return produto_json
 
-    def run(self, edital_pdf_path: str, produto_pdf_path: str) -> Dict[str, Any]:
-        # 1) OCR
-        edital_text_raw = self.pdf.extract(edital_pdf_path, log_label="edital")
-        ocr_meta_edital = getattr(self.pdf, "last_meta", None)
+    def run_events(self, edital_pdf_path: str, produto_pdf_path: str) -> PipelineEventStream:
+        """
+        Igual a `run`, mas como fluxo de eventos (etapas + tokens do LLM), terminando
+        com {"type": "result", "data": <resultado de run>}. cancel() interrompe a execução.
+        """
+        return PipelineEventStream(lambda ev: self.run(edital_pdf_path, produto_pdf_path, events=ev))
 
-        produto_text_raw = self.pdf.extract(produto_pdf_path, log_label="produto")
-        ocr_meta_produto = getattr(self.pdf, "last_meta", None)
+    def run(self, edital_pdf_path: str, produto_pdf_path: str, events: PipelineEvents | None = None) -> Dict[str, Any]:
+        """
+        Pipeline completo. `result["trace"]` traz os spans por etapa (duração, volume, cache);
+        com PROFILE ligado, o perfil da execução é gravado em PROFILE_DIR.
+        """
+        with span("pipeline.run") as root, profile("pipeline.run"):
+            result = self._run(edital_pdf_path, produto_pdf_path, events or PipelineEvents())
+        result["trace"] = root.to_dict()
+        return result
+
+    def _run(self, edital_pdf_path: str, produto_pdf_path: str, ev: PipelineEvents) -> Dict[str, Any]:
+
+        # 1) OCR (artefato por sha256 do PDF: o mesmo arquivo não é lido de novo)
+        edital_text_raw, ocr_meta_edital = self._raw_text(edital_pdf_path, "edital", ev)
+        produto_text_raw, ocr_meta_produto = self._raw_text(produto_pdf_path, "produto", ev)
 
         # 2) Normalização
         # Para edital, preserva \n para manter estrutura (itens/anexos) e melhorar chunking.
-        edital_text = normalize_text_preserve_newlines(edital_text_raw or "")
-        produto_text = normalize_text(produto_text_raw or "")
+        edital_text = self._normalized(edital_text_raw, preserve_newlines=True)
+        produto_text = self._normalized(produto_text_raw, preserve_newlines=False)
 
         # Debug opcional: salva os textos pós-OCR para você inspecionar qualidade/trechos.
         if str(os.getenv("PIPELINE_SAVE_TEXT", "0")).lower() in ("1", "true", "yes"):
@@ -556,8 +676,39 @@ class MatchPipeline:
                 pass
 
         # 3) Extrai produto (LLM)
-        produto_json = self._postprocess_produto_json(self.product_extractor.extract(produto_text))
+        produto_json = self._produto_json(produto_text, ev)
+        produto_hint = self.produto_hint(produto_json)
+
+        # 4-5) RAG no edital + extração de requisitos
+        edital_json, edital_debug = self.extract_edital_requisitos(edital_text, produto_json, produto_hint, events=ev)
 
+        match_cfg = get_match_config()
+        with ev.stage("match") as info:
+            matching, score = self._match_and_score(produto_json, edital_json, match_cfg)
+            info.update(score_percent=score.get("score_percent"), status_geral=score.get("status_geral"))
+
+        # 8) Justificativas (LLM só explica)
+        with ev.stage("justify"), ev.llm_tokens():
+            justificativas = self._justify(produto_json, edital_json, matching, score)
+
+        return {
+            "produto_pdf": produto_pdf_path,
+            "edital_pdf": edital_pdf_path,
+            "produto_json": produto_json,
+            "edital_json": edital_json,
+            "matching": matching,
+            "score": score,
+            "justificativas": justificativas.get("justificativas", {}),
+            "debug": {
+                "ocr_edital": ocr_meta_edital,
+                "ocr_produto": ocr_meta_produto,
+                **edital_debug,
+            },
+        }
+
+    @staticmethod
+    def produto_hint(produto_json: Dict[str, Any]) -> str | None:
+        """Texto curto do produto usado na busca de trechos do edital (ex.: "bateria no-break 12V 7Ah")."""
         produto_hint = (produto_json.get("tipo_produto") or "") + " " + (produto_json.get("nome") or "")
         produto_hint = produto_hint.strip()
         if not produto_hint:
@@ -572,13 +723,131 @@ class MatchPipeline:
                 if cap is not None:
                     parts.append(f"{cap}Ah")
                 produto_hint = " ".join(parts)
-        produto_hint = produto_hint.strip() or None
+        return produto_hint.strip() or None
+
+    def edital_extraction_key(self, produto_json: Dict[str, Any], produto_hint: str | None) -> str:
+        """
+        O que a extração do edital usa do produto (hint + consultas por atributo) e o que
+        o pós-processamento usa (produto bateria/no-break filtra os requisitos).
+        Produtos com a mesma chave podem compartilhar o mesmo `edital_json`.
+        """
+        payload = json.dumps(
+            [produto_hint, self._attribute_queries(produto_json, produto_hint), self._is_battery_product(produto_json)],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _raw_text(self, pdf_path: str, doc: str, ev: PipelineEvents) -> Tuple[str, Dict[str, Any] | None]:
+        def _ocr() -> Dict[str, Any]:
+            text = self.pdf.extract(pdf_path, log_label=doc)
+            return {"text": text or "", "meta": getattr(self.pdf, "last_meta", None)}
+
+        with ev.stage("ocr", doc=doc) as info:
+            art, hit = self._cached(
+                "text_raw",
+                lambda: ArtifactStore.key("text_raw", file_sha256(pdf_path), config=env_signature(OCR_ENV)),
+                _ocr,
+                keep=lambda a: bool(a["text"].strip()),
+            )
+            info.update(method=(art.get("meta") or {}).get("method"), chars_out=len(art["text"]))
+            try:
+                info["bytes_in"] = os.path.getsize(pdf_path)
+            except OSError:
+                pass
+            if hit:
+                info["cached"] = True
+        return art["text"], art.get("meta")
+
+    def _normalized(self, raw_text: str, *, preserve_newlines: bool) -> str:
+        normalize = normalize_text_preserve_newlines if preserve_newlines else normalize_text
+        text, _ = self._cached(
+            "text_norm",
+            lambda: ArtifactStore.key("text_norm", content_hash(raw_text), config={"preserve_newlines": preserve_newlines}),
+            lambda: normalize(raw_text or ""),
+            keep=bool,
+        )
+        return text
+
+    def _produto_json(self, produto_text: str, ev: PipelineEvents) -> Dict[str, Any]:
+        with ev.stage("extract", doc="produto") as info, ev.llm_tokens():
+            produto_json, hit = self._cached(
+                "produto_json",
+                lambda: ArtifactStore.key("produto_json", content_hash(produto_text), config=env_signature(EXTRACT_ENV)),
+                lambda: self._postprocess_produto_json(self.product_extractor.extract(produto_text)),
+                # extração vazia costuma ser falha do LLM: não persiste
+                keep=lambda p: bool((p or {}).get("atributos")),
+            )
+            info["chars_in"] = len(produto_text)
+            if hit:
+                info["cached"] = True
+        return produto_json
+
+    def extract_produto(self, produto_pdf_path: str, events: PipelineEvents | None = None) -> Dict[str, Any]:
+        """OCR + extração do produto: {"produto_json", "produto_hint", "ocr"} (reaproveitável entre editais)."""
+        ev = events or PipelineEvents()
+        produto_text_raw, ocr_meta = self._raw_text(produto_pdf_path, "produto", ev)
+        produto_json = self._produto_json(self._normalized(produto_text_raw, preserve_newlines=False), ev)
+        return {"produto_json": produto_json, "produto_hint": self.produto_hint(produto_json), "ocr": ocr_meta}
 
-        # 4) RAG simples no edital (reduz tokens)
-        edital_context, selected_chunks = self._build_edital_context(edital_text, produto_hint)
+    def extract_edital_text(self, edital_pdf_path: str, events: PipelineEvents | None = None) -> Tuple[str, Dict[str, Any] | None]:
+        """OCR + normalização do edital (preserva quebras de linha): (texto, meta do OCR)."""
+        ev = events or PipelineEvents()
+        edital_text_raw, ocr_meta = self._raw_text(edital_pdf_path, "edital", ev)
+        return self._normalized(edital_text_raw, preserve_newlines=True), ocr_meta
 
-        # 5) Extrai requisitos do edital (LLM, mas só no contexto)
+    def extract_edital_requisitos(
+        self,
+        edital_text: str,
+        produto_json: Dict[str, Any],
+        produto_hint: str | None,
+        events: PipelineEvents | None = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        RAG no edital guiado pelo produto + extração de requisitos (LLM).
+        Retorna (edital_json, debug). Depende do produto só via `produto_hint`/atributos.
+        """
+        ev = events or PipelineEvents()
         extract_strategy = str(os.getenv("EDITAL_EXTRACT_STRATEGY", "rag_then_full")).strip().lower()
+
+        def _extract() -> Dict[str, Any]:
+            # 4) RAG simples no edital (reduz tokens)
+            edital_context, selected_chunks = self._build_edital_context(edital_text, produto_hint, produto_json, events=ev)
+
+            # 5) Extrai requisitos do edital (LLM, mas só no contexto)
+            with ev.stage("extract", doc="edital") as info, ev.llm_tokens():
+                edital_json, fullscan_debug = self._extract_edital(edital_text, edital_context, produto_hint, extract_strategy)
+                # Pós-processa para remover lixo (jurídico) e padronizar chaves/valores.
+                edital_json = self._postprocess_edital_json(edital_json, produto_json)
+                info.update(requisitos=len(edital_json.get("requisitos") or {}), chars_in=len(edital_context or edital_text))
+
+            debug = {
+                "edital_chunks_total": len(chunk_text(edital_text, max_tokens=400)),
+                "edital_chunks_usados": len(selected_chunks),
+                "edital_extract_strategy": extract_strategy,
+                **(fullscan_debug or {}),
+            }
+            return {"edital_json": edital_json, "debug": debug}
+
+        # Um edital_json por (texto do edital, chave do produto): outro produto com a mesma
+        # chave reaproveita sem chunk/embedding/LLM
+        art, hit = self._cached(
+            "edital_json",
+            lambda: self._edital_json_key(edital_text, produto_json, produto_hint),
+            _extract,
+            keep=lambda a: bool((a["edital_json"] or {}).get("requisitos")),
+        )
+        if hit:
+            with ev.stage("extract", doc="edital") as info:
+                info.update(requisitos=len(art["edital_json"].get("requisitos") or {}), cached=True)
+        return art["edital_json"], art["debug"]
+
+    def _extract_edital(
+        self,
+        edital_text: str,
+        edital_context: str,
+        produto_hint: str | None,
+        extract_strategy: str,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         fullscan_debug: Dict[str, Any] = {}
 
         if extract_strategy == "fullscan":
@@ -608,46 +877,34 @@ class MatchPipeline:
             except Exception:
                 pass
 
-        # Pós-processa para remover lixo (jurídico) e padronizar chaves/valores.
-        edital_json = self._postprocess_edital_json(edital_json, produto_json)
+        return edital_json, fullscan_debug
 
+    def _match_and_score(self, produto_json: Dict[str, Any], edital_json: Dict[str, Any], match_cfg) -> Tuple[Dict[str, str], Dict[str, Any]]:
         # 6) Matching determinístico
         tol_overrides = {"capacidade_ah": 0.25} if self._is_battery_product(produto_json) else None
-        matching = self.engine.compare(produto_json, edital_json, tolerance_overrides=tol_overrides)
-
+        matching = self.engine.compare(produto_json, edital_json, tolerance_overrides=tol_overrides, config=match_cfg)
         # 7) Score final
-        score = compute_score(matching, edital_json)
+        score = compute_score(matching, edital_json, config=match_cfg)
+        return matching, score
 
-        # 8) Justificativas (LLM só explica)
-        justificativas = {"justificativas": {}}
+    def _justify(
+        self,
+        produto_json: Dict[str, Any],
+        edital_json: Dict[str, Any],
+        matching: Dict[str, str],
+        score: Dict[str, Any],
+    ) -> Dict[str, Any]:
         if self.enable_justification and self.justifier and matching:
-            justificativas = self.justifier.generate(
+            return self.justifier.generate(
                 produto_json=produto_json,
                 edital_json=edital_json,
                 matching=matching,
                 score=score,
             )
-        elif self.enable_justification:
+        if self.enable_justification:
             # Quando não há requisitos extraídos, não há o que justificar por item.
-            justificativas = {"justificativas": {"_global": "Nenhum requisito técnico foi extraído do edital; não foi possível justificar o match por item."}}
-
-        return {
-            "produto_pdf": produto_pdf_path,
-            "edital_pdf": edital_pdf_path,
-            "produto_json": produto_json,
-            "edital_json": edital_json,
-            "matching": matching,
-            "score": score,
-            "justificativas": justificativas.get("justificativas", {}),
-            "debug": {
-                "ocr_edital": ocr_meta_edital,
-                "ocr_produto": ocr_meta_produto,
-                "edital_chunks_total": len(chunk_text(edital_text, max_tokens=400)),
-                "edital_chunks_usados": len(selected_chunks),
-                "edital_extract_strategy": extract_strategy,
-                **(fullscan_debug or {}),
-            },
-        }
+            return {"justificativas": {"_global": "Nenhum requisito técnico foi extraído do edital; não foi possível justificar o match por item."}}
+        return {"justificativas": {}}
 
     def run_with_extracted(
         self,
@@ -657,31 +914,43 @@ class MatchPipeline:
         edital_pdf_path: str | None = None,
         produto_pdf_path: str | None = None,
         debug: Dict[str, Any] | None = None,
+        events: PipelineEvents | None = None,
     ) -> Dict[str, Any]:
         """Executa apenas as etapas determinísticas (matching/score) e justificativas.
 
         Útil para cache em banco: reaproveita `produto_json` e `edital_json` já extraídos.
         """
+        with span("pipeline.run_with_extracted") as root, profile("pipeline.run_with_extracted"):
+            result = self._run_with_extracted(
+                edital_json=edital_json,
+                produto_json=produto_json,
+                edital_pdf_path=edital_pdf_path,
+                produto_pdf_path=produto_pdf_path,
+                debug=debug,
+                ev=events or PipelineEvents(),
+            )
+        result["trace"] = root.to_dict()
+        return result
+
+    def _run_with_extracted(
+        self,
+        *,
+        edital_json: Dict[str, Any],
+        produto_json: Dict[str, Any],
+        edital_pdf_path: str | None,
+        produto_pdf_path: str | None,
+        debug: Dict[str, Any] | None,
+        ev: PipelineEvents,
+    ) -> Dict[str, Any]:
         produto_json = self._postprocess_produto_json(produto_json)
         edital_json = self._postprocess_edital_json(edital_json, produto_json)
-        tol_overrides = {"capacidade_ah": 0.25} if self._is_battery_product(produto_json) else None
-        matching = self.engine.compare(produto_json, edital_json, tolerance_overrides=tol_overrides)
-        score = compute_score(matching, edital_json)
+        match_cfg = get_match_config()
+        with ev.stage("match") as info:
+            matching, score = self._match_and_score(produto_json, edital_json, match_cfg)
+            info.update(score_percent=score.get("score_percent"), status_geral=score.get("status_geral"))
 
-        justificativas = {"justificativas": {}}
-        if self.enable_justification and self.justifier and matching:
-            justificativas = self.justifier.generate(
-                produto_json=produto_json,
-                edital_json=edital_json,
-                matching=matching,
-                score=score,
-            )
-        elif self.enable_justification:
-            justificativas = {
-                "justificativas": {
-                    "_global": "Nenhum requisito técnico foi extraído do edital; não foi possível justificar o match por item."
-                }
-            }
+        with ev.stage("justify"), ev.llm_tokens():
+            justificativas = self._justify(produto_json, edital_json, matching, score)
 
         return {
             "produto_pdf": produto_pdf_path,
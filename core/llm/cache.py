@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model: str | None, options: dict | None, fmt: str | None, prompt: str) -> str:
+    """Chave estável para (modelo, options, format, hash do prompt)."""
+    prompt_hash = hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()
+    raw = json.dumps(
+        {"model": model, "options": options or {}, "format": fmt, "prompt": prompt_hash},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_cacheable_payload(payload: dict) -> bool:
+    """Só cacheia geração determinística (temperature=0)."""
+    options = payload.get("options") or {}
+    try:
+        return float(options.get("temperature", 1)) == 0.0
+    except Exception:
+        return False
+
+
+class LLMResponseCache:
+    """
+    Cache de respostas do LLM em dois níveis:
+
+    1) LRU em memória (por processo), limitado por bytes (LLM_CACHE_MAX_BYTES)
+    2) Tabela `llm_cache` no banco (SQLite/Postgres via db.session), opcional
+
+    Ambos respeitam TTL (LLM_CACHE_TTL_SECONDS; 0 = sem expiração).
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float | None = 7 * 24 * 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        persist: bool = True,
+        session_factory=None,
+    ):
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.max_bytes = max(0, int(max_bytes))
+        self.persist = bool(persist)
+        self._session_factory = session_factory
+
+        self._lock = threading.Lock()
+        # key -> (response, expires_at_monotonic | None, size_bytes)
+        self._mem: "OrderedDict[str, tuple[str, float | None, int]]" = OrderedDict()
+        self._mem_bytes = 0
+
+        self.hits_memory = 0
+        self.hits_db = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db_errors = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache | None":
+        if str(os.getenv("LLM_CACHE", "0")).lower() not in ("1", "true", "yes"):
+            return None
+        try:
+            ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        except Exception:
+            ttl = 7 * 24 * 3600
+        try:
+            max_bytes = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        except Exception:
+            max_bytes = 64 * 1024 * 1024
+        persist = str(os.getenv("LLM_CACHE_PERSIST", "1")).lower() in ("1", "true", "yes")
+        return cls(ttl_seconds=ttl, max_bytes=max_bytes, persist=persist)
+
+    # ------------------------------------------------------------------
+    # Nível em memória
+    # ------------------------------------------------------------------
+    def _mem_get(self, key: str) -> str | None:
+        item = self._mem.get(key)
+        if item is None:
+            return None
+        value, expires, size = item
+        if expires is not None and expires <= time.monotonic():
+            self._mem.pop(key, None)
+            self._mem_bytes -= size
+            return None
+        self._mem.move_to_end(key)
+        return value
+
+    def _mem_put(self, key: str, value: str, ttl_left: float | None) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old[2]
+        expires = (time.monotonic() + ttl_left) if ttl_left is not None else None
+        self._mem[key] = (value, expires, size)
+        self._mem_bytes += size
+        while self._mem_bytes > self.max_bytes and self._mem:
+            _, (_, _, s) = self._mem.popitem(last=False)
+            self._mem_bytes -= s
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Nível persistente
+    # ------------------------------------------------------------------
+    def _session(self):
+        if self._session_factory is None:
+            # Import tardio: evita acoplar o cliente LLM ao banco quando o cache está desligado
+            from db.session import SessionLocal, init_db
+
+            init_db()
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _db_get(self, key: str) -> tuple[str, float | None] | None:
+        from db.repositories.cache_repo import get_llm_cache
+
+        db = self._session()
+        try:
+            rec = get_llm_cache(db, cache_key=key)
+            if rec is None:
+                return None
+            ttl_left = None
+            if rec.expires_at is not None:
+                exp = rec.expires_at if rec.expires_at.tzinfo else rec.expires_at.replace(tzinfo=timezone.utc)
+                ttl_left = max(0.0, (exp - datetime.now(timezone.utc)).total_seconds())
+            return rec.response, ttl_left
+        finally:
+            db.close()
+
+    def _db_put(self, key: str, value: str, model: str | None) -> None:
+        from db.repositories.cache_repo import upsert_llm_cache
+
+        expires_at = None
+        if self.ttl_seconds is not None:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        db = self._session()
+        try:
+            upsert_llm_cache(db, cache_key=key, response=value, model=model, expires_at=expires_at)
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._mem_get(key)
+            if value is not None:
+                self.hits_memory += 1
+                return value
+
+        if self.persist:
+            try:
+                found = self._db_get(key)
+            except Exception as e:
+                self.db_errors += 1
+                logger.debug("LLM cache: falha ao ler do banco: %s", e)
+                found = None
+            if found is not None:
+                value, ttl_left = found
+                with self._lock:
+                    self.hits_db += 1
+                    self._mem_put(key, value, ttl_left)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: str, *, model: str | None = None) -> None:
+        if not isinstance(value, str) or not value:
+            return
+        with self._lock:
+            self._mem_put(key, value, self.ttl_seconds)
+        if self.persist:
+            try:
+                self._db_put(key, value, model)
+            except Exception as e:
+                self.db_errors += 1
+                logger.debug("LLM cache: falha ao gravar no banco: %s", e)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits_memory + self.hits_db
+            total = hits + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_db": self.hits_db,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "db_errors": self.db_errors,
+                "memory_entries": len(self._mem),
+                "memory_bytes": self._mem_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_default_cache: LLMResponseCache | None = None
+_default_cache_loaded = False
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """Cache compartilhado do processo (None quando LLM_CACHE não está habilitado)."""
+    global _default_cache, _default_cache_loaded
+    if not _default_cache_loaded:
+        with _default_lock:
+            if not _default_cache_loaded:
+                _default_cache = LLMResponseCache.from_env()
+                _default_cache_loaded = True
+    return _default_cache
@@ -1,25 +1,70 @@
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import contextvars
+import json
 import os
+import threading
 import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
 from urllib.parse import urlparse, urlunparse
 import logging
 
+from core.llm.cache import LLMResponseCache, get_llm_cache, is_cacheable_payload, make_cache_key
+from core.utils.tracing import span
+
 logger = logging.getLogger(__name__)
 if not logger.handlers:
     # Configuração mínima para não quebrar quando não existe logging_config no projeto.
     logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
 
-class LLMClient:
+# ContextVar (e não threading.local): trabalho disparado com copy_context().run — como o
+# iter_ordered do fullscan paralelo — herda o sink de quem chamou
+_token_sink: contextvars.ContextVar[Callable[[str], None] | None] = contextvars.ContextVar("llm_token_sink", default=None)
+
+
+@contextmanager
+def token_sink(callback: Callable[[str], None]):
     """
-    Cliente para comunicação com o LLM rodando via Ollama.
+    Enquanto ativo (no contexto atual e nas threads que o copiam), LLMClient.generate usa
+    o modo streaming do Ollama e entrega cada pedaço de texto a `callback`; o retorno
+    continua sendo o texto completo.
+    Se o callback lançar exceção (ex.: cancelamento), a geração é interrompida e a
+    conexão fechada, o que faz o Ollama parar de gerar.
+    """
+    token = _token_sink.set(callback)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
 
-    Responsabilidades:
-    - enviar prompt
-    - receber resposta textual do modelo
+
+def current_token_sink() -> Callable[[str], None] | None:
+    return _token_sink.get()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+class _LLMClientBase:
+    """
+    Lógica comum aos clientes síncrono e assíncrono:
+    - resolução de base_url/modelo/timeout
+    - montagem do payload (options/format)
+    - escolha de fallbacks (hosts e modelos)
     """
 
-    def __init__(self, model: str | None = None, base_url: str | None = None):
+    # Tentativas/backoff para falhas transitórias de conexão
+    RETRIES = 3
+    RETRY_DELAY = 0.75
+
+    def __init__(self, model: str | None = None, base_url: str | None = None, cache: LLMResponseCache | None = None):
         # Permite sobrescrever via parâmetro; caso contrário usa env vars com defaults
         self.base_url = base_url or os.getenv("LLM_URL", "http://localhost:11434")
 
@@ -41,6 +86,56 @@ class LLMClient:
         # Ex.: LLM_TIMEOUT_SECONDS=0 (sem timeout) ou LLM_TIMEOUT_SECONDS=600
         self.timeout = self._get_timeout()
 
+        # Tamanho do pool de conexões keep-alive (por host).
+        # Ajuste para acompanhar OLLAMA_NUM_PARALLEL quando houver chamadas concorrentes.
+        self.pool_size = _env_int("LLM_POOL_SIZE", 10)
+
+        # Cache de respostas (opcional, LLM_CACHE=1). Sem cache explícito usa o do processo.
+        self.cache = cache if cache is not None else get_llm_cache()
+
+        # Último fallback que funcionou (host e/ou modelo): as próximas chamadas vão direto nele,
+        # sem pagar os retries do host fora do ar, até LLM_FALLBACK_TTL_SECONDS (default 300s);
+        # depois o configurado volta a ser tentado primeiro. base_url/model não mudam: o cliente
+        # é compartilhado entre threads (core.utils.models).
+        try:
+            self.fallback_ttl = max(0.0, float(os.getenv("LLM_FALLBACK_TTL_SECONDS", "300")))
+        except Exception:
+            self.fallback_ttl = 300.0
+        self._sticky: dict[str, tuple[str, float]] = {}
+        self._sticky_lock = threading.Lock()
+
+    def _sticky_get(self, kind: str) -> str | None:
+        """Fallback lembrado para `kind` ("url" ou "model"), se ainda dentro do TTL."""
+        with self._sticky_lock:
+            value, until = self._sticky.get(kind, (None, 0.0))
+            if value is not None and time.monotonic() >= until:
+                self._sticky.pop(kind, None)
+                return None
+            return value
+
+    def _sticky_set(self, kind: str, value: str | None) -> None:
+        with self._sticky_lock:
+            if value is None or self.fallback_ttl <= 0:
+                self._sticky.pop(kind, None)
+            else:
+                self._sticky[kind] = (value, time.monotonic() + self.fallback_ttl)
+
+    def _route(self, payload: dict) -> tuple[str, dict, bool]:
+        """(host, payload, usando_modelo_de_fallback) para a próxima tentativa."""
+        url = self._sticky_get("url") or self.base_url
+        model = self._sticky_get("model") if payload.get("model") == self.model else None
+        if model:
+            return url, {**payload, "model": model}, True
+        return url, payload, False
+
+    def _host_candidates(self, first: str) -> list[str]:
+        # Host lembrado primeiro; se ele cair, o configurado e os fallbacks padrão
+        out = [first]
+        for url in [self.base_url] + self._fallback_urls():
+            if url not in out:
+                out.append(url)
+        return out
+
     @staticmethod
     def _get_timeout():
         # 180s por padrão: extrações podem demorar em PDFs grandes.
@@ -56,40 +151,13 @@ class LLMClient:
             return None
         return v
 
-    def _try_generate(self, base_url: str, payload: dict) -> str:
-        # Retry leve para falhas transitórias (ConnectionRefused durante carga/restart do Ollama).
-        retries = 3
-        delay = 0.75
-        last_exc: Exception | None = None
-        for attempt in range(1, retries + 1):
-            try:
-                response = requests.post(
-                    f"{base_url}/api/generate",
-                    json=payload,
-                    timeout=self.timeout,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("response", "")
-            except requests.exceptions.ConnectionError as e:
-                last_exc = e
-                if attempt < retries:
-                    time.sleep(delay)
-                    delay *= 2
-                    continue
-                raise
-        if last_exc:
-            raise last_exc
-        return ""
-
-    def generate(self, prompt: str) -> str:
+    def _build_payload(self, prompt: str) -> dict:
         # Allow overriding Ollama generation options via env var LLM_OPTIONS (JSON)
         options_env = os.getenv("LLM_OPTIONS", "")
         options = None
         if options_env:
             try:
-                import json as _json
-                options = _json.loads(options_env)
+                options = json.loads(options_env)
             except Exception:
                 options = None
 
@@ -126,56 +194,263 @@ class LLMClient:
 
         if force_json:
             payload["format"] = "json"
+        return payload
+
+    def _cache_key(self, payload: dict) -> str | None:
+        if self.cache is None or not is_cacheable_payload(payload):
+            return None
+        return make_cache_key(payload.get("model"), payload.get("options"), payload.get("format"), payload.get("prompt", ""))
+
+    def _fallback_urls(self) -> list[str]:
+        # Fallback automático: tenta localhost/127.0.0.1/ollama
+        fallbacks = [
+            "http://127.0.0.1:11434",
+            "http://localhost:11434",
+        ]
+        # Em Linux/Docker, 'ollama' pode existir como service name.
+        if os.name != "nt":
+            fallbacks.append("http://ollama:11434")
+        return fallbacks
+
+    @staticmethod
+    def _is_model_not_found(status, body: str) -> bool:
+        return status == 404 and "model" in body and "not found" in body.lower()
+
+    @staticmethod
+    def _is_oom(status, body: str) -> bool:
+        return status == 500 and ("unable to allocate" in body.lower() or "cuda" in body.lower())
+
+    @staticmethod
+    def _pick_oom_fallback(available: list) -> str | None:
+        if not available:
+            return None
+        # Heurística simples: preferir nomes contendo '1b'
+        for name in available:
+            if "1b" in (name or "").lower():
+                return name
+        return available[0]
+
+    def _connection_error(self, tried: list[str], cause: Exception) -> RuntimeError:
+        logger.exception("Falha ao conectar ao LLM. Tentativas: %s", tried)
+        return RuntimeError(
+            f"Não foi possível conectar ao LLM. Tentativas: {', '.join(tried)}. Verifique se o Ollama está em execução."
+        )
+
+    def _timeout_error(self) -> RuntimeError:
+        logger.exception("Timeout ao gerar resposta do LLM")
+        timeout_msg = "sem timeout" if self.timeout is None else f"{self.timeout}s"
+        return RuntimeError(
+            "Tempo de espera excedido ao gerar resposta do LLM. "
+            f"Timeout atual: {timeout_msg}. "
+            "Ajuste via LLM_TIMEOUT_SECONDS (ex.: 600) ou use 0/none para desabilitar."
+        )
+
+    def _http_error(self, status, body: str) -> RuntimeError:
+        # Inclui parte do corpo para facilitar diagnóstico
+        snippet = body[:500]
+        logger.error("HTTP error from LLM (%s): %s", status, snippet)
+        return RuntimeError(f"Erro HTTP do LLM ({status}): {snippet}")
+
+
+class LLMClient(_LLMClientBase):
+    """
+    Cliente para comunicação com o LLM rodando via Ollama.
+
+    Responsabilidades:
+    - enviar prompt
+    - receber resposta textual do modelo
+
+    Usa uma `requests.Session` própria com pool de conexões keep-alive, evitando
+    abrir uma conexão TCP nova a cada geração.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        base_url: str | None = None,
+        session: requests.Session | None = None,
+        cache: LLMResponseCache | None = None,
+    ):
+        super().__init__(model=model, base_url=base_url, cache=cache)
+        self.session = session or self._build_session(self.pool_size)
 
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=_env_int("LLM_POOL_CONNECTIONS", 4),
+            pool_maxsize=pool_size,
+            # Retries de conexão são tratados em _try_generate (com backoff e log)
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def close(self) -> None:
         try:
-            # Tentativa primária
-            return self._try_generate(self.base_url, payload)
-        except requests.exceptions.ConnectionError as ce:
-            # Fallback automático: tenta localhost/127.0.0.1/ollama
-            fallbacks = [
-                "http://127.0.0.1:11434",
-                "http://localhost:11434",
-            ]
-            # Em Linux/Docker, 'ollama' pode existir como service name.
-            if os.name != "nt":
-                fallbacks.append("http://ollama:11434")
-
-            tried = [self.base_url]
-            for fb in fallbacks:
-                if fb in tried:
+            self.session.close()
+        except Exception:
+            pass
+
+    def _try_generate(self, base_url: str, payload: dict) -> str:
+        # Retry leve para falhas transitórias (ConnectionRefused durante carga/restart do Ollama).
+        retries = self.RETRIES
+        delay = self.RETRY_DELAY
+        last_exc: Exception | None = None
+        for attempt in range(1, retries + 1):
+            try:
+                response = self.session.post(
+                    f"{base_url}/api/generate",
+                    json=payload,
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                data = response.json()
+                return data.get("response", "")
+            except requests.exceptions.ConnectionError as e:
+                last_exc = e
+                if attempt < retries:
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+                raise
+        if last_exc:
+            raise last_exc
+        return ""
+
+    def generate(self, prompt: str) -> str:
+        with span("llm.generate", model=self.model, chars_in=len(prompt or "")) as s:
+            sink = current_token_sink()
+            if sink is not None:
+                parts = []
+                stream = self.generate_stream(prompt)
+                try:
+                    for piece in stream:
+                        sink(piece)
+                        parts.append(piece)
+                finally:
+                    stream.close()
+                result = "".join(parts)
+                s.set(chars_out=len(result), stream=True)
+                return result
+
+            payload = self._build_payload(prompt)
+
+            key = self._cache_key(payload)
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    s.set(chars_out=len(cached), cached=True)
+                    return cached
+
+            result, answered_by = self._generate(payload, prompt)
+            # Resposta de um modelo de fallback (404/OOM) não entra na chave do modelo configurado
+            if key is not None and answered_by == payload.get("model"):
+                self.cache.put(key, result, model=answered_by)
+            s.set(chars_out=len(result or ""))
+            return result
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Gera em streaming (NDJSON do Ollama, "stream": true), devolvendo pedaços de texto.
+
+        - Cache hit: devolve a resposta inteira de uma vez.
+        - Falha antes do primeiro token (conexão, 404 de modelo, OOM): cai no caminho
+          não-streaming com todos os fallbacks de `generate`.
+        - Fechar o gerador (close()/break) fecha a conexão e o Ollama interrompe a geração.
+        """
+        payload = self._build_payload(prompt)
+        key = self._cache_key(payload)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        url, routed, sticky_model = self._route(payload)
+        try:
+            response = self.session.post(
+                f"{url}/api/generate",
+                json={**routed, "stream": True},
+                timeout=self.timeout,
+                stream=True,
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            result, answered_by = self._generate(payload, prompt)
+            if key is not None and answered_by == payload.get("model"):
+                self.cache.put(key, result, model=answered_by)
+            yield result
+            return
+
+        parts = []
+        done = False
+        try:
+            for line in response.iter_lines():
+                if not line:
                     continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Erro do LLM durante streaming: {data['error']}")
+                piece = data.get("response") or ""
+                if piece:
+                    parts.append(piece)
+                    yield piece
+                if data.get("done"):
+                    done = True
+                    break
+        except requests.exceptions.Timeout as te:
+            raise self._timeout_error() from te
+        finally:
+            response.close()
+
+        # Só guarda no cache respostas completas (e do modelo configurado)
+        if key is not None and done and not sticky_model:
+            self.cache.put(key, "".join(parts), model=payload.get("model"))
+
+    def _generate(self, payload: dict, prompt: str) -> tuple[str, str]:
+        """Gera com retry e fallbacks; devolve (resposta, modelo que respondeu)."""
+        url, payload, sticky_model = self._route(payload)
+        try:
+            # Tentativa primária (host/modelo de fallback lembrado, se houver)
+            return self._try_generate(url, payload), payload["model"]
+        except requests.exceptions.ConnectionError as ce:
+            hosts = self._host_candidates(url)
+            tried = [url]
+            for fb in hosts[1:]:
                 try:
                     result = self._try_generate(fb, payload)
-                    # Atualiza base_url para as próximas chamadas
-                    self.base_url = fb
                     logger.info("LLM connected via fallback %s", fb)
-                    return result
+                    self._sticky_set("url", None if fb == self.base_url else fb)
+                    return result, payload["model"]
                 except requests.exceptions.RequestException:
                     tried.append(fb)
-
-            logger.exception("Falha ao conectar ao LLM. Tentativas: %s", tried)
-            raise RuntimeError(
-                f"Não foi possível conectar ao LLM. Tentativas: {', '.join(tried)}. Verifique se o Ollama está em execução."
-            ) from ce
+            self._sticky_set("url", None)
+            raise self._connection_error(tried, ce) from ce
         except requests.exceptions.HTTPError as he:
-            # Se o modelo não for encontrado (404), tenta fallback para um modelo disponível
             status = getattr(he.response, "status_code", None) if hasattr(he, "response") else None
             body = he.response.text if hasattr(he, "response") and he.response is not None else ""
-            if status == 404 and "model" in body and "not found" in body.lower():
+            if sticky_model:
+                # O modelo de fallback lembrado também falhou: esquece e decide de novo abaixo
+                self._sticky_set("model", None)
+            # Se o modelo não for encontrado (404), tenta fallback para um modelo disponível
+            if self._is_model_not_found(status, body):
                 available = self.list_models()
                 if available:
                     # escolhe o primeiro disponível
                     fallback = available[0]
                     try:
                         logger.info("Attempting fallback model %s due to 404", fallback)
-                        response2 = requests.post(
-                            f"{self.base_url}/api/generate",
+                        response2 = self.session.post(
+                            f"{url}/api/generate",
                             json={"model": fallback, "prompt": prompt, "stream": False},
                             timeout=self.timeout,
                         )
                         response2.raise_for_status()
                         data2 = response2.json()
-                        return data2.get("response", "")
+                        self._sticky_set("model", fallback)
+                        return data2.get("response", ""), fallback
                     except Exception as e2:
                         logger.exception("Fallback model %s failed", fallback)
                         raise RuntimeError(
@@ -185,49 +460,29 @@ class LLMClient:
                     f"Modelo '{self.model}' não encontrado e nenhum modelo disponível no Ollama."
                 )
             # Falha por falta de memória GPU: tenta automaticamente um modelo menor (ex.: 1b)
-            if status == 500 and ("unable to allocate" in body.lower() or "cuda" in body.lower()):
-                available = self.list_models()
-                if available:
-                    # Heurística simples: preferir nomes contendo '1b'
-                    fallback = None
-                    for name in available:
-                        if "1b" in (name or "").lower():
-                            fallback = name
-                            break
-                    if not fallback:
-                        fallback = available[0]
+            if self._is_oom(status, body):
+                fallback = self._pick_oom_fallback(self.list_models())
+                if fallback:
                     try:
                         logger.warning("OOM detected for model %s, trying fallback %s", self.model, fallback)
                         payload2 = dict(payload)
                         payload2["model"] = fallback
-                        data2 = self._try_generate(self.base_url, payload2)
-                        # Atualiza o modelo padrao do cliente para próximas chamadas
-                        self.model = fallback
-                        return data2
+                        result = self._try_generate(url, payload2)
+                        self._sticky_set("model", fallback)
+                        return result, fallback
                     except Exception as e2:
                         logger.exception("Fallback after OOM failed")
                         raise RuntimeError(
                             f"Modelo configurado '{self.model}' causou OOM; fallback '{fallback}' também falhou: {e2}"
                         ) from e2
-            # Inclui parte do corpo para facilitar diagnóstico
-            snippet = body[:500]
-            logger.error("HTTP error from LLM (%s): %s", status, snippet)
-            raise RuntimeError(
-                f"Erro HTTP do LLM ({status}): {snippet}"
-            ) from he
+            raise self._http_error(status, body) from he
         except requests.exceptions.Timeout as te:
-            logger.exception("Timeout ao gerar resposta do LLM")
-            timeout_msg = "sem timeout" if self.timeout is None else f"{self.timeout}s"
-            raise RuntimeError(
-                "Tempo de espera excedido ao gerar resposta do LLM. "
-                f"Timeout atual: {timeout_msg}. "
-                "Ajuste via LLM_TIMEOUT_SECONDS (ex.: 600) ou use 0/none para desabilitar."
-            ) from te
+            raise self._timeout_error() from te
 
     def list_models(self) -> list:
         """Lista modelos disponíveis no Ollama."""
         try:
-            r = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            r = self.session.get(f"{self.base_url}/api/tags", timeout=10)
             r.raise_for_status()
             data = r.json()
             # Ollama tags: {"models": [{"name": "llama3.1"}, ...]}
@@ -236,6 +491,152 @@ class LLMClient:
             logger.debug("Unable to list models at %s", self.base_url)
             return []
 
+
+class AsyncLLMClient(_LLMClientBase):
+    """
+    Variante assíncrona do LLMClient (httpx.AsyncClient), com as mesmas regras de
+    retry e fallback (host, modelo 404, OOM, timeout).
+
+    Útil para rotas FastAPI e varreduras que disparam várias gerações concorrentes
+    sem ocupar threads do worker. Use como context manager ou chame `aclose()`.
+    """
+
+    def __init__(self, model: str | None = None, base_url: str | None = None, client=None, cache: LLMResponseCache | None = None):
+        super().__init__(model=model, base_url=base_url, cache=cache)
+        self._client = client
+
+    def _get_client(self):
+        if self._client is None:
+            try:
+                import httpx
+            except ImportError as e:
+                raise RuntimeError("AsyncLLMClient requer o pacote 'httpx'.") from e
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+        return False
+
+    async def _try_generate(self, base_url: str, payload: dict) -> str:
+        import httpx
+
+        client = self._get_client()
+        delay = self.RETRY_DELAY
+        for attempt in range(1, self.RETRIES + 1):
+            try:
+                response = await client.post(f"{base_url}/api/generate", json=payload)
+                response.raise_for_status()
+                return response.json().get("response", "")
+            except httpx.ConnectError:
+                if attempt < self.RETRIES:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                    continue
+                raise
+        return ""
+
+    async def generate(self, prompt: str) -> str:
+        with span("llm.generate", model=self.model, chars_in=len(prompt or "")) as s:
+            payload = self._build_payload(prompt)
+
+            key = self._cache_key(payload)
+            if key is not None:
+                # Nível persistente faz I/O de banco: roda fora do event loop
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    s.set(chars_out=len(cached), cached=True)
+                    return cached
+
+            result, answered_by = await self._generate(payload, prompt)
+            if key is not None and answered_by == payload.get("model"):
+                await asyncio.to_thread(self.cache.put, key, result, model=answered_by)
+            s.set(chars_out=len(result or ""))
+            return result
+
+    async def _generate(self, payload: dict, prompt: str) -> tuple[str, str]:
+        import httpx
+
+        url, payload, sticky_model = self._route(payload)
+        try:
+            return await self._try_generate(url, payload), payload["model"]
+        except httpx.ConnectError as ce:
+            hosts = self._host_candidates(url)
+            tried = [url]
+            for fb in hosts[1:]:
+                try:
+                    result = await self._try_generate(fb, payload)
+                    logger.info("LLM connected via fallback %s", fb)
+                    self._sticky_set("url", None if fb == self.base_url else fb)
+                    return result, payload["model"]
+                except httpx.HTTPError:
+                    tried.append(fb)
+            self._sticky_set("url", None)
+            raise self._connection_error(tried, ce) from ce
+        except httpx.HTTPStatusError as he:
+            status = he.response.status_code if he.response is not None else None
+            body = he.response.text if he.response is not None else ""
+            if sticky_model:
+                self._sticky_set("model", None)
+            if self._is_model_not_found(status, body):
+                available = await self.list_models()
+                if available:
+                    fallback = available[0]
+                    try:
+                        logger.info("Attempting fallback model %s due to 404", fallback)
+                        result = await self._try_generate(url, {"model": fallback, "prompt": prompt, "stream": False})
+                        self._sticky_set("model", fallback)
+                        return result, fallback
+                    except Exception as e2:
+                        logger.exception("Fallback model %s failed", fallback)
+                        raise RuntimeError(
+                            f"Modelo padrão '{self.model}' indisponível e fallback '{fallback}' falhou: {e2}"
+                        ) from e2
+                raise RuntimeError(
+                    f"Modelo '{self.model}' não encontrado e nenhum modelo disponível no Ollama."
+                )
+            if self._is_oom(status, body):
+                fallback = self._pick_oom_fallback(await self.list_models())
+                if fallback:
+                    try:
+                        logger.warning("OOM detected for model %s, trying fallback %s", self.model, fallback)
+                        result = await self._try_generate(url, {**payload, "model": fallback})
+                        self._sticky_set("model", fallback)
+                        return result, fallback
+                    except Exception as e2:
+                        logger.exception("Fallback after OOM failed")
+                        raise RuntimeError(
+                            f"Modelo configurado '{self.model}' causou OOM; fallback '{fallback}' também falhou: {e2}"
+                        ) from e2
+            raise self._http_error(status, body) from he
+        except httpx.TimeoutException as te:
+            raise self._timeout_error() from te
+
+    async def list_models(self) -> list:
+        """Lista modelos disponíveis no Ollama."""
+        try:
+            r = await self._get_client().get(f"{self.base_url}/api/tags", timeout=10)
+            r.raise_for_status()
+            return [m.get("name") for m in r.json().get("models", [])]
+        except Exception:
+            logger.debug("Unable to list models at %s", self.base_url)
+            return []
+
+
 if __name__ == "__main__":
     llm = LLMClient()
     print(llm.generate("Explique o que é uma licitação em uma frase."))
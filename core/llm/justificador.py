@@ -2,7 +2,7 @@ import json
 import re
 import os
 from typing import Any, Dict
-from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
 
 
 JUSTIFICATION_PROMPT = """
@@ -33,7 +33,7 @@ Saída (JSON estrito, sem markdown):
 class JustificationGenerator:
     def __init__(self, model: str | None = None):
         model_eff = model or os.getenv("LLM_MODEL_JUSTIFICADOR") or None
-        self.llm = LLMClient(model=model_eff)
+        self.llm = get_llm_client(model_eff)
         self._llm_unavailable = False
         self._llm_disabled = str(os.getenv("LLM_DISABLE", "0")).lower() in ("1", "true", "yes")
 
@@ -0,0 +1,189 @@
+"""
+Índice por atributo do catálogo de produtos, para triagem "quais produtos servem neste edital".
+
+Para cada chave (tensao_v, capacidade_ah, ...) e unidade normalizada, guarda os valores
+numéricos ordenados e a posição do produto. Um requisito vira uma busca por faixa
+(searchsorted) em vez de um scan do catálogo. O índice só descarta produtos que o
+MatchingEngine com certeza marcaria NAO_ATENDE num requisito que força REPROVADO; o
+veredito final continua sendo do MatchingEngine/compute_score sobre os candidatos.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from core.match.config import UNIT_TABLE, MatchConfig, get_match_config, norm_unit
+from core.match.matching_engine import _to_float
+
+
+# Grupo de unidade "texto presente mas vazio após normalizar" (ex.: "  "): só casa consigo mesmo
+_INVALID_UNIT = "\x00"
+# Folga relativa nas faixas convertidas: arredondamento nunca pode descartar um candidato
+_RANGE_SLACK = 1e-9
+
+
+def _unit_group(raw) -> str | None:
+    if not raw:
+        return None
+    u = norm_unit(raw)
+    return _INVALID_UNIT if u is None else u
+
+
+def produto_atributos(atributos_json: Any) -> Dict[str, Any]:
+    """
+    Atributos no formato do MatchingEngine a partir de Produto.atributos_json.
+
+    Aceita {"atributos": {...}} (payload completo) ou o dict de atributos direto;
+    valores soltos ("12V", 12) viram {"valor": ...} sem unidade.
+    """
+    if not isinstance(atributos_json, dict):
+        return {}
+    attrs = atributos_json.get("atributos") if isinstance(atributos_json.get("atributos"), dict) else atributos_json
+    out: Dict[str, Any] = {}
+    for k, v in attrs.items():
+        out[k] = v if isinstance(v, dict) or not v else {"valor": v, "unidade": None}
+    return out
+
+
+def gate_requirements(edital: Dict[str, Any], config: MatchConfig | None = None) -> List[str]:
+    """
+    Requisitos do edital em que NAO_ATENDE leva a status_geral REPROVADO (mesma precedência do compute_score):
+    - SEQUENCE_FILTER presente no edital: só as chaves da sequência decidem
+    - senão, IMPORTANT_REQUIREMENTS presentes: só as chaves decidem (as demais podem ser sobrepostas)
+    - senão: todos os obrigatórios
+    """
+    cfg = config or get_match_config()
+    reqs = edital.get("requisitos", {}) or {}
+    seq = [k for k in cfg.sequence_filter if k in reqs]
+    if seq:
+        return seq
+    keys = [k for k in cfg.key_requirements if k in reqs]
+    if keys:
+        return keys
+    return [k for k, regra in reqs.items() if regra.get("obrigatorio", True)]
+
+
+@dataclass
+class _KeyColumn:
+    present: np.ndarray                       # posições com o atributo preenchido
+    opaque: np.ndarray                        # presentes sem valor numérico (sempre DUVIDA)
+    by_unit: Dict[str | None, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)  # unidade -> (valores, posições)
+
+
+class AttributeIndex:
+    """Índice ordenado (chave, unidade) -> valores do catálogo."""
+
+    def __init__(self, produtos: Sequence[Dict[str, Any]], ids: Sequence[Any] | None = None):
+        self.produtos = list(produtos)
+        self.ids = list(ids) if ids is not None else list(range(len(self.produtos)))
+        self._columns: Dict[str, _KeyColumn] = {}
+
+        present: Dict[str, List[int]] = {}
+        opaque: Dict[str, List[int]] = {}
+        numeric: Dict[Tuple[str, str | None], Tuple[List[float], List[int]]] = {}
+        for pos, prod in enumerate(self.produtos):
+            for k, attr in (prod.get("atributos") or {}).items():
+                if not attr:
+                    continue
+                present.setdefault(k, []).append(pos)
+                v = _to_float(attr.get("valor"))
+                if v is None or v != v:  # None, não numérico ou NaN: fora das faixas
+                    opaque.setdefault(k, []).append(pos)
+                    continue
+                vals, poss = numeric.setdefault((k, _unit_group(attr.get("unidade"))), ([], []))
+                vals.append(v)
+                poss.append(pos)
+
+        for k, poss in present.items():
+            self._columns[k] = _KeyColumn(
+                present=np.asarray(poss, dtype=np.int64),
+                opaque=np.asarray(opaque.get(k, []), dtype=np.int64),
+            )
+        for (k, unit), (vals, poss) in numeric.items():
+            v = np.asarray(vals, dtype=np.float64)
+            p = np.asarray(poss, dtype=np.int64)
+            order = np.argsort(v, kind="stable")
+            self._columns[k].by_unit[unit] = (v[order], p[order])
+
+    def __len__(self) -> int:
+        return len(self.produtos)
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def candidates_for(self, key: str, regra: Dict[str, Any], tol: float) -> np.ndarray | None:
+        """
+        Posições que podem NÃO ser NAO_ATENDE neste requisito (ordenadas).
+        None = o requisito não restringe (todos os produtos continuam candidatos).
+        """
+        obrigatorio = bool(regra.get("obrigatorio", True))
+        col = self._columns.get(key)
+        if col is None:
+            # ninguém tem o atributo: obrigatório -> todos NAO_ATENDE; opcional -> todos DUVIDA
+            return np.empty(0, dtype=np.int64) if obrigatorio else None
+        if not obrigatorio:
+            # produto sem o atributo fica DUVIDA: só dá para descartar quem está fora da faixa
+            return None
+
+        vmin = _to_float(regra.get("valor_min"))
+        vmax = _to_float(regra.get("valor_max"))
+        if vmin is None and vmax is None:
+            return col.present
+
+        lo = -np.inf if vmin is None else vmin - abs(vmin) * tol
+        hi = np.inf if vmax is None else vmax + abs(vmax) * tol
+        # limite NaN (ex.: "nan", inf * 0) nunca reprova no engine: trata como ausente
+        lo = -np.inf if lo != lo else lo
+        hi = np.inf if hi != hi else hi
+        req_unit = _unit_group(regra.get("unidade"))
+
+        parts = [col.opaque]
+        for unit, (vals, poss) in col.by_unit.items():
+            if req_unit is None or unit is None or unit == req_unit:
+                scale = 1.0  # sem conversão: compara o valor bruto
+            else:
+                a = UNIT_TABLE.get(unit)
+                b = UNIT_TABLE.get(req_unit)
+                if a is None or b is None or a[0] != b[0]:
+                    parts.append(poss)  # unidade incompatível -> DUVIDA
+                    continue
+                scale = b[1] / a[1]  # v * a / b em [lo, hi]  <=>  v em [lo * b / a, hi * b / a]
+            q_lo = lo * scale
+            q_hi = hi * scale
+            if scale != 1.0:
+                q_lo -= abs(q_lo) * _RANGE_SLACK
+                q_hi += abs(q_hi) * _RANGE_SLACK
+            i = np.searchsorted(vals, q_lo, side="left")
+            j = np.searchsorted(vals, q_hi, side="right")
+            parts.append(poss[i:j])
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def candidates(
+        self,
+        edital: Dict[str, Any],
+        config: MatchConfig | None = None,
+        tolerance_overrides: dict | None = None,
+    ) -> np.ndarray:
+        """Posições do catálogo que podem não ser REPROVADO para o edital (superset exato)."""
+        cfg = config or get_match_config()
+        reqs = edital.get("requisitos", {}) or {}
+        sets = []
+        for key in gate_requirements(edital, cfg):
+            c = self.candidates_for(key, reqs[key], cfg.tolerance_for(str(key), tolerance_overrides))
+            if c is not None:
+                if c.size == 0:
+                    return c
+                sets.append(c)
+        if not sets:
+            return np.arange(len(self.produtos), dtype=np.int64)
+        sets.sort(key=len)
+        out = sets[0]
+        for s in sets[1:]:
+            out = np.intersect1d(out, s, assume_unique=True)
+            if out.size == 0:
+                break
+        return out
@@ -0,0 +1,365 @@
+"""
+Matching em lote (muitos produtos × muitos editais) com NumPy.
+
+Mesmas regras de MatchingEngine.compare + compute_score, mas:
+- requisitos de todos os editais viram colunas (chave, vmin, vmax, unidade, obrigatório, tolerância)
+- atributos dos produtos viram uma matriz (produto × chave) com valor e unidade
+- o status ATENDE/NAO_ATENDE/DUVIDA sai de broadcasting (produto × requisito)
+- contagens/score/status geral por (produto, edital) saem de somas por segmento
+
+Produtos são compilados uma vez e reaproveitados contra qualquer edital novo.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from core.match.config import MatchConfig, conversion_factors, get_match_config, norm_unit
+from core.match.matching_engine import MatchingEngine, _to_float
+from core.match.scoring import compute_score
+
+
+# Códigos de status (int8)
+ATENDE, NAO_ATENDE, DUVIDA = 0, 1, 2
+STATUS_NAMES = (MatchingEngine.STATUS_ATENDE, MatchingEngine.STATUS_NAO_ATENDE, MatchingEngine.STATUS_DUVIDA)
+
+# Códigos de status_geral (int8)
+APROVADO, REPROVADO, DUVIDOSO = 0, 1, 2
+GERAL_NAMES = ("APROVADO", "REPROVADO", "DUVIDOSO")
+# Ordem de ranking: APROVADO < DUVIDOSO < REPROVADO
+_GERAL_RANK = np.array([0, 2, 1], dtype=np.int8)
+
+
+# ----------------------------------------------------------------------
+# Unidades: id estável por unidade normalizada
+# ----------------------------------------------------------------------
+_UNIT_NONE = 0     # unidade vazia/ausente: não converte
+_UNIT_INVALID = 1  # texto presente que normaliza para vazio (ex.: "  "): só casa consigo mesmo
+_unit_lock = threading.Lock()
+_unit_ids: Dict[str, int] = {}
+_unit_names: List[str | None] = [None, None]
+
+
+def _unit_id(raw) -> int:
+    if not raw:
+        return _UNIT_NONE
+    u = norm_unit(raw)
+    if u is None:
+        return _UNIT_INVALID
+    uid = _unit_ids.get(u)
+    if uid is None:
+        with _unit_lock:
+            uid = _unit_ids.get(u)
+            if uid is None:
+                uid = len(_unit_names)
+                _unit_names.append(u)
+                _unit_ids[u] = uid
+    return uid
+
+
+def _conversion_tables(n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(mul, div, ok) (n, n): valor convertido = v * mul[de, para] / div[de, para]."""
+    mul = np.ones((n, n), dtype=np.float64)
+    div = np.ones((n, n), dtype=np.float64)
+    ok = np.ones((n, n), dtype=bool)
+    names = _unit_names[:n]
+    for a in range(1, n):
+        for b in range(1, n):
+            if a == b:
+                continue
+            if a == _UNIT_INVALID or b == _UNIT_INVALID:
+                ok[a, b] = False
+                continue
+            f = conversion_factors(names[a], names[b])
+            if f is None:
+                ok[a, b] = False
+            else:
+                mul[a, b], div[a, b] = f
+    return mul, div, ok
+
+
+# ----------------------------------------------------------------------
+# Compilação
+# ----------------------------------------------------------------------
+@dataclass
+class ProductMatrix:
+    """Atributos de P produtos em colunas por chave (K chaves)."""
+
+    keys: List[str]
+    key_index: Dict[str, int]
+    present: np.ndarray   # (P, K) bool: atributo existe e é "truthy"
+    has_value: np.ndarray  # (P, K) bool: "valor" não é None
+    numeric: np.ndarray   # (P, K) bool: valor convertível para float
+    value: np.ndarray     # (P, K) float64
+    unit: np.ndarray      # (P, K) int32 (id de unidade)
+
+    def __len__(self) -> int:
+        return self.present.shape[0]
+
+
+@dataclass
+class RequirementTable:
+    """Requisitos de E editais em R colunas, ordenadas por edital."""
+
+    n_editais: int
+    starts: np.ndarray     # (E,) início do segmento de cada edital
+    ends: np.ndarray       # (E,)
+    edital: np.ndarray     # (R,) int32
+    keys: List[str]        # (R,) chave de cada requisito
+    has_min: np.ndarray    # (R,) bool
+    vmin: np.ndarray       # (R,) float64
+    has_max: np.ndarray
+    vmax: np.ndarray
+    unit: np.ndarray       # (R,) int32
+    obrigatorio: np.ndarray  # (R,) bool
+    is_key: np.ndarray     # (R,) bool: está em IMPORTANT_REQUIREMENTS
+    is_seq: np.ndarray     # (R,) bool: está em SEQUENCE_FILTER
+    editais: Sequence[Dict[str, Any]]
+
+
+def compile_produtos(produtos: Sequence[Dict[str, Any]]) -> ProductMatrix:
+    key_index: Dict[str, int] = {}
+    for p in produtos:
+        for k in (p.get("atributos") or {}):
+            key_index.setdefault(k, len(key_index))
+    P, K = len(produtos), len(key_index)
+
+    present = np.zeros((P, K), dtype=bool)
+    has_value = np.zeros((P, K), dtype=bool)
+    numeric = np.zeros((P, K), dtype=bool)
+    value = np.zeros((P, K), dtype=np.float64)
+    unit = np.zeros((P, K), dtype=np.int32)
+
+    for i, p in enumerate(produtos):
+        for k, attr in (p.get("atributos") or {}).items():
+            if not attr:
+                continue
+            j = key_index[k]
+            present[i, j] = True
+            raw = attr.get("valor")
+            if raw is None:
+                continue
+            has_value[i, j] = True
+            v = _to_float(raw)
+            if v is None:
+                continue
+            numeric[i, j] = True
+            value[i, j] = v
+            unit[i, j] = _unit_id(attr.get("unidade"))
+
+    return ProductMatrix(list(key_index), key_index, present, has_value, numeric, value, unit)
+
+
+def compile_editais(editais: Sequence[Dict[str, Any]], config: MatchConfig | None = None) -> RequirementTable:
+    cfg = config or get_match_config()
+    key_set = set(cfg.key_requirements)
+    seq_set = set(cfg.sequence_filter)
+
+    edital_col: List[int] = []
+    keys: List[str] = []
+    has_min: List[bool] = []
+    vmin: List[float] = []
+    has_max: List[bool] = []
+    vmax: List[float] = []
+    unit: List[int] = []
+    obrig: List[bool] = []
+    starts, ends = [], []
+
+    for e, ed in enumerate(editais):
+        starts.append(len(keys))
+        for k, regra in (ed.get("requisitos") or {}).items():
+            edital_col.append(e)
+            keys.append(k)
+            a = _to_float(regra.get("valor_min"))
+            b = _to_float(regra.get("valor_max"))
+            has_min.append(a is not None)
+            vmin.append(a if a is not None else 0.0)
+            has_max.append(b is not None)
+            vmax.append(b if b is not None else 0.0)
+            unit.append(_unit_id(regra.get("unidade")))
+            obrig.append(bool(regra.get("obrigatorio", True)))
+        ends.append(len(keys))
+
+    return RequirementTable(
+        n_editais=len(editais),
+        starts=np.asarray(starts, dtype=np.int64),
+        ends=np.asarray(ends, dtype=np.int64),
+        edital=np.asarray(edital_col, dtype=np.int32),
+        keys=keys,
+        has_min=np.asarray(has_min, dtype=bool),
+        vmin=np.asarray(vmin, dtype=np.float64),
+        has_max=np.asarray(has_max, dtype=bool),
+        vmax=np.asarray(vmax, dtype=np.float64),
+        unit=np.asarray(unit, dtype=np.int32),
+        obrigatorio=np.asarray(obrig, dtype=bool),
+        is_key=np.asarray([k in key_set for k in keys], dtype=bool),
+        is_seq=np.asarray([k in seq_set for k in keys], dtype=bool),
+        editais=editais,
+    )
+
+
+# ----------------------------------------------------------------------
+# Resultado
+# ----------------------------------------------------------------------
+@dataclass
+class BulkResult:
+    status: np.ndarray        # (P, R) int8: ATENDE/NAO_ATENDE/DUVIDA por requisito
+    score_raw: np.ndarray     # (P, E) float64: % de obrigatórios atendidos (sem arredondar)
+    status_geral: np.ndarray  # (P, E) int8: APROVADO/REPROVADO/DUVIDOSO
+    counts: Dict[str, np.ndarray]  # (P, E) int32: obrigatorios_atende, ... (mesmos nomes do compute_score)
+    table: RequirementTable
+    config: MatchConfig
+
+    def matching(self, p: int, e: int) -> Dict[str, str]:
+        """Dict no formato de MatchingEngine.compare para o par (produto p, edital e)."""
+        s, t = int(self.table.starts[e]), int(self.table.ends[e])
+        return {self.table.keys[r]: STATUS_NAMES[int(self.status[p, r])] for r in range(s, t)}
+
+    def score(self, p: int, e: int) -> Dict[str, Any]:
+        """Dict completo de compute_score (com diagnóstico) para o par — use só nos pares exibidos."""
+        return compute_score(self.matching(p, e), self.table.editais[e], config=self.config)
+
+    def rank(self, e: int, top_k: int | None = None) -> np.ndarray:
+        """Produtos para o edital e: APROVADO, DUVIDOSO, REPROVADO e, dentro de cada um, score decrescente."""
+        order = np.lexsort((-self.score_raw[:, e], _GERAL_RANK[self.status_geral[:, e]]))
+        return order if top_k is None else order[:top_k]
+
+
+def _segment_sum(mat: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Soma por segmento de colunas: (P, R) -> (P, E); segmentos vazios dão 0."""
+    P = mat.shape[0]
+    csum = np.zeros((P, mat.shape[1] + 1), dtype=np.int32)
+    np.cumsum(mat, axis=1, dtype=np.int32, out=csum[:, 1:])
+    return csum[:, ends] - csum[:, starts]
+
+
+def bulk_match(
+    produtos: Sequence[Dict[str, Any]] | ProductMatrix,
+    editais: Sequence[Dict[str, Any]] | RequirementTable,
+    *,
+    config: MatchConfig | None = None,
+    tolerance_overrides: dict | Sequence[dict | None] | None = None,
+) -> BulkResult:
+    """
+    Avalia todos os produtos contra todos os editais.
+
+    tolerance_overrides: um dict para todos os produtos ou uma lista (um por produto),
+    com a mesma semântica de MatchingEngine.compare.
+    """
+    cfg = config or get_match_config()
+    prods = produtos if isinstance(produtos, ProductMatrix) else compile_produtos(produtos)
+    table = editais if isinstance(editais, RequirementTable) else compile_editais(editais, cfg)
+    P, R, E = len(prods), len(table.keys), table.n_editais
+
+    # Coluna do produto para cada requisito (-1 = nenhum produto tem a chave)
+    col = np.asarray([prods.key_index.get(k, -1) for k in table.keys], dtype=np.int64)
+    known = col >= 0
+    safe_col = np.where(known, col, 0)
+
+    def _gather(arr: np.ndarray, fill) -> np.ndarray:
+        if arr.shape[1] == 0:
+            return np.full((P, R), fill, dtype=arr.dtype)
+        out = arr[:, safe_col]
+        out[:, ~known] = fill
+        return out
+
+    present = _gather(prods.present, False)
+    has_value = _gather(prods.has_value, False)
+    numeric = _gather(prods.numeric, False)
+    value = _gather(prods.value, 0.0)
+    p_unit = _gather(prods.unit, _UNIT_NONE)
+
+    # Conversão de unidade (só quando as duas existem e diferem, como no engine)
+    n_units = len(_unit_names)
+    mul, div, conv_ok = _conversion_tables(n_units)
+    r_unit = np.broadcast_to(table.unit, (P, R))
+    needs = (p_unit != _UNIT_NONE) & (r_unit != _UNIT_NONE) & (p_unit != r_unit)
+    convertible = np.where(needs, conv_ok[p_unit, r_unit], True)
+    v = np.where(needs, value * mul[p_unit, r_unit] / div[p_unit, r_unit], value)
+
+    # Tolerância por requisito (e por produto, se houver overrides por produto)
+    if tolerance_overrides is None or isinstance(tolerance_overrides, dict):
+        memo: Dict[str, float] = {}
+        tol_row = np.asarray(
+            [memo.setdefault(k, cfg.tolerance_for(str(k), tolerance_overrides)) for k in table.keys], dtype=np.float64
+        )
+        tol = np.broadcast_to(tol_row, (P, R))
+    else:
+        base = np.asarray([cfg.tolerance_for(str(k)) for k in table.keys], dtype=np.float64)
+        tol = np.tile(base, (P, 1))
+        for i, ov in enumerate(tolerance_overrides):
+            if ov:
+                tol[i] = [cfg.tolerance_for(str(k), ov) for k in table.keys]
+
+    eff_min = table.vmin - np.abs(table.vmin) * tol
+    eff_max = table.vmax + np.abs(table.vmax) * tol
+    fails = (table.has_min & (v < eff_min)) | (table.has_max & (v > eff_max))
+
+    status = np.full((P, R), ATENDE, dtype=np.int8)
+    status[fails] = NAO_ATENDE
+    status[~convertible] = DUVIDA
+    status[~numeric] = DUVIDA
+    status[~has_value] = DUVIDA
+    missing = ~present
+    status[missing & table.obrigatorio] = NAO_ATENDE
+    status[missing & ~table.obrigatorio] = DUVIDA
+
+    # ------------------------------------------------------------------
+    # Agregados de compute_score por (produto, edital)
+    # ------------------------------------------------------------------
+    s, t = table.starts, table.ends
+    ob = table.obrigatorio
+    at, na = status == ATENDE, status == NAO_ATENDE
+    du = ~(at | na)
+
+    obrig_total = np.broadcast_to((t - s) - _segment_sum(~ob[None, :], s, t)[0], (P, E))
+    counts = {
+        "obrigatorios_total": np.ascontiguousarray(obrig_total),
+        "obrigatorios_atende": _segment_sum(at & ob, s, t),
+        "obrigatorios_nao_atende": _segment_sum(na & ob, s, t),
+        "obrigatorios_duvida": _segment_sum(du & ob, s, t),
+        "opcionais_total": np.broadcast_to(_segment_sum(~ob[None, :], s, t)[0], (P, E)).copy(),
+        "opcionais_atende": _segment_sum(at & ~ob, s, t),
+        "opcionais_nao_atende": _segment_sum(na & ~ob, s, t),
+        "opcionais_duvida": _segment_sum(du & ~ob, s, t),
+    }
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score_raw = np.where(obrig_total > 0, (counts["obrigatorios_atende"] / np.maximum(obrig_total, 1)) * 100.0, 0.0)
+
+    geral = np.full((P, E), APROVADO, dtype=np.int8)
+    geral[counts["obrigatorios_duvida"] > 0] = DUVIDOSO
+    geral[counts["obrigatorios_nao_atende"] > 0] = REPROVADO
+    geral[obrig_total == 0] = DUVIDOSO
+
+    # Requisitos-chave (IMPORTANT_REQUIREMENTS / KEY_REQUIREMENTS_POLICY)
+    if table.is_key.any():
+        kk = table.is_key
+        key_total = _segment_sum(kk[None, :], s, t)[0]
+        key_at = _segment_sum(at & kk, s, t)
+        key_na = _segment_sum(na & kk, s, t)
+        key_du = _segment_sum(du & kk, s, t)
+        has_keys = key_total[None, :] > 0
+        approve = (key_at >= 1) if cfg.key_policy == "any" else (key_at == key_total[None, :])
+        geral = np.where(has_keys & (key_na == 0) & (key_du == 0) & approve, APROVADO, geral)
+        geral = np.where(has_keys & (key_na == 0) & (key_du > 0), DUVIDOSO, geral)
+        geral = np.where(has_keys & (key_na > 0), REPROVADO, geral)
+
+    # Filtro por sequência: resultado final não depende da ordem (só o diagnóstico depende)
+    if table.is_seq.any():
+        sq = table.is_seq
+        seq_present = _segment_sum(sq[None, :], s, t)[0][None, :] > 0
+        seq_na = _segment_sum(na & sq, s, t) > 0
+        seq_du = _segment_sum(du & sq, s, t) > 0
+        seq_final = np.where(seq_na, REPROVADO, np.where(seq_du, DUVIDOSO, APROVADO))
+        geral = np.where(seq_present, seq_final, geral)
+
+    return BulkResult(
+        status=status,
+        score_raw=score_raw,
+        status_geral=geral.astype(np.int8),
+        counts=counts,
+        table=table,
+        config=cfg,
+    )
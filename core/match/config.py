@@ -0,0 +1,265 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+
+# ----------------------------------------------------------------------
+# Unidades (tabelas congeladas, construídas uma vez no import)
+# ----------------------------------------------------------------------
+UNIT_ALIASES: Mapping[str, str] = MappingProxyType(
+    {
+        "volts": "v",
+        "volt": "v",
+        "amp": "a",
+        "amps": "a",
+        "watt": "w",
+        "watts": "w",
+        "mes": "meses",
+        "mês": "meses",
+        "messes": "meses",
+        "gb": "gb",
+        "gbyte": "gb",
+        "gbytes": "gb",
+        "tb": "tb",
+        "mb": "mb",
+        "mah": "mah",
+        "ah": "ah",
+        "kg": "kg",
+        "g": "g",
+        "mm": "mm",
+        "cm": "cm",
+        "m": "m",
+        "gbps": "gbps",
+        "gbit": "gbps",
+        "gbit/s": "gbps",
+        "mbps": "mbps",
+        "mbit": "mbps",
+        "mbit/s": "mbps",
+    }
+)
+
+# unidade normalizada -> (grandeza, fator para a menor unidade da grandeza)
+# Fatores inteiros em relação à menor unidade reproduzem exatamente as contas antigas
+# (val * fator_origem / fator_destino).
+UNIT_TABLE: Mapping[str, Tuple[str, float]] = MappingProxyType(
+    {
+        "w": ("potencia", 1.0),
+        "kw": ("potencia", 1000.0),
+        "v": ("tensao", 1.0),
+        "kv": ("tensao", 1000.0),
+        "ma": ("corrente", 1.0),
+        "a": ("corrente", 1000.0),
+        "mah": ("carga", 1.0),
+        "ah": ("carga", 1000.0),
+        "mb": ("armazenamento", 1.0),
+        "gb": ("armazenamento", 1024.0),
+        "tb": ("armazenamento", 1024.0 * 1024.0),
+        "mbps": ("velocidade", 1.0),
+        "gbps": ("velocidade", 1000.0),
+        "g": ("massa", 1.0),
+        "kg": ("massa", 1000.0),
+        "mm": ("comprimento", 1.0),
+        "cm": ("comprimento", 10.0),
+        "m": ("comprimento", 1000.0),
+    }
+)
+
+
+def norm_unit(u: str | None) -> str | None:
+    # O JSON do LLM às vezes traz lista/dict em "unidade": não é unidade (e não é hashable p/ o cache)
+    if not isinstance(u, str):
+        return None
+    return _norm_unit(u)
+
+
+@lru_cache(maxsize=4096)
+def _norm_unit(u: str) -> str | None:
+    s = u.strip().lower()
+    if not s:
+        return None
+    # normalizações comuns
+    s = s.replace("/s", "ps")
+    # remove plural e espaços
+    s = s.replace(" ", "")
+    return UNIT_ALIASES.get(s, s)
+
+
+def conversion_factors(unit_from: str | None, unit_to: str | None) -> Tuple[float, float] | None:
+    """(multiplicador, divisor) para converter unit_from -> unit_to; None se incompatível."""
+    uf = norm_unit(unit_from)
+    ut = norm_unit(unit_to)
+    if uf is None or ut is None:
+        return None
+    return _conversion_factors(uf, ut)
+
+
+@lru_cache(maxsize=4096)
+def _conversion_factors(uf: str, ut: str) -> Tuple[float, float] | None:
+    if uf == ut:
+        return (1.0, 1.0)
+    a = UNIT_TABLE.get(uf)
+    b = UNIT_TABLE.get(ut)
+    if a is None or b is None or a[0] != b[0]:
+        return None
+    return (a[1], b[1])
+
+
+def convert_value(val: float, unit_from: str | None, unit_to: str | None) -> float | None:
+    f = conversion_factors(unit_from, unit_to)
+    if f is None:
+        return None
+    if f == (1.0, 1.0):
+        return float(val)
+    return float(val) * f[0] / f[1]
+
+
+# ----------------------------------------------------------------------
+# Regex da extração heurística de editais (compiladas uma vez)
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class HeuristicPatterns:
+    garantia: re.Pattern = re.compile(r"garantia[^\n]{0,80}?(?:no\s+minimo|minima|minimo|>=)?\s*(\d{1,3})\s*mes", re.I)
+    tensao_min: re.Pattern = re.compile(
+        r"(?:tensao|voltagem)[^\n]{0,40}?(?:no\s+minimo|minima|minimo|>=)?\s*(\d+(?:[\.,]\d+)?)\s*v\b", re.I
+    )
+    tensao: re.Pattern = re.compile(r"\b(\d+(?:[\.,]\d+)?)\s*v\b", re.I)
+    corrente: re.Pattern = re.compile(r"\b(\d+(?:[\.,]\d+)?)\s*a\b", re.I)
+    potencia: re.Pattern = re.compile(r"\b(\d+(?:[\.,]\d+)?)\s*w\b", re.I)
+    capacidade: re.Pattern = re.compile(r"\b(\d+(?:[\.,]\d+)?)\s*ah\b", re.I)
+    ram_min: re.Pattern = re.compile(r"\bno\s+minimo\s*(\d{1,4})\s*gb\b[^\n]{0,20}?(?:ram|memoria)", re.I)
+    ram: re.Pattern = re.compile(r"\b(\d{1,4})\s*gb\b[^\n]{0,20}?(?:ram|memoria)", re.I)
+    armazenamento_min: re.Pattern = re.compile(r"\bno\s+minimo\s*(\d{2,5})\s*(gb|tb)\b", re.I)
+    portas: re.Pattern = re.compile(r"\b(\d{1,3})\s*(?:portas|ports)\b", re.I)
+    interfaces_rede: re.Pattern = re.compile(r"interfaces\s+de\s+rede\s*(\d{1,3})\b", re.I)
+    velocidade: re.Pattern = re.compile(r"\b(\d+(?:[\.,]\d+)?)\s*gbps\b", re.I)
+    poe: re.Pattern = re.compile(r"\bpoe\b", re.I)
+
+
+HEURISTIC_PATTERNS = HeuristicPatterns()
+
+
+# ----------------------------------------------------------------------
+# Parsing do ambiente
+# ----------------------------------------------------------------------
+def _pct(x: float) -> float:
+    return x / 100.0 if x > 1.0 else max(0.0, x)
+
+
+def _split_keys(raw: str) -> Tuple[str, ...]:
+    """Lista separada por vírgula/; (ou espaços), sem duplicatas e mantendo a ordem."""
+    raw = raw.replace(";", ",")
+    parts = [p.strip() for p in raw.split(",") if p.strip()]
+    if not parts:
+        parts = [p.strip() for p in raw.split() if p.strip()]
+    return tuple(dict.fromkeys(parts))
+
+
+def parse_tolerance_overrides(raw: str) -> Mapping[str, float]:
+    """"tensao_v=0.02,capacidade_ah=10" -> {"tensao_v": 0.02, "capacidade_ah": 0.1}.
+
+    Como no parser antigo, vale a primeira ocorrência de cada chave; uma entrada
+    inválida faz a chave cair na tolerância global.
+    """
+    out: dict[str, float | None] = {}
+    for p in (raw or "").replace(";", ",").split(","):
+        if "=" not in p:
+            continue
+        k, v = p.split("=", 1)
+        k = k.strip()
+        if k in out:
+            continue
+        try:
+            out[k] = _pct(float(v.strip()))
+        except Exception:
+            out[k] = None
+    return MappingProxyType(out)
+
+
+ENV_KEYS = (
+    "MATCH_TOLERANCE_PCT",
+    "MATCH_TOLERANCE_OVERRIDES",
+    "IMPORTANT_REQUIREMENTS",
+    "KEY_REQUIREMENTS_POLICY",
+    "SEQUENCE_FILTER",
+)
+
+
+@dataclass(frozen=True)
+class MatchConfig:
+    """
+    Configuração do matching/score, lida do ambiente UMA vez.
+
+    - tolerance_pct / tolerance_overrides: MATCH_TOLERANCE_PCT / MATCH_TOLERANCE_OVERRIDES
+    - key_requirements / key_policy: IMPORTANT_REQUIREMENTS / KEY_REQUIREMENTS_POLICY
+    - sequence_filter: SEQUENCE_FILTER
+    - patterns: regex pré-compiladas da extração heurística
+    """
+
+    tolerance_pct: float = 0.0
+    tolerance_overrides: Mapping[str, float | None] = field(default_factory=lambda: MappingProxyType({}))
+    key_requirements: Tuple[str, ...] = ()
+    key_policy: str = "all"
+    sequence_filter: Tuple[str, ...] = ()
+    patterns: HeuristicPatterns = HEURISTIC_PATTERNS
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "MatchConfig":
+        env = os.environ if environ is None else environ
+
+        raw_pct = str(env.get("MATCH_TOLERANCE_PCT", "0") or "0").strip()
+        try:
+            tol = _pct(float(raw_pct))
+        except Exception:
+            tol = 0.0
+
+        policy = str(env.get("KEY_REQUIREMENTS_POLICY", "all") or "all").strip().lower()
+        if policy not in ("all", "any"):
+            policy = "all"
+
+        important = str(env.get("IMPORTANT_REQUIREMENTS", "") or "").strip()
+        sequence = str(env.get("SEQUENCE_FILTER", "") or "").strip()
+        return cls(
+            tolerance_pct=tol,
+            tolerance_overrides=parse_tolerance_overrides(str(env.get("MATCH_TOLERANCE_OVERRIDES", "") or "").strip()),
+            key_requirements=_split_keys(important) if important else (),
+            key_policy=policy,
+            sequence_filter=_split_keys(sequence) if sequence else (),
+        )
+
+    def tolerance_for(self, key: str, overrides: dict | None = None) -> float:
+        """Tolerância (0.0 a 1.0): override da chamada > MATCH_TOLERANCE_OVERRIDES > global."""
+        if overrides and key in overrides:
+            try:
+                return _pct(float(overrides[key]))
+            except Exception:
+                pass
+        x = self.tolerance_overrides.get(key)
+        if x is not None:
+            return x
+        return self.tolerance_pct
+
+
+_cache_lock = threading.Lock()
+_cache: dict[tuple, MatchConfig] = {}
+
+
+def get_match_config() -> MatchConfig:
+    """
+    MatchConfig do ambiente atual. Reaproveita a instância enquanto as variáveis
+    relevantes não mudarem (custo: 5 getenv + lookup em dict).
+    """
+    snapshot = tuple(os.environ.get(k) for k in ENV_KEYS)
+    cfg = _cache.get(snapshot)
+    if cfg is None:
+        with _cache_lock:
+            cfg = _cache.get(snapshot)
+            if cfg is None:
+                if len(_cache) > 32:
+                    _cache.clear()
+                cfg = MatchConfig.from_env()
+                _cache[snapshot] = cfg
+    return cfg
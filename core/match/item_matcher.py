@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import List, Dict, Any
-from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
 from core.llm.prompt import MATCH_ITEMS_PROMPT
 import json
 
@@ -10,7 +10,7 @@ class ItemMatcher:
     Retorna lista de veredictos por item.
     """
     def __init__(self, model: str | None = None):
-        self.llm = LLMClient(model=model)
+        self.llm = get_llm_client(model)
 
     def match(self, produto_json: Dict[str, Any], requisitos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         prompt = MATCH_ITEMS_PROMPT.format(
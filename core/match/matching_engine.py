@@ -1,5 +1,7 @@
 from typing import Dict, Any
 
+from core.match.config import MatchConfig, convert_value, get_match_config, norm_unit
+
 
 def _to_float(v) -> float | None:
     if v is None:
@@ -26,147 +28,22 @@ def _to_float(v) -> float | None:
 
 
 def _norm_unit(u: str | None) -> str | None:
-    if u is None:
-        return None
-    s = str(u).strip().lower()
-    if not s:
-        return None
-    # normalizações comuns
-    s = s.replace("/s", "ps")
-    s = s.replace("mbps", "mbps")
-    # remove plural e espaços
-    s = s.replace(" ", "")
-    # sinônimos
-    alias = {
-        "volts": "v",
-        "volt": "v",
-        "amp": "a",
-        "amps": "a",
-        "watt": "w",
-        "watts": "w",
-        "mes": "meses",
-        "mês": "meses",
-        "messes": "meses",
-        "gb": "gb",
-        "gbyte": "gb",
-        "gbytes": "gb",
-        "tb": "tb",
-        "mb": "mb",
-        "mah": "mah",
-        "ah": "ah",
-        "kg": "kg",
-        "g": "g",
-        "mm": "mm",
-        "cm": "cm",
-        "m": "m",
-        "gbps": "gbps",
-        "gbit": "gbps",
-        "gbit/s": "gbps",
-        "mbps": "mbps",
-        "mbit": "mbps",
-        "mbit/s": "mbps",
-    }
-    return alias.get(s, s)
+    # Tabela de aliases congelada e resultado memoizado em core.match.config
+    return norm_unit(u)
 
 
 def _convert_value(val: float, unit_from: str | None, unit_to: str | None) -> float | None:
     """Converte val de unit_from para unit_to quando suportado."""
-    uf = _norm_unit(unit_from)
-    ut = _norm_unit(unit_to)
-    if uf is None or ut is None:
-        return None
-    if uf == ut:
-        return float(val)
-
-    # energia/potência: W <-> kW
-    if (uf, ut) == ("kw", "w"):
-        return float(val) * 1000.0
-    if (uf, ut) == ("w", "kw"):
-        return float(val) / 1000.0
-
-    # tensão: V <-> kV
-    if (uf, ut) == ("kv", "v"):
-        return float(val) * 1000.0
-    if (uf, ut) == ("v", "kv"):
-        return float(val) / 1000.0
-
-    # corrente: A <-> mA
-    if (uf, ut) == ("ma", "a"):
-        return float(val) / 1000.0
-    if (uf, ut) == ("a", "ma"):
-        return float(val) * 1000.0
-
-    # capacidade: Ah <-> mAh
-    if (uf, ut) == ("mah", "ah"):
-        return float(val) / 1000.0
-    if (uf, ut) == ("ah", "mah"):
-        return float(val) * 1000.0
-
-    # armazenamento/memória: MB/GB/TB
-    storage = {"mb": 1.0, "gb": 1024.0, "tb": 1024.0 * 1024.0}
-    if uf in storage and ut in storage:
-        # converte para MB base
-        mb = float(val) * storage[uf]
-        return mb / storage[ut]
-
-    # velocidade: Mbps <-> Gbps
-    if (uf, ut) == ("gbps", "mbps"):
-        return float(val) * 1000.0
-    if (uf, ut) == ("mbps", "gbps"):
-        return float(val) / 1000.0
-
-    # peso: g <-> kg
-    if (uf, ut) == ("g", "kg"):
-        return float(val) / 1000.0
-    if (uf, ut) == ("kg", "g"):
-        return float(val) * 1000.0
-
-    # comprimento: mm <-> cm <-> m
-    length = {"mm": 1.0, "cm": 10.0, "m": 1000.0}
-    if uf in length and ut in length:
-        mm = float(val) * length[uf]
-        return mm / length[ut]
-
-    return None
+    return convert_value(val, unit_from, unit_to)
 
 
-def _get_tolerance_for_key(key: str, overrides: dict | None = None) -> float:
+def _get_tolerance_for_key(key: str, overrides: dict | None = None, config: MatchConfig | None = None) -> float:
     """Retorna tolerância percentual (0.0 a 1.0) para um requisito.
 
     - MATCH_TOLERANCE_PCT: ex. "5" (5%) ou "0.05" (5%)
     - MATCH_TOLERANCE_OVERRIDES: ex. "tensao_v=0.02,capacidade_ah=0.1"
     """
-    import os
-
-    if overrides and key in overrides:
-        try:
-            x = float(overrides[key])
-            return x / 100.0 if x > 1.0 else max(0.0, x)
-        except Exception:
-            pass
-
-    overrides = str(os.getenv("MATCH_TOLERANCE_OVERRIDES", "") or "").strip()
-    if overrides:
-        pairs = overrides.replace(";", ",").split(",")
-        for p in pairs:
-            if "=" not in p:
-                continue
-            k, v = p.split("=", 1)
-            if k.strip() == key:
-                try:
-                    x = float(v.strip())
-                    return x / 100.0 if x > 1.0 else max(0.0, x)
-                except Exception:
-                    break
-
-    raw = str(os.getenv("MATCH_TOLERANCE_PCT", "0") or "0").strip()
-    try:
-        x = float(raw)
-    except Exception:
-        return 0.0
-    if x > 1.0:
-        x = x / 100.0
-    return max(0.0, x)
+    return (config or get_match_config()).tolerance_for(key, overrides)
 
 
 class MatchingEngine:
@@ -174,13 +51,19 @@ class MatchingEngine:
     STATUS_NAO_ATENDE = "NAO_ATENDE"
     STATUS_DUVIDA = "DUVIDA"
 
+    def __init__(self, config: MatchConfig | None = None):
+        # None = lê o ambiente (uma vez por compare, não por requisito)
+        self.config = config
+
     def compare(
         self,
         produto: Dict[str, Any],
         edital: Dict[str, Any],
         tolerance_overrides: dict | None = None,
+        config: MatchConfig | None = None,
     ) -> Dict[str, str]:
 
+        cfg = config or self.config or get_match_config()
         resultados: Dict[str, str] = {}
 
         atributos_produto = produto.get("atributos", {})
@@ -222,14 +105,14 @@ class MatchingEngine:
                 continue
 
             # Unidade incompatível (tenta conversão quando possível)
-            if unidade_req and unidade_produto and _norm_unit(unidade_req) != _norm_unit(unidade_produto):
-                converted = _convert_value(v_prod, unidade_produto, unidade_req)
+            if unidade_req and unidade_produto and norm_unit(unidade_req) != norm_unit(unidade_produto):
+                converted = convert_value(v_prod, unidade_produto, unidade_req)
                 if converted is None:
                     resultados[requisito] = self.STATUS_DUVIDA
                     continue
                 v_prod = converted
 
-            tol = _get_tolerance_for_key(str(requisito), overrides=tolerance_overrides)
+            tol = cfg.tolerance_for(str(requisito), tolerance_overrides)
 
             # Mínimo (com tolerância)
             if vmin is not None:
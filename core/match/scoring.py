@@ -1,5 +1,7 @@
 from typing import Dict, Any
 
+from core.match.config import MatchConfig, get_match_config
+
 
 def _parse_key_requirements() -> tuple[list[str], str]:
     """Lê requisitos-chave do ambiente.
@@ -7,35 +9,8 @@ def _parse_key_requirements() -> tuple[list[str], str]:
     - IMPORTANT_REQUIREMENTS: lista separada por vírgula/; ou espaços (ex.: "tensao_v, capacidade_ah")
     - KEY_REQUIREMENTS_POLICY: "all" (default) ou "any"
     """
-    import os
-
-    raw = str(os.getenv("IMPORTANT_REQUIREMENTS", "") or "").strip()
-    policy = str(os.getenv("KEY_REQUIREMENTS_POLICY", "all") or "all").strip().lower()
-    if policy not in ("all", "any"):
-        policy = "all"
-
-    if not raw:
-        return [], policy
-
-    # aceita separadores comuns
-    raw = raw.replace(";", ",")
-    parts = []
-    for token in raw.split(","):
-        tok = token.strip()
-        if not tok:
-            continue
-        parts.append(tok)
-    if not parts:
-        # fallback para whitespace
-        parts = [p.strip() for p in raw.split() if p.strip()]
-    # normaliza duplicatas
-    seen = set()
-    keys: list[str] = []
-    for k in parts:
-        if k not in seen:
-            seen.add(k)
-            keys.append(k)
-    return keys, policy
+    cfg = get_match_config()
+    return list(cfg.key_requirements), cfg.key_policy
 
 
 def _parse_sequence_filter() -> list[str]:
@@ -46,26 +21,14 @@ def _parse_sequence_filter() -> list[str]:
 
     Sem essa env var, retorna lista vazia (desabilitado).
     """
-    import os
-
-    raw = str(os.getenv("SEQUENCE_FILTER", "") or "").strip()
-    if not raw:
-        return []
-    raw = raw.replace(";", ",")
-    parts = [p.strip() for p in raw.split(",") if p.strip()]
-    if not parts:
-        parts = [p.strip() for p in raw.split() if p.strip()]
-    # mantém ordem, remove duplicatas
-    seen = set()
-    ordered: list[str] = []
-    for k in parts:
-        if k not in seen:
-            seen.add(k)
-            ordered.append(k)
-    return ordered
-
-
-def compute_score(matching: Dict[str, str], edital_json: Dict[str, Any]) -> Dict[str, Any]:
+    return list(get_match_config().sequence_filter)
+
+
+def compute_score(
+    matching: Dict[str, str],
+    edital_json: Dict[str, Any],
+    config: MatchConfig | None = None,
+) -> Dict[str, Any]:
     """
     Score baseado apenas nos requisitos do edital.
     - obrigatórios: contam para o denominador
@@ -85,6 +48,7 @@ def compute_score(matching: Dict[str, str], edital_json: Dict[str, Any]) -> Dict
       "status_geral": "APROVADO" | "REPROVADO" | "DUVIDOSO"
     }
     """
+    cfg = config or get_match_config()
     reqs = edital_json.get("requisitos", {}) or {}
 
     obrig_total = obrig_atende = obrig_nao = obrig_duvida = 0
@@ -126,7 +90,7 @@ def compute_score(matching: Dict[str, str], edital_json: Dict[str, Any]) -> Dict
         status_geral_base = "APROVADO"
 
     # Override opcional por requisitos-chave (ex.: tensao_v)
-    key_reqs, policy = _parse_key_requirements()
+    key_reqs, policy = list(cfg.key_requirements), cfg.key_policy
     key_total = key_atende = key_nao = key_duvida = 0
     key_present: list[str] = []
     for k in key_reqs:
@@ -166,7 +130,7 @@ def compute_score(matching: Dict[str, str], edital_json: Dict[str, Any]) -> Dict
                     key_override_applied = True
 
     # Filtro por sequência (gating) opcional — tem precedência maior que key_requirements.
-    seq = _parse_sequence_filter()
+    seq = list(cfg.sequence_filter)
     seq_present: list[str] = []
     seq_steps: list[dict] = []
     seq_final = None
@@ -1,6 +1,127 @@
-import pdfplumber
+import gc
+import logging
+import multiprocessing
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from core.ocr.page_cache import PageTextCache, file_sha256
+from core.utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+NATIVE_METHOD = "native"
+OCR_METHOD = "doctr"
+
+
+def _extract_pages_from_pdf(pdf, page_indices) -> dict[int, str]:
+    out: dict[int, str] = {}
+    for i in page_indices:
+        out[i] = pdf.pages[i].extract_text() or ""
+    return out
+
+
+def _extract_native_range(pdf_path: str, page_indices: list[int]) -> dict[int, str]:
+    """Worker de processo: abre o PDF e extrai só as páginas pedidas."""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return _extract_pages_from_pdf(pdf, page_indices)
+
+
+def _split_ranges(items: list[int], parts: int) -> list[list[int]]:
+    """Divide em blocos contíguos (vizinhas compartilham recursos/fontes no PDF)."""
+    parts = max(1, min(parts, len(items)))
+    size, rest = divmod(len(items), parts)
+    out, start = [], 0
+    for k in range(parts):
+        end = start + size + (1 if k < rest else 0)
+        out.append(items[start:end])
+        start = end
+    return out
+
+
+def _mp_context():
+    """
+    Contexto dos processos da extração nativa (PDF_NATIVE_MP_START, default: spawn).
+
+    Nunca fork por padrão: o extrator roda dentro da API e de pools de threads, e um
+    fork com locks segurados por outras threads (logging, sqlite, ONNX) pode travar o filho.
+    """
+    method = os.getenv("PDF_NATIVE_MP_START", "spawn").strip().lower() or "spawn"
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _extract_pages_parallel(pdf_path: str, page_indices: list[int], workers: int) -> dict[int, str]:
+    out: dict[int, str] = {}
+    try:
+        ranges = _split_ranges(page_indices, workers)
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=_mp_context()) as pool:
+            for part in pool.map(_extract_native_range, [pdf_path] * len(ranges), ranges):
+                out.update(part)
+    except Exception as e:
+        # Ambientes sem spawn (ou worker morto): cai para extração serial
+        logger.warning("PDFExtractor: pool de processos falhou (%s); extraindo em série", e, exc_info=True)
+        out = _extract_native_range(pdf_path, page_indices)
+    return out
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def _rss_mb() -> float | None:
+    """RSS atual do processo (Linux: /proc/self/statm); None se indisponível."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident = int(f.read().split()[1])
+        return resident * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _adaptive_dpi(width_pt: float, height_pt: float, native_text: str = "", max_dpi: float | None = None) -> float:
+    """
+    DPI de rasterização para OCR de uma página.
+
+    - Base OCR_DPI (default 144, igual ao DocumentFile.from_pdf do doctr).
+    - Páginas com texto pequeno/denso (muitos caracteres por área no texto nativo,
+      mesmo que ruim) sobem para OCR_DENSE_DPI.
+    - Limita pelo orçamento de pixels OCR_MAX_PAGE_MPX, então páginas grandes
+      (A3, plantas) não explodem a memória.
+    """
+    dpi = _env_float("OCR_DPI", 144.0)
+    area_in2 = max(1e-6, (width_pt / 72.0) * (height_pt / 72.0))
+    density = len(native_text or "") / area_in2
+    if density >= _env_float("OCR_DENSE_CHARS_PER_IN2", 40.0):
+        dpi = max(dpi, _env_float("OCR_DENSE_DPI", 200.0))
+
+    max_mpx = _env_float("OCR_MAX_PAGE_MPX", 6.0)
+    if max_mpx > 0:
+        budget_dpi = ((max_mpx * 1_000_000) / area_in2) ** 0.5
+        dpi = min(dpi, budget_dpi)
+    if max_dpi is not None:
+        dpi = min(dpi, max_dpi)
+    return max(_env_float("OCR_MIN_DPI", 96.0), min(dpi, _env_float("OCR_MAX_DPI", 300.0)))
+
+
+def _render_rgb(page, dpi: float):
+    """
+    Rasteriza a página como RGB (H, W, 3), como o `read_pdf` do doctr: o pdfium
+    devolve BGR(A) por padrão, então pede a ordem invertida e descarta o alfa.
+    """
+    img = page.render(scale=dpi / 72.0, rev_byteorder=True).to_numpy()
+    if img.ndim == 3 and img.shape[2] == 4:
+        img = img[:, :, :3]
+    return img
+
 
 class PDFExtractor:
     """
@@ -14,6 +135,8 @@ class PDFExtractor:
         self.ocr_model = None
         # Meta do último extract() para debug (método usado, erros etc.)
         self.last_meta: dict = {}
+        # Cache de texto por página (sha256 do arquivo, página); PDF_PAGE_CACHE=0 desliga
+        self.page_cache = PageTextCache.from_env()
 
     @staticmethod
     def _text_quality(text: str) -> dict:
@@ -45,42 +168,294 @@ class PDFExtractor:
             min_ratio = 0.12
         return q["chars"] >= min_chars and q["words"] >= min_words and q["alnum_ratio"] >= min_ratio
 
+    @staticmethod
+    def _native_workers(n_pages: int) -> int:
+        """
+        Nº de processos para extração nativa.
+        PDF_NATIVE_WORKERS=0 (default) escolhe automaticamente; abaixo de
+        PDF_NATIVE_PARALLEL_MIN_PAGES páginas roda em série (spawn não compensa).
+        """
+        try:
+            min_pages = int(os.getenv("PDF_NATIVE_PARALLEL_MIN_PAGES", "40"))
+        except Exception:
+            min_pages = 40
+        if n_pages < max(2, min_pages):
+            return 1
+        try:
+            workers = int(os.getenv("PDF_NATIVE_WORKERS", "0"))
+        except Exception:
+            workers = 0
+        if workers <= 0:
+            try:
+                cpus = len(os.sched_getaffinity(0))
+            except Exception:
+                cpus = os.cpu_count() or 1
+            workers = min(4, cpus)
+        return max(1, min(workers, n_pages))
+
+    def _file_sha256(self, pdf_path: str) -> str:
+        st = os.stat(pdf_path)
+        key = (os.path.abspath(pdf_path), st.st_mtime_ns, st.st_size)
+        memo = getattr(self, "_sha_memo", None)
+        if memo is None or memo[0] != key:
+            memo = (key, file_sha256(pdf_path))
+            self._sha_memo = memo
+        return memo[1]
+
+    def extract_pages_native(self, pdf_path: str) -> list[str]:
+        """
+        Extrai o texto nativo página a página (índice 0-based; "" para página sem texto).
+
+        - Páginas já vistas (mesmo sha256 do arquivo) vêm do cache por página.
+        - As faltantes são extraídas em série ou num pool de processos
+          (pdfplumber é CPU-bound e preso ao GIL).
+        """
+        cache = self.page_cache
+        sha = None
+        if cache is not None:
+            try:
+                sha = self._file_sha256(pdf_path)
+            except Exception:
+                sha = None
+
+        # Import tardio: quem só importa o módulo (API, CLI) não paga o pdfminer
+        import pdfplumber
+
+        fresh: dict[int, str] = {}
+        with pdfplumber.open(pdf_path) as pdf:
+            n_pages = len(pdf.pages)
+            pages = cache.get_many(sha, range(n_pages), NATIVE_METHOD) if sha else {}
+            missing = [i for i in range(n_pages) if i not in pages]
+            workers = self._native_workers(len(missing))
+            if missing and workers <= 1:
+                # Reaproveita o documento já aberto
+                fresh = _extract_pages_from_pdf(pdf, missing)
+
+        if missing and workers > 1:
+            fresh = _extract_pages_parallel(pdf_path, missing, workers)
+
+        pages.update(fresh)
+        if sha and fresh:
+            cache.put_many(sha, fresh, NATIVE_METHOD)
+
+        self.last_meta["pages_total"] = n_pages
+        self.last_meta["pages_cached"] = n_pages - len(fresh)
+        self.last_meta["native_workers"] = workers if missing else 0
+        return [pages.get(i, "") for i in range(n_pages)]
+
     def extract_text_native(self, pdf_path: str) -> str | None:
         """
         Extrai texto de PDF que possuem texto embutido
         Retorna None se der erro ou nao tiver texto util
         """
-        try: 
-            with pdfplumber.open(pdf_path) as pdf:
-                texto = ""
-                for pagina in pdf.pages:
-                    page_txt = pagina.extract_text()
-                    if page_txt:
-                        texto += page_txt + "\n"
+        try:
+            pages = self.extract_pages_native(pdf_path)
+            texto = "".join(f"{t}\n" for t in pages if t)
             return texto if texto.strip() else None
         except Exception as e:
             print(f"Erro ao extrair texto nativo: {e}")
             return None
-        
+
     def extract_text_ocr(self, pdf_path: str) -> str:
         """
         Extrai o texto de pdf escaneados usando ocr
         Retorna o texto extraido
         """
-        try:
-            from doctr.io import DocumentFile
-            from doctr.models import ocr_predictor
-        except ImportError:
-            raise RuntimeError(
-                "OCR não disponível: instale 'python-doctr' e dependências (torch/torchvision)."
-            )
+        self._ensure_ocr_model()
+        # OCR_STREAMING=0 volta ao modo antigo (todas as páginas rasterizadas de uma vez)
+        if str(os.getenv("OCR_STREAMING", "1")).lower() in ("1", "true", "yes"):
+            return "\n\n".join(txt for _, txt in self.iter_ocr_pages(pdf_path))
 
-        if self.ocr_model is None:
-            self.ocr_model = ocr_predictor(pretrained=True)
+        from doctr.io import DocumentFile
 
         doc = DocumentFile.from_pdf(pdf_path)
         result = self.ocr_model(doc)
         return result.render()
+
+    def iter_ocr_pages(
+        self,
+        pdf_path: str,
+        page_indices: list[int] | None = None,
+        *,
+        native_pages: list[str] | None = None,
+    ) -> Iterator[tuple[int, str]]:
+        """
+        OCR em streaming: rasteriza e reconhece OCR_BATCH_PAGES páginas por vez
+        e devolve (página, texto) à medida que cada lote termina.
+
+        Só um lote de imagens fica em memória. Se o RSS passar de OCR_MAX_RSS_MB,
+        o lote cai pela metade e o teto de DPI é reduzido até voltar ao limite.
+        """
+        model = self._ensure_ocr_model()
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            raise RuntimeError("OCR por página requer 'pypdfium2' (dependência do python-doctr).")
+
+        try:
+            batch_size = max(1, int(os.getenv("OCR_BATCH_PAGES", "4")))
+        except Exception:
+            batch_size = 4
+        max_rss = _env_float("OCR_MAX_RSS_MB", 0.0)
+        dpi_cap: float | None = None
+        stats = {"batches": 0, "peak_rss_mb": None, "throttled": 0, "dpi": []}
+        self.last_meta["ocr_stream"] = stats
+
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            todo = list(range(len(pdf))) if page_indices is None else [int(i) for i in page_indices]
+            pos = 0
+            while pos < len(todo):
+                batch = todo[pos:pos + batch_size]
+                images = []
+                for i in batch:
+                    page = pdf[i]
+                    try:
+                        w, h = page.get_size()
+                        hint = native_pages[i] if native_pages and i < len(native_pages) else ""
+                        dpi = _adaptive_dpi(w, h, hint, dpi_cap)
+                        stats["dpi"].append(round(dpi))
+                        images.append(_render_rgb(page, dpi))
+                    finally:
+                        page.close()
+
+                result = model(images)
+                texts = [p.render() for p in result.pages]
+                del images, result
+                gc.collect()
+                stats["batches"] += 1
+                pos += len(batch)
+
+                rss = _rss_mb()
+                if rss is not None:
+                    stats["peak_rss_mb"] = max(stats["peak_rss_mb"] or 0.0, round(rss, 1))
+                    if max_rss > 0 and rss > max_rss:
+                        stats["throttled"] += 1
+                        batch_size = max(1, batch_size // 2)
+                        dpi_cap = max(_env_float("OCR_MIN_DPI", 96.0), (dpi_cap or max(stats["dpi"])) * 0.8)
+                        print(
+                            f"PDFExtractor: RSS {rss:.0f}MB > OCR_MAX_RSS_MB={max_rss:.0f}; "
+                            f"lote={batch_size}, dpi<= {dpi_cap:.0f}"
+                        )
+
+                for i, txt in zip(batch, texts):
+                    yield i, txt
+        finally:
+            pdf.close()
+
+    def _ensure_ocr_model(self):
+        if self.ocr_model is not None:
+            return self.ocr_model
+        # Pesos do doctr carregados uma vez por processo e compartilhados entre extratores
+        from core.utils.models import get_ocr_predictor
+
+        self.ocr_model = get_ocr_predictor()
+        return self.ocr_model
+
+    @staticmethod
+    def _page_min_chars() -> int:
+        try:
+            return int(os.getenv("OCR_PAGE_MIN_CHARS", "50"))
+        except Exception:
+            return 50
+
+    def _page_needs_ocr(self, text: str, has_images: bool = True) -> bool:
+        """
+        Critério por página (mais brando que o do documento inteiro):
+        página com texto "lixo" (baixa proporção alfanumérica) é tratada como
+        escaneada; página quase vazia só quando tem imagem (página em branco,
+        separadora ou de assinatura de um PDF digital continua nativa).
+        """
+        q = self._text_quality(text)
+        try:
+            min_ratio = float(os.getenv("OCR_PAGE_MIN_ALNUM_RATIO", "0.12"))
+        except Exception:
+            min_ratio = 0.12
+        if q["chars"] < self._page_min_chars():
+            return has_images
+        return q["alnum_ratio"] < min_ratio
+
+    def _pages_with_images(self, pdf_path: str, page_indices: list[int]) -> set[int]:
+        """
+        Páginas (entre as pedidas) com objeto de imagem, contado pelo pdfium sem rasterizar.
+        Sem pypdfium2 ou com erro de leitura, considera todas com imagem (vão para o OCR).
+        """
+        if not page_indices:
+            return set()
+        try:
+            import pypdfium2 as pdfium
+
+            pdf = pdfium.PdfDocument(pdf_path)
+        except Exception:
+            return set(page_indices)
+        out: set[int] = set()
+        try:
+            for i in page_indices:
+                page = pdf[i]
+                try:
+                    if next(page.get_objects(filter=(pdfium.raw.FPDF_PAGEOBJ_IMAGE,)), None) is not None:
+                        out.add(i)
+                finally:
+                    page.close()
+        except Exception:
+            return set(page_indices)
+        finally:
+            pdf.close()
+        return out
+
+    def _pages_needing_ocr(self, pages: list[str], pdf_path: str | None = None) -> list[int]:
+        min_chars = self._page_min_chars()
+        short = [i for i, t in enumerate(pages) if self._text_quality(t)["chars"] < min_chars]
+        # Só abre o PDF de novo se houver página curta para checar
+        with_images = self._pages_with_images(pdf_path, short) if pdf_path and short else set(short)
+        return [i for i, t in enumerate(pages) if self._page_needs_ocr(t, i in with_images)]
+
+    def extract_pages_ocr(
+        self,
+        pdf_path: str,
+        page_indices: list[int],
+        *,
+        native_pages: list[str] | None = None,
+    ) -> dict[int, str]:
+        """
+        Roda o doctr só nas páginas pedidas (índice 0-based) e devolve {página: texto}.
+        Usa o mesmo cache por página da extração nativa (método "doctr").
+        """
+        page_indices = sorted(set(int(i) for i in page_indices))
+        if not page_indices:
+            return {}
+
+        cache = self.page_cache
+        sha = None
+        if cache is not None:
+            try:
+                sha = self._file_sha256(pdf_path)
+            except Exception:
+                sha = None
+        out = cache.get_many(sha, page_indices, OCR_METHOD) if sha else {}
+        missing = [i for i in page_indices if i not in out]
+        if not missing:
+            return out
+
+        for i, txt in self.iter_ocr_pages(pdf_path, missing, native_pages=native_pages):
+            out[i] = txt
+            # Grava a cada página: um OOM no meio não perde o que já foi reconhecido
+            if sha:
+                cache.put(sha, i, OCR_METHOD, txt)
+        return out
+
+    def _merge_pages(self, native_pages: list[str], ocr_pages: dict[int, str]) -> str:
+        """Junta em ordem de página, preferindo o OCR só quando ele trouxe mais conteúdo."""
+        merged = []
+        for i, native in enumerate(native_pages):
+            txt = native
+            ocr = ocr_pages.get(i)
+            if ocr is not None:
+                if sum(c.isalnum() for c in ocr) > sum(c.isalnum() for c in (native or "")):
+                    txt = ocr
+            if txt:
+                merged.append(f"{txt}\n")
+        return "".join(merged)
     
     def extract_text_gemini(self, pdf_path: str, *, log_label: str | None = None) -> str:
         """
@@ -199,6 +574,17 @@ class PDFExtractor:
         e depois o OCR se necessario
         Retorna o texto extraido
         """
+        with span("pdf.extract", doc=log_label) as s:
+            try:
+                s.set(bytes_in=os.path.getsize(pdf_path))
+            except OSError:
+                pass
+            text = self._extract(pdf_path, log_label=log_label)
+            meta = self.last_meta or {}
+            s.set(chars_out=len(text or ""), method=meta.get("method"), pages_ocr=meta.get("pages_ocr"))
+            return text
+
+    def _extract(self, pdf_path: str, *, log_label: str | None = None) -> str:
         label = (log_label or "doc").strip() or "doc"
         self.last_meta = {
             "pdf_path": pdf_path,
@@ -230,27 +616,50 @@ class PDFExtractor:
                 except Exception:
                     pass
 
-        texto = self.extract_text_native(pdf_path)
+        try:
+            pages = self.extract_pages_native(pdf_path)
+        except Exception as e:
+            print(f"Erro ao extrair texto nativo: {e}")
+            pages = []
+        texto = "".join(f"{t}\n" for t in pages if t)
+        texto = texto if texto.strip() else None
+
+        # OCR_ROUTING=page (default): decide nativo vs OCR página a página;
+        # OCR_ROUTING=document: comportamento antigo (documento inteiro).
+        routing = str(os.getenv("OCR_ROUTING", "page")).lower()
+        ocr_pages = self._pages_needing_ocr(pages, pdf_path) if routing == "page" else []
+        if routing == "page":
+            self.last_meta["pages_ocr"] = len(ocr_pages)
+
+        native_usable = False
         if texto is not None:
             self.last_meta["native_text"] = True
             self.last_meta["native_quality"] = self._text_quality(texto)
             # Alguns PDFs escaneados retornam "texto" lixo via extractor nativo.
             # Se for baixa qualidade, tenta OCR para melhorar.
-            if self._is_usable_text(texto):
+            native_usable = self._is_usable_text(texto)
+            if native_usable and not ocr_pages:
                 self.last_meta["method"] = "native"
                 return texto
-            try:
-                self.last_meta["errors"].append("native_low_quality")
-            except Exception:
-                pass
+            if not native_usable:
+                try:
+                    self.last_meta["errors"].append("native_low_quality")
+                except Exception:
+                    pass
         # Sem texto nativo, tenta OCR se disponível
         # 1) tenta OCR local (python-doctr). Se não estiver instalado e houver credenciais Gemini/Google,
         #    tenta usar o OCR via Gemini como fallback automático.
         try:
-            txt = self.extract_text_ocr(pdf_path)
+            if ocr_pages:
+                # Só as páginas reprovadas vão para o doctr; o resto fica com o texto nativo
+                ocr_method = "hybrid" if len(ocr_pages) < len(pages) else "doctr"
+                txt = self._merge_pages(pages, self.extract_pages_ocr(pdf_path, ocr_pages, native_pages=pages))
+            else:
+                ocr_method = "doctr"
+                txt = self.extract_text_ocr(pdf_path)
             self.last_meta["ocr_quality"] = self._text_quality(txt)
             if self._is_usable_text(txt):
-                self.last_meta["method"] = "doctr"
+                self.last_meta["method"] = ocr_method
                 return txt
             # Se OCR local for baixa qualidade e houver chave Gemini, tenta Gemini.
             try:
@@ -281,6 +690,10 @@ class PDFExtractor:
                 self.last_meta["errors"].append(f"doctr_failed: {msg}")
             except Exception:
                 pass
+            # Texto nativo já era bom; só faltavam páginas escaneadas pontuais
+            if native_usable:
+                self.last_meta["method"] = "native"
+                return texto
             # Se houver chave Gemini/Google, tenta usar o método Gemini
             api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
             if api_key:
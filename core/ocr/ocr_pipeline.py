@@ -1,15 +1,21 @@
-import pdfplumber
-import cv2
-import numpy as np
-from PIL import Image
+_PYTESSERACT = False  # False = ainda não tentou importar; None = indisponível
 
-try:
-    import pytesseract  # type: ignore
-except Exception:
-    pytesseract = None
+
+def _pytesseract():
+    """pytesseract (opcional), importado na primeira página que precisar."""
+    global _PYTESSERACT
+    if _PYTESSERACT is False:
+        try:
+            import pytesseract  # type: ignore
+        except Exception:
+            pytesseract = None
+        _PYTESSERACT = pytesseract
+    return _PYTESSERACT
 
 
 def ocr_pdf(path: str) -> str:
+    import pdfplumber
+
     text = ""
 
     with pdfplumber.open(path) as pdf:
@@ -19,7 +25,12 @@ def ocr_pdf(path: str) -> str:
 
             # OCR de imagem (opcional). Se pytesseract não estiver disponível,
             # seguimos apenas com o texto extraído nativamente do PDF.
+            pytesseract = _pytesseract()
             if pytesseract is not None:
+                # cv2/numpy só quando há OCR de imagem (import do cv2 custa centenas de ms)
+                import cv2
+                import numpy as np
+
                 img = page.to_image(resolution=300).original
                 gray = cv2.cvtColor(np.array(img), cv2.COLOR_BGR2GRAY)
                 ocr_img = pytesseract.image_to_string(gray, lang="eng")
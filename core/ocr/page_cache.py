@@ -0,0 +1,66 @@
+import hashlib
+import os
+from pathlib import Path
+
+
+DEFAULT_PAGE_CACHE_DIR = Path("data/processed/pages")
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class PageTextCache:
+    """
+    Cache de texto por página, chaveado por (sha256 do arquivo, página, método).
+
+    Layout: <dir>/<sha[:2]>/<sha>/<método>/<página:05d>.txt
+    Um arquivo por página permite gravar páginas de forma independente
+    (workers paralelos, re-OCR parcial) sem reescrever o documento inteiro.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None):
+        self.dir = Path(cache_dir) if cache_dir else Path(os.getenv("PDF_PAGE_CACHE_DIR") or DEFAULT_PAGE_CACHE_DIR)
+
+    @classmethod
+    def from_env(cls) -> "PageTextCache | None":
+        if str(os.getenv("PDF_PAGE_CACHE", "1")).lower() not in ("1", "true", "yes"):
+            return None
+        return cls()
+
+    def _page_path(self, sha256: str, page: int, method: str) -> Path:
+        return self.dir / sha256[:2] / sha256 / method / f"{int(page):05d}.txt"
+
+    def get_many(self, sha256: str, pages, method: str) -> dict[int, str]:
+        out: dict[int, str] = {}
+        for p in pages:
+            fp = self._page_path(sha256, p, method)
+            try:
+                out[int(p)] = fp.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            except Exception:
+                continue
+        return out
+
+    def put(self, sha256: str, page: int, method: str, text: str) -> None:
+        fp = self._page_path(sha256, page, method)
+        try:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            tmp = fp.with_suffix(f".tmp{os.getpid()}")
+            tmp.write_text(text or "", encoding="utf-8")
+            tmp.replace(fp)
+        except Exception:
+            # Cache é best-effort: nunca derruba a extração
+            pass
+
+    def put_many(self, sha256: str, pages: dict[int, str], method: str) -> None:
+        for p, txt in pages.items():
+            self.put(sha256, p, method, txt)
@@ -11,7 +11,10 @@ import json
 # Esses imports assumem que você já tem isso no projeto
 from db.repositories.produto_repo import get_or_create
 from core.llm.client import LLMClient
-import pickle
+from core.utils.models import get_llm_client
+from core.vectorstore.chunk_store import ChunkStore, edital_chunks_exist, edital_store_path, open_edital_chunks
+import re
+from bisect import bisect_right
 from pathlib import Path
 from typing import Any, Dict
 
@@ -134,23 +137,43 @@ Comparação:
 
 
 # -- Compatibility wrapper functions expected by API/service layer
-def _chunk_text(text: str, max_chars: int = 1200) -> list:
-    parts = []
-    cur = []
+_SECTION_RE = re.compile(
+    r"^(?:\d+(?:\.\d+)*\.?\s+[A-ZÀ-Ú]|(?:CAP[IÍ]TULO|ANEXO|SE[ÇC][AÃ]O|CL[AÁ]USULA|T[IÍ]TULO)\b)"
+)
+
+
+def _chunk_text_with_meta(text: str, max_chars: int = 1200) -> List[Dict[str, Any]]:
+    """Mesmos chunks de _chunk_text, com span de caracteres no texto e a última seção vista."""
+    parts: List[Dict[str, Any]] = []
+    cur: List[str] = []
     cur_len = 0
-    for para in [p.strip() for p in text.split("\n") if p.strip()]:
+    cur_start = cur_end = 0
+    cur_section = section = None
+    for m in re.finditer(r"[^\n]+", text):
+        para = m.group(0).strip()
+        if not para:
+            continue
+        if len(para) <= 120 and _SECTION_RE.match(para):
+            section = para
         if cur_len + len(para) + 1 > max_chars and cur:
-            parts.append("\n".join(cur))
-            cur = [para]
-            cur_len = len(para)
-        else:
-            cur.append(para)
-            cur_len += len(para) + 1
+            parts.append({"text": "\n".join(cur), "start": cur_start, "end": cur_end, "section": cur_section})
+            cur = []
+            cur_len = -1
+        if not cur:
+            cur_start = m.start() + (len(m.group(0)) - len(m.group(0).lstrip()))
+            cur_section = section
+        cur.append(para)
+        cur_len += len(para) + 1
+        cur_end = m.end() - (len(m.group(0)) - len(m.group(0).rstrip()))
     if cur:
-        parts.append("\n".join(cur))
+        parts.append({"text": "\n".join(cur), "start": cur_start, "end": cur_end, "section": cur_section})
     return parts
 
 
+def _chunk_text(text: str, max_chars: int = 1200) -> list:
+    return [c["text"] for c in _chunk_text_with_meta(text, max_chars)]
+
+
 def process_edital(pdf_path: str, edital_id: int) -> Dict[str, Any]:
     """Processa o PDF do edital: extrai texto (native/OCR/Gemini), gera chunks e salva índice.
 
@@ -161,10 +184,18 @@ def process_edital(pdf_path: str, edital_id: int) -> Dict[str, Any]:
     # Extrai texto (tentativa explícita para capturar qual método foi usado)
     extraction_log: List[str] = []
     texto = None
+    page_starts: List[int] = []
     try:
-        texto_native = extractor.extract_text_native(str(pdf_path))
-        if texto_native:
+        pages = extractor.extract_pages_native(str(pdf_path))
+        texto_native = "".join(f"{t}\n" for t in pages if t)
+        if texto_native.strip():
             texto = texto_native
+            # início de cada página no texto (para anotar a página de cada chunk)
+            pos = 0
+            for t in pages:
+                page_starts.append(pos)
+                if t:
+                    pos += len(t) + 1
             extraction_log.append("native_text")
         else:
             extraction_log.append("native_no_text")
@@ -188,20 +219,25 @@ def process_edital(pdf_path: str, edital_id: int) -> Dict[str, Any]:
                 texto = ""
     if not texto:
         print(f"[edital] Nenhum texto extraído do PDF {pdf_path}. Criando índice vazio.")
-        chunks = []
+        parts = []
     else:
-        chunks = _chunk_text(texto)
+        parts = _chunk_text_with_meta(texto)
+    chunks = [p["text"] for p in parts]
 
-    idx_path = VECTOR_DIR / f"edital_{edital_id}_index.pkl"
     try:
-        with open(idx_path, "wb") as f:
-            pickle.dump(chunks, f)
+        ChunkStore.write(
+            edital_store_path(VECTOR_DIR, edital_id),
+            chunks,
+            pages=[(bisect_right(page_starts, p["start"]) - 1) if page_starts else None for p in parts],
+            spans=[(p["start"], p["end"]) for p in parts],
+            sections=[p["section"] for p in parts],
+        )
     except Exception as e:
         print(f"[edital] Falha ao gravar índice: {e}")
 
     # opcional: também grava requisitos extraídos em JSON usando LLM
     try:
-        llm = LLMClient()
+        llm = get_llm_client()
         # prepara prompt com os primeiros N chunks
         preview = "\n\n".join(chunks[:5]) if chunks else ""
         if preview:
@@ -227,20 +263,14 @@ def extract_requisitos_edital(edital_id: int, model: str | None = None, max_chun
 
     Retorna um dicionário com chave 'items' contendo a lista de requisitos extraídos.
     """
-    idx_path = VECTOR_DIR / f"edital_{edital_id}_index.pkl"
-    if not idx_path.exists():
-        raise FileNotFoundError("Índice do edital não encontrado")
-    try:
-        with open(idx_path, "rb") as f:
-            chunks = pickle.load(f)
-    except Exception:
-        chunks = []
+    # ChunkStore abre em O(1); só os max_chunks primeiros são decodificados
+    chunks = open_edital_chunks(VECTOR_DIR, edital_id)
 
-    preview = "\n\n".join(chunks[:max_chunks]) if chunks else ""
+    preview = "\n\n".join(chunks[:max_chunks]) if len(chunks) else ""
     if not preview:
         return {"items": []}
 
-    llm = LLMClient(model=model)
+    llm = get_llm_client(model)
     prompt = REQUIREMENTS_PROMPT.format(edital=preview)
     raw = llm.generate(prompt)
     try:
@@ -270,7 +300,7 @@ def match_produto_edital(produto_json: Dict[str, Any], edital_id: int, consulta_
     produto_str = json.dumps(produto_json, ensure_ascii=False)
     requisitos_str = json.dumps(requisitos, ensure_ascii=False)
 
-    llm = LLMClient(model=model)
+    llm = get_llm_client(model)
     prompt = MATCH_ITEMS_PROMPT.format(produto=produto_str, requisitos=requisitos_str)
     raw = llm.generate(prompt)
     try:
@@ -289,7 +319,6 @@ def match_produto_edital(produto_json: Dict[str, Any], edital_id: int, consulta_
 
 def match_produto_com_requisitos(produto_json: Dict[str, Any], edital_id: int, model: str | None = None) -> list[Dict[str, Any]]:
     """Compat wrapper que retorna itens/requisitos com pontuação simples."""
-    idx_path = VECTOR_DIR / f"edital_{edital_id}_index.pkl"
-    if not idx_path.exists():
+    if not edital_chunks_exist(VECTOR_DIR, edital_id):
         raise FileNotFoundError("Índice do edital não encontrado")
     return [{"item": "fallback", "score": 0.5}]
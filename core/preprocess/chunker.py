@@ -1,52 +1,197 @@
+import os
 import re
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+# Tokens aproximados do modelo: cada palavra conta 1 (+1 a cada 8 caracteres, já que
+# palavras longas viram vários subtokens) e cada pontuação conta 1.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_LONG_WORD_CHARS = 8
+
+# Início de seção: força quebra de chunk e vira o `section` dos chunks seguintes
+_SECTION_RE = re.compile(
+    r"^(?:ANEXO\b|TERMO\s+DE\s+REFER[ÊE]NCIA\b|CAP[IÍ]TULO\b|SE[ÇC][ÃA]O\b|CL[ÁA]USULA\b|T[IÍ]TULO\b)",
+    re.IGNORECASE,
+)
+_NUMBERED_HEADING_RE = re.compile(r"^\d+(?:\.\d+)*\.?\s+(?=[^a-zà-ú]*[A-ZÀ-Ú]{3})[^a-zà-ú]{4,}$")
+# Início de item (1., 1.2.3, 1), a), IV -, marcadores): as linhas seguintes sem marcador são continuação
+_ITEM_RE = re.compile(r"^(?:\d+(?:\.\d+)*[.)\-–]?\s|[a-zA-Z][.)]\s|[IVXLC]+\s*[.)\-–]\s|[-•*–]\s)")
+# Linha de tabela: separador explícito ou 3+ colunas alinhadas por espaços
+_TABLE_SEP_RE = re.compile(r"[|\t]")
+_COLUMN_GAP_RE = re.compile(r"\S {2,}(?=\S)")
+# Fim de sentença só com espaço depois (não quebra "12.000" nem "1.2")
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.;!?]+(?=\s)|\Z)", re.S)
+_WORD_RE = re.compile(r"\S+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata (linear) de tokens do modelo de embedding para `text`."""
+    n = 0
+    for m in _TOKEN_RE.finditer(text or ""):
+        n += 1 + (m.end() - m.start() - 1) // _LONG_WORD_CHARS
+    return n
 
-def chunk_text(text: str, max_tokens: int = 400) -> list[str]:
-    if max_tokens <= 0:
-        max_tokens = 400
 
-    sentences = re.split(r'[\n\.]+', text or "")
-    chunks: list[str] = []
-    buffer = ""
-
-    def _flush_buffer() -> None:
-        nonlocal buffer
-        if buffer:
-            chunks.append(buffer)
-            buffer = ""
-
-    def _split_by_words(s: str) -> list[str]:
-        words = s.split()
-        if not words:
-            return []
-        if len(words) <= max_tokens:
-            return [" ".join(words)]
-
-        out: list[str] = []
-        for i in range(0, len(words), max_tokens):
-            out.append(" ".join(words[i : i + max_tokens]))
-        return out
-
-    for s in sentences:
-        s = s.strip()
-        if not s:
+def _default_overlap() -> int:
+    try:
+        return max(0, int(os.getenv("CHUNK_OVERLAP_TOKENS", "0")))
+    except Exception:
+        return 0
+
+
+def _is_heading(line: str) -> bool:
+    if len(line) > 120:
+        return False
+    return bool(_SECTION_RE.match(line) or _NUMBERED_HEADING_RE.match(line))
+
+
+def _units(text: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Blocos estruturais (tipo, início, fim) em uma passada pelas linhas.
+
+    - "heading": título de seção (ANEXO, TERMO DE REFERÊNCIA, "3. ESPECIFICAÇÕES")
+    - "item": item numerado/marcado + linhas de continuação
+    - "table": linhas tabulares consecutivas
+    - "para": parágrafo (até linha em branco ou novo bloco)
+    """
+    kind = None
+    start = end = 0
+    prev_end = 0
+    for m in re.finditer(r"[^\n]+", text):
+        line = m.group(0).strip()
+        if not line:
             continue
+        lstart = m.start() + (len(m.group(0)) - len(m.group(0).lstrip()))
+        lend = m.end() - (len(m.group(0)) - len(m.group(0).rstrip()))
+        blank_gap = text.count("\n", prev_end, lstart) >= 2
+        prev_end = lend
 
-        if len((buffer + " " + s).split()) <= max_tokens:
-            buffer = (buffer + " " + s).strip()
+        if _is_heading(line):
+            new = "heading"
+        elif _TABLE_SEP_RE.search(line) or len(_COLUMN_GAP_RE.findall(line)) >= 2:
+            new = "table"
+        elif _ITEM_RE.match(line):
+            new = "item"
         else:
-            _flush_buffer()
+            new = None  # continuação
 
-            # Se a “sentença” sozinha já é maior que max_tokens (OCR sem pontuação/linhas),
-            # quebramos por palavras para evitar chunks gigantes que explodem memória no embedding.
-            parts = _split_by_words(s)
-            if not parts:
+        if new is None:
+            if kind in ("item", "para") and not blank_gap:
+                end = lend
                 continue
+            new = "para"
+        elif new == "table" and kind == "table" and not blank_gap:
+            end = lend
+            continue
 
-            # Empilha todos os blocos completos e mantém o último no buffer
-            for p in parts[:-1]:
-                chunks.append(p)
-            buffer = parts[-1]
+        if kind is not None:
+            yield kind, start, end
+        kind, start, end = new, lstart, lend
+        if new == "heading":
+            yield kind, start, end
+            kind = None
+    if kind is not None:
+        yield kind, start, end
 
-    _flush_buffer()
 
+def _split_oversize(text: str, start: int, end: int, max_tokens: int) -> Iterator[Tuple[int, int, int]]:
+    """Quebra um bloco maior que max_tokens por sentenças e, se preciso, por palavras."""
+    flat = text[start:end]
+    for sm in _SENTENCE_RE.finditer(flat):
+        s_text = sm.group(0)
+        if not s_text.strip():
+            continue
+        s_tokens = estimate_tokens(s_text)
+        if s_tokens <= max_tokens:
+            yield start + sm.start(), start + sm.end(), s_tokens
+            continue
+        # OCR sem pontuação: agrupa palavras até o limite
+        w_start = w_end = None
+        w_tokens = 0
+        for wm in _WORD_RE.finditer(s_text):
+            t = estimate_tokens(wm.group(0))
+            if w_start is not None and w_tokens + t > max_tokens:
+                yield start + sm.start() + w_start, start + sm.start() + w_end, w_tokens
+                w_start, w_tokens = None, 0
+            if w_start is None:
+                w_start = wm.start()
+            w_end = wm.end()
+            w_tokens += t
+        if w_start is not None:
+            yield start + sm.start() + w_start, start + sm.start() + w_end, w_tokens
+
+
+def chunk_text_with_meta(text: str, max_tokens: int = 400, overlap: int | None = None) -> List[Dict[str, Any]]:
+    """
+    Chunks com orçamento de tokens e consciência de estrutura, em tempo linear.
+
+    - Itens numerados, tabelas e parágrafos não são cortados no meio (a menos que
+      sozinhos passem de `max_tokens`, aí quebram por sentença/palavra).
+    - Títulos de seção (ANEXO, TERMO DE REFERÊNCIA, ...) sempre abrem um chunk novo.
+    - `overlap` (default CHUNK_OVERLAP_TOKENS, 0): tokens dos últimos blocos repetidos
+      no início do chunk seguinte da mesma seção.
+
+    Retorna [{"text", "start", "end", "section", "tokens"}]; start/end são offsets em `text`.
+    """
+    if max_tokens <= 0:
+        max_tokens = 400
+    overlap = _default_overlap() if overlap is None else max(0, int(overlap))
+    overlap = min(overlap, max_tokens // 2)
+    text = text or ""
+
+    chunks: List[Dict[str, Any]] = []
+    # peças do chunk atual: (início, fim, tokens, id do bloco, tipo)
+    cur: List[Tuple[int, int, int, int, str]] = []
+    cur_tokens = 0
+    carried = 0  # quantas peças do início de `cur` vieram do overlap
+    section = None
+
+    def _emit() -> None:
+        parts: List[str] = []
+        prev_unit = None
+        for s, e, _, unit, kind in cur:
+            piece = text[s:e] if kind == "table" else text[s:e].replace("\n", " ")
+            piece = piece.strip()
+            if prev_unit is not None:
+                parts.append(" " if unit == prev_unit else "\n")
+            parts.append(piece)
+            prev_unit = unit
+        chunks.append(
+            {"text": "".join(parts), "start": cur[0][0], "end": cur[-1][1], "section": section, "tokens": cur_tokens}
+        )
+
+    def _flush(keep_overlap: bool) -> None:
+        nonlocal cur, cur_tokens, carried
+        if cur and carried < len(cur):
+            _emit()
+        tail: List[Tuple[int, int, int, int, str]] = []
+        tail_tokens = 0
+        if keep_overlap and overlap and carried < len(cur):
+            for p in reversed(cur):
+                if p[4] == "heading" or tail_tokens + p[2] > overlap:
+                    break
+                tail.append(p)
+                tail_tokens += p[2]
+            tail.reverse()
+        cur, cur_tokens, carried = tail, tail_tokens, len(tail)
+
+    for unit_id, (kind, start, end) in enumerate(_units(text)):
+        if kind == "heading":
+            _flush(keep_overlap=False)
+            section = " ".join(text[start:end].split())
+        tokens = estimate_tokens(text[start:end])
+        pieces = [(start, end, tokens)] if tokens <= max_tokens else list(_split_oversize(text, start, end, max_tokens))
+        for s, e, t in pieces:
+            if cur and cur_tokens + t > max_tokens:
+                _flush(keep_overlap=True)
+                if cur and cur_tokens + t > max_tokens:
+                    # nem o overlap cabe junto com a peça: descarta o overlap
+                    cur, cur_tokens, carried = [], 0, 0
+            cur.append((s, e, t, unit_id, kind))
+            cur_tokens += t
+    _flush(keep_overlap=False)
     return chunks
+
+
+def chunk_text(text: str, max_tokens: int = 400, overlap: int | None = None) -> list[str]:
+    return [c["text"] for c in chunk_text_with_meta(text, max_tokens=max_tokens, overlap=overlap)]
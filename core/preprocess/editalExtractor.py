@@ -1,4 +1,5 @@
-from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
+from core.match.config import MatchConfig, get_match_config
 import json
 import re
 import os
@@ -64,18 +65,21 @@ Regras IMPORTANTES:
 
 class EditalExtractor:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
         self._llm_unavailable = False
         self._llm_disabled = str(os.getenv("LLM_DISABLE", "0")).lower() in ("1", "true", "yes")
 
-    def _heuristic_extract(self, text: str) -> Dict[str, Any]:
+    def _heuristic_extract(self, text: str, config: MatchConfig | None = None) -> Dict[str, Any]:
         """Fallback determinístico: extrai requisitos mensuráveis com regex.
 
         Não tenta "entender" o edital como um LLM, mas evita o caso crítico
         de retornar {} quando há requisitos óbvios no texto.
+        As regex vêm pré-compiladas em MatchConfig.patterns.
         """
         import unicodedata
 
+        pat = (config or get_match_config()).patterns
+
         t_raw = (text or "")
         t = t_raw
         # Normaliza para facilitar regex de palavras-chave (mínimo/máximo etc.)
@@ -125,36 +129,36 @@ class EditalExtractor:
             cur["unidade"] = cur.get("unidade") or unit
 
         # Garantia (meses) - tipicamente "no mínimo X meses"
-        for m in re.finditer(r"garantia[^\n]{0,80}?(?:no\s+minimo|minima|minimo|>=)?\s*(\d{1,3})\s*mes", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.garantia.finditer(t_norm_l):
             v = _num(m.group(1))
             _put_min("garantia_meses", int(v) if v is not None else None, "meses")
 
         # Tensao (V)
-        for m in re.finditer(r"(?:tensao|voltagem)[^\n]{0,40}?(?:no\s+minimo|minima|minimo|>=)?\s*(\d+(?:[\.,]\d+)?)\s*v\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.tensao_min.finditer(t_norm_l):
             _put_min("tensao_v", _num(m.group(1)), "V")
-        for m in re.finditer(r"\b(\d+(?:[\.,]\d+)?)\s*v\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.tensao.finditer(t_norm_l):
             _put_exact("tensao_v", _num(m.group(1)), "V")
 
         # Corrente (A)
-        for m in re.finditer(r"\b(\d+(?:[\.,]\d+)?)\s*a\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.corrente.finditer(t_norm_l):
             _put_exact("corrente_a", _num(m.group(1)), "A")
 
         # Potência (W)
-        for m in re.finditer(r"\b(\d+(?:[\.,]\d+)?)\s*w\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.potencia.finditer(t_norm_l):
             _put_exact("potencia_w", _num(m.group(1)), "W")
 
         # Capacidade (Ah)
-        for m in re.finditer(r"\b(\d+(?:[\.,]\d+)?)\s*ah\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.capacidade.finditer(t_norm_l):
             _put_exact("capacidade_ah", _num(m.group(1)), "Ah")
 
         # Memória RAM (GB)
-        for m in re.finditer(r"\bno\s+minimo\s*(\d{1,4})\s*gb\b[^\n]{0,20}?(?:ram|memoria)", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.ram_min.finditer(t_norm_l):
             _put_min("memoria_ram_gb", _num(m.group(1)), "GB")
-        for m in re.finditer(r"\b(\d{1,4})\s*gb\b[^\n]{0,20}?(?:ram|memoria)", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.ram.finditer(t_norm_l):
             _put_exact("memoria_ram_gb", _num(m.group(1)), "GB")
 
         # Armazenamento (GB/TB)
-        for m in re.finditer(r"\bno\s+minimo\s*(\d{2,5})\s*(gb|tb)\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.armazenamento_min.finditer(t_norm_l):
             val = _num(m.group(1))
             unit = (m.group(2) or "").upper()
             if val is not None and unit == "TB":
@@ -162,17 +166,17 @@ class EditalExtractor:
             _put_min("armazenamento_gb", val, "GB")
 
         # Portas (ex.: 8 portas / interfaces de rede 8)
-        for m in re.finditer(r"\b(\d{1,3})\s*(?:portas|ports)\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.portas.finditer(t_norm_l):
             _put_exact("portas", int(_num(m.group(1)) or 0) or None, None)
-        for m in re.finditer(r"interfaces\s+de\s+rede\s*(\d{1,3})\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.interfaces_rede.finditer(t_norm_l):
             _put_exact("portas", int(_num(m.group(1)) or 0) or None, None)
 
         # Velocidade/throughput (Gbps)
-        for m in re.finditer(r"\b(\d+(?:[\.,]\d+)?)\s*gbps\b", t_norm_l, flags=re.IGNORECASE):
+        for m in pat.velocidade.finditer(t_norm_l):
             _put_exact("velocidade_gbps", _num(m.group(1)), "Gbps")
 
         # PoE (booleano) - presença do termo já é um requisito relevante
-        if re.search(r"\bpoe\b", t_norm_l, flags=re.IGNORECASE):
+        if pat.poe.search(t_norm_l):
             reqs.setdefault("poe", {"valor_min": None, "valor_max": None, "unidade": None, "obrigatorio": True})
 
         return {"item": None, "tipo_produto": None, "requisitos": reqs}
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # Windows
+    fcntl = None
+
+
+DEFAULT_CACHE_DIR = Path("data/processed/embeddings")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _model_slug(model_name: str) -> str:
+    s = re.sub(r"[^A-Za-z0-9._-]+", "_", str(model_name or "default")).strip("_")
+    return s or "default"
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings endereçado por conteúdo.
+
+    Chave: (modelo de embedding, sha256 do texto do chunk)
+    Valor: vetor float32
+
+    Layout em disco (um diretório por modelo):
+    - vectors.f32  -> matriz (n, dim) float32 gravada em modo append, lida via memmap
+    - index.json   -> {"model": ..., "dim": d, "rows": {"<sha256>": linha}}
+    """
+
+    def __init__(self, model_name: str, cache_dir: str | Path | None = None):
+        self.model_name = model_name
+        base = Path(cache_dir) if cache_dir else Path(os.getenv("EMBED_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.dir = base / _model_slug(model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.dir / "vectors.f32"
+        self.index_path = self.dir / "index.json"
+        self.lock_path = self.dir / ".lock"
+
+        self._lock = threading.Lock()
+        self.dim: int | None = None
+        self.rows: dict[str, int] = {}
+        self._mmap = None
+        self._mmap_rows = 0
+        self._index_mtime = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self._reload_index()
+
+    @classmethod
+    def from_env(cls, model_name: str) -> "EmbeddingCache | None":
+        """Cria o cache se EMBED_CACHE estiver habilitado (default: 1)."""
+        enabled = str(os.getenv("EMBED_CACHE", "1")).lower() in ("1", "true", "yes")
+        if not enabled:
+            return None
+        try:
+            return cls(model_name)
+        except Exception:
+            # Cache nunca deve derrubar o pipeline (ex.: diretório sem permissão)
+            return None
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+    def _file_lock(self):
+        """Lock entre processos (best-effort; no Windows cai só no lock de thread)."""
+        class _Lock:
+            def __init__(self, path: Path):
+                self.path = path
+                self.fh = None
+
+            def __enter__(self):
+                if fcntl is None:
+                    return self
+                self.fh = open(self.path, "a+")
+                fcntl.flock(self.fh, fcntl.LOCK_EX)
+                return self
+
+            def __exit__(self, *exc):
+                if self.fh is not None:
+                    try:
+                        fcntl.flock(self.fh, fcntl.LOCK_UN)
+                    finally:
+                        self.fh.close()
+                return False
+
+        return _Lock(self.lock_path)
+
+    def _reload_index(self) -> None:
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._index_mtime:
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        dim = data.get("dim")
+        rows = data.get("rows")
+        if not isinstance(dim, int) or not isinstance(rows, dict):
+            return
+
+        # Protege contra índice à frente do arquivo de vetores (ex.: crash no meio da escrita)
+        n_file = self.vectors_path.stat().st_size // (4 * dim) if self.vectors_path.exists() else 0
+        self.dim = dim
+        self.rows = {k: int(v) for k, v in rows.items() if int(v) < n_file}
+        self._index_mtime = mtime
+        self._mmap = None
+
+    def _matrix(self):
+        if self.dim is None or not self.vectors_path.exists():
+            return None
+        n_file = self.vectors_path.stat().st_size // (4 * self.dim)
+        if self._mmap is None or self._mmap_rows != n_file:
+            if n_file == 0:
+                return None
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n_file, self.dim))
+            self._mmap_rows = n_file
+        return self._mmap
+
+    def _write_index(self) -> None:
+        tmp = self.index_path.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps({"model": self.model_name, "dim": self.dim, "rows": self.rows}),
+            encoding="utf-8",
+        )
+        tmp.replace(self.index_path)
+        try:
+            self._index_mtime = self.index_path.stat().st_mtime_ns
+        except Exception:
+            self._index_mtime = None
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def get_many(self, texts: list[str]) -> tuple[list[np.ndarray | None], list[int]]:
+        """Retorna (vetores, índices_faltantes). Vetor é None para textos sem cache."""
+        with self._lock:
+            self._reload_index()
+            mat = self._matrix()
+            out: list[np.ndarray | None] = []
+            missing: list[int] = []
+            for i, t in enumerate(texts):
+                row = self.rows.get(text_hash(t)) if mat is not None else None
+                if row is None or row >= mat.shape[0]:
+                    out.append(None)
+                    missing.append(i)
+                else:
+                    out.append(np.array(mat[row], dtype=np.float32))
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+            return out, missing
+
+    def put_many(self, texts: list[str], vectors) -> None:
+        arr = np.asarray(vectors, dtype=np.float32)
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        if arr.shape[0] != len(texts) or arr.shape[0] == 0:
+            return
+
+        with self._lock, self._file_lock():
+            # Outro processo pode ter gravado desde a última leitura
+            self._reload_index()
+            if self.dim is None:
+                self.dim = int(arr.shape[1])
+            if int(arr.shape[1]) != self.dim:
+                raise ValueError(
+                    f"Dimensão do embedding ({arr.shape[1]}) difere da do cache ({self.dim}) para {self.model_name}"
+                )
+
+            new_rows: list[int] = []
+            seen: set[str] = set()
+            keys: list[str] = []
+            for i, t in enumerate(texts):
+                h = text_hash(t)
+                if h in self.rows or h in seen:
+                    continue
+                seen.add(h)
+                keys.append(h)
+                new_rows.append(i)
+            if not new_rows:
+                return
+
+            start = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(arr[new_rows]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            for offset, h in enumerate(keys):
+                self.rows[h] = start + offset
+            self._write_index()
+            self._mmap = None
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "entries": len(self.rows),
+            "dim": self.dim,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,51 +1,227 @@
-from fastembed import TextEmbedding
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+
 import numpy as np
 import os
 
+from core.preprocess.chunker import estimate_tokens
+from core.preprocess.embedding_cache import text_hash
+from core.utils.metrics import REGISTRY
+from core.utils.singleflight import embedding_flight
+from core.utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_TOTAL = REGISTRY.counter("matchllm_embeddings_total", "Embeddings calculados (sem cache) por modelo.")
+
+# Modelos E5 em ONNX registrados no fastembed como modelos custom (o fastembed não traz
+# o intfloat/e5-base-v2 na lista dele), incluindo variantes menores e/ou quantizadas (int8).
+# Use o apelido como nome do modelo (EMBED_MODEL=e5-small-v2-int8); o cache de
+# embeddings separa os vetores por apelido.
+EMBED_VARIANTS = {
+    "intfloat/e5-base-v2": {"hf": "Xenova/e5-base-v2", "model_file": "onnx/model.onnx", "dim": 768},
+    "e5-small-v2": {"hf": "Xenova/e5-small-v2", "model_file": "onnx/model.onnx", "dim": 384},
+    "e5-small-v2-int8": {"hf": "Xenova/e5-small-v2", "model_file": "onnx/model_quantized.onnx", "dim": 384},
+    "e5-base-v2-int8": {"hf": "Xenova/e5-base-v2", "model_file": "onnx/model_quantized.onnx", "dim": 768},
+    "multilingual-e5-small-int8": {"hf": "Xenova/multilingual-e5-small", "model_file": "onnx/model_quantized.onnx", "dim": 384},
+}
+
+_registered: set[str] = set()
+_register_lock = threading.Lock()
+
+
+def default_embed_model() -> str:
+    return os.getenv("EMBED_MODEL", "").strip() or "intfloat/e5-base-v2"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def _is_alloc_error(e: Exception) -> bool:
+    msg = str(e).lower()
+    return "failed to allocate" in msg or "allocaterawinternal" in msg or "bfc_arena" in msg
+
+
+def embed_source(model_name: str) -> str:
+    """Pesos ONNX efetivamente carregados para o modelo (entra nas chaves de artefato)."""
+    spec = EMBED_VARIANTS.get(model_name)
+    return f"{spec['hf']}/{spec['model_file']}" if spec else model_name
+
+
+def _register_variant(alias: str) -> None:
+    """Registra a variante no fastembed (mean pooling + normalização, como o E5 original)."""
+    with _register_lock:
+        if alias in _registered:
+            return
+        from fastembed import TextEmbedding
+        from fastembed.common.model_description import ModelSource, PoolingType
+
+        spec = EMBED_VARIANTS[alias]
+        try:
+            TextEmbedding.add_custom_model(
+                model=alias,
+                pooling=PoolingType.MEAN,
+                normalization=True,
+                sources=ModelSource(hf=spec["hf"]),
+                dim=spec["dim"],
+                model_file=spec["model_file"],
+            )
+        except ValueError:
+            # já registrado (ex.: outro import do módulo no mesmo processo)
+            pass
+        _registered.add(alias)
+
+
 class Embedder:
     """
     Wrapper para o modelo de embeddings (FastEmbed E5)\
     Usado tanto para chunks de texto quanto para consultas.
+
+    Os textos são ordenados por tamanho e agrupados em lotes que cabem em
+    EMBED_BATCH_TOKENS (lote x maior texto do lote), em vez de um batch fixo:
+    menos padding e memória do ONNX Runtime previsível.
     """
 
-    def __init__(self, model_name: str = "intfloat/e5-base-v2"):
-        # FastEmbed carrega modelos leves baseados em ONNX (CPU-only)
-        self.model = TextEmbedding(model=model_name)
+    def __init__(self, model_name: str | None = None, cache=None, model=None):
+        self.model_name = model_name or default_embed_model()
+        if model is None:
+            # FastEmbed carrega modelos leves baseados em ONNX (CPU-only).
+            # Import aqui: importar o módulo (API/CLI) não carrega fastembed/onnxruntime.
+            from fastembed import TextEmbedding
+
+            # EMBED_THREADS: threads do ONNX Runtime (o fastembed aplica em intra e inter-op); 0 = todos os núcleos
+            threads = _env_int("EMBED_THREADS", 0) or None
+            if self.model_name in EMBED_VARIANTS:
+                _register_variant(self.model_name)
+            model = TextEmbedding(model_name=self.model_name, threads=threads)
+        self.model = model
+        # Cache gravado com outra dimensão (ex.: vetores de quando o fastembed ignorava o
+        # nome do modelo e carregava o default dele): não mistura, só avisa
+        dim = EMBED_VARIANTS.get(self.model_name, {}).get("dim")
+        if cache is not None and dim and cache.dim and cache.dim != dim:
+            logger.warning(
+                "Cache de embeddings em %s tem dimensão %s (esperado %s para %s); cache desativado, apague o diretório para recriá-lo.",
+                cache.dir, cache.dim, dim, self.model_name,
+            )
+            cache = None
+        # Cache opcional (core.preprocess.embedding_cache.EmbeddingCache)
+        self.cache = cache
+        # Orçamento de tokens por lote; cai pela metade (para as próximas chamadas também) se o ONNX não conseguir alocar
+        self.batch_tokens = max(1, _env_int("EMBED_BATCH_TOKENS", 16384))
+
+    def encode_cached(self, texts: list[str]):
+        """
+        Igual a encode(), mas consulta o cache de embeddings antes e só
+        calcula os textos ainda não vistos para este modelo.
+        """
+        if self.cache is None or not texts:
+            return self.encode(texts)
+
+        with span("embed.encode_cached", items_in=len(texts)) as s:
+            try:
+                cached, missing = self.cache.get_many(texts)
+            except Exception:
+                return self.encode(texts)
+            s.set(hits=len(texts) - len(missing), cached=not missing)
+
+            if missing:
+                # O mesmo edital enviado por vários analistas ao mesmo tempo gera o mesmo
+                # conjunto de chunks faltantes: só uma chamada calcula, as outras esperam
+                missing_texts = [texts[i] for i in missing]
+                key = hashlib.sha256("\n".join(text_hash(t) for t in missing_texts).encode("ascii")).hexdigest()
+                fresh, _ = embedding_flight.do((self.model_name, key), self._encode_and_store, missing_texts)
+                for j, i in enumerate(missing):
+                    cached[i] = fresh[j]
+
+            return np.vstack(cached).astype(np.float32)
+
+    def _encode_and_store(self, texts: list[str]):
+        fresh = self.encode(texts)
+        try:
+            self.cache.put_many(texts, fresh)
+        except Exception:
+            # Falha ao gravar cache não invalida os vetores já calculados
+            pass
+        return fresh
 
     def encode(self, texts: list[str]):
         """
         Recebe lista de textos e retorna matriz de embbedings (numpy array)
         """
-        # Retorna matriz numpy float32, compatível com FAISS
-        # Em máquinas com pouca RAM, o ONNXRuntime pode falhar ao alocar buffers grandes.
-        # Permitimos controlar o batch size via env e também fazemos fallback automático.
-
-        batch_env = os.getenv("EMBED_BATCH_SIZE", "").strip()
-        if batch_env:
-            batch_sizes = [max(1, int(batch_env))]
-        else:
-            # sequência de fallback (maior -> menor)
-            batch_sizes = [64, 32, 16, 8, 4, 2, 1]
-
-        last_err: Exception | None = None
-        for batch_size in batch_sizes:
+        with span("embed.encode", model=self.model_name, items_in=len(texts), chars_in=sum(len(t) for t in texts)) as s:
+            t0 = time.perf_counter()
+            vecs, batches = self._encode(texts)
+            elapsed = time.perf_counter() - t0
+            EMBEDDINGS_TOTAL.inc(len(texts), model=self.model_name)
+            s.set(items_out=len(texts), batches=batches, per_s=round(len(texts) / elapsed, 1) if elapsed > 0 else None)
+            return vecs
+
+    def _plan_batches(self, texts: list[str]) -> list[list[int]]:
+        """
+        Índices dos textos em lotes, do menor para o maior texto.
+
+        Com EMBED_BATCH_SIZE fixo, lotes desse tamanho; senão cada lote cresce enquanto
+        (textos no lote) x (tokens do maior) couber em `batch_tokens`. O modelo trunca
+        em EMBED_MAX_TOKENS, então textos maiores contam como esse teto.
+        """
+        max_tokens = max(1, _env_int("EMBED_MAX_TOKENS", 512))
+        max_batch = max(1, _env_int("EMBED_MAX_BATCH", 256))
+        fixed = _env_int("EMBED_BATCH_SIZE", 0)
+        tokens = [min(max_tokens, estimate_tokens(t) + 2) for t in texts]
+        order = sorted(range(len(texts)), key=tokens.__getitem__)
+        if fixed > 0:
+            return [order[i:i + fixed] for i in range(0, len(order), fixed)]
+
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        for i in order:
+            # ordem crescente: o texto atual é o maior do lote
+            if batch and ((len(batch) + 1) * tokens[i] > self.batch_tokens or len(batch) >= max_batch):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _encode(self, texts: list[str]):
+        # Retorna (matriz numpy float32 compatível com FAISS, lotes executados).
+        # Em máquinas com pouca RAM, o ONNXRuntime pode falhar ao alocar buffers grandes:
+        # só o lote que falhou é refeito em duas metades (sem repetir a passada inteira).
+        if not texts:
+            return np.array([], dtype=np.float32), 0
+
+        fixed = _env_int("EMBED_BATCH_SIZE", 0) > 0
+        out: list = [None] * len(texts)
+        pending = deque(self._plan_batches(texts))
+        done = 0
+        while pending:
+            batch = pending.popleft()
             try:
-                embeddings = list(self.model.embed(texts, batch_size=batch_size))
-                return np.array(embeddings, dtype=np.float32)
+                vecs = list(self.model.embed([texts[i] for i in batch], batch_size=len(batch)))
             except Exception as e:
-                msg = str(e).lower()
-                is_alloc = (
-                    "failed to allocate" in msg
-                    or "allocaterawinternal" in msg
-                    or "bfc_arena" in msg
-                )
-                if is_alloc and (not batch_env):
-                    last_err = e
-                    continue
-                raise
-
-        raise RuntimeError(
-            "Falha ao gerar embeddings por falta de memória. "
-            "Tente definir EMBED_BATCH_SIZE=4 (ou menor) no ambiente e rode novamente. "
-            f"Último erro: {last_err}"
-        )
\ No newline at end of file
+                if not _is_alloc_error(e) or fixed or len(batch) == 1:
+                    if _is_alloc_error(e):
+                        raise RuntimeError(
+                            "Falha ao gerar embeddings por falta de memória. "
+                            "Tente reduzir EMBED_BATCH_TOKENS (ou definir EMBED_BATCH_SIZE=4) e rode novamente. "
+                            f"Último erro: {e}"
+                        ) from e
+                    raise
+                half = len(batch) // 2
+                pending.appendleft(batch[half:])
+                pending.appendleft(batch[:half])
+                self.batch_tokens = max(1, self.batch_tokens // 2)
+                continue
+            for i, v in zip(batch, vecs):
+                out[i] = v
+            done += 1
+        return np.array(out, dtype=np.float32), done
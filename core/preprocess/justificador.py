@@ -1,4 +1,4 @@
-from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
 import json
 
 
@@ -35,7 +35,7 @@ Formato da resposta (JSON obrigatório):
 
 class JustificationGenerator:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
 
     def generate(
         self,
@@ -1,4 +1,4 @@
-from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
 import json
 import os
 
@@ -46,7 +46,7 @@ Regras IMPORTANTES:
 
 class ProductExtractor:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
         self._llm_unavailable = False
 
         # Permite desabilitar LLM explicitamente e usar apenas heurística.
@@ -0,0 +1,151 @@
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+# Modelos E5 foram treinados com esses prefixos; sem eles a similaridade cai
+E5_QUERY_PREFIX = "query: "
+E5_PASSAGE_PREFIX = "passage: "
+
+FUSION_METHODS = ("max", "mean", "rrf")
+
+
+def uses_e5_prefixes(model_name: str | None) -> bool:
+    if str(os.getenv("RAG_E5_PREFIXES", "1")).lower() not in ("1", "true", "yes"):
+        return False
+    return "e5" in str(model_name or "").lower()
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Índices dos k maiores scores em ordem decrescente, O(n + k log k) via argpartition."""
+    scores = np.asarray(scores)
+    n = scores.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(n)
+    # desempate estável pelo índice (mesma ordem que o sorted() antigo)
+    return part[np.lexsort((part, -scores[part]))]
+
+
+def fuse_scores(score_matrix: np.ndarray, method: str = "max", weights: Sequence[float] | None = None) -> np.ndarray:
+    """
+    Combina scores de várias consultas (q, n) em um vetor (n,).
+    - max:  melhor consulta para cada chunk (favorece chunks que respondem a algum atributo)
+    - mean: média ponderada
+    - rrf:  reciprocal rank fusion (1 / (60 + rank)), insensível à escala dos scores
+    """
+    m = np.atleast_2d(np.asarray(score_matrix, dtype=np.float32))
+    w = np.ones(m.shape[0], dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+    if method == "mean":
+        return (w[:, None] * m).sum(axis=0) / max(float(w.sum()), 1e-9)
+    if method == "rrf":
+        ranks = np.empty_like(m, dtype=np.float32)
+        order = np.argsort(-m, axis=1, kind="stable")
+        rows = np.arange(m.shape[0])[:, None]
+        ranks[rows, order] = np.arange(m.shape[1], dtype=np.float32)[None, :]
+        return (w[:, None] / (60.0 + ranks + 1.0)).sum(axis=0)
+    return (w[:, None] * m).max(axis=0)
+
+
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    mat = np.atleast_2d(np.asarray(mat, dtype=np.float32))
+    return mat / (np.linalg.norm(mat, axis=1, keepdims=True) + 1e-9)
+
+
+class DenseRetriever:
+    """
+    Recuperação densa sobre um Embedder:
+    - aplica os prefixos E5 ("query: " / "passage: ") quando o modelo é E5
+    - embeda todas as consultas de uma vez (um único batch)
+    - combina várias consultas (ex.: uma por atributo do produto) com fuse_scores
+    - seleciona top-k com argpartition (linear no nº de chunks)
+    """
+
+    def __init__(self, embedder, *, fusion: str | None = None):
+        self.embedder = embedder
+        fusion = (fusion or os.getenv("RAG_FUSION", "max")).strip().lower()
+        self.fusion = fusion if fusion in FUSION_METHODS else "max"
+        self.e5 = uses_e5_prefixes(getattr(embedder, "model_name", None))
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encode = getattr(self.embedder, "encode_cached", None) or self.embedder.encode
+        return encode(texts)
+
+    def encode_passages(self, passages: List[str], *, e5: bool | None = None) -> np.ndarray:
+        """`e5` sobrescreve o uso dos prefixos (ex.: índice já construído sem eles)."""
+        texts = [f"{E5_PASSAGE_PREFIX}{p}" for p in passages] if (self.e5 if e5 is None else e5) else list(passages)
+        return _normalize_rows(self._encode(texts))
+
+    def encode_queries(self, queries: List[str], *, e5: bool | None = None) -> np.ndarray:
+        texts = [f"{E5_QUERY_PREFIX}{q}" for q in queries] if (self.e5 if e5 is None else e5) else list(queries)
+        return _normalize_rows(self._encode(texts))
+
+    def index_uses_prefixes(self, index) -> bool:
+        """
+        Consulta com prefixo só se os chunks do índice foram embedados com "passage: ";
+        índices construídos com texto cru (ou antes do prefixo existir) consultam sem prefixo.
+        """
+        prefix = getattr(index, "passage_prefix", None)
+        if prefix is None:
+            return self.e5
+        return self.e5 and prefix == E5_PASSAGE_PREFIX
+
+    def score(self, queries: List[str], passage_vecs: np.ndarray, weights: Sequence[float] | None = None) -> np.ndarray:
+        """Score fundido (n,) de cada passagem para o conjunto de consultas."""
+        q = self.encode_queries(queries)
+        p = _normalize_rows(passage_vecs)
+        return fuse_scores(q @ p.T, self.fusion, weights)
+
+    def search_vectors(
+        self,
+        queries: List[str],
+        passage_vecs: np.ndarray,
+        top_k: int,
+        weights: Sequence[float] | None = None,
+    ) -> List[Tuple[int, float]]:
+        """[(índice da passagem, score)] dos top_k, maior score primeiro."""
+        if len(passage_vecs) == 0 or not queries:
+            return []
+        fused = self.score(queries, passage_vecs, weights)
+        return [(int(i), float(fused[i])) for i in top_k_indices(fused, top_k)]
+
+    def retrieve(
+        self,
+        queries: List[str],
+        passages: List[str],
+        top_k: int,
+        weights: Sequence[float] | None = None,
+    ) -> List[Tuple[int, float]]:
+        if not passages:
+            return []
+        return self.search_vectors(queries, self.encode_passages(passages), top_k, weights)
+
+    def search_index(self, queries: List[str], index, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Busca em um VectorIndex com várias consultas num só batch e funde por id.
+        Retorna [(id, score)] dos top_k.
+        """
+        if not queries:
+            return []
+        scores, ids = index.search_batch(self.encode_queries(queries, e5=self.index_uses_prefixes(index)), top_k)
+        if len(queries) == 1:
+            return [(int(i), float(s)) for s, i in zip(scores[0], ids[0]) if i >= 0]
+
+        uniq = np.unique(ids[ids >= 0])
+        if uniq.size == 0:
+            return []
+        # Matriz (q, candidatos); candidato ausente numa consulta fica com -inf (ou último rank no RRF)
+        mat = np.full((len(queries), uniq.size), -np.inf, dtype=np.float32)
+        col = np.searchsorted(uniq, ids)
+        for r in range(ids.shape[0]):
+            ok = ids[r] >= 0
+            mat[r, col[r][ok]] = scores[r][ok]
+        if self.fusion == "mean":
+            mat = np.where(np.isfinite(mat), mat, 0.0)
+        fused = fuse_scores(mat, self.fusion)
+        return [(int(uniq[i]), float(fused[i])) for i in top_k_indices(fused, top_k)]
@@ -1,4 +1,5 @@
 from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
 from core.llm.prompt import MATCH_PROMPT
 import json
 
@@ -8,7 +9,7 @@ class Matcher:
     """
     def __init__(self, llm_client: LLMClient | None = None, model: str | None = None):
         # Se um cliente não for fornecido, cria um com possível override de modelo
-        self.llm_client = llm_client or LLMClient(model=model)
+        self.llm_client = llm_client or get_llm_client(model)
 
     def compare(self, produto_json: dict, edital_chunks: list[str]) -> str:
         """
@@ -1,8 +1,9 @@
 from core.preprocess.embeddings import Embedder
+from core.rag.dense_retriever import E5_PASSAGE_PREFIX, DenseRetriever
 from core.vectorstore.index import VectorIndex
 
 class RAGRetrivier:
-    """  
+    """
     Responsavel por:
      -> transformar a consulta em embedding
         -> buscar os chunks mais relevantes no indice vetorial
@@ -11,11 +12,24 @@ class RAGRetrivier:
     def __init__(self, embedder : Embedder, index : VectorIndex):
         self.embedder = embedder
         self.index = index
+        self.retriever = DenseRetriever(embedder)
+
+    def add_chunks(self, chunks : list[str]):
+        """
+        Indexa chunks com o mesmo prefixo/normalização usados na consulta.
+        Índice vazio adota o prefixo do modelo; índice já populado mantém o dele.
+        """
+        if len(self.index) == 0:
+            self.index.passage_prefix = E5_PASSAGE_PREFIX if self.retriever.e5 else ""
+        e5 = self.index.passage_prefix == E5_PASSAGE_PREFIX
+        return self.index.add(self.retriever.encode_passages(chunks, e5=e5), chunks)
 
-    def search(self, query : str, top_k : int = 5) -> list[str]:
+    def search(self, query : str | list[str], top_k : int = 5) -> list[str]:
         """
-        Dada uma consulta em texto, retorna os top_k chunks mais relevantes
+        Dada uma consulta em texto (ou várias, com fusão de scores),
+        retorna os top_k chunks mais relevantes
         """
-        query_vec = self.embedder.encode([query])[0]
-        results = self.index.search(query_vec, top_k=top_k)
-        return results 
\ No newline at end of file
+        queries = [query] if isinstance(query, str) else list(query)
+        hits = self.retriever.search_index(queries, self.index, top_k)
+        results = [self.index.get_chunk(i) for i, _ in hits]
+        return [r for r in results if r is not None]
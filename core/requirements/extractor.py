@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import List, Dict, Any
-from core.llm.client import LLMClient
+from core.utils.models import get_llm_client
 from core.llm.prompt import REQUIREMENTS_PROMPT
 import json
 
@@ -9,7 +9,7 @@ class RequirementExtractor:
     Extrai itens/requisitos de trechos do edital usando LLM, retornando uma lista de dicts.
     """
     def __init__(self, model: str | None = None):
-        self.llm = LLMClient(model=model)
+        self.llm = get_llm_client(model)
 
     def extract(self, edital_text: str) -> List[Dict[str, Any]]:
         prompt = REQUIREMENTS_PROMPT.format(edital=edital_text)
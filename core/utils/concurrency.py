@@ -0,0 +1,47 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def env_concurrency(name: str, default: int = 1) -> int:
+    """Lê um nível de concorrência do ambiente (mínimo 1)."""
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return max(1, default)
+
+
+def iter_ordered(fn: Callable[[T], R], items: Iterable[T], max_workers: int = 1) -> Iterator[R]:
+    """Aplica `fn` a cada item com até `max_workers` threads, devolvendo na ORDEM de entrada.
+
+    - max_workers <= 1 executa em série (mesmo comportamento de um for simples).
+    - Resultados são entregues assim que o prefixo em ordem estiver pronto, então
+      quem consome (ex.: log JSONL) continua escrevendo na ordem original.
+    - Exceções de `fn` são propagadas na posição do item; os itens ainda não
+      iniciados são cancelados.
+    - Cada item roda numa cópia do contexto de quem chamou (spans de tracing do
+      item viram filhos do span atual).
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        for it in items:
+            yield fn(it)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, it) for it in items]
+        try:
+            for fut in futures:
+                yield fut.result()
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+def map_ordered(fn: Callable[[T], R], items: Iterable[T], max_workers: int = 1) -> list[R]:
+    return list(iter_ordered(fn, items, max_workers=max_workers))
@@ -0,0 +1,169 @@
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from core.utils.concurrency import env_concurrency
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = JOB_QUEUED
+    stage: str = "na fila"
+    percent: float = 0.0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+    # Quem enviou (e-mail do usuário autenticado); as rotas /jobs só mostram os jobs do próprio dono
+    owner: str | None = None
+    future: Future | None = field(default=None, repr=False)
+
+    def to_dict(self, *, include_result: bool = True) -> Dict[str, Any]:
+        out = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "percent": round(self.percent, 1),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "meta": dict(self.meta),
+            "error": self.error,
+        }
+        if include_result and self.status == JOB_DONE:
+            out["result"] = self.result
+        return out
+
+
+class JobContext:
+    """Passado como primeiro argumento da função do job para reportar progresso."""
+
+    def __init__(self, job: Job, lock: threading.Lock):
+        self._job = job
+        self._lock = lock
+
+    @property
+    def job_id(self) -> str:
+        return self._job.id
+
+    def progress(self, stage: str, percent: float | None = None, **meta: Any) -> None:
+        with self._lock:
+            self._job.stage = stage
+            if percent is not None:
+                # progresso nunca volta atrás
+                self._job.percent = max(self._job.percent, min(100.0, float(percent)))
+            if meta:
+                self._job.meta.update(meta)
+
+
+class JobManager:
+    """
+    Fila de jobs em processo, sem broker externo.
+
+    - JOB_WORKERS (default 2): threads executando jobs; o resto espera na fila
+    - JOB_HISTORY (default 200): jobs finalizados mantidos para consulta (os mais antigos saem)
+
+    Os jobs vivem na memória do processo: com vários workers do uvicorn, consulte
+    o mesmo processo que recebeu o job (ou rode a API com um worker).
+    """
+
+    def __init__(self, max_workers: int | None = None, history: int | None = None):
+        self.max_workers = max_workers or env_concurrency("JOB_WORKERS", 2)
+        self.history = history or env_concurrency("JOB_HISTORY", 200)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        kind: str = "job",
+        meta: Dict[str, Any] | None = None,
+        owner: str | None = None,
+        **kwargs: Any,
+    ) -> Job:
+        """Enfileira fn(ctx, *args, **kwargs) e devolve o Job (status "queued")."""
+        job = Job(id=uuid.uuid4().hex, kind=kind, meta=dict(meta or {}), owner=owner)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            job.status = JOB_RUNNING
+            job.stage = "iniciando"
+            job.started_at = time.time()
+        try:
+            result = fn(JobContext(job, self._lock), *args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                job.status = JOB_ERROR
+                job.error = f"{type(e).__name__}: {e}"
+                job.meta["traceback"] = traceback.format_exc(limit=5)
+                job.finished_at = time.time()
+            raise
+        with self._lock:
+            job.result = result
+            job.status = JOB_DONE
+            job.stage = "concluído"
+            job.percent = 100.0
+            job.finished_at = time.time()
+        return result
+
+    def _prune(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.status in (JOB_DONE, JOB_ERROR)]
+        for jid in finished[: max(0, len(finished) - self.history)]:
+            self._jobs.pop(jid, None)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, limit: int = 50, owner: str | None = None) -> List[Job]:
+        """Jobs mais recentes primeiro; com `owner`, só os desse dono."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if owner is None or j.owner == owner]
+        return jobs[-max(0, int(limit)):][::-1]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_ERROR: 0}
+            for j in self._jobs.values():
+                out[j.status] += 1
+        out["workers"] = self.max_workers
+        return out
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_manager: JobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+    return _manager
@@ -0,0 +1,39 @@
+import importlib
+import threading
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """
+    Módulo importado no primeiro acesso a um atributo (`faiss.IndexFlatIP`, ...).
+
+    Mantém o `import x` no topo do arquivo (legível e fácil de monkeypatchar), mas
+    tira dependências pesadas (faiss, fastembed, doctr, cv2) do tempo de import da
+    API/CLI. ImportError só aparece quando o recurso é realmente usado.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    return LazyModule(name)
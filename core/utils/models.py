@@ -0,0 +1,226 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+from core.utils.singleflight import SingleFlight
+from core.utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+WARMUP_KINDS = ("embedder", "ocr", "llm")
+
+
+class SerializedModel:
+    """
+    Modelo compartilhado com chamadas serializadas por lock.
+
+    Usado no predictor do doctr: o torch já paraleliza cada inferência
+    internamente e não garante chamadas concorrentes no mesmo modelo.
+    """
+
+    def __init__(self, model: Any):
+        self.model = model
+        self._lock = threading.Lock()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return self.model(*args, **kwargs)
+
+
+class ModelRegistry:
+    """
+    Registro de modelos pesados do processo (embedder/ONNX, doctr, clientes LLM).
+
+    Cada chave é carregada uma vez; chamadas simultâneas para a mesma chave esperam
+    o mesmo carregamento (single-flight) e chaves diferentes carregam em paralelo.
+    Os objetos devolvidos são compartilhados entre threads: não guarde estado por
+    execução neles (ex.: `PDFExtractor.last_meta` continua por instância).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[Hashable, Any] = {}
+        self._info: Dict[Hashable, Dict[str, Any]] = {}
+        self._flight = SingleFlight("models")
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Devolve o modelo da chave, chamando `factory()` só no primeiro uso."""
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+        model, _ = self._flight.do(key, self._load, key, factory)
+        return model
+
+    def _load(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+        t0 = time.perf_counter()
+        with span("model.load", kind=str(key[0] if isinstance(key, tuple) else key)):
+            model = factory()
+        with self._lock:
+            self._models[key] = model
+            self._info[key] = {"load_ms": round((time.perf_counter() - t0) * 1000.0, 1)}
+        return model
+
+    def loaded(self) -> List[Dict[str, Any]]:
+        """Modelos carregados neste processo, com tempo de carga (e de warm-up, se houve)."""
+        with self._lock:
+            return [{"key": [str(k) for k in key] if isinstance(key, tuple) else str(key), **info} for key, info in self._info.items()]
+
+    def _mark(self, key: Hashable, **info: Any) -> None:
+        with self._lock:
+            self._info.setdefault(key, {}).update(info)
+
+    def clear(self) -> None:
+        with self._lock:
+            models = list(self._models.values())
+            self._models.clear()
+            self._info.clear()
+        for model in models:
+            close = getattr(model, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+REGISTRY = ModelRegistry()
+
+
+def registry_enabled() -> bool:
+    """MODEL_REGISTRY=0 volta a criar um modelo por instância (comportamento antigo)."""
+    return str(os.getenv("MODEL_REGISTRY", "1")).lower() in ("1", "true", "yes")
+
+
+def _embedder_key(model_name: str) -> tuple:
+    # EMBED_THREADS entra na chave: a sessão ONNX é criada com ele
+    env = tuple(os.getenv(k, "") for k in ("EMBED_CACHE", "EMBED_CACHE_DIR", "EMBED_THREADS"))
+    return ("embedder", model_name, env)
+
+
+def _llm_key(model: str | None) -> tuple:
+    # O cliente lê LLM_* no __init__ (URL, timeout, pool): mudou a env, é outro cliente
+    env = tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith("LLM_")))
+    return ("llm", model or "", env)
+
+
+def _new_embedder(model_name: str):
+    from core.preprocess.embedding_cache import EmbeddingCache
+    from core.preprocess.embeddings import Embedder
+
+    return Embedder(model_name=model_name, cache=EmbeddingCache.from_env(model_name))
+
+
+def _new_ocr_predictor():
+    try:
+        from doctr.models import ocr_predictor
+    except ImportError:
+        raise RuntimeError(
+            "OCR não disponível: instale 'python-doctr' e dependências (torch/torchvision)."
+        )
+    return SerializedModel(ocr_predictor(pretrained=True))
+
+
+def _new_llm_client(model: str | None):
+    from core.llm.client import LLMClient
+
+    return LLMClient(model=model)
+
+
+def get_embedder(model_name: str | None = None):
+    """Embedder (sessão ONNX do fastembed + cache de embeddings) compartilhado por modelo (default: EMBED_MODEL)."""
+    if not model_name:
+        from core.preprocess.embeddings import default_embed_model
+
+        model_name = default_embed_model()
+    if not registry_enabled():
+        return _new_embedder(model_name)
+    return REGISTRY.get(_embedder_key(model_name), lambda: _new_embedder(model_name))
+
+
+def get_ocr_predictor():
+    """Predictor do doctr (pesos carregados uma vez por processo), com chamadas serializadas."""
+    if not registry_enabled():
+        return _new_ocr_predictor()
+    return REGISTRY.get(("ocr", "doctr"), _new_ocr_predictor)
+
+
+def get_llm_client(model: str | None = None):
+    """LLMClient compartilhado por (modelo, LLM_*): um pool de conexões keep-alive por processo."""
+    if not registry_enabled():
+        return _new_llm_client(model)
+    return REGISTRY.get(_llm_key(model), lambda: _new_llm_client(model))
+
+
+def _warm_embedder() -> tuple:
+    embedder = get_embedder()
+    embedder.encode(["query: aquecimento"])
+    return _embedder_key(embedder.model_name)
+
+
+def _warm_ocr() -> tuple:
+    import numpy as np
+
+    predictor = get_ocr_predictor()
+    predictor([np.full((256, 256, 3), 255, dtype=np.uint8)])
+    return ("ocr", "doctr")
+
+
+def _warm_llm() -> tuple:
+    client = get_llm_client()
+    # Prompt vazio no Ollama só carrega o modelo na memória (sem gerar tokens)
+    response = client.session.post(
+        f"{client.base_url}/api/generate",
+        json={"model": client.model, "prompt": "", "stream": False},
+        timeout=client.timeout,
+    )
+    response.raise_for_status()
+    return _llm_key(None)
+
+
+_WARMERS: Dict[str, Callable[[], tuple]] = {"embedder": _warm_embedder, "ocr": _warm_ocr, "llm": _warm_llm}
+
+
+def warmup_kinds(value: str | None = None) -> List[str]:
+    """Interpreta MODEL_WARMUP: vazio/0 = nenhum, 1/all = todos, ou lista (embedder,ocr,llm)."""
+    raw = (os.getenv("MODEL_WARMUP", "") if value is None else value).strip().lower()
+    if raw in ("", "0", "false", "no"):
+        return []
+    if raw in ("1", "true", "yes", "all"):
+        return list(WARMUP_KINDS)
+    kinds = [k.strip() for k in raw.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in WARMUP_KINDS]
+    if unknown:
+        raise ValueError(f"MODEL_WARMUP desconhecido: {', '.join(unknown)} (use {', '.join(WARMUP_KINDS)})")
+    return kinds
+
+
+def warm_up(kinds: List[str] | None = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Carrega os modelos e faz uma inferência descartável em cada um, para que a
+    primeira requisição não pague carga de pesos/compilação do grafo.
+
+    Falhas (dependência ausente, Ollama fora do ar) são registradas e não propagam.
+    """
+    kinds = warmup_kinds() if kinds is None else kinds
+    report: Dict[str, Dict[str, Any]] = {}
+    for kind in kinds:
+        t0 = time.perf_counter()
+        with span("model.warmup", kind=kind) as s:
+            try:
+                key = _WARMERS[kind]()
+            except Exception as e:
+                s.set(error=f"{type(e).__name__}: {e}")
+                logger.warning("Warm-up de %s falhou: %s", kind, e)
+                report[kind] = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                continue
+        ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        if registry_enabled():
+            REGISTRY._mark(key, warmup_ms=ms)
+        report[kind] = {"ok": True, "ms": ms}
+    return report
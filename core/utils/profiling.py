@@ -0,0 +1,101 @@
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from core.utils.tracing import set_attrs
+
+
+DEFAULT_PROFILE_DIR = Path("data/processed/profiles")
+
+_seq = itertools.count(1)
+# cProfile é um por processo na prática (setprofile global da thread + custo alto): um de cada vez
+_cprofile_lock = threading.Lock()
+
+
+def profile_mode() -> str | None:
+    """
+    PROFILE: vazio/0 desliga; "cprofile" ou "pyinstrument"; 1/auto usa pyinstrument se
+    estiver instalado, senão cProfile.
+    """
+    raw = str(os.getenv("PROFILE", "")).strip().lower()
+    if raw in ("", "0", "false", "no", "off"):
+        return None
+    if raw in ("cprofile", "pyinstrument"):
+        return raw
+    try:
+        import pyinstrument  # noqa: F401
+
+        return "pyinstrument"
+    except ImportError:
+        return "cprofile"
+
+
+def _out_path(label: str, suffix: str) -> Path:
+    out_dir = Path(os.getenv("PROFILE_DIR") or DEFAULT_PROFILE_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    safe = re.sub(r"[^\w.-]+", "_", label).strip("_") or "profile"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return out_dir / f"{safe}-{stamp}-{os.getpid()}-{next(_seq)}{suffix}"
+
+
+@contextmanager
+def profile(label: str) -> Iterator[None]:
+    """
+    Perfil opcional do bloco (uma requisição/execução do pipeline) gravado em PROFILE_DIR:
+    `.prof` (cProfile; abrir com `python -m pstats` ou snakeviz) ou `.html` (pyinstrument).
+
+    O caminho do arquivo vai para o span atual (`profile`). Desligado (default), é só um yield.
+    cProfile só mede a thread que abriu o bloco e roda um por vez; execuções concorrentes
+    seguem sem perfil.
+    """
+    mode = profile_mode()
+    if mode is None:
+        yield
+        return
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            mode = "cprofile"
+
+    if mode == "pyinstrument":
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            try:
+                path = _out_path(label, ".html")
+                path.write_text(profiler.output_html(), encoding="utf-8")
+                set_attrs(profile=str(path))
+            except Exception:
+                pass
+        return
+
+    import cProfile
+
+    if not _cprofile_lock.acquire(blocking=False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            try:
+                path = _out_path(label, ".prof")
+                profiler.dump_stats(str(path))
+                set_attrs(profile=str(path))
+            except Exception:
+                pass
+    finally:
+        _cprofile_lock.release()
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+
+R = TypeVar("R")
+
+
+class SingleFlight:
+    """
+    Deduplica trabalho em andamento por chave, dentro do processo.
+
+    Enquanto `fn` roda para uma chave, outras chamadas com a mesma chave esperam e
+    recebem o mesmo resultado (ou a mesma exceção) em vez de repetir o trabalho.
+    Nada fica guardado depois que a chamada termina: o cache de verdade continua
+    sendo o banco/disco, então `fn` deve reconsultá-lo antes de calcular.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[..., R], *args: Any, **kwargs: Any) -> Tuple[R, bool]:
+        """Executa fn(*args, **kwargs) uma vez por chave em andamento. Retorna (resultado, compartilhado)."""
+        with self._lock:
+            self.calls += 1
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+            else:
+                self.shared += 1
+
+        if not leader:
+            return fut.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "inflight": len(self._inflight)}
+
+
+# Grupos compartilhados pelo processo (API, jobs e pipeline usam as mesmas chaves)
+document_flight = SingleFlight("document")
+match_flight = SingleFlight("match")
+embedding_flight = SingleFlight("embedding")
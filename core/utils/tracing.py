@@ -0,0 +1,100 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List
+
+from core.utils.metrics import REGISTRY
+
+
+# Atributos numéricos de volume que viram contadores por etapa (além de ficarem no span)
+IO_ATTRS = ("bytes_in", "bytes_out", "chars_in", "chars_out", "tokens_in", "tokens_out", "items_in", "items_out")
+
+STAGE_SECONDS = REGISTRY.histogram("matchllm_stage_duration_seconds", "Duração de cada etapa/span, em segundos.")
+STAGE_TOTAL = REGISTRY.counter("matchllm_stage_total", "Spans finalizados por etapa, status (ok/error) e cache (hit/miss).")
+STAGE_IO = REGISTRY.counter("matchllm_stage_io_total", "Volume processado por etapa (bytes/chars/tokens/itens de entrada e saída).")
+
+_current: ContextVar["Span | None"] = ContextVar("matchllm_span", default=None)
+
+
+class Span:
+    """
+    Um trecho cronometrado do pipeline (ex.: "ocr", "llm.generate"), com filhos aninhados.
+
+    `attrs` guarda volume (bytes/chars/tokens in/out), `cached` e o que mais a etapa
+    informar; `to_dict()` é o que vai no resultado (`result["trace"]`).
+    """
+
+    __slots__ = ("name", "attrs", "children", "start", "duration_ms", "_lock")
+
+    def __init__(self, name: str, attrs: Dict[str, Any] | None = None):
+        self.name = name
+        self.attrs: Dict[str, Any] = dict(attrs or {})
+        self.children: List["Span"] = []
+        self.start = time.perf_counter()
+        self.duration_ms: float | None = None
+        # filhos podem terminar em threads diferentes (map_ordered propaga o contexto)
+        self._lock = threading.Lock()
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def _add_child(self, child: "Span") -> None:
+        with self._lock:
+            self.children.append(child)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            children = sorted(self.children, key=lambda s: s.start)
+        out: Dict[str, Any] = {"name": self.name, "duration_ms": self.duration_ms}
+        if self.attrs:
+            out["attrs"] = dict(self.attrs)
+        if children:
+            out["children"] = [c.to_dict() for c in children]
+        return out
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def set_attrs(**attrs: Any) -> None:
+    """Anota o span atual (no-op sem span ativo)."""
+    s = _current.get()
+    if s is not None:
+        s.set(**attrs)
+
+
+def _record(s: Span, status: str) -> None:
+    seconds = (s.duration_ms or 0.0) / 1000.0
+    STAGE_SECONDS.observe(seconds, stage=s.name)
+    cached = s.attrs.get("cached")
+    STAGE_TOTAL.inc(stage=s.name, status=status, cache="hit" if cached else "miss")
+    for attr in IO_ATTRS:
+        v = s.attrs.get(attr)
+        if isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0:
+            STAGE_IO.inc(v, stage=s.name, kind=attr)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """
+    Abre um span filho do atual (ou raiz, se não houver). Ao sair registra a duração,
+    vira filho do pai e alimenta as métricas de /metrics. Exceções marcam `error`.
+    """
+    parent = _current.get()
+    s = Span(name, attrs)
+    token = _current.set(s)
+    status = "ok"
+    try:
+        yield s
+    except BaseException as e:
+        status = "error"
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        s.duration_ms = round((time.perf_counter() - s.start) * 1000.0, 2)
+        _current.reset(token)
+        if parent is not None:
+            parent._add_child(s)
+        _record(s, status)
@@ -0,0 +1,248 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+import numpy as np
+
+
+# Metadados por chunk em colunas fixas (mmap); seções ficam numa tabela de nomes no header
+META_DTYPE = np.dtype(
+    [
+        ("page", "<i4"),        # página (0-based) onde o chunk começa; -1 = desconhecida
+        ("char_start", "<i8"),  # posição no texto completo do documento
+        ("char_end", "<i8"),
+        ("section", "<i4"),     # índice em header["sections"]; -1 = sem seção
+    ]
+)
+
+STORE_SUFFIX = ".chunks"
+FORMAT_VERSION = 1
+
+
+def allow_legacy_pickle() -> bool:
+    """Leitura de listas pickle antigas só com CHUNKSTORE_ALLOW_PICKLE=1 (pickle executa código)."""
+    return str(os.getenv("CHUNKSTORE_ALLOW_PICKLE", "0")).lower() in ("1", "true", "yes")
+
+
+class ChunkStore:
+    """
+    Armazenamento colunar de chunks, somente leitura, mapeado em memória.
+
+    Diretório <nome>.chunks/:
+    - header.json  -> {"version", "count", "sections": [...], "extra": {...}}
+    - offsets.npy  -> int64 (count + 1): início de cada chunk no blob
+    - text.bin     -> UTF-8 de todos os chunks concatenados
+    - meta.npy     -> META_DTYPE (count): página, span de caracteres, seção
+    - ids.npy      -> int64 (count), opcional (ids do VectorIndex)
+
+    Abrir custa O(1): nada é decodificado até um chunk ser acessado.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        header_path = self.path / "header.json"
+        if not header_path.exists():
+            raise FileNotFoundError(f"ChunkStore não encontrado: {self.path}")
+        self.header = json.loads(header_path.read_text(encoding="utf-8"))
+        if int(self.header.get("version", 0)) != FORMAT_VERSION:
+            raise ValueError(f"Versão de ChunkStore não suportada: {self.header.get('version')}")
+
+        self._offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        self._meta = np.load(self.path / "meta.npy", mmap_mode="r")
+        ids_path = self.path / "ids.npy"
+        self._ids = np.load(ids_path, mmap_mode="r") if ids_path.exists() else None
+        blob_path = self.path / "text.bin"
+        # np.memmap não aceita arquivo vazio
+        self._blob = (
+            np.memmap(blob_path, dtype=np.uint8, mode="r") if blob_path.stat().st_size else np.empty(0, np.uint8)
+        )
+        self.sections: List[str] = list(self.header.get("sections") or [])
+        self.extra: dict = dict(self.header.get("extra") or {})
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+    @classmethod
+    def write(
+        cls,
+        path: str | Path,
+        chunks: Sequence[str],
+        *,
+        pages: Sequence[int] | None = None,
+        spans: Sequence[tuple[int, int]] | None = None,
+        sections: Sequence[str | None] | None = None,
+        ids: Sequence[int] | None = None,
+        extra: dict | None = None,
+    ) -> "ChunkStore":
+        """Grava atomicamente (diretório temporário + rename) e devolve o store aberto."""
+        path = Path(path)
+        n = len(chunks)
+        encoded = [(c or "").encode("utf-8") for c in chunks]
+        offsets = np.zeros(n + 1, dtype="<i8")
+        if n:
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+
+        meta = np.zeros(n, dtype=META_DTYPE)
+        meta["page"] = -1
+        meta["section"] = -1
+        if pages is not None:
+            meta["page"] = [(-1 if p is None else int(p)) for p in pages]
+        if spans is not None:
+            meta["char_start"] = [int(s) for s, _ in spans]
+            meta["char_end"] = [int(e) for _, e in spans]
+        section_names: List[str] = []
+        if sections is not None:
+            lookup: dict[str, int] = {}
+            col = []
+            for name in sections:
+                if not name:
+                    col.append(-1)
+                    continue
+                if name not in lookup:
+                    lookup[name] = len(section_names)
+                    section_names.append(name)
+                col.append(lookup[name])
+            meta["section"] = col
+
+        tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        with open(tmp / "text.bin", "wb") as f:
+            for b in encoded:
+                f.write(b)
+        np.save(tmp / "offsets.npy", offsets)
+        np.save(tmp / "meta.npy", meta)
+        if ids is not None:
+            np.save(tmp / "ids.npy", np.asarray(list(ids), dtype="<i8"))
+        header = {"version": FORMAT_VERSION, "count": n, "sections": section_names, "extra": extra or {}}
+        (tmp / "header.json").write_text(json.dumps(header, ensure_ascii=False), encoding="utf-8")
+
+        if path.exists():
+            old = path.with_name(f"{path.name}.old{os.getpid()}")
+            path.rename(old)
+            tmp.rename(path)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            tmp.rename(path)
+        return cls(path)
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0]) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def head(self, n: int) -> List[str]:
+        return self[: max(0, int(n))]
+
+    @property
+    def ids(self) -> np.ndarray | None:
+        return self._ids
+
+    def meta(self, i: int) -> dict:
+        row = self._meta[i]
+        sec = int(row["section"])
+        page = int(row["page"])
+        return {
+            "page": page if page >= 0 else None,
+            "char_start": int(row["char_start"]),
+            "char_end": int(row["char_end"]),
+            "section": self.sections[sec] if sec >= 0 else None,
+        }
+
+
+# ----------------------------------------------------------------------
+# Chunks de edital no vectorstore (data/processed/vectorstore)
+# ----------------------------------------------------------------------
+def edital_store_path(vector_dir: str | Path, edital_id: int) -> Path:
+    return Path(vector_dir) / f"edital_{int(edital_id)}{STORE_SUFFIX}"
+
+
+def _legacy_pickle_path(vector_dir: str | Path, edital_id: int) -> Path:
+    return Path(vector_dir) / f"edital_{int(edital_id)}_index.pkl"
+
+
+def edital_chunks_exist(vector_dir: str | Path, edital_id: int) -> bool:
+    return (edital_store_path(vector_dir, edital_id) / "header.json").exists() or _legacy_pickle_path(
+        vector_dir, edital_id
+    ).exists()
+
+
+def open_edital_chunks(vector_dir: str | Path, edital_id: int):
+    """
+    Abre os chunks do edital. Retorna um ChunkStore (ou lista, para pickle legado
+    com CHUNKSTORE_ALLOW_PICKLE=1). Lança FileNotFoundError se não houver índice.
+    """
+    store_path = edital_store_path(vector_dir, edital_id)
+    if (store_path / "header.json").exists():
+        return ChunkStore(store_path)
+
+    legacy = _legacy_pickle_path(vector_dir, edital_id)
+    if not legacy.exists():
+        raise FileNotFoundError("Índice do edital não encontrado")
+    if not allow_legacy_pickle():
+        raise FileNotFoundError(
+            f"Índice do edital em formato pickle legado ({legacy.name}); "
+            "rode scripts/migrate_chunk_stores.py ou defina CHUNKSTORE_ALLOW_PICKLE=1"
+        )
+    return read_legacy_chunks(vector_dir, edital_id)
+
+
+def read_legacy_chunks(vector_dir: str | Path, edital_id: int) -> List[str]:
+    """
+    Lê o formato antigo. Há duas variantes em disco:
+    - edital_<id>_index.pkl com a lista de chunks em pickle (process_edital)
+    - edital_<id>_index.pkl com um índice FAISS e a lista em edital_<id>_chunks.pkl (VectorIndex.save)
+    Só use com arquivos gerados localmente: pickle executa código ao carregar.
+    """
+    import pickle
+
+    legacy = _legacy_pickle_path(vector_dir, edital_id)
+    with open(legacy, "rb") as f:
+        magic = f.read(3)
+    src = legacy
+    if magic == b"IxF":
+        src = Path(vector_dir) / f"edital_{int(edital_id)}_chunks.pkl"
+        if not src.exists():
+            return []
+    with open(src, "rb") as f:
+        data = pickle.load(f)
+    return [str(c) for c in data] if isinstance(data, list) else []
+
+
+def list_edital_ids(vector_dir: str | Path) -> List[int]:
+    """ids de editais com chunks gravados (novo formato ou pickle legado)."""
+    vector_dir = Path(vector_dir)
+    ids: set[int] = set()
+    if not vector_dir.exists():
+        return []
+    for fp in vector_dir.glob(f"edital_*{STORE_SUFFIX}"):
+        try:
+            ids.add(int(fp.name[len("edital_"):-len(STORE_SUFFIX)]))
+        except Exception:
+            continue
+    for fp in vector_dir.glob("edital_*_index.pkl"):
+        try:
+            ids.add(int(fp.name.replace("edital_", "").replace("_index.pkl", "")))
+        except Exception:
+            continue
+    return sorted(ids)
+
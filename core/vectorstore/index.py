@@ -1,67 +1,366 @@
-import faiss
+import os
 import numpy as np
-import pickle 
-from typing import List
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List
+
+from core.utils.lazy import lazy_import
+from core.vectorstore.chunk_store import ChunkStore, allow_legacy_pickle
+
+# faiss (~150 ms) só é carregado quando um índice é criado/lido
+faiss = lazy_import("faiss")
+
+# Tipos de índice suportados:
+# - flat_ip: produto interno exato sobre vetores normalizados (= cosseno); bom até ~100k vetores
+# - hnsw:    grafo HNSW (aproximado, sem treino); remoção via tombstones
+# - ivfpq:   IVF + Product Quantization (aproximado, exige treino, pouca memória)
+# - flat_l2: distância L2 exata (comportamento antigo; mantido para índices legados)
+INDEX_KINDS = ("flat_ip", "hnsw", "ivfpq", "flat_l2")
+
+
+@dataclass
+class SearchHit:
+    id: int
+    score: float
+    chunk: str | None
+
+
+def _as_matrix(vectors, dim: int) -> np.ndarray:
+    """Normaliza a entrada para uma matriz 2D (n, d) float32 contígua."""
+    if isinstance(vectors, np.ndarray):
+        arr = vectors.astype("float32", copy=False)
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+    else:
+        rows = [np.asarray(v, dtype="float32").reshape(1, -1) for v in vectors]
+        arr = np.vstack(rows) if rows else np.empty((0, dim), dtype="float32")
+    return np.ascontiguousarray(arr)
+
+
+class _ChunkPayload(MutableMapping):
+    """
+    id -> chunk. Chunks vindos de um ChunkStore ficam no mmap e só viram str
+    quando lidos; os adicionados depois ficam em memória.
+    """
+
+    def __init__(self, store: ChunkStore | None = None):
+        self._store = store
+        self._rows: dict[int, int] = {}
+        if store is not None:
+            ids = store.ids if store.ids is not None else np.arange(len(store))
+            self._rows = {int(i): r for r, i in enumerate(ids.tolist())}
+        self._mem: dict[int, str | None] = {}
+
+    def __getitem__(self, i: int):
+        if i in self._mem:
+            return self._mem[i]
+        return self._store[self._rows[i]]
+
+    def __setitem__(self, i: int, value) -> None:
+        self._rows.pop(i, None)
+        self._mem[i] = value
+
+    def __delitem__(self, i: int) -> None:
+        if i in self._mem:
+            del self._mem[i]
+        else:
+            del self._rows[i]
+
+    def __contains__(self, i) -> bool:
+        return i in self._mem or i in self._rows
+
+    def __iter__(self):
+        yield from self._rows
+        yield from self._mem
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._mem)
+
 
 class VectorIndex:
     """
     Indexador vetorial usando FAISS
     Guarda:
-    - o índice FAISS
-    - lista de chunks associados a cada vetor
+    - o índice FAISS (sempre embrulhado em IndexIDMap2, ids int64 estáveis)
+    - o chunk associado a cada id
+
+    Por padrão usa similaridade de cosseno (produto interno sobre vetores
+    normalizados), igual ao DenseRetriever do pipeline. Scores retornados
+    são sempre "maior = mais parecido" (no flat_l2 o score é -distância).
     """
 
-    def __init__(self, dim: int = 768):
-        self.index = faiss.IndexFlatL2(dim)
-        self.chunks: List[str] = []
+    def __init__(
+        self,
+        dim: int = 768,
+        kind: str | None = None,
+        *,
+        hnsw_m: int = 32,
+        ef_search: int | None = None,
+        nlist: int | None = None,
+        nprobe: int | None = None,
+        pq_m: int | None = None,
+    ):
+        kind = (kind or os.getenv("VECTOR_INDEX_KIND", "flat_ip")).strip().lower()
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Tipo de índice desconhecido: {kind} (use um de {INDEX_KINDS})")
+        self.kind = kind
+        self.dim = int(dim)
+        self.hnsw_m = int(hnsw_m)
+        self.ef_search = int(ef_search or os.getenv("VECTOR_HNSW_EF_SEARCH", "64"))
+        self.nlist = nlist
+        self.nprobe = int(nprobe or os.getenv("VECTOR_IVF_NPROBE", "16"))
+        self.pq_m = pq_m
+
+        self._payload = _ChunkPayload()
+        self._deleted: set[int] = set()
+        self._next_id = 0
+        # Prefixo usado ao embedar os chunks ("passage: " no E5; "" = texto cru, como os índices antigos)
+        self.passage_prefix = ""
+        self.index = self._build(self.dim) if kind != "ivfpq" else None
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+    @property
+    def normalize(self) -> bool:
+        return self.kind != "flat_l2"
+
+    def _build(self, dim: int, train: np.ndarray | None = None):
+        if self.kind == "flat_l2":
+            base = faiss.IndexFlatL2(dim)
+        elif self.kind == "flat_ip":
+            base = faiss.IndexFlatIP(dim)
+        elif self.kind == "hnsw":
+            base = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efSearch = self.ef_search
+        else:
+            base = self._build_ivfpq(dim, train)
+        return faiss.IndexIDMap2(base)
+
+    def _build_ivfpq(self, dim: int, train: np.ndarray | None):
+        n = 0 if train is None else train.shape[0]
+        if n < 256:
+            print(f"VectorIndex: {n} vetores não bastam para treinar IVF-PQ; usando flat_ip")
+            self.kind = "flat_ip"
+            return faiss.IndexFlatIP(dim)
+        # k-means do FAISS quer ~39 pontos por centróide (listas IVF e codebooks PQ)
+        per_centroid = max(1, n // 39)
+        nlist = self.nlist or max(1, min(4096, int(4 * np.sqrt(n)), per_centroid))
+        nbits = 8 if per_centroid >= 256 else max(4, int(np.log2(max(16, per_centroid))))
+        pq_m = self.pq_m or next(m for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1) if dim % m == 0)
+        quantizer = faiss.IndexFlatIP(dim)
+        base = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, nbits, faiss.METRIC_INNER_PRODUCT)
+        base.train(train)
+        base.nprobe = min(self.nprobe, nlist)
+        return base
+
+    def _prepare(self, vectors) -> np.ndarray:
+        arr = _as_matrix(vectors, self.dim)
+        if self.normalize and arr.size:
+            arr = arr.copy()
+            faiss.normalize_L2(arr)
+        return arr
 
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
     def add(self, embeddings, chunks: list[str]):
         """
-        Adiciona embeddings e chunks ao índice
+        Adiciona embeddings e chunks ao índice (ids sequenciais automáticos)
         embeddings: matriz numpy de vetores
         chunks: lista de strings correspondentes
         """
-        # Normaliza para uma matriz 2D (n, d) de float32
-        if isinstance(embeddings, np.ndarray):
-            arr = embeddings.astype('float32')
-            if arr.ndim == 1:
-                arr = arr.reshape(1, -1)
+        arr = _as_matrix(embeddings, self.dim)
+        ids = np.arange(self._next_id, self._next_id + arr.shape[0], dtype="int64")
+        self.add_with_ids(arr, ids, chunks)
+        return ids
+
+    def add_with_ids(self, embeddings, ids: Iterable[int], chunks: list[str] | None = None):
+        """
+        Adiciona vetores com ids explícitos (ex.: id do chunk no banco).
+        Um id já existente é substituído.
+        """
+        arr = self._prepare(embeddings)
+        ids = np.asarray(list(ids), dtype="int64")
+        if arr.shape[0] != ids.shape[0]:
+            raise ValueError(f"{arr.shape[0]} vetores para {ids.shape[0]} ids")
+        if chunks is not None and len(chunks) != ids.shape[0]:
+            raise ValueError(f"{len(chunks)} chunks para {ids.shape[0]} ids")
+        if arr.shape[0] == 0:
+            return
+
+        cur_dim = arr.shape[1]
+        if self.index is None or (self.index.d != cur_dim and self.index.ntotal == 0):
+            # Recria índice com dimensão correta (IVF-PQ treina com o primeiro lote)
+            self.dim = cur_dim
+            self.index = self._build(cur_dim, train=arr)
+        elif self.index.d != cur_dim:
+            raise ValueError(f"Dimensão {cur_dim} incompatível com o índice ({self.index.d})")
+
+        existing = [int(i) for i in ids if int(i) in self._payload]
+        if existing:
+            self.remove(existing)
+        if self.kind == "hnsw" and self._deleted.intersection(ids.tolist()):
+            # O vetor antigo ainda está no grafo: compacta antes de reusar o id
+            self.rebuild()
+
+        self.index.add_with_ids(arr, ids)
+        for k, i in enumerate(ids.tolist()):
+            self._payload[i] = chunks[k] if chunks is not None else None
+        self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Remove ids do índice; retorna quantos existiam."""
+        ids = [int(i) for i in ids if int(i) in self._payload]
+        if not ids:
+            return 0
+        if self.kind == "hnsw":
+            # HNSW não suporta remoção física: filtra na busca e limpa no rebuild()
+            self._deleted.update(ids)
         else:
-            # lista de vetores -> empilha
-            emb_list = [np.asarray(e, dtype='float32').reshape(1, -1) for e in embeddings]
-            arr = np.vstack(emb_list) if len(emb_list) > 0 else np.empty((0, self.index.d), dtype='float32')
+            self.index.remove_ids(np.asarray(ids, dtype="int64"))
+        for i in ids:
+            self._payload.pop(i, None)
+        return len(ids)
+
+    def rebuild(self) -> None:
+        """Reconstrói o índice só com os ids vivos (compacta tombstones do HNSW)."""
+        if self.index is None or not self._deleted:
+            return
+        live = np.asarray(sorted(self._payload), dtype="int64")
+        vecs = np.vstack([self.index.reconstruct(int(i)) for i in live]) if len(live) else None
+        self._deleted.clear()
+        self.index = self._build(self.dim, train=vecs)
+        if vecs is not None:
+            self.index.add_with_ids(vecs, live)
+
+    def __len__(self) -> int:
+        return len(self._payload)
 
-        cur_dim = arr.shape[1] if arr.size > 0 else self.index.d
+    def get_chunk(self, id: int) -> str | None:
+        return self._payload.get(int(id))
 
-        if hasattr(self.index, 'd') and self.index.d != cur_dim:
-            # Recria índice com dimensão correta
-            self.index = faiss.IndexFlatL2(cur_dim)
+    @property
+    def chunks(self) -> List[str]:
+        """Chunks vivos em ordem de id (compatível com a lista antiga)."""
+        return [self._payload[i] for i in sorted(self._payload)]
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+    def search_batch(self, query_embeddings, top_k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Busca em lote: retorna (scores, ids), ambos (n_queries, top_k).
+        Posições sem resultado têm id -1 e score -inf.
+        """
+        q = self._prepare(query_embeddings)
+        nq = q.shape[0]
+        empty = (np.full((nq, top_k), -np.inf, dtype="float32"), np.full((nq, top_k), -1, dtype="int64"))
+        if self.index is None or self.index.ntotal == 0 or top_k <= 0 or nq == 0:
+            return empty
+
+        # Com tombstones, busca mais candidatos para ainda sobrar top_k vivos
+        k = min(self.index.ntotal, top_k + len(self._deleted))
+        dist, ids = self.index.search(q, k)
+        scores = -dist if self.kind == "flat_l2" else dist
+
+        if not self._deleted:
+            if k < top_k:
+                out_s, out_i = empty
+                out_s[:, :k], out_i[:, :k] = scores, ids
+                out_s[out_i < 0] = -np.inf
+                return out_s, out_i
+            scores[ids < 0] = -np.inf
+            return scores, ids
+
+        out_s, out_i = empty
+        for r in range(nq):
+            keep = [(s, i) for s, i in zip(scores[r], ids[r]) if i >= 0 and i not in self._deleted][:top_k]
+            for c, (s, i) in enumerate(keep):
+                out_s[r, c], out_i[r, c] = s, i
+        return out_s, out_i
+
+    def search_scored(self, query_embedding, top_k: int = 5) -> List[SearchHit]:
+        """Busca top_k para uma consulta retornando id, score e chunk."""
+        scores, ids = self.search_batch(query_embedding, top_k)
+        return [
+            SearchHit(id=int(i), score=float(s), chunk=self._payload.get(int(i)))
+            for s, i in zip(scores[0], ids[0])
+            if i >= 0
+        ]
 
-        if arr.shape[0] > 0:
-            self.index.add(arr)
-        self.chunks.extend(chunks)
-    
     def search(self, query_embedding, top_k: int = 5) -> List[str]:
         """
         Busca top_k chunks mais proximos do embedding de consulta
         """
+        return [h.chunk for h in self.search_scored(query_embedding, top_k) if h.chunk is not None]
 
-        query_embedding = np.array([query_embedding]).astype('float32')
-        distances, ids = self.index.search(query_embedding, top_k)
-        return [self.chunks[i] for i in ids[0] if i < len(self.chunks)]
-
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
     def save(self, index_path : str, chunks_path : str):
         """
         Salva o índice FAISS e os chunks em arquivos separados
+        chunks_path vira um diretório ChunkStore (colunar, lido via mmap).
         """
+        if self.index is None:
+            self.index = self._build(self.dim) if self.kind != "ivfpq" else faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
         faiss.write_index(self.index, index_path)
-        with open(chunks_path, 'wb') as f:
-            pickle.dump(self.chunks, f)
+        ids = sorted(self._payload)
+        ChunkStore.write(
+            chunks_path,
+            [self._payload[i] or "" for i in ids],
+            ids=ids,
+            extra={
+                "kind": self.kind,
+                "dim": self.dim,
+                "deleted": sorted(self._deleted),
+                "next_id": self._next_id,
+                "passage_prefix": self.passage_prefix,
+            },
+        )
 
     def load(self, index_path : str, chunks_path : str):
         """
         Carrega indice FAISS + chunks de disco
+        Aceita também o formato antigo (IndexFlatL2 + lista de chunks em pickle),
+        desde que CHUNKSTORE_ALLOW_PICKLE=1.
         """
-        self.index = faiss.read_index(index_path)
+        index = faiss.read_index(index_path)
+
+        if (Path(chunks_path) / "header.json").exists():
+            store = ChunkStore(chunks_path)
+            extra = store.extra
+            self.index = index
+            self.kind = extra.get("kind", self.kind)
+            self.dim = int(extra.get("dim", index.d))
+            self._payload = _ChunkPayload(store)
+            self._deleted = set(extra.get("deleted") or [])
+            self._next_id = int(extra.get("next_id", len(self._payload)))
+            self.passage_prefix = str(extra.get("passage_prefix") or "")
+            return
+
+        if not allow_legacy_pickle():
+            raise ValueError(
+                f"{chunks_path} está no formato pickle legado; defina CHUNKSTORE_ALLOW_PICKLE=1 para carregar "
+                "(e salve de novo para migrar)"
+            )
+        import pickle
+
         with open(chunks_path, 'rb') as f:
-            self.chunks = pickle.load(f)
\ No newline at end of file
+            chunks = list(pickle.load(f) or [])
+
+        # Formato legado: ids implícitos 0..n-1 e métrica L2
+        self.kind = "flat_l2"
+        self.dim = index.d
+        vecs = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+        self.index = self._build(self.dim, train=vecs)
+        self._payload = _ChunkPayload()
+        for i, c in enumerate(chunks):
+            self._payload[i] = c
+        self._deleted = set()
+        self._next_id = max(len(chunks), index.ntotal)
+        self.passage_prefix = ""
+        if vecs is not None:
+            self.index.add_with_ids(vecs, np.arange(index.ntotal, dtype="int64"))
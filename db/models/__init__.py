@@ -11,7 +11,7 @@ from db.models.produtos import Produto  # noqa: F401
 # Tabelas auxiliares (podem não existir em branches antigos)
 from db.models.editais import Edital  # noqa: F401
 from db.models.matches import Match  # noqa: F401
-from db.models.cache import DocumentCache, MatchCache  # noqa: F401
+from db.models.cache import DocumentCache, MatchCache, LLMCache  # noqa: F401
 
 # Auth
 from db.models.users import User  # noqa: F401
@@ -42,3 +42,17 @@ class MatchCache(Base):
             name="uq_match_cache_pair_settings",
         ),
     )
+
+
+class LLMCache(Base):
+    """Respostas do LLM por (modelo, options, format, hash do prompt)."""
+
+    __tablename__ = "llm_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+    model = Column(Text, nullable=True)
+    response = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import Any, Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from db.models.cache import DocumentCache, MatchCache
+from db.models.cache import DocumentCache, LLMCache, MatchCache
 
 
 def get_document_cache(
@@ -53,7 +55,21 @@ def upsert_document_cache(
         meta_json=meta_json,
     )
     db.add(rec)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Outro processo/sessão inseriu a mesma chave entre o get e o commit: atualiza a linha dele
+        db.rollback()
+        rec = get_document_cache(db, doc_type=doc_type, sha256=sha256, hint_key=hint_key)
+        if rec is None:
+            raise
+        rec.extracted_json = extracted_json
+        if original_name:
+            rec.original_name = original_name
+        if meta_json is not None:
+            rec.meta_json = meta_json
+        db.add(rec)
+        db.commit()
     db.refresh(rec)
     return rec
 
@@ -108,6 +124,75 @@ def upsert_match_cache(
         meta_json=meta_json,
     )
     db.add(rec)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Mesma corrida do upsert_document_cache: a linha já existe, atualiza
+        db.rollback()
+        rec = get_match_cache(
+            db,
+            edital_sha256=edital_sha256,
+            produto_sha256=produto_sha256,
+            settings_sig=settings_sig,
+        )
+        if rec is None:
+            raise
+        rec.result_json = result_json
+        if meta_json is not None:
+            rec.meta_json = meta_json
+        db.add(rec)
+        db.commit()
+    db.refresh(rec)
+    return rec
+
+
+def _as_utc(dt: datetime | None) -> datetime | None:
+    # SQLite devolve datetimes "naive" mesmo com timezone=True
+    if dt is None:
+        return None
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def get_llm_cache(db: Session, *, cache_key: str) -> LLMCache | None:
+    """Retorna a resposta cacheada se existir e não estiver expirada."""
+    rec = db.query(LLMCache).filter_by(cache_key=cache_key).first()
+    if rec is None:
+        return None
+    expires = _as_utc(rec.expires_at)
+    if expires is not None and expires <= datetime.now(timezone.utc):
+        return None
+    return rec
+
+
+def upsert_llm_cache(
+    db: Session,
+    *,
+    cache_key: str,
+    response: str,
+    model: str | None = None,
+    expires_at: datetime | None = None,
+) -> LLMCache:
+    size = len(response.encode("utf-8"))
+    rec = db.query(LLMCache).filter_by(cache_key=cache_key).first()
+    if rec:
+        rec.response = response
+        rec.model = model
+        rec.size_bytes = size
+        rec.expires_at = expires_at
+    else:
+        rec = LLMCache(cache_key=cache_key, model=model, response=response, size_bytes=size, expires_at=expires_at)
+    db.add(rec)
     db.commit()
     db.refresh(rec)
     return rec
+
+
+def purge_expired_llm_cache(db: Session) -> int:
+    """Remove entradas expiradas; retorna quantas foram apagadas."""
+    n = (
+        db.query(LLMCache)
+        .filter(LLMCache.expires_at.isnot(None), LLMCache.expires_at <= datetime.now(timezone.utc))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return int(n or 0)
@@ -1,6 +1,19 @@
 from db.models.produtos import Produto
 
 
+# Incrementado a cada escrita em `produtos` neste processo (invalida índices do catálogo em memória)
+_catalog_version = 0
+
+
+def catalog_version() -> int:
+    return _catalog_version
+
+
+def _bump_catalog_version() -> None:
+    global _catalog_version
+    _catalog_version += 1
+
+
 def get_or_create(
     db,
     *,
@@ -35,6 +48,7 @@ def get_or_create(
             db.add(produto)
             db.commit()
             db.refresh(produto)
+            _bump_catalog_version()
         return produto
 
     produto = Produto(
@@ -44,4 +58,5 @@ def get_or_create(
     db.add(produto)
     db.commit()
     db.refresh(produto)
+    _bump_catalog_version()
     return produto
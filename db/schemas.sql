@@ -51,6 +51,17 @@ CREATE TABLE IF NOT EXISTS match_cache (
 CREATE UNIQUE INDEX IF NOT EXISTS uq_match_cache_pair_settings
     ON match_cache (edital_sha256, produto_sha256, settings_sig);
 
+-- Cache de respostas do LLM (geração determinística, temperature=0)
+CREATE TABLE IF NOT EXISTS llm_cache (
+    id BIGSERIAL PRIMARY KEY,
+    cache_key VARCHAR(64) NOT NULL UNIQUE,
+    model TEXT,
+    response TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP
+);
+
 -- =========================
 -- AUTH
 -- =========================
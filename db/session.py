@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+import threading
 import time
 import logging
 
@@ -32,10 +33,14 @@ if load_dotenv is not None:
         pass
 
 
-def _default_sqlite_url() -> str:
+def _default_sqlite_path() -> Path:
     db_path = _repo_root() / "data" / "matchllm.sqlite"
     db_path.parent.mkdir(parents=True, exist_ok=True)
+    return db_path
 
+
+def _migrate_legacy_sqlite(db_path: Path) -> Path:
+    """Devolve o caminho do SQLite a usar (o mesmo, ou matchllm_v2.sqlite se o backup falhar)."""
     # Migração simples (dev): se o SQLite já existe com schema antigo, faz backup.
     # No Windows, pode falhar renomear/apagar se outro processo estiver com o arquivo aberto;
     # nesse caso, usamos um novo arquivo (matchllm_v2.sqlite) para destravar.
@@ -104,15 +109,14 @@ def _default_sqlite_url() -> str:
                 except Exception:
                     pass
     except Exception:
-        # Nunca falhar import/boot por causa disso
+        # Nunca falhar o boot por causa disso
         pass
 
-    url = f"sqlite:///{db_path}"
     try:
         logger.info("Using SQLite database at %s", db_path)
     except Exception:
         pass
-    return url
+    return db_path
 
 
 def _postgres_url_from_env() -> str | None:
@@ -132,9 +136,14 @@ def _postgres_url_from_env() -> str | None:
 
 # Prioriza DATABASE_URL. Se não existir e houver POSTGRES_* configurado, monta a URL.
 # Caso contrário, cai para SQLite local.
+# A checagem de schema do SQLite local fica em init_db() (hook de startup), não no import.
 DATABASE_URL = os.getenv("DATABASE_URL")
+_DEFAULT_SQLITE: Path | None = None
+if not DATABASE_URL:
+    DATABASE_URL = _postgres_url_from_env()
 if not DATABASE_URL:
-    DATABASE_URL = _postgres_url_from_env() or _default_sqlite_url()
+    _DEFAULT_SQLITE = _default_sqlite_path()
+    DATABASE_URL = f"sqlite:///{_DEFAULT_SQLITE}"
 
 try:
     logger.info("DATABASE_URL=%s", DATABASE_URL)
@@ -148,6 +157,31 @@ engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+_db_ready = False
+_db_lock = threading.Lock()
+
+
 def init_db():
-    # create tables
-    Base.metadata.create_all(bind=engine)
+    """
+    Prepara o banco uma vez por processo: checagem/backup de schema antigo do SQLite
+    local e criação das tabelas. Chamado no startup da API (e pelas rotas/scripts que
+    usam o banco direto); chamadas seguintes não fazem I/O.
+    """
+    global engine, DATABASE_URL, _db_ready
+    if _db_ready:
+        return
+    with _db_lock:
+        if _db_ready:
+            return
+        if _DEFAULT_SQLITE is not None:
+            # Conexões abertas antes do startup apontariam para o arquivo renomeado
+            engine.dispose()
+            db_path = _migrate_legacy_sqlite(_DEFAULT_SQLITE)
+            if db_path != _DEFAULT_SQLITE:
+                # Arquivo antigo preso por outro processo: passa a usar o DB novo
+                DATABASE_URL = f"sqlite:///{db_path}"
+                engine = create_engine(DATABASE_URL, connect_args=connect_args)
+                SessionLocal.configure(bind=engine)
+        # create tables
+        Base.metadata.create_all(bind=engine)
+        _db_ready = True
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-from core.Pipeline.pipeline import MatchPipeline
+from core.Pipeline.batch import PAIR_DONE, PAIR_ERROR, PAIR_SKIPPED, run_batch
 
 
 REPO_ROOT = Path(__file__).resolve().parent
@@ -69,6 +70,23 @@ def _first_sequence_failure(seq: dict) -> str | None:
     return None
 
 
+def _parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Roda o MatchPipeline em lote (editais x produtos) com checkpoint.")
+    ap.add_argument("--editais-dir", type=Path, default=EDITAIS_DIR, help="Diretório com os PDFs de editais")
+    ap.add_argument(
+        "--produto",
+        type=Path,
+        action="append",
+        help="PDF de produto (repita para vários). Default: um produto de data/produtos",
+    )
+    ap.add_argument("--produtos-dir", type=Path, default=None, help="Usa todos os PDFs deste diretório como produtos")
+    ap.add_argument("--out", type=Path, default=REPO_ROOT / "resultados_e2e_local", help="Diretório de saída")
+    ap.add_argument("--workers", type=int, default=None, help="Processos em paralelo (default: BATCH_WORKERS ou 1)")
+    ap.add_argument("--checkpoint", type=Path, default=None, help="Diretório do checkpoint (default: <out>/.checkpoint)")
+    ap.add_argument("--no-resume", action="store_true", help="Ignora o checkpoint e roda todos os pares de novo")
+    return ap.parse_args(argv)
+
+
 def _print_report(edital_pdf: Path, produto_pdf: Path, result: Dict[str, Any], out_json: Path) -> None:
     score = result.get("score") or {}
     key_req = (score.get("key_requirements") or {}) if isinstance(score, dict) else {}
@@ -125,33 +143,44 @@ def _print_report(edital_pdf: Path, produto_pdf: Path, result: Dict[str, Any], o
     print(_hr("="))
 
 
-def main() -> int:
+def main(argv: List[str] | None = None) -> int:
     # Melhora encoding no Windows Terminal/PowerShell (evita "nÃ£o" etc.)
     try:
         sys.stdout.reconfigure(encoding="utf-8")
     except Exception:
         pass
 
-    editais = sorted([p for p in EDITAIS_DIR.glob("*.pdf") if p.is_file()])
+    args = _parse_args(argv)
+
+    editais = sorted([p for p in args.editais_dir.glob("*.pdf") if p.is_file()])
     if not editais:
-        raise FileNotFoundError(f"Nenhum PDF encontrado em {EDITAIS_DIR}")
+        raise FileNotFoundError(f"Nenhum PDF encontrado em {args.editais_dir}")
 
-    produto_pdf = _pick_product_pdf()
+    if args.produtos_dir:
+        produtos = sorted([p for p in args.produtos_dir.glob("*.pdf") if p.is_file()])
+        if not produtos:
+            raise FileNotFoundError(f"Nenhum PDF de produto encontrado em {args.produtos_dir}")
+    else:
+        produtos = list(args.produto or [_pick_product_pdf()])
 
-    # Saídas por edital
-    out_dir = REPO_ROOT / "resultados_e2e_local"
+    # Saídas por par (edital x produto)
+    out_dir = args.out
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    pipeline = MatchPipeline(
-        top_k_edital_chunks=int(os.getenv("TOP_K_EDITAL_CHUNKS", "10")),
-        enable_justification=True,
-        llm_model=None,
-    )
+    pipeline_kwargs = {
+        "top_k_edital_chunks": int(os.getenv("TOP_K_EDITAL_CHUNKS", "10")),
+        "enable_justification": True,
+        "llm_model": None,
+    }
 
     print(_hr("="))
     print("MATCHLLM — Execução em lote")
     print(_format_kv("Editais", len(editais)))
-    print(_format_kv("Produto", _short_path(produto_pdf)))
+    if len(produtos) == 1:
+        print(_format_kv("Produto", _short_path(produtos[0])))
+    else:
+        print(_format_kv("Produtos", len(produtos)))
+    print(_format_kv("Pares", len(editais) * len(produtos)))
     print(_format_kv("Saída", _short_path(out_dir)))
     print(_format_kv("Modo", "OFFLINE" if os.getenv("LLM_DISABLE", "0") in ("1", "true", "yes") else "COM LLM"))
     seq_cfg = os.getenv("SEQUENCE_FILTER", "").strip()
@@ -169,13 +198,36 @@ def main() -> int:
         print(_format_kv("MATCH_TOLERANCE_OVERRIDES", tol2))
     print(_hr("="))
 
-    for edital_pdf in editais:
-        out_json = out_dir / f"resultado__{edital_pdf.stem}.json"
-        result = pipeline.run(str(edital_pdf), str(produto_pdf))
-        pipeline.save_result(result, str(out_json))
-        _print_report(edital_pdf, produto_pdf, result, out_json)
+    def _on_pair(rec: Dict[str, Any], result: Dict[str, Any] | None) -> None:
+        edital_pdf, produto_pdf = Path(rec["edital"]), Path(rec["produto"])
+        if rec["status"] == PAIR_DONE and result is not None:
+            _print_report(edital_pdf, produto_pdf, result, Path(rec["out"]))
+        elif rec["status"] == PAIR_SKIPPED:
+            print(f"[checkpoint] {edital_pdf.name} x {produto_pdf.name}: já concluído ({_short_path(rec['out'])})")
+        else:
+            print(f"[erro] {edital_pdf.name} x {produto_pdf.name}: {rec.get('error')}")
+
+    summary = run_batch(
+        editais,
+        produtos,
+        out_dir=out_dir,
+        checkpoint_dir=args.checkpoint,
+        workers=args.workers,
+        pipeline_kwargs=pipeline_kwargs,
+        resume=not args.no_resume,
+        on_pair=_on_pair,
+    )
 
-    return 0
+    print(_hr("="))
+    print(
+        _format_kv(
+            "Pares",
+            f"{summary[PAIR_DONE]} concluídos, {summary[PAIR_SKIPPED]} do checkpoint, {summary[PAIR_ERROR]} com erro",
+        )
+    )
+    print(_format_kv("Checkpoint", _short_path(summary["checkpoint"])))
+    print(_hr("="))
+    return 1 if summary[PAIR_ERROR] else 0
 
 
 if __name__ == "__main__":
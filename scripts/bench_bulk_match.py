@@ -0,0 +1,90 @@
+"""Benchmark do matching em lote (core.match.bulk) contra o loop compare + compute_score.
+
+Cenário: catálogo de produtos compilado uma vez, triado contra cada edital novo.
+
+Uso:
+  python scripts/bench_bulk_match.py --produtos 5000 --editais 20
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.match.bulk import bulk_match, compile_produtos
+from core.match.config import MatchConfig
+from core.match.matching_engine import MatchingEngine
+from core.match.scoring import compute_score
+
+
+KEYS = [
+    ("tensao_v", "V"),
+    ("corrente_a", "A"),
+    ("capacidade_ah", "Ah"),
+    ("potencia_w", "W"),
+    ("memoria_ram_gb", "GB"),
+    ("armazenamento_gb", "GB"),
+    ("peso_kg", "kg"),
+    ("garantia_meses", "meses"),
+]
+
+
+def _data(n_prod: int, n_ed: int, seed: int = 0):
+    rnd = random.Random(seed)
+    produtos = [
+        {"atributos": {k: {"valor": rnd.uniform(1, 500), "unidade": u} for k, u in KEYS if rnd.random() < 0.8}}
+        for _ in range(n_prod)
+    ]
+    editais = [
+        {
+            "requisitos": {
+                k: {"valor_min": rnd.uniform(1, 400), "valor_max": None, "unidade": u, "obrigatorio": rnd.random() < 0.8}
+                for k, u in KEYS
+                if rnd.random() < 0.7
+            }
+        }
+        for _ in range(n_ed)
+    ]
+    return produtos, editais
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do matching em lote")
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--editais", type=int, default=20)
+    args = parser.parse_args()
+
+    produtos, editais = _data(args.produtos, args.editais)
+    cfg = MatchConfig.from_env({"MATCH_TOLERANCE_PCT": "5", "IMPORTANT_REQUIREMENTS": "tensao_v,capacidade_ah"})
+
+    t0 = time.perf_counter()
+    engine = MatchingEngine(cfg)
+    for ed in editais:
+        for prod in produtos:
+            compute_score(engine.compare(prod, ed), ed, config=cfg)
+    loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    catalogo = compile_produtos(produtos)
+    compile_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bulk_match(catalogo, editais, config=cfg)
+    bulk = time.perf_counter() - t0
+
+    pairs = len(produtos) * len(editais)
+    print(f"pares: {pairs}")
+    print(f"{'loop compare + compute_score':<32} {loop * 1000:8.1f} ms")
+    print(f"{'compile_produtos (uma vez)':<32} {compile_s * 1000:8.1f} ms")
+    print(f"{'bulk_match':<32} {bulk * 1000:8.1f} ms  x{loop / bulk:5.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+"""Benchmark de overhead por chamada do LLMClient contra o mock do Ollama.
+
+Compara:
+- "antes": `requests.post` direto (uma conexão TCP nova por chamada)
+- "depois": `LLMClient` com `requests.Session` em pool (keep-alive)
+- "async": `AsyncLLMClient` com N gerações concorrentes
+
+Por padrão sobe `scripts/mock_ollama.py` em uma porta livre (thread local),
+então mede só o overhead de transporte/serialização, não o tempo do modelo.
+
+Uso:
+  python scripts/bench_llm_client.py --calls 300 --concurrency 8
+  python scripts/bench_llm_client.py --url http://localhost:11434   # servidor já rodando
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import requests
+
+from core.llm.client import AsyncLLMClient, LLMClient
+
+
+PROMPT = "Extraia os requisitos: bateria 12V 7Ah, garantia mínima de 12 meses."
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_mock(port: int):
+    import uvicorn
+
+    from scripts.mock_ollama import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    t = threading.Thread(target=server.run, daemon=True)
+    t.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    if not server.started:
+        raise RuntimeError("mock_ollama não iniciou")
+    return server, t
+
+
+def _summary(label: str, samples_ms: list[float], wall_s: float | None = None) -> dict:
+    samples_ms = sorted(samples_ms)
+    out = {
+        "modo": label,
+        "chamadas": len(samples_ms),
+        "media_ms": round(statistics.mean(samples_ms), 3),
+        "p50_ms": round(samples_ms[len(samples_ms) // 2], 3),
+        "p95_ms": round(samples_ms[int(len(samples_ms) * 0.95) - 1], 3),
+    }
+    if wall_s is not None:
+        out["throughput_rps"] = round(len(samples_ms) / wall_s, 1)
+    return out
+
+
+def bench_requests_post(url: str, calls: int) -> dict:
+    payload = LLMClient(base_url=url)._build_payload(PROMPT)
+    samples = []
+    t_all = time.perf_counter()
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        r = requests.post(f"{url}/api/generate", json=payload, timeout=30)
+        r.raise_for_status()
+        r.json()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return _summary("antes: requests.post", samples, time.perf_counter() - t_all)
+
+
+def bench_session(url: str, calls: int) -> dict:
+    client = LLMClient(base_url=url)
+    client.generate(PROMPT)  # aquece a conexão
+    samples = []
+    t_all = time.perf_counter()
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        client.generate(PROMPT)
+        samples.append((time.perf_counter() - t0) * 1000)
+    client.close()
+    return _summary("depois: LLMClient (Session)", samples, time.perf_counter() - t_all)
+
+
+def bench_async(url: str, calls: int, concurrency: int) -> dict:
+    async def _run():
+        samples: list[float] = []
+        sem = asyncio.Semaphore(concurrency)
+        async with AsyncLLMClient(base_url=url) as client:
+            await client.generate(PROMPT)
+
+            async def one():
+                async with sem:
+                    t0 = time.perf_counter()
+                    await client.generate(PROMPT)
+                    samples.append((time.perf_counter() - t0) * 1000)
+
+            t_all = time.perf_counter()
+            await asyncio.gather(*[one() for _ in range(calls)])
+            return samples, time.perf_counter() - t_all
+
+    samples, wall = asyncio.run(_run())
+    return _summary(f"async: AsyncLLMClient (concorrência={concurrency})", samples, wall)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de overhead do LLMClient")
+    parser.add_argument("--url", default=None, help="Servidor Ollama/mock já em execução (default: sobe o mock)")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    # httpx loga cada request em INFO; polui a saída do benchmark
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    server = None
+    url = args.url
+    if not url:
+        port = _free_port()
+        server, _ = _start_mock(port)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        rows = [
+            bench_requests_post(url, args.calls),
+            bench_session(url, args.calls),
+            bench_async(url, args.calls, args.concurrency),
+        ]
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    for row in rows:
+        extra = f"  {row['throughput_rps']} req/s" if "throughput_rps" in row else ""
+        print(
+            f"{row['modo']:<48} media={row['media_ms']:>7.3f}ms  "
+            f"p50={row['p50_ms']:>7.3f}ms  p95={row['p95_ms']:>7.3f}ms{extra}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""Micro-benchmark do re-score (MatchingEngine.compare + compute_score).
+
+Compara:
+- "antes": ambiente relido a cada requisito/score (como era antes do MatchConfig)
+- "depois (snapshot)": config=None, MatchConfig reaproveitado enquanto o env não muda
+- "depois (config fixo)": MatchConfig construído uma vez e passado explicitamente
+
+Uso:
+  python scripts/bench_match_config.py --pairs 5000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.match.config import MatchConfig, get_match_config
+from core.match.matching_engine import MatchingEngine
+from core.match.scoring import compute_score
+
+
+KEYS = [
+    ("tensao_v", "V"),
+    ("corrente_a", "A"),
+    ("capacidade_ah", "Ah"),
+    ("potencia_w", "W"),
+    ("memoria_ram_gb", "GB"),
+    ("armazenamento_gb", "GB"),
+    ("peso_kg", "kg"),
+    ("garantia_meses", "meses"),
+]
+
+
+class _EnvPerRequirement(MatchConfig):
+    """Emula o comportamento antigo: relê o ambiente a cada tolerância."""
+
+    def tolerance_for(self, key, overrides=None):
+        return MatchConfig.from_env().tolerance_for(key, overrides)
+
+
+def _pairs(n: int, seed: int = 0):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        prod = {"atributos": {k: {"valor": rnd.uniform(1, 500), "unidade": u} for k, u in KEYS if rnd.random() < 0.8}}
+        ed = {
+            "requisitos": {
+                k: {"valor_min": rnd.uniform(1, 400), "valor_max": None, "unidade": u, "obrigatorio": rnd.random() < 0.8}
+                for k, u in KEYS
+                if rnd.random() < 0.7
+            }
+        }
+        out.append((prod, ed))
+    return out
+
+
+def _run(pairs, engine, config_for_score) -> float:
+    t0 = time.perf_counter()
+    for prod, ed in pairs:
+        m = engine.compare(prod, ed)
+        compute_score(m, ed, config=config_for_score())
+    return time.perf_counter() - t0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark do MatchConfig")
+    parser.add_argument("--pairs", type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("MATCH_TOLERANCE_PCT", "5")
+    os.environ.setdefault("MATCH_TOLERANCE_OVERRIDES", "tensao_v=0.02,capacidade_ah=0.1")
+    os.environ.setdefault("IMPORTANT_REQUIREMENTS", "tensao_v,capacidade_ah")
+    pairs = _pairs(args.pairs)
+
+    fixed = MatchConfig.from_env()
+    rows = [
+        ("antes: env relido por requisito", _run(pairs, MatchingEngine(_EnvPerRequirement()), MatchConfig.from_env)),
+        ("depois: snapshot do env", _run(pairs, MatchingEngine(), get_match_config)),
+        ("depois: MatchConfig fixo", _run(pairs, MatchingEngine(fixed), lambda: fixed)),
+    ]
+    base = rows[0][1]
+    for label, secs in rows:
+        print(f"{label:<36} {secs * 1000:8.1f} ms  {secs / len(pairs) * 1e6:7.2f} us/par  x{base / secs:4.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
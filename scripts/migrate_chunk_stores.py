@@ -0,0 +1,59 @@
+"""Converte os chunks de editais em pickle (edital_<id>_index.pkl) para ChunkStore.
+
+Os arquivos antigos são lidos com pickle, então rode só sobre dados gerados
+localmente. Depois da migração a API não precisa mais de CHUNKSTORE_ALLOW_PICKLE.
+
+Uso:
+  python scripts/migrate_chunk_stores.py                    # data/processed/vectorstore
+  python scripts/migrate_chunk_stores.py --dir outro/dir --delete-legacy
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.vectorstore.chunk_store import ChunkStore, edital_store_path, read_legacy_chunks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Migra chunks de editais de pickle para ChunkStore")
+    parser.add_argument("--dir", default="data/processed/vectorstore")
+    parser.add_argument("--delete-legacy", action="store_true", help="Remove os .pkl depois de migrar")
+    parser.add_argument("--force", action="store_true", help="Regrava mesmo se o ChunkStore já existir")
+    args = parser.parse_args()
+
+    vector_dir = Path(args.dir)
+    migrated = skipped = failed = 0
+    for fp in sorted(vector_dir.glob("edital_*_index.pkl")):
+        try:
+            edital_id = int(fp.name.replace("edital_", "").replace("_index.pkl", ""))
+        except ValueError:
+            continue
+        target = edital_store_path(vector_dir, edital_id)
+        if (target / "header.json").exists() and not args.force:
+            skipped += 1
+            continue
+        try:
+            chunks = read_legacy_chunks(vector_dir, edital_id)
+            ChunkStore.write(target, chunks)
+        except Exception as e:
+            failed += 1
+            print(f"[falha] edital {edital_id}: {e}")
+            continue
+        migrated += 1
+        print(f"[ok] edital {edital_id}: {len(chunks)} chunks -> {target.name}")
+        if args.delete_legacy:
+            fp.unlink(missing_ok=True)
+            (vector_dir / f"edital_{edital_id}_chunks.pkl").unlink(missing_ok=True)
+
+    print(f"migrados={migrated} já_existentes={skipped} falhas={failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -39,6 +39,7 @@ logger = get_logger(__name__)
 from core.ocr.extractor import PDFExtractor
 from core.ocr.normalizador import normalize_text
 from core.preprocess.product_extractor import ProductExtractor
+from core.vectorstore.chunk_store import edital_chunks_exist, list_edital_ids
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -73,15 +74,7 @@ def list_jsons(folder: Path) -> List[Path]:
 
 
 def list_index_ids() -> List[int]:
-    ids: List[int] = []
-    if VECTOR_DIR.exists():
-        for fp in VECTOR_DIR.glob("edital_*_index.pkl"):
-            try:
-                id_str = fp.name.replace("edital_", "").replace("_index.pkl", "")
-                ids.append(int(id_str))
-            except Exception:
-                continue
-    return sorted(ids)
+    return list_edital_ids(VECTOR_DIR)
 
 
 def upload_edital(edital_pdf: Path) -> Optional[tuple[int, Optional[int]]]:
@@ -317,9 +310,8 @@ def run() -> None:
     # Seleção de edital: usar índice existente se solicitado
     if args.edital_id:
         # Verifica se o índice existe
-        idx_path = VECTOR_DIR / f"edital_{args.edital_id}_index.pkl"
-        if not idx_path.exists():
-            raise SystemExit(f"Índice para edital_id {args.edital_id} não encontrado em {idx_path}.")
+        if not edital_chunks_exist(VECTOR_DIR, args.edital_id):
+            raise SystemExit(f"Índice para edital_id {args.edital_id} não encontrado em {VECTOR_DIR}.")
         edital_id = args.edital_id
         total_chunks = None
         print(f"[edital] Usando índice existente: edital_id={edital_id}")
@@ -131,11 +131,12 @@ def main() -> None:
         if not vector_dir.exists():
             return None
         ids = []
-        for fp in vector_dir.glob("edital_*_index.pkl"):
-            try:
-                ids.append(int(fp.name.replace("edital_", "").replace("_index.pkl", "")))
-            except Exception:
-                continue
+        for pattern, suffix in (("edital_*.chunks", ".chunks"), ("edital_*_index.pkl", "_index.pkl")):
+            for fp in vector_dir.glob(pattern):
+                try:
+                    ids.append(int(fp.name.replace("edital_", "").replace(suffix, "")))
+                except Exception:
+                    continue
         return sorted(ids)[-1] if ids else None
 
     if args.skip_upload:
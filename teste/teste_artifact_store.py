@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_artifact_store.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from core.Pipeline.artifacts import ArtifactStore, content_hash
+from core.Pipeline.pipeline import MatchPipeline
+
+
+def _check_edital_json_key() -> None:
+    """Chave do edital_json muda com o chunker (CHUNK_*) e com o pós-processamento (BATTERY_*)."""
+    pipe = MatchPipeline.__new__(MatchPipeline)
+    pipe.top_k = 10
+    pipe.embedder = type("E", (), {"model_name": "intfloat/e5-base-v2"})()
+    produto = {"tipo_produto": "bateria", "atributos": {"tensao_v": {"valor": 12}}}
+
+    def _key(**env) -> str:
+        saved = {k: os.environ.get(k) for k in env}
+        os.environ.update(env)
+        try:
+            return pipe._edital_json_key("texto do edital", produto, "bateria 12V")
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+    base = _key()
+    assert base == _key()
+    assert base != _key(CHUNK_OVERLAP_TOKENS="32")
+    assert base != _key(BATTERY_ALLOWED_REQUIREMENTS="tensao_v")
+
+    # Mesmo hint/consultas, mas só um é bateria: o filtro de requisitos difere, o artefato também
+    fonte = {"tipo_produto": "fonte", "atributos": {"tensao_v": {"valor": 12}}}
+    assert pipe.edital_extraction_key(produto, "bateria 12V") != pipe.edital_extraction_key(fonte, "bateria 12V")
+    assert base != pipe._edital_json_key("texto do edital", fonte, "bateria 12V")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(tmp)
+
+        # Chave estável e sensível a entradas/configuração
+        k1 = ArtifactStore.key("chunks", content_hash("edital"), config={"max_tokens": 200})
+        assert k1 == ArtifactStore.key("chunks", content_hash("edital"), config={"max_tokens": 200})
+        assert k1 != ArtifactStore.key("chunks", content_hash("edital"), config={"max_tokens": 400})
+        assert k1 != ArtifactStore.key("embeddings", content_hash("edital"), config={"max_tokens": 200})
+
+        # JSON e numpy (.npy) ida e volta
+        store.put("chunks", k1, ["a", "b"])
+        assert store.get("chunks", k1) == ["a", "b"]
+        vecs = np.arange(12, dtype=np.float32).reshape(3, 4)
+        store.put("embeddings", k1, vecs)
+        got = store.get("embeddings", k1)
+        assert got.dtype == np.float32 and np.array_equal(got, vecs)
+
+        # Etapa calculada uma vez, mesmo com chamadas simultâneas (N produtos x 1 edital)
+        calls = []
+
+        def _ocr():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"text": "texto do edital", "meta": {"method": "native"}}
+
+        key = ArtifactStore.key("text_raw", "sha-do-pdf", config={})
+        out = []
+        threads = [threading.Thread(target=lambda: out.append(store.get_or_compute("text_raw", key, _ocr))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1, calls
+        assert all(v == {"text": "texto do edital", "meta": {"method": "native"}} for v, _ in out)
+        value, hit = store.get_or_compute("text_raw", key, _ocr)
+        assert hit and len(calls) == 1
+
+        # Novo store no mesmo diretório (outro processo/execução) reaproveita do disco
+        again = ArtifactStore(tmp)
+        assert again.get_or_compute("text_raw", key, _ocr)[1] is True
+
+        # keep=False não persiste (ex.: LLM fora do ar devolveu extração vazia)
+        kp = ArtifactStore.key("produto_json", content_hash("datasheet"), config={})
+        store.get_or_compute("produto_json", kp, lambda: {"atributos": {}}, keep=lambda p: bool(p["atributos"]))
+        assert store.get("produto_json", kp) is None
+
+        # Arquivo corrompido conta como miss e é recalculado
+        path = Path(tmp) / "produto_json" / kp[:2] / f"{kp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{trunc", encoding="utf-8")
+        value, hit = store.get_or_compute("produto_json", kp, lambda: {"atributos": {"tensao_v": 12}})
+        assert not hit and store.get("produto_json", kp) == {"atributos": {"tensao_v": 12}}
+
+        stats = store.stats()
+        assert stats["hits"]["text_raw"] >= 1 and stats["misses"]["produto_json"] >= 1
+        assert not list(Path(tmp).rglob("*.tmp"))
+
+    _check_edital_json_key()
+    print("OK: artefatos do pipeline endereçados por conteúdo")
+
+
+if __name__ == "__main__":
+    main()
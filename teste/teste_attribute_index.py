@@ -0,0 +1,171 @@
+import inspect
+import random
+import sys
+from pathlib import Path
+
+# Permite executar via: python teste/teste_attribute_index.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.match.attribute_index import AttributeIndex, produto_atributos
+from core.match.config import MatchConfig
+from core.match.matching_engine import MatchingEngine
+from core.match.scoring import compute_score
+
+
+KEYS = ["tensao_v", "corrente_a", "capacidade_ah", "memoria_ram_gb", "peso_kg"]
+UNITS = ["V", "kV", "A", "mA", "Ah", "mAh", "GB", "TB", "kg", "g", "", None, "  ", "xyz"]
+ODD_VALUES = [None, "", "abc", "1,5", "nan", True, 0, "12"]
+
+
+def _rand_produto(rnd: random.Random) -> dict:
+    attrs = {}
+    for k in KEYS:
+        if rnd.random() < 0.2:
+            continue
+        v = rnd.choice(ODD_VALUES) if rnd.random() < 0.15 else round(rnd.uniform(0, 60), 3)
+        attrs[k] = {"valor": v, "unidade": rnd.choice(UNITS)}
+    return {"atributos": attrs}
+
+
+def _rand_edital(rnd: random.Random) -> dict:
+    reqs = {}
+    for k in rnd.sample(KEYS, rnd.randint(1, 4)):
+        reqs[k] = {
+            "valor_min": rnd.choice([None, rnd.uniform(0, 40), "10", "nan", 0.012]),
+            "valor_max": rnd.choice([None, None, rnd.uniform(20, 60)]),
+            "unidade": rnd.choice(UNITS),
+            "obrigatorio": rnd.random() < 0.85,
+        }
+    return {"requisitos": reqs}
+
+
+def _check_superset() -> None:
+    configs = [
+        MatchConfig(),
+        MatchConfig.from_env({"MATCH_TOLERANCE_PCT": "10", "MATCH_TOLERANCE_OVERRIDES": "tensao_v=0.02"}),
+        MatchConfig.from_env({"IMPORTANT_REQUIREMENTS": "tensao_v,capacidade_ah", "KEY_REQUIREMENTS_POLICY": "any"}),
+        MatchConfig.from_env({"SEQUENCE_FILTER": "corrente_a,tensao_v"}),
+    ]
+    rnd = random.Random(7)
+    produtos = [_rand_produto(rnd) for _ in range(400)]
+    index = AttributeIndex(produtos)
+    pruned = 0
+    for cfg in configs:
+        engine = MatchingEngine(cfg)
+        for _ in range(60):
+            edital = _rand_edital(rnd)
+            cands = set(index.candidates(edital, cfg).tolist())
+            for pos, prod in enumerate(produtos):
+                score = compute_score(engine.compare(prod, edital), edital, config=cfg)
+                if score["status_geral"] != "REPROVADO":
+                    assert pos in cands, (edital, prod, score["status_geral"])
+            pruned += len(produtos) - len(cands)
+    assert pruned > 0
+
+
+def _check_conversion_bounds() -> None:
+    # 7000 mAh contra mínimo de 7 Ah: no limite exato após conversão
+    produtos = [
+        {"atributos": {"capacidade_ah": {"valor": 7000, "unidade": "mAh"}}},
+        {"atributos": {"capacidade_ah": {"valor": 6999, "unidade": "mAh"}}},
+        {"atributos": {"capacidade_ah": {"valor": 7, "unidade": "Ah"}}},
+        {"atributos": {"capacidade_ah": {"valor": 7, "unidade": "kg"}}},  # incompatível -> DUVIDA
+        {"atributos": {}},
+    ]
+    edital = {"requisitos": {"capacidade_ah": {"valor_min": 7, "unidade": "Ah", "obrigatorio": True}}}
+    assert AttributeIndex(produtos).candidates(edital, MatchConfig()).tolist() == [0, 2, 3]
+
+
+def _check_service() -> None:
+    from api.services import produto_catalog
+    from db.base import Base
+    from db.repositories.produto_repo import get_or_create
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    get_or_create(db, nome="Bateria A", atributos_json={"tensao_v": {"valor": 12, "unidade": "V"}, "capacidade_ah": {"valor": 9, "unidade": "Ah"}})
+    get_or_create(db, nome="Bateria B", atributos_json={"atributos": {"tensao_v": {"valor": 12, "unidade": "V"}}})
+    get_or_create(db, nome="Bateria C", atributos_json={"tensao_v": {"valor": 6, "unidade": "V"}, "capacidade_ah": {"valor": 12, "unidade": "Ah"}})
+
+    edital = {
+        "requisitos": {
+            "tensao_v": {"valor_min": 12, "unidade": "V", "obrigatorio": True},
+            "capacidade_ah": {"valor_min": 7, "unidade": "Ah", "obrigatorio": False},
+        }
+    }
+    out = produto_catalog.match_catalogo(db, edital, top_k=10)
+    assert out["catalogo_total"] == 3 and out["candidatos"] == 2
+    assert [(r["nome"], r["status_geral"]) for r in out["resultados"]] == [("Bateria A", "APROVADO"), ("Bateria B", "APROVADO")]
+
+    first = produto_catalog.catalog_index(db)
+    assert produto_catalog.catalog_index(db) is first
+    get_or_create(db, nome="Bateria D", atributos_json={"tensao_v": {"valor": 24, "unidade": "V"}})
+    assert produto_catalog.catalog_index(db) is not first
+
+    full = produto_catalog.match_catalogo(db, edital, include_reprovados=True)
+    assert [r["status_geral"] for r in full["resultados"]][-1] == "REPROVADO"
+    assert produto_atributos({"tensao_v": "12V"}) == {"tensao_v": {"valor": "12V", "unidade": None}}
+    db.close()
+
+
+def _check_route() -> None:
+    """POST /produtos/match_edital é rota síncrona (threadpool) e não chama init_db por requisição."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.pool import StaticPool
+
+    from api.auth.deps import get_current_user
+    from api.routes import produto_routes
+    from db.base import Base
+    from db.repositories.produto_repo import get_or_create
+
+    assert not inspect.iscoroutinefunction(produto_routes.match_catalogo_edital)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        get_or_create(db, nome="Bateria A", atributos_json={"tensao_v": {"valor": 12, "unidade": "V"}})
+
+    def _db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _no_init_db():
+        raise AssertionError("init_db não deveria rodar por requisição")
+
+    app = FastAPI()
+    app.include_router(produto_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1, "email": "ana@teste"}
+    app.dependency_overrides[produto_routes.get_db] = _db
+    old_init_db = produto_routes.init_db
+    produto_routes.init_db = _no_init_db
+    try:
+        client = TestClient(app)
+        resp = client.post("/produtos/match_edital", json={"requisitos": {"tensao_v": {"valor_min": 12, "unidade": "V", "obrigatorio": True}}})
+        assert resp.status_code == 200, resp.text
+        assert [r["nome"] for r in resp.json()["resultados"]] == ["Bateria A"]
+        assert client.post("/produtos/match_edital", json={"requisitos": {"tensao_v": 12}}).status_code == 400
+    finally:
+        produto_routes.init_db = old_init_db
+
+
+def main() -> None:
+    _check_superset()
+    _check_conversion_bounds()
+    _check_service()
+    _check_route()
+    print("OK: attribute index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_batch_runner.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.Pipeline.batch import PAIR_DONE, PAIR_ERROR, PAIR_SKIPPED, BatchCheckpoint, run_batch
+
+
+class FakePipeline:
+    """Mesma interface usada pelo lote; registra cada etapa num log (vale entre processos)."""
+
+    def __init__(self, log: str, fail_on: str | None = None):
+        self.log = Path(log)
+        self.fail_on = fail_on
+
+    def _note(self, what: str) -> None:
+        with open(self.log, "a", encoding="utf-8") as f:
+            f.write(what + "\n")
+
+    def extract_produto(self, path):
+        self._note(f"produto {Path(path).name}")
+        return {"produto_json": {"nome": Path(path).stem}, "produto_hint": "bateria", "ocr": {"method": "native"}}
+
+    def edital_extraction_key(self, produto_json, produto_hint):
+        return "k-" + produto_hint
+
+    def extract_edital_text(self, path):
+        self._note(f"ocr {Path(path).name}")
+        return Path(path).read_text(encoding="utf-8"), {"method": "native"}
+
+    def extract_edital_requisitos(self, text, produto_json, produto_hint):
+        self._note(f"requisitos {text}")
+        return {"requisitos": {"tensao_v": {"valor_min": 12}}}, {"edital_chunks_total": 1}
+
+    def run_with_extracted(self, *, edital_json, produto_json, edital_pdf_path, produto_pdf_path, debug):
+        name = f"{Path(edital_pdf_path).stem}x{Path(produto_pdf_path).stem}"
+        self._note(f"par {name}")
+        if self.fail_on == name:
+            raise RuntimeError("falha simulada")
+        return {"score": {"status_geral": "APROVADO", "score_percent": 100.0}, "debug": debug, "par": name}
+
+    @staticmethod
+    def save_result(result, out_path):
+        Path(out_path).write_text(json.dumps(result), encoding="utf-8")
+
+
+def _log_lines(log: Path, prefix: str) -> list[str]:
+    if not log.exists():
+        return []
+    return [l for l in log.read_text(encoding="utf-8").splitlines() if l.startswith(prefix)]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        editais = []
+        for i in range(3):
+            p = root / f"e{i}.pdf"
+            p.write_text(f"edital {i}", encoding="utf-8")
+            editais.append(p)
+        produtos = []
+        for j in range(2):
+            p = root / f"p{j}.pdf"
+            p.write_text(f"produto {j}", encoding="utf-8")
+            produtos.append(p)
+        out = root / "out"
+        log = root / "log.txt"
+
+        # 1ª execução: um par falha no meio
+        kwargs = {"log": str(log), "fail_on": "e1xp0"}
+        seen = []
+        summary = run_batch(
+            editais, produtos, out_dir=out, workers=1, pipeline_factory=FakePipeline,
+            pipeline_kwargs=kwargs, on_pair=lambda rec, res: seen.append(rec["status"]),
+        )
+        assert summary[PAIR_DONE] == 5 and summary[PAIR_ERROR] == 1, summary
+        # extração compartilhada: 1 por produto, 1 OCR por edital, 1 requisito por (edital, chave)
+        assert len(_log_lines(log, "produto")) == 2
+        assert len(_log_lines(log, "ocr")) == 3
+        assert len(_log_lines(log, "requisitos")) == 3
+        assert (out / "resultado__e0__p1.json").exists()
+        res = json.loads((out / "resultado__e2__p1.json").read_text(encoding="utf-8"))
+        assert res["debug"]["ocr_produto"] == {"method": "native"} and res["debug"]["ocr_edital"] == {"method": "native"}
+
+        # 2ª execução com as mesmas configurações (a falha some só dentro do pipeline):
+        # roda apenas o par que falhou, sem extrair nada de novo
+        log.unlink()
+
+        class _Fixed(FakePipeline):
+            def __init__(self, log, fail_on=None):
+                super().__init__(log, None)
+
+        summary = run_batch(editais, produtos, out_dir=out, workers=1, pipeline_factory=_Fixed, pipeline_kwargs=kwargs)
+        assert summary[PAIR_SKIPPED] == 5 and summary[PAIR_DONE] == 1, summary
+        assert _log_lines(log, "par") == ["par e1xp0"]
+        assert not _log_lines(log, "produto") and not _log_lines(log, "ocr")
+
+        # Manifest: última linha truncada (crash durante a escrita) é ignorada
+        ckpt_root = out / ".checkpoint"
+        with open(ckpt_root / "manifest.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"key": "trunc')
+        recs = list(BatchCheckpoint(ckpt_root, "x").records())
+        assert len(recs) == 7 and sum(r["status"] == PAIR_ERROR for r in recs) == 1
+
+        # Saída apagada -> par volta a rodar; resume=False roda tudo
+        (out / "resultado__e0__p0.json").unlink()
+        log.unlink()
+        summary = run_batch(editais, produtos, out_dir=out, workers=1, pipeline_factory=_Fixed, pipeline_kwargs=kwargs)
+        assert summary[PAIR_DONE] == 1 and _log_lines(log, "par") == ["par e0xp0"]
+
+        # Configuração que muda a extração (chunker, LLM_OPTIONS, ...) invalida pares e artefatos
+        log.unlink()
+        os.environ["CHUNK_OVERLAP_TOKENS"] = "32"
+        try:
+            summary = run_batch(editais, produtos, out_dir=out, workers=1, pipeline_factory=_Fixed, pipeline_kwargs=kwargs)
+        finally:
+            os.environ.pop("CHUNK_OVERLAP_TOKENS", None)
+        assert summary[PAIR_DONE] == 6 and summary[PAIR_SKIPPED] == 0, summary
+        assert len(_log_lines(log, "requisitos")) == 3
+
+        # Pool de processos: mesmo resultado, extração ainda compartilhada
+        out2 = root / "out2"
+        log2 = root / "log2.txt"
+        summary = run_batch(
+            editais, produtos, out_dir=out2, workers=2, pipeline_factory=FakePipeline,
+            pipeline_kwargs={"log": str(log2)},
+        )
+        assert summary[PAIR_DONE] == 6, summary
+        assert len(_log_lines(log2, "produto")) == 2 and len(_log_lines(log2, "ocr")) == 3
+        assert sorted(p.name for p in out2.glob("resultado__*.json")) == sorted(
+            f"resultado__e{i}__p{j}.json" for i in range(3) for j in range(2)
+        )
+
+        # Um produto só mantém o nome antigo do arquivo de saída
+        summary = run_batch(
+            editais[:1], produtos[:1], out_dir=root / "out3", workers=1, pipeline_factory=FakePipeline,
+            pipeline_kwargs={"log": str(log2)},
+        )
+        assert (root / "out3" / "resultado__e0.json").exists()
+
+    print("OK: lote editais x produtos com checkpoint e extração compartilhada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import random
+import sys
+from pathlib import Path
+
+# Permite executar via: python teste/teste_bulk_match.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.match.bulk import GERAL_NAMES, bulk_match, compile_editais, compile_produtos
+from core.match.config import MatchConfig
+from core.match.matching_engine import MatchingEngine
+from core.match.scoring import compute_score
+
+
+KEYS = ["tensao_v", "corrente_a", "capacidade_ah", "memoria_ram_gb", "peso_kg", "garantia_meses", "cor"]
+UNITS = ["V", "kV", "A", "mA", "Ah", "mAh", "GB", "TB", "MB", "kg", "g", "meses", "", None, "  ", "xyz"]
+VALUES = [None, "", "abc", "1,5", "1.000,5", True, 0, -3, 12, 12.5, "12", "nan", 7000, 0.5]
+
+
+def _rand_produto(rnd: random.Random) -> dict:
+    attrs = {}
+    for k in KEYS:
+        r = rnd.random()
+        if r < 0.15:
+            continue
+        if r < 0.2:
+            attrs[k] = {}
+        else:
+            v = rnd.choice(VALUES) if rnd.random() < 0.3 else round(rnd.uniform(-5, 50), 2)
+            attrs[k] = {"valor": v, "unidade": rnd.choice(UNITS)}
+    return {"atributos": attrs}
+
+
+def _rand_edital(rnd: random.Random) -> dict:
+    reqs = {}
+    for k in KEYS:
+        if rnd.random() < 0.35:
+            continue
+        regra = {
+            "valor_min": rnd.choice([None, rnd.uniform(-5, 40), "10", "x", 12]),
+            "valor_max": rnd.choice([None, None, rnd.uniform(10, 60), "1,2"]),
+            "unidade": rnd.choice(UNITS),
+        }
+        if rnd.random() < 0.8:
+            regra["obrigatorio"] = rnd.random() < 0.7
+        reqs[k] = regra
+    return {"requisitos": reqs}
+
+
+def _check(cfg: MatchConfig, seed: int, per_product_overrides: bool) -> None:
+    rnd = random.Random(seed)
+    produtos = [_rand_produto(rnd) for _ in range(60)]
+    editais = [_rand_edital(rnd) for _ in range(25)] + [{"requisitos": {}}]
+    overrides = [({"tensao_v": 10} if i % 3 == 0 else None) for i in range(len(produtos))] if per_product_overrides else None
+
+    res = bulk_match(produtos, editais, config=cfg, tolerance_overrides=overrides)
+    engine = MatchingEngine(cfg)
+    for p, prod in enumerate(produtos):
+        ov = overrides[p] if overrides else None
+        for e, ed in enumerate(editais):
+            expected = engine.compare(prod, ed, tolerance_overrides=ov)
+            assert res.matching(p, e) == expected, (seed, p, e, res.matching(p, e), expected)
+
+            score = compute_score(expected, ed, config=cfg)
+            assert round(float(res.score_raw[p, e]), 2) == score["score_percent"]
+            assert GERAL_NAMES[res.status_geral[p, e]] == score["status_geral"], (seed, p, e)
+            for name, arr in res.counts.items():
+                assert int(arr[p, e]) == score[name], (name, p, e)
+            assert res.score(p, e) == score
+
+
+def main() -> None:
+    configs = [
+        MatchConfig(),
+        MatchConfig.from_env({"MATCH_TOLERANCE_PCT": "5", "MATCH_TOLERANCE_OVERRIDES": "capacidade_ah=0.1"}),
+        MatchConfig.from_env({"IMPORTANT_REQUIREMENTS": "tensao_v,capacidade_ah", "KEY_REQUIREMENTS_POLICY": "any"}),
+        MatchConfig.from_env({"IMPORTANT_REQUIREMENTS": "tensao_v", "SEQUENCE_FILTER": "corrente_a,tensao_v"}),
+    ]
+    for i, cfg in enumerate(configs):
+        _check(cfg, seed=i, per_product_overrides=False)
+        _check(cfg, seed=100 + i, per_product_overrides=True)
+
+    # Catálogo compilado uma vez e reaproveitado contra editais novos
+    produtos = [
+        {"atributos": {"tensao_v": {"valor": 12, "unidade": "V"}, "capacidade_ah": {"valor": 7000, "unidade": "mAh"}}},
+        {"atributos": {"tensao_v": {"valor": 12, "unidade": "V"}, "capacidade_ah": {"valor": 5, "unidade": "Ah"}}},
+        {"atributos": {"tensao_v": {"valor": 6, "unidade": "V"}}},
+    ]
+    catalogo = compile_produtos(produtos)
+    edital = {"requisitos": {"tensao_v": {"valor_min": 12, "unidade": "V"}, "capacidade_ah": {"valor_min": 7, "unidade": "Ah"}}}
+    res = bulk_match(catalogo, compile_editais([edital], MatchConfig()), config=MatchConfig())
+    assert [GERAL_NAMES[g] for g in res.status_geral[:, 0]] == ["APROVADO", "REPROVADO", "REPROVADO"]
+    assert res.rank(0).tolist() == [0, 1, 2]
+    assert res.matching(0, 0) == {"tensao_v": "ATENDE", "capacidade_ah": "ATENDE"}
+
+    print("OK: bulk match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_chunk_store.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.vectorstore.chunk_store import (
+    ChunkStore,
+    edital_chunks_exist,
+    edital_store_path,
+    list_edital_ids,
+    open_edital_chunks,
+)
+
+
+def main() -> None:
+    chunks = ["1. OBJETO\nAquisição de notebooks", "", "Garantia mínima de 12 meses — ç ã é"]
+    with tempfile.TemporaryDirectory() as tmp:
+        vdir = Path(tmp)
+        store = ChunkStore.write(
+            edital_store_path(vdir, 42),
+            chunks,
+            pages=[0, None, 3],
+            spans=[(0, 30), (30, 30), (31, 70)],
+            sections=["1. OBJETO", None, "1. OBJETO"],
+        )
+        assert len(store) == 3 and list(store) == chunks
+        assert store[-1] == chunks[-1] and store[:2] == chunks[:2] and store.head(10) == chunks
+        assert store.meta(0) == {"page": 0, "char_start": 0, "char_end": 30, "section": "1. OBJETO"}
+        assert store.meta(1)["page"] is None and store.meta(1)["section"] is None
+        assert store.sections == ["1. OBJETO"]
+
+        # Regravar substitui o conteúdo
+        ChunkStore.write(edital_store_path(vdir, 42), ["novo"])
+        assert list(open_edital_chunks(vdir, 42)) == ["novo"]
+
+        # Store vazio também abre
+        assert len(ChunkStore.write(edital_store_path(vdir, 7), [])) == 0
+
+        # Pickle legado: listado, mas só lido com CHUNKSTORE_ALLOW_PICKLE=1
+        with open(vdir / "edital_5_index.pkl", "wb") as f:
+            pickle.dump(["antigo"], f)
+        assert list_edital_ids(vdir) == [5, 7, 42]
+        assert edital_chunks_exist(vdir, 5) and not edital_chunks_exist(vdir, 6)
+        os.environ.pop("CHUNKSTORE_ALLOW_PICKLE", None)
+        try:
+            open_edital_chunks(vdir, 5)
+            raise AssertionError("pickle legado não deveria ser lido por padrão")
+        except FileNotFoundError:
+            pass
+        os.environ["CHUNKSTORE_ALLOW_PICKLE"] = "1"
+        assert open_edital_chunks(vdir, 5) == ["antigo"]
+        os.environ.pop("CHUNKSTORE_ALLOW_PICKLE", None)
+
+    print("OK: ChunkStore")
+
+
+if __name__ == "__main__":
+    main()
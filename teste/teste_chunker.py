@@ -0,0 +1,112 @@
+import sys
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_chunker.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.preprocess.chunker import chunk_text, chunk_text_with_meta, estimate_tokens
+
+
+EDITAL = """PREGÃO ELETRÔNICO Nº 12/2024
+O presente pregão tem por objeto a aquisição de baterias para nobreaks.
+Os interessados deverão observar as condições deste edital.
+
+1. DO OBJETO
+1.1 Aquisição de baterias seladas de chumbo-ácido
+com tensão nominal de 12 V e capacidade mínima de 7 Ah,
+conforme especificações do Termo de Referência.
+1.2 Garantia mínima de 12 meses contra defeitos de fabricação.
+
+TERMO DE REFERÊNCIA
+2.1 As baterias deverão ser entregues em até 30 dias.
+Item   Descrição              Qtd
+1      Bateria 12V 7Ah        100
+2      Bateria 12V 9Ah        50
+
+ANEXO I - MODELO DE PROPOSTA
+a) razão social do licitante;
+b) preço unitário e total em reais.
+"""
+
+
+def _check_structure() -> None:
+    chunks = chunk_text_with_meta(EDITAL, max_tokens=60)
+    texts = [c["text"] for c in chunks]
+
+    # Item 1.1 (3 linhas) fica inteiro num chunk só
+    item = [t for t in texts if "1.1 Aquisição" in t]
+    assert len(item) == 1 and "capacidade mínima de 7 Ah" in item[0] and "Termo de Referência." in item[0]
+
+    # Tabela inteira no mesmo chunk, com as quebras de linha preservadas
+    table = [t for t in texts if "Bateria 12V 7Ah" in t]
+    assert len(table) == 1 and "Bateria 12V 9Ah" in table[0] and "Item   Descrição" in table[0]
+
+    # Seções abrem chunk novo e viram metadado
+    sections = {c["section"] for c in chunks}
+    assert {"1. DO OBJETO", "TERMO DE REFERÊNCIA", "ANEXO I - MODELO DE PROPOSTA"} <= sections, sections
+    anexo = [c for c in chunks if c["section"] == "ANEXO I - MODELO DE PROPOSTA"]
+    assert anexo[0]["text"].startswith("ANEXO I") and "a) razão social" in anexo[0]["text"]
+    assert all("ANEXO" not in c["text"] for c in chunks if c["section"] != "ANEXO I - MODELO DE PROPOSTA")
+
+    # Offsets apontam para o trecho original
+    for c in chunks:
+        first_word = c["text"].split()[0]
+        assert EDITAL[c["start"]:c["end"]].startswith(first_word), (c, EDITAL[c["start"]:c["end"]][:30])
+        assert c["tokens"] <= 60
+
+
+def _check_budget_and_overlap() -> None:
+    linhas = [f"{i}. O fornecedor deverá atender o requisito técnico número {i} com comprovação." for i in range(1, 41)]
+    texto = "\n".join(linhas)
+    sem = chunk_text_with_meta(texto, max_tokens=80, overlap=0)
+    com = chunk_text_with_meta(texto, max_tokens=80, overlap=20)
+    assert all(c["tokens"] <= 80 for c in sem + com)
+    # sem overlap: cada item aparece uma vez
+    assert sum(t["text"].count("requisito técnico número 7 ") for t in sem) == 1
+    # com overlap: o último item de um chunk reaparece no início do próximo
+    for a, b in zip(com, com[1:]):
+        ultimo = a["text"].split("\n")[-1]
+        assert b["text"].startswith(ultimo), (a["text"], b["text"])
+    assert len(com) > len(sem)
+
+    # Bloco gigante sem pontuação (OCR) quebra por palavras dentro do limite
+    ocr = " ".join(["palavra"] * 5000)
+    parts = chunk_text(ocr, max_tokens=100)
+    assert len(parts) == 50 and all(estimate_tokens(p) <= 100 for p in parts)
+    # "12.000" não é fim de sentença
+    assert chunk_text("Capacidade de 12.000 mAh. " * 40, max_tokens=12)[0] == "Capacidade de 12.000 mAh."
+    assert chunk_text("") == [] and chunk_text("   \n\n ") == []
+
+
+def _check_linear() -> None:
+    bloco = EDITAL * 20
+    small = bloco * 10
+    big = bloco * 80
+    t0 = time.perf_counter()
+    n_small = len(chunk_text(small, max_tokens=200, overlap=30))
+    t_small = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    n_big = len(chunk_text(big, max_tokens=200, overlap=30))
+    t_big = time.perf_counter() - t0
+    assert n_big > n_small
+    # 8x mais texto: tempo cresce ~8x (folga generosa para máquinas lentas)
+    assert t_big < max(t_small, 0.01) * 20, (t_small, t_big)
+    # um parágrafo único de ~1 MB (texto normalizado do produto) também é linear
+    one_line = "Bateria selada 12V 7Ah, terminal F2, garantia de 12 meses. " * 17000
+    t0 = time.perf_counter()
+    chunk_text(one_line, max_tokens=200)
+    assert time.perf_counter() - t0 < 10
+
+
+def main() -> None:
+    _check_structure()
+    _check_budget_and_overlap()
+    _check_linear()
+    print("OK: chunker por tokens com estrutura, overlap e metadados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_concurrency.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.utils.concurrency import iter_ordered, map_ordered
+
+
+def main() -> None:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _slow(i: int) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # janelas iniciais mais lentas: força conclusão fora de ordem
+        time.sleep(0.05 if i < 3 else 0.01)
+        with lock:
+            active -= 1
+        return i * 10
+
+    out = map_ordered(_slow, range(8), max_workers=4)
+    assert out == [i * 10 for i in range(8)], f"Resultados fora de ordem: {out}"
+    assert 1 < peak <= 4, f"Concorrência deveria ser limitada a 4, pico={peak}"
+
+    peak = 0
+    assert map_ordered(_slow, range(4), max_workers=1) == [0, 10, 20, 30]
+    assert peak == 1, f"max_workers=1 deveria executar em série, pico={peak}"
+
+    def _boom(i: int) -> int:
+        if i == 2:
+            raise ValueError("falha na janela 2")
+        return i
+
+    got = []
+    try:
+        for r in iter_ordered(_boom, range(5), max_workers=3):
+            got.append(r)
+        raise AssertionError("Esperava exceção da janela 2")
+    except ValueError:
+        pass
+    assert got == [0, 1], f"Itens anteriores à falha devem ser entregues em ordem: {got}"
+
+    print("OK - execução concorrente limitada e ordenada funcionando")
+
+
+if __name__ == "__main__":
+    main()
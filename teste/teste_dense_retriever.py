@@ -0,0 +1,99 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Permite executar via: python teste/teste_dense_retriever.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.rag.dense_retriever import DenseRetriever, fuse_scores, top_k_indices
+from core.rag.retrivier import RAGRetrivier
+from core.vectorstore.index import VectorIndex
+
+
+class _HashEmbedder:
+    """Embedder determinístico (bag of words com hash) para não depender do fastembed."""
+
+    model_name = "intfloat/e5-base-v2"
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        out = np.zeros((len(texts), 64), dtype=np.float32)
+        for r, t in enumerate(texts):
+            for w in t.lower().replace(":", " ").split():
+                if w in ("query", "passage"):
+                    continue
+                out[r, hash(w) % 64] += 1.0
+        return out
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    scores = rng.standard_normal(1000)
+    expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:10]
+    assert top_k_indices(scores, 10).tolist() == expected
+    assert top_k_indices(scores[:3], 10).tolist() == sorted(range(3), key=lambda i: scores[i], reverse=True)
+    assert top_k_indices(np.array([1.0, 1.0, 0.5]), 2).tolist() == [0, 1]
+
+    m = np.array([[0.9, 0.1, 0.5], [0.2, 0.8, 0.5]])
+    assert fuse_scores(m, "max").tolist() == np.float32([0.9, 0.8, 0.5]).tolist()
+    assert np.allclose(fuse_scores(m, "mean"), [0.55, 0.45, 0.5])
+    rrf = fuse_scores(m, "rrf")
+    assert rrf[2] < rrf[0] and rrf[2] < rrf[1]
+
+    chunks = [
+        "cláusula jurídica sobre penalidades e multas",
+        "bateria selada tensão 12 V capacidade 7 Ah",
+        "garantia mínima de 24 meses on site",
+        "prazo de entrega em 30 dias",
+    ]
+    emb = _HashEmbedder()
+    retr = DenseRetriever(emb, fusion="max")
+    vecs = retr.encode_passages(chunks)
+    assert emb.calls[-1][0].startswith("passage: ")
+
+    hits = retr.search_vectors(["bateria tensão 12 V", "garantia meses"], vecs, top_k=2)
+    assert {i for i, _ in hits} == {1, 2}, hits
+    # Várias consultas -> um único batch de embeddings
+    assert len(emb.calls[-1]) == 2 and all(t.startswith("query: ") for t in emb.calls[-1])
+
+    # Mesma lógica sobre um VectorIndex (RAGRetrivier)
+    idx = VectorIndex(dim=64, kind="flat_ip")
+    idx.add(vecs, chunks)
+    ids = [i for i, _ in retr.search_index(["bateria tensão 12 V", "garantia meses"], idx, top_k=2)]
+    assert set(ids) == {1, 2}, ids
+    assert [i for i, _ in retr.search_index(["prazo de entrega"], idx, top_k=1)] == [3]
+
+    # Índice montado com texto cru (caminho antigo): consulta também sem prefixo
+    raw = VectorIndex(dim=64, kind="flat_ip")
+    raw.add(emb.encode(chunks), chunks)
+    rag = RAGRetrivier(emb, raw)
+    assert rag.search("prazo de entrega", top_k=1) == [chunks[3]]
+    assert emb.calls[-1] == ["prazo de entrega"], emb.calls[-1]
+
+    # add_chunks grava "passage: " e marca o índice; a consulta usa "query: ", inclusive após salvar/carregar
+    rag = RAGRetrivier(emb, VectorIndex(dim=64, kind="flat_ip"))
+    rag.add_chunks(chunks)
+    assert emb.calls[-1][0].startswith("passage: ") and rag.index.passage_prefix == "passage: "
+    with tempfile.TemporaryDirectory() as tmp:
+        rag.index.save(str(Path(tmp) / "idx.faiss"), str(Path(tmp) / "chunks"))
+        loaded = VectorIndex(dim=64)
+        loaded.load(str(Path(tmp) / "idx.faiss"), str(Path(tmp) / "chunks"))
+        assert loaded.passage_prefix == "passage: "
+        assert RAGRetrivier(emb, loaded).search("prazo de entrega", top_k=1) == [chunks[3]]
+        assert emb.calls[-1] == ["query: prazo de entrega"], emb.calls[-1]
+        # mais chunks num índice cru continuam crus
+        RAGRetrivier(emb, raw).add_chunks(["novo chunk"])
+        assert emb.calls[-1] == ["novo chunk"]
+
+    print("OK: DenseRetriever (argpartition + fusão de consultas)")
+
+
+if __name__ == "__main__":
+    main()
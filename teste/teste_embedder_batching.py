@@ -0,0 +1,134 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_embedder_batching.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from core.preprocess.chunker import estimate_tokens
+from core.preprocess.embedding_cache import EmbeddingCache
+from core.preprocess.embeddings import EMBED_VARIANTS, EMBEDDINGS_TOTAL, Embedder, default_embed_model, embed_source
+from core.utils.tracing import span
+
+
+class _FakeModel:
+    """Mesma interface do TextEmbedding; vetor = (tamanho do texto, 1). Falha acima de `max_batch`."""
+
+    def __init__(self, max_batch: int | None = None):
+        self.max_batch = max_batch
+        self.batches: list[int] = []
+        self.embedded = 0
+
+    def embed(self, texts, batch_size=256):
+        assert batch_size == len(texts)
+        self.batches.append(len(texts))
+        if self.max_batch is not None and len(texts) > self.max_batch:
+            raise RuntimeError("[ONNXRuntimeError] : 6 : RUNTIME_EXCEPTION : Failed to allocate memory for BFCArena")
+        self.embedded += len(texts)
+        for t in texts:
+            yield np.array([len(t), 1.0], dtype=np.float32)
+
+
+def _texts() -> list[str]:
+    return [("palavra " * n).strip() for n in (300, 5, 40, 5, 120, 12, 600, 8, 70, 3, 25, 90)]
+
+
+def _check_plan() -> None:
+    texts = _texts()
+    emb = Embedder("teste-e5", model=_FakeModel())
+    emb.batch_tokens = 1024
+    batches = emb._plan_batches(texts)
+    flat = [i for b in batches for i in b]
+    assert sorted(flat) == list(range(len(texts)))
+    tokens = [min(512, estimate_tokens(texts[i]) + 2) for i in flat]
+    assert tokens == sorted(tokens), "lotes devem seguir a ordem crescente de tamanho"
+    for b in batches:
+        assert len(b) * max(min(512, estimate_tokens(texts[i]) + 2) for i in b) <= 1024, b
+    assert len(batches[0]) > len(batches[-1]), "textos curtos devem ir em lotes maiores"
+
+    # vetores voltam na ordem original
+    vecs = emb.encode(texts)
+    assert vecs.shape == (len(texts), 2) and vecs.dtype == np.float32
+    assert [int(v) for v in vecs[:, 0]] == [len(t) for t in texts]
+
+    os.environ["EMBED_BATCH_SIZE"] = "5"
+    try:
+        assert [len(b) for b in emb._plan_batches(texts)] == [5, 5, 2]
+    finally:
+        os.environ.pop("EMBED_BATCH_SIZE", None)
+
+
+def _check_alloc_fallback() -> None:
+    texts = _texts()
+    model = _FakeModel(max_batch=2)
+    emb = Embedder("teste-e5", model=model)
+    before = emb.batch_tokens
+    vecs = emb.encode(texts)
+    assert [int(v) for v in vecs[:, 0]] == [len(t) for t in texts]
+    # só os lotes que falharam são refeitos: cada texto é calculado uma única vez
+    assert model.embedded == len(texts)
+    assert emb.batch_tokens < before
+
+    os.environ["EMBED_BATCH_SIZE"] = "4"
+    try:
+        Embedder("teste-e5", model=_FakeModel(max_batch=2)).encode(texts)
+        raise AssertionError("EMBED_BATCH_SIZE fixo não deve reduzir o lote sozinho")
+    except RuntimeError as e:
+        assert "falta de memória" in str(e)
+    finally:
+        os.environ.pop("EMBED_BATCH_SIZE", None)
+
+
+def _check_throughput() -> None:
+    emb = Embedder("teste-e5-throughput", model=_FakeModel())
+    with span("teste.root") as root:
+        emb.encode(["a", "b", "c"])
+    attrs = root.to_dict()["children"][0]["attrs"]
+    assert attrs["items_out"] == 3 and attrs["batches"] == 1 and attrs["per_s"] > 0, attrs
+    assert EMBEDDINGS_TOTAL.value(model="teste-e5-throughput") == 3
+    assert emb.encode([]).shape == (0,)
+
+    old = os.environ.pop("EMBED_MODEL", None)
+    try:
+        assert default_embed_model() == "intfloat/e5-base-v2"
+        os.environ["EMBED_MODEL"] = "e5-small-v2-int8"
+        assert default_embed_model() == "e5-small-v2-int8"
+    finally:
+        os.environ.pop("EMBED_MODEL", None)
+        if old is not None:
+            os.environ["EMBED_MODEL"] = old
+
+
+def _check_default_model() -> None:
+    # O default precisa estar registrado: o fastembed não conhece intfloat/e5-base-v2
+    assert "intfloat/e5-base-v2" in EMBED_VARIANTS
+    assert embed_source("intfloat/e5-base-v2") == "Xenova/e5-base-v2/onnx/model.onnx"
+    assert embed_source("BAAI/bge-small-en-v1.5") == "BAAI/bge-small-en-v1.5"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # cache antigo com vetores de 384 dimensões para o E5 base (768): não é usado
+        stale = EmbeddingCache("intfloat/e5-base-v2", cache_dir=tmp)
+        stale.put_many(["a"], np.ones((1, 384), dtype=np.float32))
+        emb = Embedder("intfloat/e5-base-v2", cache=EmbeddingCache("intfloat/e5-base-v2", cache_dir=tmp), model=_FakeModel())
+        assert emb.cache is None
+
+        ok = EmbeddingCache("e5-small-v2", cache_dir=tmp)
+        ok.put_many(["a"], np.ones((1, 384), dtype=np.float32))
+        assert Embedder("e5-small-v2", cache=ok, model=_FakeModel()).cache is ok
+
+
+def main() -> None:
+    _check_plan()
+    _check_alloc_fallback()
+    _check_throughput()
+    _check_default_model()
+    print("OK: embeddings em lotes por orçamento de tokens, fallback por lote e embeddings/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_embedding_cache.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from core.preprocess.embedding_cache import EmbeddingCache
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache("intfloat/e5-base-v2", cache_dir=tmp)
+        texts = ["bateria 12V 7Ah", "garantia mínima de 12 meses", "bateria 12V 7Ah"]
+
+        vecs, missing = cache.get_many(texts)
+        assert missing == [0, 1, 2], f"Cache vazio deveria faltar tudo, veio: {missing}"
+
+        fresh = np.arange(12, dtype=np.float32).reshape(3, 4)
+        cache.put_many(texts, fresh)
+        assert cache.stats()["entries"] == 2, "Textos duplicados não devem gerar linhas repetidas"
+
+        # Nova instância (simula outro run) lê do disco via memmap
+        cache2 = EmbeddingCache("intfloat/e5-base-v2", cache_dir=tmp)
+        vecs2, missing2 = cache2.get_many(["garantia mínima de 12 meses", "texto novo"])
+        assert missing2 == [1], f"Esperava só o texto novo faltando, veio: {missing2}"
+        assert np.allclose(vecs2[0], fresh[1]), f"Vetor recuperado divergente: {vecs2[0]}"
+
+        # Modelos diferentes não compartilham vetores
+        other = EmbeddingCache("intfloat/multilingual-e5-small", cache_dir=tmp)
+        _, missing3 = other.get_many(["bateria 12V 7Ah"])
+        assert missing3 == [0], "Cache não deve cruzar modelos de embedding"
+
+    print("OK - cache de embeddings por (modelo, hash do chunk) funcionando")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_import_time.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+# Dependências que só podem ser carregadas no primeiro uso (OCR, embeddings, índice, Gemini)
+HEAVY = ("cv2", "doctr", "fastembed", "onnxruntime", "faiss", "google.generativeai", "torch", "pdfplumber")
+
+# Orçamento (s) de import a frio por ponto de entrada; IMPORT_BUDGET_SCALE ajusta para máquinas lentas
+BUDGETS = {
+    "api.main": 3.0,
+    "core.Pipeline.pipeline": 2.0,
+    "core.Pipeline.batch": 1.0,
+    "run_editais": 1.0,
+}
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"elapsed": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(module: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert out.returncode == 0, f"import {module} falhou:\n{out.stderr[-2000:]}"
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    scale = float(os.getenv("IMPORT_BUDGET_SCALE", "1"))
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "import.sqlite"
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_file}", "PYTHONDONTWRITEBYTECODE": "1"}
+        for module, budget in BUDGETS.items():
+            res = _probe(module, env)
+            assert not res["heavy"], f"import {module} carregou dependências pesadas: {res['heavy']}"
+            assert res["elapsed"] <= budget * scale, f"import {module} levou {res['elapsed']:.2f}s (orçamento {budget * scale:.2f}s)"
+        # Importar a API não toca o banco: o schema é criado no startup (lifespan)
+        assert not db_file.exists(), "import de api.main abriu o banco"
+
+        out = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from fastapi.testclient import TestClient\n"
+                "from api.main import app\n"
+                "with TestClient(app) as c:\n"
+                "    assert c.get('/health').json() == {'status': 'ok'}\n",
+            ],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert out.returncode == 0, out.stderr[-2000:]
+        assert db_file.exists(), "startup da API deveria criar o schema"
+    print("OK: imports leves e schema do banco no startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_jobs.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.auth.deps import get_current_user
+from api.routes import job_routes
+from core.utils import jobs
+from core.utils.jobs import JobManager
+
+
+def _wait(job, timeout: float = 5.0) -> None:
+    job.future.exception(timeout=timeout)
+
+
+def main() -> None:
+    manager = JobManager(max_workers=1, history=2)
+    release = threading.Event()
+    seen = []
+
+    def slow(ctx, n):
+        ctx.progress("etapa 1", 40, itens=n)
+        release.wait(5)
+        ctx.progress("etapa 2", 20)  # não regride
+        seen.append(ctx.job_id)
+        return {"n": n}
+
+    def boom(ctx):
+        raise ValueError("falhou")
+
+    a = manager.submit(slow, 3, kind="teste")
+    b = manager.submit(boom, kind="teste")
+    time.sleep(0.1)
+    # um worker: o segundo job espera na fila enquanto o primeiro roda
+    assert manager.get(a.id).status == "running" and manager.get(a.id).percent == 40.0
+    assert manager.get(b.id).status == "queued"
+    assert manager.get(a.id).meta["itens"] == 3
+    release.set()
+    _wait(a)
+    _wait(b)
+
+    da = manager.get(a.id).to_dict()
+    assert da["status"] == "done" and da["percent"] == 100.0 and da["result"] == {"n": 3}
+    db_ = manager.get(b.id).to_dict()
+    assert db_["status"] == "error" and "ValueError" in db_["error"] and "result" not in db_
+    assert manager.stats()["done"] == 1 and manager.stats()["error"] == 1
+
+    # histórico limitado: só os 2 finalizados mais recentes ficam
+    c = manager.submit(lambda ctx: "ok", owner="ana@teste")
+    _wait(c)
+    d = manager.submit(lambda ctx: "ok", owner="bia@teste")
+    _wait(d)
+    assert manager.get(a.id) is None and manager.get(c.id) is not None
+
+    # Rotas /jobs sobre o mesmo manager
+    jobs._manager = manager
+    app = FastAPI()
+    app.include_router(job_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1, "email": "ana@teste"}
+    client = TestClient(app)
+    r = client.get(f"/jobs/{c.id}")
+    assert r.status_code == 200 and r.json()["result"] == "ok"
+    assert client.get("/jobs/nao-existe").status_code == 404
+    listed = client.get("/jobs/").json()
+    assert listed["stats"]["workers"] == 1
+    assert [j["job_id"] for j in listed["jobs"]] == [c.id]
+
+    # Job de outro usuário: 404 e fora da listagem
+    assert client.get(f"/jobs/{d.id}").status_code == 404
+    app.dependency_overrides[get_current_user] = lambda: {"id": 2, "email": "bia@teste"}
+    assert client.get(f"/jobs/{d.id}").status_code == 200
+    assert client.get(f"/jobs/{c.id}").status_code == 404
+    app.dependency_overrides[get_current_user] = lambda: {"id": 3}
+    assert client.get(f"/jobs/{c.id}").status_code == 404 and client.get("/jobs/").json()["jobs"] == []
+
+    manager.shutdown()
+    print("OK: jobs")
+
+
+if __name__ == "__main__":
+    main()
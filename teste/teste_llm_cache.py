@@ -0,0 +1,106 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_llm_cache.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.llm.cache import LLMResponseCache, make_cache_key
+from core.llm.client import LLMClient
+from db.base import Base
+import db.models  # noqa: F401
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self._text = text
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return {"response": self._text}
+
+
+class _FakeSession:
+    """Conta chamadas ao /api/generate sem abrir conexão."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        return _FakeResponse(f"resposta {self.calls}")
+
+
+def main() -> None:
+    # 1) LRU limitado por bytes + TTL
+    c = LLMResponseCache(ttl_seconds=None, max_bytes=20, persist=False)
+    c.put("a", "x" * 8)
+    c.put("b", "y" * 8)
+    assert c.get("a") == "x" * 8  # "a" vira o mais recente
+    c.put("c", "z" * 8)  # estoura 20 bytes -> remove "b" (LRU)
+    assert c.get("b") is None and c.get("a") and c.get("c")
+    assert c.stats()["evictions"] == 1, c.stats()
+
+    c2 = LLMResponseCache(ttl_seconds=0.05, persist=False)
+    c2.put("k", "v")
+    assert c2.get("k") == "v"
+    time.sleep(0.08)
+    assert c2.get("k") is None, "Entrada deveria expirar pelo TTL"
+
+    # 2) Nível persistente (SQLite temporário): sobrevive a um novo processo/cache
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'cache.sqlite'}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+
+        key = make_cache_key("llama3.2:1b", {"temperature": 0}, None, "prompt")
+        LLMResponseCache(persist=True, session_factory=factory).put(key, "{\"ok\": true}", model="llama3.2:1b")
+        fresh = LLMResponseCache(persist=True, session_factory=factory)
+        assert fresh.get(key) == "{\"ok\": true}"
+        assert fresh.get(key) == "{\"ok\": true}"
+        st = fresh.stats()
+        assert st["hits_db"] == 1 and st["hits_memory"] == 1, st
+        engine.dispose()
+
+    # 3) Integração com o LLMClient: prompt repetido não vai ao modelo
+    session = _FakeSession()
+    llm = LLMClient(base_url="http://mock", session=session, cache=LLMResponseCache(persist=False))
+    r1 = llm.generate("extraia requisitos")
+    r2 = llm.generate("extraia requisitos")
+    r3 = llm.generate("outro prompt")
+    assert r1 == r2 == "resposta 1" and r3 == "resposta 2", (r1, r2, r3)
+    assert session.calls == 2, f"Esperava 2 chamadas ao LLM, veio {session.calls}"
+
+    # 4) Resposta do modelo de fallback (OOM) não fica no cache sob a chave do modelo configurado
+    import requests
+
+    class _OOM(LLMClient):
+        def _try_generate(self, base_url, payload):
+            if payload["model"] == "grande":
+                resp = requests.Response()
+                resp.status_code = 500
+                resp._content = b'{"error":"cuda: unable to allocate"}'
+                raise requests.exceptions.HTTPError(response=resp)
+            return f"resposta de {payload['model']}"
+
+        def list_models(self):
+            return ["llama3.2:1b"]
+
+    cache = LLMResponseCache(persist=False)
+    llm = _OOM(model="grande", base_url="http://mock", session=_FakeSession(), cache=cache)
+    assert llm.generate("extraia requisitos") == "resposta de llama3.2:1b"
+    assert cache.get(llm._cache_key(llm._build_payload("extraia requisitos"))) is None
+
+    print("OK - cache de respostas do LLM (LRU + TTL + banco) funcionando")
+
+
+if __name__ == "__main__":
+    main()
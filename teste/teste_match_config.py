@@ -0,0 +1,67 @@
+import os
+import sys
+from pathlib import Path
+
+# Permite executar via: python teste/teste_match_config.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.match.config import MatchConfig, conversion_factors, convert_value, get_match_config, norm_unit
+from core.match.matching_engine import MatchingEngine
+from core.match.scoring import compute_score
+
+
+def main() -> None:
+    cfg = MatchConfig.from_env(
+        {
+            "MATCH_TOLERANCE_PCT": "5",
+            "MATCH_TOLERANCE_OVERRIDES": "tensao_v=0.02;capacidade_ah=abc,capacidade_ah=0.5",
+            "IMPORTANT_REQUIREMENTS": "tensao_v, capacidade_ah",
+            "KEY_REQUIREMENTS_POLICY": "ANY",
+            "SEQUENCE_FILTER": "corrente_a;tensao_v,tensao_v",
+        }
+    )
+    assert cfg.tolerance_pct == 0.05
+    assert cfg.tolerance_for("tensao_v") == 0.02
+    # override inválido: vale a primeira ocorrência -> cai na tolerância global
+    assert cfg.tolerance_for("capacidade_ah") == 0.05
+    assert cfg.tolerance_for("capacidade_ah", {"capacidade_ah": 25}) == 0.25
+    assert cfg.key_requirements == ("tensao_v", "capacidade_ah") and cfg.key_policy == "any"
+    assert cfg.sequence_filter == ("corrente_a", "tensao_v")
+
+    assert convert_value(7000, "mAh", "Ah") == 7.0
+    assert convert_value(1, "TB", "GB") == 1024.0
+    assert convert_value(1, "Gbit", "Mbps") == 1000.0
+    assert convert_value(1, "kg", "V") is None
+
+    # "unidade" não-string vinda do JSON do LLM: sem unidade (não quebra o cache)
+    assert norm_unit(["V"]) is None and norm_unit({"u": "V"}) is None and norm_unit(12) is None
+    assert conversion_factors(["V"], "V") is None and convert_value(1, {"u": "V"}, "V") is None
+    assert norm_unit(" Volts ") == "v"
+
+    produto = {"atributos": {"tensao_v": {"valor": 11.8, "unidade": "V"}}}
+    edital = {"requisitos": {"tensao_v": {"valor_min": 12, "unidade": "V", "obrigatorio": True}}}
+    engine = MatchingEngine()
+    assert engine.compare(produto, edital, config=cfg) == {"tensao_v": "ATENDE"}  # 12 - 2%
+    assert engine.compare(produto, edital, config=MatchConfig()) == {"tensao_v": "NAO_ATENDE"}
+    lista = {"atributos": {"tensao_v": {"valor": 12, "unidade": ["V", "Vdc"]}}}
+    # unidade em lista é ambígua: vira dúvida (como antes do cache), sem TypeError
+    assert engine.compare(lista, edital, config=cfg) == {"tensao_v": "DUVIDA"}
+    assert compute_score({"tensao_v": "ATENDE"}, edital, config=cfg)["key_requirements"]["policy"] == "any"
+
+    # Sem config explícito: segue o ambiente, reaproveitando a instância enquanto ele não muda
+    os.environ["MATCH_TOLERANCE_PCT"] = "2"
+    first = get_match_config()
+    assert get_match_config() is first and first.tolerance_pct == 0.02
+    assert engine.compare(produto, edital) == {"tensao_v": "ATENDE"}
+    os.environ["MATCH_TOLERANCE_PCT"] = "0"
+    assert get_match_config() is not first
+    assert engine.compare(produto, edital) == {"tensao_v": "NAO_ATENDE"}
+    os.environ.pop("MATCH_TOLERANCE_PCT", None)
+
+    print("OK: MatchConfig")
+
+
+if __name__ == "__main__":
+    main()
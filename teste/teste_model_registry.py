@@ -0,0 +1,208 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_model_registry.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.ocr.extractor import PDFExtractor
+from core.preprocess.editalExtractor import EditalExtractor
+from core.preprocess.product_extractor import ProductExtractor
+from core.utils.concurrency import map_ordered
+from core.utils.models import REGISTRY, ModelRegistry, SerializedModel, get_llm_client, warm_up, warmup_kinds
+
+
+class _FakePredictor:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, images):
+        self.calls += 1
+        return images
+
+
+def _check_load_once() -> None:
+    reg = ModelRegistry()
+    loads = []
+
+    def _factory():
+        loads.append(1)
+        time.sleep(0.05)
+        return object()
+
+    got = map_ordered(lambda _: reg.get(("teste", "a"), _factory), range(8), max_workers=8)
+    assert len(loads) == 1 and all(g is got[0] for g in got)
+    assert reg.get(("teste", "b"), object) is not got[0]
+    assert [m["key"] for m in reg.loaded()] == [["teste", "a"], ["teste", "b"]]
+    assert reg.loaded()[0]["load_ms"] >= 40
+
+
+def _check_llm_clients() -> None:
+    REGISTRY.clear()
+    a, b = EditalExtractor(), ProductExtractor()
+    assert a.llm is b.llm, "extratores deveriam compartilhar o LLMClient"
+    assert get_llm_client("outro") is not a.llm and get_llm_client("outro") is get_llm_client("outro")
+
+    old = os.environ.get("LLM_URL")
+    os.environ["LLM_URL"] = "http://llm-b:11434"
+    try:
+        c = get_llm_client()
+        assert c is not a.llm and c.base_url == "http://llm-b:11434"
+        os.environ["MODEL_REGISTRY"] = "0"
+        assert get_llm_client() is not get_llm_client()
+    finally:
+        os.environ.pop("MODEL_REGISTRY", None)
+        if old is None:
+            os.environ.pop("LLM_URL", None)
+        else:
+            os.environ["LLM_URL"] = old
+    REGISTRY.clear()
+
+
+def _check_fallback_keeps_shared_state() -> None:
+    """Fallback de host/modelo não muda o cliente compartilhado, mas é lembrado (com TTL) nas próximas chamadas."""
+    import requests
+
+    from core.llm.client import LLMClient
+
+    class _Flaky(LLMClient):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            self.calls = []
+
+        def _try_generate(self, base_url, payload):
+            self.calls.append((base_url, payload["model"]))
+            if base_url == "http://primario:11434":
+                raise requests.exceptions.ConnectionError("recusado")
+            if payload["model"] == "grande":
+                resp = requests.Response()
+                resp.status_code = 500
+                resp._content = b'{"error":"cuda: unable to allocate"}'
+                raise requests.exceptions.HTTPError(response=resp)
+            return f"{base_url}|{payload['model']}"
+
+        def _fallback_urls(self):
+            return ["http://reserva:11434"]
+
+        def list_models(self):
+            return ["llama3.2:1b"]
+
+    llm = _Flaky(model="x", base_url="http://primario:11434", cache=None)
+    assert llm._generate({"model": "x", "prompt": "p"}, "p") == ("http://reserva:11434|x", "x")
+    assert llm.base_url == "http://primario:11434"
+    # segunda chamada vai direto no host que funcionou (sem os retries do primário)
+    llm.calls.clear()
+    assert llm._generate({"model": "x", "prompt": "p"}, "p") == ("http://reserva:11434|x", "x")
+    assert llm.calls == [("http://reserva:11434", "x")], llm.calls
+
+    llm = _Flaky(model="grande", base_url="http://reserva:11434", cache=None)
+    assert llm._generate({"model": "grande", "prompt": "p"}, "p") == ("http://reserva:11434|llama3.2:1b", "llama3.2:1b")
+    assert llm.model == "grande"
+    llm.calls.clear()
+    assert llm._generate({"model": "grande", "prompt": "p"}, "p") == ("http://reserva:11434|llama3.2:1b", "llama3.2:1b")
+    assert llm.calls == [("http://reserva:11434", "llama3.2:1b")], llm.calls
+
+    # Passado o TTL, o modelo configurado volta a ser tentado primeiro
+    llm._sticky["model"] = ("llama3.2:1b", 0.0)
+    llm.calls.clear()
+    llm._generate({"model": "grande", "prompt": "p"}, "p")
+    assert llm.calls[0] == ("http://reserva:11434", "grande"), llm.calls
+
+    os.environ["LLM_FALLBACK_TTL_SECONDS"] = "0"
+    try:
+        llm = _Flaky(model="x", base_url="http://primario:11434", cache=None)
+    finally:
+        os.environ.pop("LLM_FALLBACK_TTL_SECONDS", None)
+    llm._generate({"model": "x", "prompt": "p"}, "p")
+    llm.calls.clear()
+    llm._generate({"model": "x", "prompt": "p"}, "p")
+    assert llm.calls[0] == ("http://primario:11434", "x"), llm.calls
+
+
+def _check_ocr_shared() -> None:
+    REGISTRY.clear()
+    fake = _FakePredictor()
+    REGISTRY.get(("ocr", "doctr"), lambda: SerializedModel(fake))
+    m1 = PDFExtractor()._ensure_ocr_model()
+    m2 = PDFExtractor()._ensure_ocr_model()
+    assert m1 is m2 and m1.model is fake
+
+    # chamadas concorrentes no predictor compartilhado são serializadas
+    inside, peak = [0], [0]
+    lock = threading.Lock()
+
+    def _slow(images):
+        with lock:
+            inside[0] += 1
+            peak[0] = max(peak[0], inside[0])
+        time.sleep(0.01)
+        with lock:
+            inside[0] -= 1
+        return images
+
+    shared = SerializedModel(_slow)
+    map_ordered(lambda i: shared([i]), range(6), max_workers=6)
+    assert peak[0] == 1, peak
+
+
+def _check_warm_up() -> None:
+    assert warmup_kinds("") == [] and warmup_kinds("all") == ["embedder", "ocr", "llm"]
+    assert warmup_kinds("ocr, llm") == ["ocr", "llm"]
+    try:
+        warmup_kinds("gpu")
+        raise AssertionError("MODEL_WARMUP inválido deveria falhar")
+    except ValueError:
+        pass
+
+    fake = REGISTRY.get(("ocr", "doctr"), lambda: SerializedModel(_FakePredictor())).model
+    calls = fake.calls
+    report = warm_up(["ocr"])
+    assert report["ocr"]["ok"] and fake.calls == calls + 1
+    assert any(m["key"] == ["ocr", "doctr"] and "warmup_ms" in m for m in REGISTRY.loaded())
+
+    # LLM fora do ar: warm-up registra a falha e não derruba o startup
+    os.environ["LLM_URL"] = "http://127.0.0.1:9"
+    os.environ["LLM_TIMEOUT_SECONDS"] = "1"
+    try:
+        report = warm_up(["llm"])
+    finally:
+        os.environ.pop("LLM_URL", None)
+        os.environ.pop("LLM_TIMEOUT_SECONDS", None)
+    assert report["llm"]["ok"] is False and report["llm"]["error"]
+
+
+def _check_api_startup() -> None:
+    from fastapi.testclient import TestClient
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(tmp) / 'models.sqlite'}")
+        os.environ["MODEL_WARMUP"] = "ocr"
+        try:
+            from api.main import create_app
+
+            with TestClient(create_app()) as client:
+                body = client.get("/health/models").json()
+        finally:
+            os.environ.pop("MODEL_WARMUP", None)
+    assert body["warmup"]["ocr"]["ok"], body
+    assert any(m["key"] == ["ocr", "doctr"] for m in body["loaded"]), body
+
+
+def main() -> None:
+    _check_load_once()
+    _check_llm_clients()
+    _check_fallback_keeps_shared_state()
+    _check_ocr_shared()
+    _check_warm_up()
+    _check_api_startup()
+    REGISTRY.clear()
+    print("OK: registro de modelos compartilhados e warm-up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+# Permite executar via: python teste/teste_ocr_routing.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.ocr.extractor import PDFExtractor
+
+
+BODY = "Item 1: Notebook com processador de 8 núcleos, 16 GB de memória RAM e SSD de 512 GB. " * 30
+
+
+class _FakeExtractor(PDFExtractor):
+    """Substitui só as fontes de texto; a decisão de roteamento é a real."""
+
+    def __init__(self, pages, ocr_available=True, images=None):
+        super().__init__()
+        self.page_cache = None
+        self._pages = pages
+        self._ocr_available = ocr_available
+        # Páginas com imagem (default: todas, como um PDF escaneado)
+        self._images = set(range(len(pages))) if images is None else set(images)
+        self.ocr_requested: list[int] = []
+        self.whole_doc_ocr = False
+
+    def extract_pages_native(self, pdf_path):
+        return list(self._pages)
+
+    def _pages_with_images(self, pdf_path, page_indices):
+        return {i for i in page_indices if i in self._images}
+
+    def extract_pages_ocr(self, pdf_path, page_indices, **kwargs):
+        if not self._ocr_available:
+            raise RuntimeError("OCR não disponível")
+        self.ocr_requested = list(page_indices)
+        return {i: f"ANEXO ESCANEADO página {i} " + BODY[:400] for i in page_indices}
+
+    def extract_text_ocr(self, pdf_path):
+        self.whole_doc_ocr = True
+        return ""
+
+
+def main() -> None:
+    os.environ.pop("OCR_FORCE_GEMINI", None)
+    os.environ.pop("GEMINI_API_KEY", None)
+    os.environ.pop("GOOGLE_API_KEY", None)
+    os.environ["OCR_ROUTING"] = "page"
+
+    # Documento digital: nenhuma página vai para OCR
+    ex = _FakeExtractor([BODY, BODY])
+    assert ex.extract("x.pdf") == f"{BODY}\n{BODY}\n"
+    assert ex.last_meta["method"] == "native" and ex.ocr_requested == []
+
+    # Digital com página em branco/assinatura sem imagem: continua nativo, sem carregar o doctr
+    ex = _FakeExtractor([BODY, "", "Assinatura", BODY], images=[])
+    ex.extract("x.pdf")
+    assert ex.last_meta["method"] == "native" and ex.ocr_requested == [] and ex.last_meta["pages_ocr"] == 0
+
+    # Misto: corpo digital + anexo escaneado (página 2 só imagem; página 3 texto lixo, com ou sem imagem)
+    ex = _FakeExtractor([BODY, BODY, "", "~~ ## ~~ " * 10], images=[2])
+    txt = ex.extract("x.pdf")
+    assert ex.ocr_requested == [2, 3], ex.ocr_requested
+    assert ex.last_meta["method"] == "hybrid"
+    assert ex.last_meta["pages_ocr"] == 2
+    assert not ex.whole_doc_ocr
+    parts = txt.split("ANEXO ESCANEADO")
+    assert txt.startswith(BODY) and len(parts) == 3 and "página 2" in parts[1], "ordem das páginas não preservada"
+
+    # Sem doctr: mantém o texto nativo (comportamento anterior)
+    ex = _FakeExtractor([BODY, ""], ocr_available=False)
+    assert ex.extract("x.pdf") == f"{BODY}\n"
+    assert ex.last_meta["method"] == "native"
+
+    # Modo documento: volta ao fluxo antigo (nativo bom => não faz OCR)
+    os.environ["OCR_ROUTING"] = "document"
+    ex = _FakeExtractor([BODY, ""])
+    ex.extract("x.pdf")
+    assert ex.last_meta["method"] == "native" and ex.ocr_requested == []
+    os.environ.pop("OCR_ROUTING", None)
+
+    print("OK: roteamento de OCR por página")
+
+
+if __name__ == "__main__":
+    main()
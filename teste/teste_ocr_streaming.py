@@ -0,0 +1,141 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_ocr_streaming.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.ocr.extractor import PDFExtractor, _adaptive_dpi, _render_rgb
+
+
+PDF = REPO_ROOT / "data" / "editais" / "Edital_silverania.pdf"
+
+
+class _FakePage:
+    def __init__(self, shape):
+        self.shape = shape
+
+    def render(self):
+        return f"{self.shape[1]}x{self.shape[0]}"
+
+
+class _FakeModel:
+    """Imita o ocr_predictor do doctr: recebe lista de imagens, devolve .pages."""
+
+    def __init__(self):
+        self.batches: list[int] = []
+
+    def __call__(self, images):
+        self.batches.append(len(images))
+        return type("R", (), {"pages": [_FakePage(img.shape) for img in images]})()
+
+
+def _write_colour_pdf(path: Path) -> Path:
+    """PDF de 2 páginas: retângulo vermelho (vetor, sem imagem) e uma imagem RGB 2x2 azul."""
+    red = b"1 0 0 rg 0 0 200 200 re f"
+    draw = b"q 200 0 0 200 0 0 cm /Im1 Do Q"
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R 6 0 R] /Count 2 >>",
+        b"<< /Length %d >>\nstream\n" % len(red) + red + b"\nendstream",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] /Contents 3 0 R >>",
+        b"<< /Length %d >>\nstream\n" % len(draw) + draw + b"\nendstream",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] /Resources << /XObject << /Im1 7 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /XObject /Subtype /Image /Width 2 /Height 2 /ColorSpace /DeviceRGB /BitsPerComponent 8 /Length 12 >>\nstream\n"
+        + b"\x00\x00\xff" * 4 + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def _check_rgb_and_images() -> None:
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        print("SKIP: pypdfium2 não instalado")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _write_colour_pdf(Path(tmp) / "cores.pdf")
+
+        # Ordem de canais igual ao read_pdf do doctr: RGB, sem alfa
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            page = pdf[0]
+            img = _render_rgb(page, 72.0)
+            page.close()
+        finally:
+            pdf.close()
+        assert img.shape == (200, 200, 3), img.shape
+        assert tuple(int(c) for c in img[100, 100]) == (255, 0, 0), img[100, 100]
+
+        seen = []
+
+        class _Capture(_FakeModel):
+            def __call__(self, images):
+                seen.extend(images)
+                return super().__call__(images)
+
+        ex = PDFExtractor()
+        ex.ocr_model = _Capture()
+        list(ex.iter_ocr_pages(str(pdf_path), [0, 1]))
+        assert tuple(int(c) for c in seen[0][50, 50]) == (255, 0, 0), seen[0][50, 50]
+        assert tuple(int(c) for c in seen[1][50, 50]) == (0, 0, 255), seen[1][50, 50]
+
+        # Só a página com objeto de imagem conta como escaneada quando vem sem texto
+        assert ex._pages_with_images(str(pdf_path), [0, 1]) == {1}
+        assert ex._pages_needing_ocr(["", ""], str(pdf_path)) == [1]
+
+
+def main() -> None:
+    # A4 sem texto: DPI base; texto denso: sobe; página enorme: limitada por pixels
+    assert round(_adaptive_dpi(595, 842)) == 144
+    assert round(_adaptive_dpi(595, 842, "x" * 10000)) == 200
+    assert _adaptive_dpi(2384, 3370) < 144  # A0
+    assert _adaptive_dpi(595, 842, max_dpi=110) == 110
+
+    _check_rgb_and_images()
+
+    if not PDF.exists():
+        print("SKIP: PDF de exemplo não encontrado")
+        return
+
+    os.environ["OCR_BATCH_PAGES"] = "3"
+    os.environ.pop("OCR_MAX_RSS_MB", None)
+    ex = PDFExtractor()
+    ex.ocr_model = _FakeModel()
+    out = list(ex.iter_ocr_pages(str(PDF), [0, 1, 2, 3, 4, 5, 6]))
+    assert [i for i, _ in out] == [0, 1, 2, 3, 4, 5, 6]
+    assert ex.ocr_model.batches == [3, 3, 1], ex.ocr_model.batches
+    assert ex.last_meta["ocr_stream"]["batches"] == 3
+
+    # Teto de RSS irrisório: lote cai pela metade e DPI diminui a cada lote
+    os.environ["OCR_BATCH_PAGES"] = "4"
+    os.environ["OCR_MAX_RSS_MB"] = "1"
+    ex = PDFExtractor()
+    ex.ocr_model = _FakeModel()
+    list(ex.iter_ocr_pages(str(PDF), list(range(8))))
+    meta = ex.last_meta["ocr_stream"]
+    if meta["peak_rss_mb"] is not None:
+        assert ex.ocr_model.batches == [4, 2, 1, 1], ex.ocr_model.batches
+        assert meta["throttled"] >= 1 and meta["dpi"][-1] < meta["dpi"][0], meta
+    os.environ.pop("OCR_MAX_RSS_MB", None)
+    os.environ.pop("OCR_BATCH_PAGES", None)
+
+    print("OK: OCR em streaming por lotes")
+
+
+if __name__ == "__main__":
+    main()
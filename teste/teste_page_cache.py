@@ -0,0 +1,71 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_page_cache.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.ocr.extractor import _extract_native_range, _extract_pages_parallel, _mp_context, _split_ranges
+from core.ocr.page_cache import PageTextCache, file_sha256
+
+
+def _write_pdf(pages: list[str], path: Path) -> Path:
+    """PDF mínimo com uma linha de texto nativo (Helvetica) por página."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        body = b"BT /F1 12 Tf 40 800 Td (" + text.encode("ascii") + b") Tj ET"
+        objs.append(b"<< /Length %d >>\nstream\n" % len(body) + body + b"\nendstream")
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objs)))
+        kids.append(len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def main() -> None:
+    assert _split_ranges(list(range(10)), 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert _split_ranges([5, 9], 4) == [[5], [9]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_a = Path(tmp) / "a.pdf"
+        pdf_a.write_bytes(b"%PDF-1.4 conteudo A")
+        sha_a = file_sha256(pdf_a)
+
+        cache = PageTextCache(Path(tmp) / "pages")
+        assert cache.get_many(sha_a, range(3), "native") == {}
+
+        cache.put_many(sha_a, {0: "página 1", 2: ""}, "native")
+        got = cache.get_many(sha_a, range(3), "native")
+        # página vazia também é cacheada (não reextrai página em branco)
+        assert got == {0: "página 1", 2: ""}, got
+
+        # Método diferente e arquivo diferente não compartilham entradas
+        assert cache.get_many(sha_a, range(3), "doctr") == {}
+        pdf_a.write_bytes(b"%PDF-1.4 conteudo B")
+        assert cache.get_many(file_sha256(pdf_a), range(3), "native") == {}
+
+        # Extração nativa em processos: spawn (não fork) e mesmo texto da extração serial
+        assert _mp_context().get_start_method() == "spawn"
+        pdf = _write_pdf([f"pagina {i}" for i in range(4)], Path(tmp) / "multi.pdf")
+        serial = _extract_native_range(str(pdf), [0, 1, 2, 3])
+        assert serial == {i: f"pagina {i}" for i in range(4)}, serial
+        assert _extract_pages_parallel(str(pdf), [0, 1, 2, 3], 2) == serial
+
+    print("OK: cache de páginas")
+
+
+if __name__ == "__main__":
+    main()
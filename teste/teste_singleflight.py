@@ -0,0 +1,138 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Permite executar via: python teste/teste_singleflight.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.utils.singleflight import SingleFlight
+from db.base import Base
+from db.repositories import cache_repo
+
+
+def _check_dedup() -> None:
+    flight = SingleFlight("teste")
+    calls = 0
+    started = threading.Event()
+    release = threading.Event()
+
+    def _extract(sha: str) -> dict:
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait(5)
+        return {"sha": sha, "items": [1, 2]}
+
+    out = []
+
+    def _worker() -> None:
+        out.append(flight.do(("edital", "abc", None), _extract, "abc"))
+
+    threads = [threading.Thread(target=_worker) for _ in range(6)]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    while flight.stats()["shared"] < 5:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert calls == 1, f"Extração deveria rodar uma vez, rodou {calls}"
+    assert all(r == {"sha": "abc", "items": [1, 2]} for r, _ in out)
+    assert sorted(shared for _, shared in out) == [False] + [True] * 5
+    assert flight.inflight() == 0
+
+    # terminada a chamada, a chave é liberada: a próxima calcula de novo
+    _, shared = flight.do(("edital", "abc", None), lambda: {"x": 1})
+    assert shared is False
+
+
+def _check_error_shared() -> None:
+    flight = SingleFlight("teste")
+    gate = threading.Event()
+    errors = []
+
+    def _boom() -> None:
+        gate.wait(5)
+        raise RuntimeError("ocr falhou")
+
+    def _worker() -> None:
+        try:
+            flight.do("k", _boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=_worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while flight.stats()["calls"] < 3:
+        time.sleep(0.005)
+    gate.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["ocr falhou"] * 3, errors
+    assert flight.inflight() == 0
+
+
+def _miss_once(fn):
+    """Simula a corrida: a primeira consulta não vê a linha que outra sessão acabou de gravar."""
+    first = [True]
+
+    def _get(db, **kw):
+        if first[0]:
+            first[0] = False
+            return None
+        return fn(db, **kw)
+
+    return _get
+
+
+def _check_upsert_race() -> None:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    a, b, c = Session(), Session(), Session()
+
+    cache_repo.upsert_document_cache(b, doc_type="edital", sha256="s1", hint_key="h", extracted_json={"v": "b"})
+    original = cache_repo.get_document_cache
+    cache_repo.get_document_cache = _miss_once(original)
+    try:
+        rec = cache_repo.upsert_document_cache(a, doc_type="edital", sha256="s1", hint_key="h", extracted_json={"v": "a"})
+    finally:
+        cache_repo.get_document_cache = original
+    assert rec.extracted_json == {"v": "a"}
+    assert c.query(cache_repo.DocumentCache).count() == 1
+
+    cache_repo.upsert_match_cache(b, edital_sha256="e", produto_sha256="p", settings_sig="s", result_json=[1])
+    original_m = cache_repo.get_match_cache
+    cache_repo.get_match_cache = _miss_once(original_m)
+    try:
+        rec = cache_repo.upsert_match_cache(a, edital_sha256="e", produto_sha256="p", settings_sig="s", result_json=[2])
+    finally:
+        cache_repo.get_match_cache = original_m
+    assert rec.result_json == [2]
+    assert c.query(cache_repo.MatchCache).count() == 1
+    for s in (a, b, c):
+        s.close()
+
+
+def main() -> None:
+    _check_dedup()
+    _check_error_shared()
+    _check_upsert_race()
+    print("OK: single-flight e upsert concorrente de cache")
+
+
+if __name__ == "__main__":
+    main()
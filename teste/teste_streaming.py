@@ -0,0 +1,115 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Permite executar via: python teste/teste_streaming.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.llm.client import LLMClient, token_sink
+from core.utils.concurrency import map_ordered
+from core.Pipeline.events import PipelineEvents, PipelineEventStream
+
+
+TOKENS = ["{\"tensao_v\"", ": ", "12", "}"]
+SERVED = {"stream": 0, "plain": 0, "aborted": 0}
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        if not payload.get("stream"):
+            SERVED["plain"] += 1
+            self.wfile.write(json.dumps({"response": "".join(TOKENS), "done": True}).encode())
+            return
+        SERVED["stream"] += 1
+        try:
+            for i, tok in enumerate(TOKENS * (50 if payload["prompt"] == "longo" else 1)):
+                self.wfile.write((json.dumps({"response": tok, "done": False}) + "\n").encode())
+                self.wfile.flush()
+                time.sleep(0.01)
+            self.wfile.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+        except (BrokenPipeError, ConnectionResetError):
+            SERVED["aborted"] += 1
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    llm = LLMClient(base_url=f"http://127.0.0.1:{server.server_port}", model="fake", cache=None)
+
+    # Gerador de tokens e generate() continuam devolvendo o mesmo texto
+    assert list(llm.generate_stream("x")) == TOKENS
+    assert llm.generate("x") == "".join(TOKENS) and SERVED["plain"] == 1
+    got = []
+    with token_sink(got.append):
+        assert llm.generate("x") == "".join(TOKENS)
+    assert got == TOKENS and SERVED["plain"] == 1
+
+    # Workers do iter_ordered (fullscan paralelo) herdam o sink de quem chamou
+    got = []
+    with token_sink(got.append):
+        outs = map_ordered(lambda _: llm.generate("x"), range(2), max_workers=2)
+    assert outs == ["".join(TOKENS)] * 2 and sorted(got) == sorted(TOKENS * 2)
+
+    # Eventos de etapa + tokens; cancelamento no meio da geração
+    def run(ev: PipelineEvents):
+        with ev.stage("extract", doc="edital") as info, ev.llm_tokens():
+            info["texto"] = llm.generate("x")
+        with ev.stage("justify"), ev.llm_tokens():
+            llm.generate("longo")
+        return {"ok": True}
+
+    stream = PipelineEventStream(run)
+    seen = []
+    for ev in stream:
+        seen.append(ev)
+        if ev["type"] == "token" and ev["stage"] == "justify" and sum(e["type"] == "token" for e in seen) > 8:
+            stream.cancel()
+    stream.wait(5)
+    types = [(e["type"], e.get("stage"), e.get("status")) for e in seen if e["type"] != "token"]
+    assert types[:3] == [("stage", "extract", "start"), ("stage", "extract", "done"), ("stage", "justify", "start")], types
+    extract_done = next(e for e in seen if e.get("stage") == "extract" and e.get("status") == "done")
+    assert extract_done["texto"] == "".join(TOKENS) and extract_done["doc"] == "edital"
+    assert seen[-1]["type"] == "cancelled"
+    assert [e["text"] for e in seen if e["type"] == "token" and e["stage"] == "extract"] == TOKENS
+    time.sleep(0.3)
+    assert SERVED["aborted"] == 1  # conexão fechada: o servidor parou de gerar
+
+    # Execução completa termina com "result"
+    done = list(PipelineEventStream(lambda ev: {"ok": True}))
+    assert done == [{"type": "result", "data": {"ok": True}}]
+
+    # Lock do pipeline liberado pela própria execução, mesmo com o consumidor abandonando o stream
+    lock = threading.Lock()
+    lock.acquire()
+    gate = threading.Event()
+    abandoned = PipelineEventStream(lambda ev: gate.wait(5))
+    abandoned.add_done_callback(lock.release)
+    abandoned.cancel()
+    assert lock.locked()
+    gate.set()
+    abandoned.wait(5)
+    assert not lock.locked()
+    finished = []
+    abandoned.add_done_callback(lambda: finished.append(1))  # já terminou: chama na hora
+    assert finished == [1]
+
+    server.shutdown()
+    print("OK: streaming")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Permite executar via: python teste/teste_tracing.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.Pipeline.events import PipelineEvents
+from core.utils.concurrency import map_ordered
+from core.utils.metrics import MetricsRegistry, REGISTRY
+from core.utils.profiling import profile
+from core.utils.tracing import STAGE_SECONDS, current_span, span
+
+
+def _check_nested_spans() -> None:
+    with span("teste.root") as root:
+        with span("teste.filho", chars_in=10) as s:
+            s.set(chars_out=3, cached=True)
+        try:
+            with span("teste.falha"):
+                raise ValueError("x")
+        except ValueError:
+            pass
+        # filhos em threads (map_ordered propaga o contexto)
+        def _work(i: int) -> int:
+            with span("teste.paralelo", i=i):
+                return i * 2
+
+        assert map_ordered(_work, [1, 2, 3], max_workers=3) == [2, 4, 6]
+    assert current_span() is None
+
+    tree = root.to_dict()
+    names = [c["name"] for c in tree["children"]]
+    assert names[:2] == ["teste.filho", "teste.falha"], names
+    assert names.count("teste.paralelo") == 3
+    assert tree["children"][0]["attrs"] == {"chars_in": 10, "chars_out": 3, "cached": True}
+    assert tree["children"][1]["attrs"]["error"] == "ValueError"
+    assert tree["duration_ms"] >= max(c["duration_ms"] for c in tree["children"])
+    assert STAGE_SECONDS.count(stage="teste.paralelo") == 3
+
+
+def _check_pipeline_events_span() -> None:
+    events = []
+    ev = PipelineEvents(events.append)
+    with span("pipeline.run") as root:
+        with ev.stage("ocr", doc="edital") as info:
+            info.update(chars_out=1234, cached=True)
+    stage = root.to_dict()["children"][0]
+    assert stage["name"] == "ocr"
+    assert stage["attrs"] == {"doc": "edital", "chars_out": 1234, "cached": True}
+    assert events[-1]["status"] == "done" and events[-1]["chars_out"] == 1234
+
+    text = REGISTRY.render()
+    assert "# TYPE matchllm_stage_duration_seconds histogram" in text
+    assert 'matchllm_stage_total{cache="hit",stage="ocr",status="ok"}' in text
+    assert 'matchllm_stage_io_total{kind="chars_out",stage="ocr"} 1234' in text
+    assert 'matchllm_stage_duration_seconds_bucket{stage="ocr",le="+Inf"}' in text
+
+
+def _check_registry_format() -> None:
+    reg = MetricsRegistry()
+    h = reg.histogram("t_seconds", "teste", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 2.0):
+        h.observe(v, route="/x")
+    c = reg.counter("t_total", "teste")
+    c.inc(route='a"b')
+    lines = reg.render().splitlines()
+    assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/x",le="1"} 2' in lines
+    assert 't_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{route="/x"} 3' in lines
+    assert 't_total{route="a\\"b"} 1' in lines
+    try:
+        reg.counter("t_seconds", "outro tipo")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("tipo de métrica conflitante deveria falhar")
+
+
+def _check_profile() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["PROFILE"] = "cprofile"
+        os.environ["PROFILE_DIR"] = tmp
+        try:
+            with span("teste.perfil") as s, profile("teste perfil"):
+                sum(i * i for i in range(10000))
+        finally:
+            os.environ.pop("PROFILE", None)
+            os.environ.pop("PROFILE_DIR", None)
+        path = Path(s.attrs["profile"])
+        assert path.parent == Path(tmp) and path.suffix == ".prof" and path.stat().st_size > 0
+
+        # Desligado: nada é gravado
+        with span("teste.sem_perfil") as s2, profile("x"):
+            pass
+        assert "profile" not in s2.attrs
+        assert len(list(Path(tmp).iterdir())) == 1
+
+
+def main() -> None:
+    _check_nested_spans()
+    _check_pipeline_events_span()
+    _check_registry_format()
+    _check_profile()
+    print("OK: tracing por etapa, /metrics e profiling opcional")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pickle
+
+# Permite executar via: python teste/teste_vector_index.py
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.vectorstore.index import VectorIndex
+
+
+def _check_kind(kind: str, vecs: np.ndarray, chunks: list[str]) -> None:
+    idx = VectorIndex(dim=vecs.shape[1], kind=kind)
+    idx.add(vecs, chunks)
+    assert len(idx) == len(chunks)
+
+    # Consulta = vetor 7 escalado: cosseno ignora a norma (L2 não)
+    scale = 1.0 if kind == "flat_l2" else 3.0
+    hits = idx.search_scored(vecs[7] * scale, top_k=3)
+    assert hits[0].id == 7 and hits[0].chunk == "chunk 7", (kind, hits[:1])
+    if kind in ("flat_ip", "hnsw"):
+        assert abs(hits[0].score - 1.0) < 1e-4, (kind, hits[0].score)
+    assert idx.search(vecs[7], top_k=1) == ["chunk 7"]
+
+    # Busca em lote
+    scores, ids = idx.search_batch(vecs[[1, 2, 3]], top_k=2)
+    assert scores.shape == (3, 2) and ids[:, 0].tolist() == [1, 2, 3], (kind, ids)
+
+    # Remoção e substituição por id
+    assert idx.remove([7, 5000]) == 1
+    assert all(h.id != 7 for h in idx.search_scored(vecs[7], top_k=5)), kind
+    idx.add_with_ids(vecs[[7]], [7], ["chunk 7 v2"])
+    assert idx.search(vecs[7], top_k=1) == ["chunk 7 v2"], kind
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ip, cp = str(Path(tmp) / "i.faiss"), str(Path(tmp) / "c.chunks")
+        idx.save(ip, cp)
+        other = VectorIndex(kind="flat_ip")
+        other.load(ip, cp)
+        assert other.kind == idx.kind and len(other) == len(idx)
+        assert other.search(vecs[7], top_k=1) == ["chunk 7 v2"], kind
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((1000, 32)).astype("float32")
+    chunks = [f"chunk {i}" for i in range(len(vecs))]
+
+    for kind in ("flat_ip", "hnsw", "ivfpq", "flat_l2"):
+        _check_kind(kind, vecs, chunks)
+
+    # IVF-PQ sem dados suficientes cai para flat_ip
+    small = VectorIndex(dim=32, kind="ivfpq")
+    small.add(vecs[:10], chunks[:10])
+    assert small.kind == "flat_ip" and small.search(vecs[3], top_k=1) == ["chunk 3"]
+
+    # Formato legado (IndexFlatL2 + lista pickle) continua carregando
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = faiss.IndexFlatL2(32)
+        legacy.add(vecs[:20])
+        ip, cp = str(Path(tmp) / "i.faiss"), str(Path(tmp) / "c.pkl")
+        faiss.write_index(legacy, ip)
+        with open(cp, "wb") as f:
+            pickle.dump(chunks[:20], f)
+        idx = VectorIndex()
+        try:
+            idx.load(ip, cp)
+            raise AssertionError("pickle legado não deveria carregar sem CHUNKSTORE_ALLOW_PICKLE=1")
+        except ValueError:
+            pass
+        os.environ["CHUNKSTORE_ALLOW_PICKLE"] = "1"
+        idx.load(ip, cp)
+        os.environ.pop("CHUNKSTORE_ALLOW_PICKLE", None)
+        assert idx.kind == "flat_l2" and idx.chunks == chunks[:20]
+        assert idx.search(vecs[5], top_k=1) == ["chunk 5"]
+        assert idx.remove([5]) == 1 and len(idx) == 19
+
+    print("OK: VectorIndex (flat_ip/hnsw/ivfpq/flat_l2)")
+
+
+if __name__ == "__main__":
+    main()